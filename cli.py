@@ -6,11 +6,16 @@ A simplified CLI for publishing DePIN scan results to blockchain ledgers and rep
 Returns only JSON output.
 """
 
+import io
 import json
 import sys
 import argparse
 import os
-from typing import Dict, Any
+import signal
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, Any, Iterator, Optional, Callable
 
 def load_env():
     """Load environment variables from .env file if it exists."""
@@ -24,13 +29,17 @@ def load_env():
     except FileNotFoundError:
         pass  # .env file is optional
 
+# Only configuration and the daemon client are imported up front; each command
+# handler imports the publishers it uses, so e.g. `report` never loads web3
 try:
-    from pgdn_publisher import (
-        publish_to_ledger, 
-        publish_report, 
-        LedgerPublisher, 
-        ReportPublisher, 
-        PublisherConfig
+    from pgdn_publisher.config import PublisherConfig
+    from pgdn_publisher.daemon import (
+        PublisherDaemon,
+        PublisherPool,
+        DaemonError,
+        call_daemon,
+        config_fingerprint,
+        default_socket_path,
     )
 except ImportError:
     print(json.dumps({
@@ -40,9 +49,37 @@ except ImportError:
     sys.exit(1)
 
 
-def parse_arguments():
-    """Parse command line arguments."""
-    parser = argparse.ArgumentParser(
+# Commands the serve daemon runs with its warm publishers
+DAEMON_COMMANDS = ('ledger', 'report', 'status', 'retrieve', 'query')
+
+
+def add_scan_file_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the --scan-file parsing options shared by ledger and report."""
+    parser.add_argument('--parse-workers', type=int, help='Processes parsing --scan-file (default: CPU count)')
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='Publish --scan-file chunks as soon as they are parsed instead of in file order'
+    )
+
+
+class RequestArgumentParser(argparse.ArgumentParser):
+    """Parser for arguments sent to the daemon: reports errors instead of exiting the daemon."""
+    
+    def error(self, message):
+        raise ValueError(f"{self.prog}: error: {message}")
+    
+    def exit(self, status=0, message=None):
+        raise ValueError(message.strip() if message else f"{self.prog} exited with status {status}")
+    
+    def _print_message(self, message, file=None):
+        # Usage and help text would end up on the daemon's terminal
+        pass
+
+
+def parse_arguments(argv=None, parser_class=argparse.ArgumentParser):
+    """Parse command line arguments (parser_class also builds the subcommand parsers)."""
+    parser = parser_class(
         description="PGDN Publisher - Blockchain ledger and report publishing CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -61,6 +98,30 @@ Examples:
   
   # Retrieve report from Walrus
   pgdn-publisher retrieve --walrus-hash "abc123def456"
+  
+  # All CRITICAL reports for a host in the last 30 days
+  pgdn-publisher query --host-uid validator_123 --risk-level CRITICAL --days 30
+  
+  # Retrieve only the security assessment of a report
+  pgdn-publisher retrieve --walrus-hash "abc123def456" --section security_assessment
+  
+  # Store reports on Walrus and publish them to the ledger with the blob ID as report_pointer
+  pgdn-publisher pipeline --input scans.ndjson --no-wait > results.ndjson
+  
+  # Keep warm publishers in a daemon; later commands are forwarded to it
+  pgdn-publisher serve &
+  pgdn-publisher ledger --scan-data '{"host_uid": "validator_123", "trust_score": 85, "summary_hash": "0x..."}'
+  
+  # Queue scans locally and publish them in the background
+  pgdn-publisher enqueue --input scans.ndjson
+  pgdn-publisher worker
+  
+  # Export many reports as NDJSON, resuming an interrupted export
+  pgdn-publisher retrieve-bulk --input blob_ids.txt --output reports.ndjson --resume
+  
+  # Anchor a day of scans with one transaction, then verify a scan's proof
+  pgdn-publisher anchor --scan-file scans.ndjson > proofs.ndjson
+  pgdn-publisher verify --proof-file proofs.ndjson
         """
     )
     
@@ -74,29 +135,49 @@ Examples:
         choices=['zksync', 'sui'],
         help='Blockchain network to use (overrides PGDN_NETWORK env var)'
     )
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Run the command in this process even if a publisher daemon is running'
+    )
+    parser.add_argument(
+        '--socket',
+        help='Publisher daemon socket path (overrides PGDN_DAEMON_SOCKET env var)'
+    )
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Ledger publishing command
     ledger_parser = subparsers.add_parser('ledger', help='Publish scan to blockchain ledger')
-    ledger_parser.add_argument(
+    ledger_source = ledger_parser.add_mutually_exclusive_group(required=True)
+    ledger_source.add_argument(
         '--scan-data',
-        required=True,
         help='Scan data as JSON string (must include summary_hash)'
     )
+    ledger_source.add_argument(
+        '--scan-file',
+        help='NDJSON file with one scan per line, or - for stdin; writes one NDJSON result per scan'
+    )
     ledger_parser.add_argument(
         '--no-wait',
         action='store_true',
         help='Do not wait for transaction confirmation'
     )
+    ledger_parser.add_argument('--batch-size', type=int, default=50, help='Scans per transaction with --scan-file (default: 50)')
+    ledger_parser.add_argument('--window', type=int, help='Transactions in flight with --scan-file')
+    add_scan_file_arguments(ledger_parser)
     
     # Report publishing command
     report_parser = subparsers.add_parser('report', help='Publish scan report')
-    report_parser.add_argument(
+    report_source = report_parser.add_mutually_exclusive_group(required=True)
+    report_source.add_argument(
         '--scan-data',
-        required=True,
         help='Scan data as JSON string'
     )
+    report_source.add_argument(
+        '--scan-file',
+        help='NDJSON file with one scan per line, or - for stdin; writes one NDJSON result per scan'
+    )
     report_parser.add_argument(
         '--destinations',
         nargs='+',
@@ -104,10 +185,97 @@ Examples:
         default=['walrus', 'local_file'],
         help='Publishing destinations (default: walrus local_file)'
     )
+    report_parser.add_argument('--window', type=int, help='Reports in flight with --scan-file (default: WALRUS_POOL_SIZE)')
+    add_scan_file_arguments(report_parser)
+    
+    # Merkle anchoring commands
+    anchor_parser = subparsers.add_parser(
+        'anchor',
+        help='Anchor a set of scans with one ledger entry holding their Merkle root'
+    )
+    anchor_parser.add_argument(
+        '--scan-file',
+        required=True,
+        help='NDJSON (or Arrow/Parquet) file with one scan per line, or - for stdin; writes one NDJSON proof per scan'
+    )
+    anchor_parser.add_argument(
+        '--manifest-destination',
+        choices=['local', 'walrus'],
+        help='Where to store the manifest (overrides ANCHOR_MANIFEST_DESTINATION)'
+    )
+    anchor_parser.add_argument(
+        '--no-wait',
+        action='store_true',
+        help='Do not wait for transaction confirmation'
+    )
+    add_scan_file_arguments(anchor_parser)
+    
+    verify_parser = subparsers.add_parser('verify', help='Verify Merkle inclusion proofs written by anchor')
+    verify_source = verify_parser.add_mutually_exclusive_group(required=True)
+    verify_source.add_argument('--proof', help='One proof record as JSON string')
+    verify_source.add_argument(
+        '--proof-file',
+        help='NDJSON file of proof records (e.g. anchor output), or - for stdin; writes one NDJSON result per proof'
+    )
+    verify_parser.add_argument(
+        '--no-ledger',
+        action='store_true',
+        help='Only check the proofs, without looking up their roots on the ledger'
+    )
+    
+    # Pipeline command
+    pipeline_parser = subparsers.add_parser(
+        'pipeline',
+        help='Stream scans through report formatting, Walrus storage and ledger publishing'
+    )
+    pipeline_parser.add_argument(
+        '--input',
+        default='-',
+        help='NDJSON file with one scan per line, or - for stdin (default: -)'
+    )
+    pipeline_parser.add_argument(
+        '--no-wait',
+        action='store_true',
+        help='Do not wait for transaction confirmation'
+    )
+    pipeline_parser.add_argument(
+        '--local-copy',
+        action='store_true',
+        help='Also store each report in the local reports directory'
+    )
+    pipeline_parser.add_argument('--queue-size', type=int, default=64, help='Capacity of each queue between stages (default: 64)')
+    pipeline_parser.add_argument('--walrus-workers', type=int, default=8, help='Concurrent Walrus uploads (default: 8)')
+    pipeline_parser.add_argument('--ledger-workers', type=int, default=1, help='Concurrent ledger submissions (default: 1)')
+    
+    # Outbox commands
+    enqueue_parser = subparsers.add_parser('enqueue', help='Queue scans in the local outbox for background publishing')
+    enqueue_source = enqueue_parser.add_mutually_exclusive_group(required=True)
+    enqueue_source.add_argument('--scan-data', help='Scan data as JSON string')
+    enqueue_source.add_argument('--input', help='NDJSON file with one scan per line, or - for stdin')
+    
+    worker_parser = subparsers.add_parser('worker', help='Publish queued scans from the local outbox')
+    worker_parser.add_argument('--once', action='store_true', help='Make a single pass over the outbox and exit')
+    worker_parser.add_argument(
+        '--no-store',
+        action='store_true',
+        help='Do not store reports on Walrus; scans must carry their own report_pointer'
+    )
+    
+    outbox_parser = subparsers.add_parser('outbox', help='Show outbox entry counts by state')
+    outbox_parser.add_argument('--purge-days', type=float, help='Delete confirmed entries older than N days')
+    
+    # Local store maintenance
+    subparsers.add_parser(
+        'compact-store',
+        help='Expire and compact the segmented local report store (LOCAL_STORE_BACKEND=segments)'
+    )
     
     # Status command
     subparsers.add_parser('status', help='Check ledger connection status')
     
+    # Daemon command
+    subparsers.add_parser('serve', help='Run a publisher daemon that keeps publishers warm between commands')
+    
     # Retrieve command
     retrieve_parser = subparsers.add_parser('retrieve', help='Retrieve report from Walrus')
     retrieve_parser.add_argument(
@@ -115,8 +283,61 @@ Examples:
         required=True,
         help='Walrus hash of the report to retrieve'
     )
+    retrieve_parser.add_argument(
+        '--section',
+        help='Retrieve only this top-level report section (e.g. security_assessment)'
+    )
+    
+    # Bulk retrieve command
+    bulk_parser = subparsers.add_parser('retrieve-bulk', help='Retrieve many reports from Walrus as NDJSON')
+    bulk_parser.add_argument(
+        '--input',
+        default='-',
+        help='File with one Walrus hash per line, or - for stdin (default: -)'
+    )
+    bulk_parser.add_argument(
+        '--output',
+        help='NDJSON output file (default: stdout)'
+    )
+    bulk_parser.add_argument(
+        '--window',
+        type=int,
+        help='Maximum concurrent retrievals (default: WALRUS_POOL_SIZE)'
+    )
+    bulk_parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Append to --output, skipping hashes it already contains successfully'
+    )
     
-    return parser.parse_args()
+    # Query command
+    query_parser = subparsers.add_parser('query', help='Query the local report index')
+    query_parser.add_argument('--host-uid', help='Only reports for this host')
+    query_parser.add_argument('--validator-id', help='Only reports for this validator')
+    query_parser.add_argument('--scan-id', help='Only reports for this scan')
+    query_parser.add_argument(
+        '--risk-level',
+        choices=['LOW', 'MEDIUM', 'HIGH', 'CRITICAL'],
+        help='Only reports with this risk level'
+    )
+    query_parser.add_argument('--min-score', type=int, help='Minimum trust score')
+    query_parser.add_argument('--max-score', type=int, help='Maximum trust score')
+    query_parser.add_argument('--days', type=float, help='Only reports generated in the last N days')
+    query_parser.add_argument(
+        '--order-by',
+        choices=['generated_at', 'trust_score'],
+        default='generated_at',
+        help='Sort column (default: generated_at)'
+    )
+    query_parser.add_argument('--ascending', action='store_true', help='Sort ascending instead of descending')
+    query_parser.add_argument('--limit', type=int, default=100, help='Maximum number of results (default: 100)')
+    query_parser.add_argument(
+        '--reindex',
+        action='store_true',
+        help='Index existing report files in the reports directory before querying'
+    )
+    
+    return parser.parse_args(argv)
 
 
 def load_scan_data(scan_data_str: str) -> Dict[str, Any]:
@@ -127,9 +348,25 @@ def load_scan_data(scan_data_str: str) -> Dict[str, Any]:
         raise ValueError(f"Invalid JSON in scan data: {e}")
 
 
-def handle_ledger_command(args, config: PublisherConfig) -> Dict[str, Any]:
+def handle_ledger_command(args, config: PublisherConfig, pool: Optional[PublisherPool] = None) -> Dict[str, Any]:
     """Handle ledger publishing command."""
     try:
+        from pgdn_publisher.ledger import LedgerPublisher
+        
+        if args.scan_file:
+            from pgdn_publisher.bulk import publish_ledger, publish_ledger_batches
+            
+            publisher = LedgerPublisher(config)
+            options = dict(batch_size=args.batch_size, window=args.window, wait_for_confirmation=not args.no_wait)
+            try:
+                return run_scan_file(
+                    args,
+                    lambda scans: publish_ledger(publisher, scans, sys.stdout, **options),
+                    lambda record_batches: publish_ledger_batches(publisher, record_batches, sys.stdout, **options)
+                )
+            finally:
+                publisher.close()
+        
         scan_data = load_scan_data(args.scan_data)
         
         # Validate that summary_hash is present
@@ -143,8 +380,8 @@ def handle_ledger_command(args, config: PublisherConfig) -> Dict[str, Any]:
         # Set wait for confirmation based on flag
         wait_for_confirmation = not args.no_wait
         
-        # Create publisher and publish
-        publisher = LedgerPublisher(config)
+        # Create publisher (or reuse the daemon's) and publish
+        publisher = pool.ledger(config) if pool else LedgerPublisher(config)
         result = publisher.publish(scan_data, wait_for_confirmation=wait_for_confirmation)
         
         return {
@@ -161,17 +398,33 @@ def handle_ledger_command(args, config: PublisherConfig) -> Dict[str, Any]:
         }
 
 
-def handle_report_command(args, config: PublisherConfig) -> Dict[str, Any]:
+def handle_report_command(args, config: PublisherConfig, pool: Optional[PublisherPool] = None) -> Dict[str, Any]:
     """Handle report publishing command."""
     try:
+        from pgdn_publisher.reports import publish_report, ReportPublisher
+        
+        if args.scan_file:
+            from pgdn_publisher.bulk import publish_reports
+            
+            publisher = ReportPublisher(config)
+            try:
+                return run_scan_file(args, lambda scans: publish_reports(
+                    publisher, scans, sys.stdout, args.destinations, args.window
+                ))
+            finally:
+                publisher.close()
+        
         scan_data = load_scan_data(args.scan_data)
         
         # Publish report
-        results = publish_report(
-            scan_data,
-            destinations=args.destinations,
-            config=config
-        )
+        if pool:
+            results = pool.reports(config).publish(scan_data, args.destinations)
+        else:
+            results = publish_report(
+                scan_data,
+                destinations=args.destinations,
+                config=config
+            )
         
         # Convert PublishResult objects to dicts for JSON serialization
         serializable_results = {}
@@ -180,7 +433,8 @@ def handle_report_command(args, config: PublisherConfig) -> Dict[str, Any]:
                 "success": result.success,
                 "destination": result.destination,
                 "identifier": result.identifier,
-                "error": result.error
+                "error": result.error,
+                "duration": result.duration
             }
         
         # Determine overall success
@@ -201,10 +455,290 @@ def handle_report_command(args, config: PublisherConfig) -> Dict[str, Any]:
         }
 
 
-def handle_status_command(config: PublisherConfig) -> Dict[str, Any]:
-    """Handle status command."""
+def run_scan_file(args, publish: Callable[[Iterator[Dict[str, Any]]], Dict[str, int]],
+                  publish_columnar: Optional[Callable[[Iterator[Any]], Dict[str, int]]] = None) -> Dict[str, Any]:
+    """
+    Stream the scans of --scan-file through publish and summarize the run.
+    
+    Arrow/Parquet files go to publish_columnar as record batches when given,
+    otherwise their rows are converted to scan dictionaries. NDJSON lines that
+    are not scans reach publish as InvalidScan and get a failed record.
+    """
+    from pgdn_publisher.scan_reader import is_columnar_path
+    
+    start = time.time()
+    if args.scan_file == '-':
+        from pgdn_publisher.bulk import read_scans
+        counts = publish(read_scans(sys.stdin, keep_invalid=True))
+    elif is_columnar_path(args.scan_file):
+        from pgdn_publisher.arrow_input import read_record_batches
+        if publish_columnar:
+            counts = publish_columnar(read_record_batches(args.scan_file))
+        else:
+            record_batches = read_record_batches(args.scan_file, columns=None)
+            counts = publish(row for record_batch in record_batches for row in record_batch.to_pylist())
+    else:
+        # Files are memory-mapped and parsed in parallel
+        from pgdn_publisher.scan_reader import read_scan_file
+        scans = read_scan_file(args.scan_file, workers=args.parse_workers, ordered=not args.unordered,
+                               keep_invalid=True)
+        try:
+            counts = publish(scans)
+        finally:
+            scans.close()
+    elapsed = time.time() - start
+    
+    total = counts["published"] + counts["failed"]
+    return {
+        "success": counts["failed"] == 0,
+        "command": args.command,
+        **counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "scans_per_second": round(total / elapsed, 2) if elapsed > 0 else None
+    }
+
+
+def handle_pipeline_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle pipeline command; writes one NDJSON result per scan to stdout."""
+    try:
+        from pgdn_publisher.bulk import read_scans
+        from pgdn_publisher.pipeline import PublishPipeline
+        
+        pipeline = PublishPipeline(
+            config,
+            queue_size=args.queue_size,
+            walrus_workers=args.walrus_workers,
+            ledger_workers=args.ledger_workers,
+            wait_for_confirmation=not args.no_wait,
+            local_copy=args.local_copy
+        )
+        
+        counts = {"published": 0, "failed": 0}
+        input_file = sys.stdin if args.input == '-' else open(args.input, 'r')
+        try:
+            for result in pipeline.run(read_scans(input_file)):
+                counts["published" if result.success else "failed"] += 1
+                sys.stdout.write(json.dumps(asdict(result), default=str) + '\n')
+                sys.stdout.flush()
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+            pipeline.report_publisher.close()
+        
+        return {
+            "success": counts["failed"] == 0,
+            "command": "pipeline",
+            **counts
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "pipeline",
+            "error": str(e)
+        }
+
+
+def handle_enqueue_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle enqueue command."""
+    try:
+        from pgdn_publisher.bulk import read_scans
+        from pgdn_publisher.outbox import open_outbox
+        
+        outbox = open_outbox(config)
+        try:
+            if args.scan_data:
+                enqueued = outbox.enqueue_many([load_scan_data(args.scan_data)])
+            else:
+                input_file = sys.stdin if args.input == '-' else open(args.input, 'r')
+                try:
+                    enqueued = outbox.enqueue_many(read_scans(input_file))
+                finally:
+                    if input_file is not sys.stdin:
+                        input_file.close()
+        finally:
+            outbox.close()
+        
+        return {
+            "success": True,
+            "command": "enqueue",
+            "enqueued": enqueued
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "enqueue",
+            "error": str(e)
+        }
+
+
+def handle_worker_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle worker command."""
     try:
+        from pgdn_publisher.outbox import OutboxWorker
+        
+        worker = OutboxWorker(config, store_reports=not args.no_store)
+        try:
+            if args.once:
+                progress = worker.run_once()
+            else:
+                progress = None
+                worker.run()
+            counts = worker.outbox.counts()
+        finally:
+            worker.close()
+        
+        result = {
+            "success": True,
+            "command": "worker",
+            "outbox": counts
+        }
+        if progress is not None:
+            result["progress"] = progress
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "worker",
+            "error": str(e)
+        }
+
+
+def handle_outbox_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle outbox command."""
+    try:
+        from pgdn_publisher.outbox import open_outbox
+        
+        outbox = open_outbox(config)
+        try:
+            purged = outbox.purge(args.purge_days * 86400) if args.purge_days is not None else None
+            counts = outbox.counts()
+        finally:
+            outbox.close()
+        
+        result = {
+            "success": True,
+            "command": "outbox",
+            "outbox": counts
+        }
+        if purged is not None:
+            result["purged"] = purged
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "outbox",
+            "error": str(e)
+        }
+
+
+def handle_compact_store_command(config: PublisherConfig) -> Dict[str, Any]:
+    """Handle compact-store command."""
+    try:
+        from pgdn_publisher.reports import ReportPublisher
+        
+        if config.local_store_backend != 'segments':
+            raise ValueError("The local store is not segmented (set LOCAL_STORE_BACKEND=segments)")
+        
+        publisher = ReportPublisher(config)
+        try:
+            segments = publisher.compact_local_store()
+        finally:
+            publisher.close()
+        
+        return {
+            "success": True,
+            "command": "compact-store",
+            **segments
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "compact-store",
+            "error": str(e)
+        }
+
+
+def handle_anchor_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle anchor command; writes one NDJSON proof record per scan to stdout."""
+    try:
+        from pgdn_publisher.ledger import LedgerPublisher
+        from pgdn_publisher.anchor import anchor_scans
+        
+        if args.manifest_destination:
+            config.anchor_manifest_destination = args.manifest_destination
+        
         publisher = LedgerPublisher(config)
+        anchor = {}
+        
+        def publish(scans):
+            anchor.update(anchor_scans(publisher, scans, sys.stdout, wait_for_confirmation=not args.no_wait))
+            return {"published": anchor.pop("published"), "failed": anchor.pop("failed")}
+        
+        summary = run_scan_file(args, publish)
+        return {**summary, **anchor}
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "anchor",
+            "error": str(e)
+        }
+
+
+def handle_verify_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle verify command."""
+    try:
+        from pgdn_publisher.anchor import verify_records
+        from pgdn_publisher.bulk import read_scans
+        
+        publisher = None
+        if not args.no_ledger:
+            from pgdn_publisher.ledger import LedgerPublisher
+            publisher = LedgerPublisher(config)
+        
+        if args.proof:
+            output = io.StringIO()
+            counts = verify_records([json.loads(args.proof)], output, publisher)
+            return {
+                "success": counts["invalid"] == 0,
+                "command": "verify",
+                "result": json.loads(output.getvalue())
+            }
+        
+        input_file = sys.stdin if args.proof_file == '-' else open(args.proof_file, 'r')
+        try:
+            # Lines without a proof (failed scans) are skipped
+            records = (record for record in read_scans(input_file) if 'proof' in record)
+            counts = verify_records(records, sys.stdout, publisher)
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+        
+        return {
+            "success": counts["invalid"] == 0,
+            "command": "verify",
+            **counts
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "verify",
+            "error": str(e)
+        }
+
+
+def handle_status_command(config: PublisherConfig, pool: Optional[PublisherPool] = None) -> Dict[str, Any]:
+    """Handle status command."""
+    try:
+        from pgdn_publisher.ledger import LedgerPublisher
+        
+        publisher = pool.ledger(config) if pool else LedgerPublisher(config)
         status = publisher.get_status()
         
         return {
@@ -221,10 +755,22 @@ def handle_status_command(config: PublisherConfig) -> Dict[str, Any]:
         }
 
 
-def handle_retrieve_command(args, config: PublisherConfig) -> Dict[str, Any]:
+def handle_retrieve_command(args, config: PublisherConfig, pool: Optional[PublisherPool] = None) -> Dict[str, Any]:
     """Handle retrieve command."""
     try:
-        publisher = ReportPublisher(config)
+        from pgdn_publisher.reports import ReportPublisher
+        
+        publisher = pool.reports(config) if pool else ReportPublisher(config)
+        
+        if args.section:
+            return {
+                "success": True,
+                "command": "retrieve",
+                "walrus_hash": args.walrus_hash,
+                "section": args.section,
+                "data": publisher.retrieve_section(args.walrus_hash, args.section)
+            }
+        
         report = publisher.retrieve_from_walrus(args.walrus_hash)
         
         if report:
@@ -249,6 +795,198 @@ def handle_retrieve_command(args, config: PublisherConfig) -> Dict[str, Any]:
         }
 
 
+def handle_retrieve_bulk_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle retrieve-bulk command."""
+    try:
+        from pgdn_publisher.bulk import read_blob_ids, completed_blob_ids, export_reports
+        from pgdn_publisher.reports import ReportPublisher
+        
+        if args.resume and not args.output:
+            raise ValueError("--resume requires --output")
+        
+        skip = completed_blob_ids(args.output) if args.resume else set()
+        publisher = ReportPublisher(config)
+        
+        input_file = sys.stdin if args.input == '-' else open(args.input, 'r')
+        output_file = sys.stdout if not args.output else open(args.output, 'a' if args.resume else 'w')
+        try:
+            counts = export_reports(publisher, read_blob_ids(input_file), output_file, args.window, skip)
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+            if output_file is not sys.stdout:
+                output_file.close()
+            publisher.close()
+        
+        return {
+            "success": counts['failed'] == 0,
+            "command": "retrieve-bulk",
+            "output": args.output,
+            **counts
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "retrieve-bulk",
+            "error": str(e)
+        }
+
+
+def handle_query_command(args, config: PublisherConfig, pool: Optional[PublisherPool] = None) -> Dict[str, Any]:
+    """Handle query command."""
+    try:
+        from pgdn_publisher.reports import ReportPublisher
+        
+        index = (pool.reports(config) if pool else ReportPublisher(config)).get_report_index()
+        
+        reindexed = index.index_directory(config.reports_dir) if args.reindex else None
+        
+        reports = index.query(
+            host_uid=args.host_uid,
+            validator_id=args.validator_id,
+            scan_id=args.scan_id,
+            risk_level=args.risk_level,
+            min_score=args.min_score,
+            max_score=args.max_score,
+            since=time.time() - args.days * 86400 if args.days is not None else None,
+            order_by=args.order_by,
+            descending=not args.ascending,
+            limit=args.limit
+        )
+        
+        result = {
+            "success": True,
+            "command": "query",
+            "count": len(reports),
+            "reports": reports
+        }
+        if reindexed is not None:
+            result["reindexed"] = reindexed
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "query",
+            "error": str(e)
+        }
+
+
+def run_command(args, config: PublisherConfig, pool: Optional[PublisherPool] = None) -> Dict[str, Any]:
+    """Route parsed arguments to their command handler."""
+    if args.command == 'ledger':
+        return handle_ledger_command(args, config, pool)
+    elif args.command == 'report':
+        return handle_report_command(args, config, pool)
+    elif args.command == 'status':
+        return handle_status_command(config, pool)
+    elif args.command == 'retrieve':
+        return handle_retrieve_command(args, config, pool)
+    elif args.command == 'query':
+        return handle_query_command(args, config, pool)
+    elif args.command == 'enqueue':
+        return handle_enqueue_command(args, config)
+    elif args.command == 'worker':
+        return handle_worker_command(args, config)
+    elif args.command == 'outbox':
+        return handle_outbox_command(args, config)
+    elif args.command == 'compact-store':
+        return handle_compact_store_command(config)
+    elif args.command == 'anchor':
+        return handle_anchor_command(args, config)
+    elif args.command == 'verify':
+        return handle_verify_command(args, config)
+    elif args.command == 'pipeline':
+        return handle_pipeline_command(args, config)
+    elif args.command == 'retrieve-bulk':
+        return handle_retrieve_bulk_command(args, config)
+    elif args.command == 'serve':
+        return handle_serve_command(args, config)
+    else:
+        return {
+            "success": False,
+            "error": f"Unknown command: {args.command}"
+        }
+
+
+def forward_to_daemon(args, config: PublisherConfig) -> Optional[Dict[str, Any]]:
+    """Run a command in a running publisher daemon; None if it is not running or declines."""
+    try:
+        response = call_daemon(
+            {"argv": sys.argv[1:], "fingerprint": config_fingerprint(config)},
+            args.socket or config.daemon_socket
+        )
+    except (DaemonError, OSError, ValueError):
+        return None
+    if not response or not response.get('forwarded'):
+        return None
+    return response['result']
+
+
+def dispatch_request(request: Dict[str, Any], pool: PublisherPool) -> Dict[str, Any]:
+    """Run one forwarded command with the daemon's warm publishers."""
+    try:
+        request_args = parse_arguments(request['argv'], parser_class=RequestArgumentParser)
+    except ValueError as e:
+        return {"forwarded": False, "error": f"Invalid arguments: {e}"}
+    if request_args.command not in DAEMON_COMMANDS:
+        return {"forwarded": False, "error": f"Command not served by the daemon: {request_args.command}"}
+    
+    config = pool.config(request_args.network)
+    if request.get('fingerprint') != config_fingerprint(config):
+        return {"forwarded": False, "error": "Client configuration differs from the daemon's"}
+    
+    # Ledger transactions of one network are serialised; status only reads
+    if request_args.command == 'ledger':
+        with pool.network_lock(config.network):
+            result = run_command(request_args, config, pool)
+    else:
+        result = run_command(request_args, config, pool)
+    return {"forwarded": True, "result": result}
+
+
+def handle_serve_command(args, config: PublisherConfig) -> Dict[str, Any]:
+    """Handle serve command; runs until interrupted or terminated."""
+    pool = PublisherPool()
+    served = [0]
+    served_lock = threading.Lock()
+    
+    def dispatch(request: Dict[str, Any]) -> Dict[str, Any]:
+        response = dispatch_request(request, pool)
+        if response.get('forwarded'):
+            with served_lock:
+                served[0] += 1
+        return response
+    
+    try:
+        socket_path = args.socket or config.daemon_socket or default_socket_path()
+        server = PublisherDaemon(socket_path, dispatch)
+    except Exception as e:
+        return {
+            "success": False,
+            "command": "serve",
+            "error": str(e)
+        }
+    
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(json.dumps({"success": True, "command": "serve", "socket": socket_path, "status": "listening"}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+    
+    return {
+        "success": True,
+        "command": "serve",
+        "socket": socket_path,
+        "requests_served": served[0]
+    }
+
+
 def main():
     """Main CLI entry point."""
     try:
@@ -274,23 +1012,21 @@ def main():
             }))
             sys.exit(1)
         
-        # Route to command handlers
-        if args.command == 'ledger':
-            result = handle_ledger_command(args, config)
-        elif args.command == 'report':
-            result = handle_report_command(args, config)
-        elif args.command == 'status':
-            result = handle_status_command(config)
-        elif args.command == 'retrieve':
-            result = handle_retrieve_command(args, config)
-        else:
-            result = {
-                "success": False,
-                "error": f"Unknown command: {args.command}"
-            }
+        # Forward to a running daemon when possible, otherwise run here
+        result = None
+        bulk_input = getattr(args, 'scan_file', None) or getattr(args, 'proof_file', None)
+        if args.command in DAEMON_COMMANDS and not args.no_daemon and not bulk_input:
+            result = forward_to_daemon(args, config)
+        if result is None:
+            result = run_command(args, config)
         
-        # Output result as JSON
-        print(json.dumps(result, indent=2))
+        # Output result as JSON; keep stdout pure NDJSON when it carries bulk records
+        if bulk_input:
+            print(json.dumps(result))
+        elif args.command == 'pipeline' or (args.command == 'retrieve-bulk' and not args.output):
+            print(json.dumps(result, indent=2), file=sys.stderr)
+        else:
+            print(json.dumps(result, indent=2))
         
         # Exit with appropriate code
         if not result.get('success', False):
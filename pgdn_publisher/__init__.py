@@ -4,9 +4,14 @@ PGDN Publisher Library
 A pure Python library for publishing DePIN scan results to blockchain ledgers and reports.
 """
 
-from .ledger import publish_to_ledger, LedgerPublisher, create_ledger_publisher
-from .reports import publish_report, ReportPublisher
-from .config import PublisherConfig
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .ledger import publish_to_ledger, LedgerPublisher, create_ledger_publisher
+    from .reports import publish_report, ReportPublisher
+    from .async_reports import AsyncReportPublisher
+    from .config import PublisherConfig
+    from .records import ScanRecord
 
 __version__ = "1.5.4"
 __all__ = [
@@ -14,6 +19,36 @@ __all__ = [
     "publish_report", 
     "LedgerPublisher",
     "ReportPublisher",
+    "AsyncReportPublisher",
     "PublisherConfig",
+    "ScanRecord",
     "create_ledger_publisher"
-]
\ No newline at end of file
+]
+
+# Public names are imported from their modules on first access, so importing
+# the package (or only the report side of it) does not load web3
+_LAZY_IMPORTS = {
+    "publish_to_ledger": ".ledger",
+    "LedgerPublisher": ".ledger",
+    "create_ledger_publisher": ".ledger",
+    "publish_report": ".reports",
+    "ReportPublisher": ".reports",
+    "AsyncReportPublisher": ".async_reports",
+    "PublisherConfig": ".config",
+    "ScanRecord": ".records",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
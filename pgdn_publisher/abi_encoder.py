@@ -0,0 +1,145 @@
+"""
+Precompiled calldata encoding for the ledger contract's hot functions.
+
+web3's contract functions re-resolve the ABI, validate and normalize the
+arguments and build several intermediate dictionaries on every call. The
+functions the publisher calls in bulk are instead compiled once from the
+embedded ABI into a selector and an eth_abi type list, and encoded and
+decoded directly.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
+
+from eth_abi import encode, decode
+from eth_utils import keccak
+
+from .contract_abi import CONTRACT_ABI
+
+
+# Fields of the contract's ScanSummary struct, as returned by the lookups
+SCAN_SUMMARY_FIELDS = (
+    'host_uid', 'scan_time', 'summary_hash', 'score', 'report_pointer',
+    'status', 'deleted_at', 'deletion_reason', 'reputation_at_scan'
+)
+
+
+class AbiEncoderError(Exception):
+    """Custom exception for ABI encoding errors."""
+    pass
+
+
+@dataclass(frozen=True)
+class CompiledFunction:
+    """A contract function reduced to its selector and canonical argument types."""
+    name: str
+    selector: bytes
+    input_types: Tuple[str, ...]
+    output_types: Tuple[str, ...]
+
+    def encode_call(self, *args: Any) -> bytes:
+        """Calldata (selector followed by the ABI-encoded arguments)."""
+        return self.selector + encode(self.input_types, args)
+
+    def decode_output(self, data: bytes) -> Tuple[Any, ...]:
+        """Decode the return data of an eth_call."""
+        return decode(self.output_types, data)
+
+
+def _canonical_type(param: Dict[str, Any]) -> str:
+    """Canonical ABI type of a parameter, with tuples expanded to their components."""
+    abi_type = param['type']
+    if abi_type.startswith('tuple'):
+        components = ','.join(_canonical_type(component) for component in param['components'])
+        return f"({components}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+@lru_cache(maxsize=None)
+def compiled_function(name: str) -> CompiledFunction:
+    """
+    Compile a function of the embedded contract ABI.
+
+    Args:
+        name: Function name
+
+    Returns:
+        CompiledFunction, cached per name
+
+    Raises:
+        AbiEncoderError: If the ABI has no (or more than one) function of that name
+    """
+    entries = [entry for entry in CONTRACT_ABI if entry.get('type') == 'function' and entry.get('name') == name]
+    if len(entries) != 1:
+        raise AbiEncoderError(f"Expected one ABI function named {name}, found {len(entries)}")
+
+    entry = entries[0]
+    input_types = tuple(_canonical_type(param) for param in entry['inputs'])
+    output_types = tuple(_canonical_type(param) for param in entry.get('outputs', []))
+    signature = f"{name}({','.join(input_types)})"
+    return CompiledFunction(name, keccak(text=signature)[:4], input_types, output_types)
+
+
+def encode_publish(summaries: List[tuple]) -> bytes:
+    """
+    Calldata publishing contract-ready summary tuples.
+
+    One summary is published with publishScanSummary, several with
+    batchPublishScans, as with the web3 contract functions.
+
+    Args:
+        summaries: (host_uid, scan_time, summary_hash bytes, score, report_pointer) tuples
+    """
+    if len(summaries) == 1:
+        return compiled_function('publishScanSummary').encode_call(*summaries[0])
+    return compiled_function('batchPublishScans').encode_call(summaries)
+
+
+def encode_scan_summary_lookup(summary_hashes: List[bytes]) -> bytes:
+    """Calldata looking up summaries: scanSummaries for one hash, getBatchScanSummaries for several."""
+    if len(summary_hashes) == 1:
+        return compiled_function('scanSummaries').encode_call(summary_hashes[0])
+    return compiled_function('getBatchScanSummaries').encode_call(summary_hashes)
+
+
+def decode_scan_summary_lookup(data: bytes, count: int) -> List[Dict[str, Any]]:
+    """
+    Decode the return data of encode_scan_summary_lookup's call.
+
+    Args:
+        data: eth_call return data
+        count: Number of hashes that were looked up
+
+    Returns:
+        One dictionary of SCAN_SUMMARY_FIELDS per hash
+    """
+    if count == 1:
+        rows = [compiled_function('scanSummaries').decode_output(data)]
+    else:
+        rows = compiled_function('getBatchScanSummaries').decode_output(data)[0]
+    return [dict(zip(SCAN_SUMMARY_FIELDS, row)) for row in rows]
+
+
+def transaction_fields(to: str, data: bytes, nonce: int, gas: int, gas_price: int,
+                       chain_id: int) -> Dict[str, Any]:
+    """
+    Legacy transaction fields ready for signing, as build_transaction returns them for a gasPrice transaction.
+
+    Args:
+        to: Checksummed contract address
+        data: Calldata
+        nonce: Sender nonce
+        gas: Gas limit
+        gas_price: Gas price in wei
+        chain_id: Chain id of the network
+    """
+    return {
+        'to': to,
+        'data': '0x' + data.hex(),
+        'value': 0,
+        'nonce': nonce,
+        'gas': gas,
+        'gasPrice': gas_price,
+        'chainId': chain_id,
+    }
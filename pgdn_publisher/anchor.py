@@ -0,0 +1,292 @@
+"""
+Merkle-root anchoring of scan sets.
+
+Instead of one ledger entry per scan, a window of scans (for example a day's
+scans) is anchored by a single entry: the scans' summary hashes are the
+leaves of a Merkle tree (see the merkle module) and only the root is
+published, as the summary_hash of an entry whose report_pointer locates the
+manifest. Every scan gets an inclusion proof showing it belongs to the
+anchored set.
+
+The manifest is NDJSON: a header line with the root and the hashing scheme,
+then one line per leaf in tree order. It is written to ANCHOR_DIR and
+optionally stored on Walrus.
+"""
+
+import json
+import os
+import shutil
+import time
+from typing import Dict, Any, Optional, Iterable, Iterator, TextIO, TYPE_CHECKING
+
+from .merkle import MerkleTree, MerkleProof, MerkleError, verify_proof
+from .validation import validate_scans
+
+if TYPE_CHECKING:
+    from .ledger import LedgerPublisher
+    from .reports import ReportPublisher
+
+
+MANIFEST_VERSION = 1
+
+# Scans validated per pass while collecting leaves
+ANCHOR_CHUNK = 65536
+
+HASH_SCHEME = {
+    'leaf': 'keccak256(0x00 || summary_hash)',
+    'node': 'keccak256(0x01 || left || right)',
+    'odd_node': 'carried up unchanged'
+}
+
+
+class AnchorError(Exception):
+    """Custom exception for Merkle anchoring errors."""
+    pass
+
+
+def anchor_dir(config: Any) -> str:
+    """Directory for manifests and tree files (ANCHOR_DIR, default <reports_dir>/anchors)."""
+    return config.anchor_dir or os.path.join(config.reports_dir, 'anchors')
+
+
+def anchor_scans(ledger_publisher: 'LedgerPublisher', scans: Iterable[Dict[str, Any]], output: TextIO,
+                 report_publisher: Optional['ReportPublisher'] = None,
+                 wait_for_confirmation: bool = True) -> Dict[str, Any]:
+    """
+    Anchor a set of scans with one ledger entry and write one NDJSON proof record per scan.
+
+    Scans are validated as for ledger publishing; rejected scans get a failed
+    record with the reason. The tree and manifest are built on disk, so
+    memory use does not grow with the number of scans. If the manifest
+    cannot be written or stored, or the root transaction fails or does not
+    confirm, every collected scan gets a failed record.
+
+    Args:
+        ledger_publisher: Publisher of the root entry
+        scans: Scan data dictionaries (summary_hash required)
+        output: Text stream receiving one record per scan
+        report_publisher: Used to store the manifest when anchor_manifest_destination
+            is 'walrus' (created from the ledger publisher's config if omitted)
+        wait_for_confirmation: Wait for the root transaction to confirm
+
+    Returns:
+        Counts of 'published' and 'failed' scans, plus 'root', 'leaf_count',
+        'manifest' and 'transaction_hash' when a root was anchored
+    """
+    config = ledger_publisher.config
+    directory = anchor_dir(config)
+    os.makedirs(directory, exist_ok=True)
+
+    counts = {'published': 0, 'failed': 0}
+    work = os.path.join(directory, f'.anchor-{os.getpid()}-{time.time_ns()}')
+    tree_path, leaves_path = work + '.tree', work + '.leaves'
+
+    def leaves(leaf_file: TextIO) -> Iterator[bytes]:
+        chunk = []
+        for index, scan in enumerate(scans):
+            chunk.append((index, scan))
+            if len(chunk) >= ANCHOR_CHUNK:
+                yield from _collect(chunk, config.network, leaf_file, output, counts)
+                chunk = []
+        yield from _collect(chunk, config.network, leaf_file, output, counts)
+
+    try:
+        with open(leaves_path, 'w') as leaf_file:
+            try:
+                tree = MerkleTree.build(leaves(leaf_file), tree_path)
+            except MerkleError:
+                # Every scan was rejected (or there were none)
+                return counts
+
+        with tree:
+            root = '0x' + tree.root.hex()
+            manifest_path = os.path.join(directory, f'{root[2:]}.ndjson')
+            try:
+                _write_manifest(manifest_path, leaves_path, root, tree.leaf_count)
+                manifest = _store_manifest(manifest_path, config, report_publisher)
+                ledger = ledger_publisher.publish({
+                    'host_uid': config.anchor_host_uid,
+                    'summary_hash': root,
+                    'trust_score': 0,
+                    'report_pointer': manifest
+                }, wait_for_confirmation=wait_for_confirmation)
+            except Exception as e:
+                _fail_leaves(leaves_path, output, counts, {'error': f'Anchor publication failed: {e}'})
+                return counts
+
+            if ledger.get('confirmation_error'):
+                # Reverted or not confirmed in time: the proofs cannot be relied on
+                _fail_leaves(leaves_path, output, counts, {
+                    'error': f"Anchor transaction not confirmed: {ledger['confirmation_error']}",
+                    'transaction_hash': ledger.get('transaction_hash')
+                })
+                return counts
+
+            anchor = {
+                'root': root,
+                'leaf_count': tree.leaf_count,
+                'manifest': manifest,
+                'transaction_hash': ledger.get('transaction_hash'),
+                'network': config.network
+            }
+            with open(leaves_path, 'r') as leaf_file:
+                for line, proof in zip(leaf_file, tree.proofs()):
+                    leaf = json.loads(line)
+                    _record(output, counts, leaf['index'], leaf['scan_id'], {
+                        'success': True,
+                        'summary_hash': leaf['summary_hash'],
+                        'leaf_index': proof.leaf_index,
+                        'proof': proof.to_hex(),
+                        **anchor
+                    })
+            return dict(counts, **anchor)
+    finally:
+        output.flush()
+        for path in (tree_path, leaves_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _collect(chunk: list, network: str, leaf_file: TextIO, output: TextIO,
+             counts: Dict[str, int]) -> Iterator[bytes]:
+    """Validate a chunk of (index, scan) pairs, record rejects and yield the clean summary hashes."""
+    if not chunk:
+        return
+    validated = validate_scans([scan for _, scan in chunk], network)
+    for rejected in validated.rejected:
+        index, scan = chunk[rejected.index]
+        _record(output, counts, index, _scan_id(scan), {'success': False, 'error': rejected.reason})
+
+    for position, record in zip(validated.index, validated.records()):
+        index, scan = chunk[position]
+        leaf_file.write(json.dumps({
+            'index': index,
+            'scan_id': _scan_id(scan),
+            'host_uid': record.host_uid,
+            'summary_hash': record.summary_hash_hex
+        }, default=str) + '\n')
+        yield record.summary_hash
+
+
+def _fail_leaves(leaves_path: str, output: TextIO, counts: Dict[str, int], outcome: Dict[str, Any]) -> None:
+    """Record every collected leaf as failed."""
+    with open(leaves_path, 'r') as leaf_file:
+        for line in leaf_file:
+            leaf = json.loads(line)
+            _record(output, counts, leaf['index'], leaf['scan_id'], {'success': False, **outcome})
+
+
+def _write_manifest(path: str, leaves_path: str, root: str, leaf_count: int) -> None:
+    header = {
+        'type': 'pgdn-merkle-anchor',
+        'version': MANIFEST_VERSION,
+        'root': root,
+        'leaf_count': leaf_count,
+        'created_at': int(time.time()),
+        **HASH_SCHEME
+    }
+    with open(path, 'w') as manifest, open(leaves_path, 'r') as leaves:
+        manifest.write(json.dumps(header) + '\n')
+        shutil.copyfileobj(leaves, manifest)
+
+
+def _store_manifest(path: str, config: Any, report_publisher: Optional['ReportPublisher']) -> str:
+    """Store the manifest where configured and return its pointer (Walrus blob ID or local path)."""
+    destination = config.anchor_manifest_destination
+    if destination == 'local':
+        return os.path.abspath(path)
+    if destination != 'walrus':
+        raise AnchorError(f"Unsupported manifest destination: {destination}")
+
+    if report_publisher is None:
+        from .reports import ReportPublisher
+        report_publisher = ReportPublisher(config)
+    result = report_publisher.store_file_to_walrus(path, 'application/x-ndjson')
+    if not result.success:
+        raise AnchorError(f"Failed to store manifest on Walrus: {result.error}")
+    return result.identifier
+
+
+def verify_record(record: Dict[str, Any]) -> bool:
+    """
+    Check the inclusion proof of a record written by anchor_scans.
+
+    Args:
+        record: Dictionary with 'summary_hash', 'root', 'leaf_index', 'leaf_count' and 'proof'
+
+    Returns:
+        Whether the proof links summary_hash to root
+    """
+    try:
+        summary_hash = bytes.fromhex(record['summary_hash'][2:] if record['summary_hash'].startswith('0x') else record['summary_hash'])
+        root = bytes.fromhex(record['root'][2:] if record['root'].startswith('0x') else record['root'])
+        proof = MerkleProof.from_hex(int(record['leaf_index']), int(record['leaf_count']), record['proof'])
+    except (KeyError, TypeError, ValueError, AttributeError, MerkleError):
+        return False
+    return verify_proof(summary_hash, proof, root)
+
+
+def verify_records(records: Iterable[Dict[str, Any]], output: TextIO,
+                   ledger_publisher: Optional['LedgerPublisher'] = None) -> Dict[str, int]:
+    """
+    Verify proof records and write one NDJSON result per record.
+
+    Each proof is checked locally; with a ledger publisher the root is also
+    looked up on the ledger (once per root). 'anchored' is None on networks
+    without summary lookups.
+
+    Args:
+        records: Proof records as written by anchor_scans
+        output: Text stream receiving one result per record
+        ledger_publisher: Optional publisher used to confirm roots on the ledger
+
+    Returns:
+        Counts of 'valid' and 'invalid' records
+    """
+    counts = {'valid': 0, 'invalid': 0}
+    anchored_roots: Dict[str, Optional[bool]] = {}
+
+    for index, record in enumerate(records):
+        result = {
+            'index': index,
+            'scan_id': record.get('scan_id'),
+            'summary_hash': record.get('summary_hash'),
+            'root': record.get('root'),
+            'proof_valid': verify_record(record),
+            'anchored': None
+        }
+        if result['proof_valid'] and ledger_publisher is not None:
+            root = record['root'].lower()
+            if root not in anchored_roots:
+                anchored_roots[root] = is_anchored(ledger_publisher, root)
+            result['anchored'] = anchored_roots[root]
+
+        result['valid'] = result['proof_valid'] and result['anchored'] is not False
+        counts['valid' if result['valid'] else 'invalid'] += 1
+        _write(output, result)
+
+    output.flush()
+    return counts
+
+
+def is_anchored(ledger_publisher: 'LedgerPublisher', root: str) -> Optional[bool]:
+    """Whether a root is published on the ledger; None if the network cannot be queried."""
+    if not ledger_publisher.supports_summary_lookups:
+        return None
+    root_bytes = bytes.fromhex(root[2:] if root.startswith('0x') else root)
+    summary = ledger_publisher.get_scan_summaries([root_bytes])[0]
+    return summary.get('summary_hash') == root_bytes
+
+
+def _record(output: TextIO, counts: Dict[str, int], index: int, scan_id: Any, outcome: Dict[str, Any]) -> None:
+    counts['published' if outcome.get('success') else 'failed'] += 1
+    _write(output, {'index': index, 'scan_id': scan_id, **outcome})
+
+
+def _write(output: TextIO, record: Dict[str, Any]) -> None:
+    # Not flushed per record: a run may write millions of proofs
+    output.write(json.dumps(record, default=str) + '\n')
+
+
+def _scan_id(scan: Dict[str, Any]) -> Any:
+    return scan.get('scan_id', scan.get('id', 'unknown'))
@@ -0,0 +1,267 @@
+"""
+Columnar (Arrow / Parquet) scan input for ledger publishing.
+
+Scan exports are read as Arrow record batches and converted to the ledger
+columns in bulk: host_uid, scan_time, summary_hash, trust_score and
+report_pointer. Defaults, validation (see the validation module), clamping
+and hex decoding run over whole columns and summary_hash is held as a
+fixed-width 32-byte binary column; rows become ScanRecords only when a
+transaction is built, without going through a dictionary.
+
+Requires pyarrow (``pip install 'pgdn-publisher[arrow]'``).
+"""
+
+import time
+from typing import Any, Optional, List, Tuple, Iterator, Sequence, Callable
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional dependency, see the 'arrow' extra
+    pa = None
+
+from .records import ScanRecord
+from .scan_reader import IPC_SUFFIXES
+from .validation import (
+    RejectedScan,
+    MAX_HOST_UID_LENGTH,
+    MAX_REPORT_POINTER_LENGTH,
+    SCAN_TIME_LIMIT,
+    SCAN_TIME_UNITS,
+    decode_hex_digests,
+    normalize_scan_times,
+    clamp_scores,
+)
+
+
+# Rows per record batch read from Parquet
+READ_BATCH_ROWS = 65536
+
+# Arrow timestamp unit for each network's scan_time units per second
+_TIMESTAMP_UNITS = {1: 's', 1000: 'ms'}
+
+# Columns used from the input, when present
+INPUT_COLUMNS = ('host_uid', 'validator_id', 'scan_id', 'scan_time', 'summary_hash', 'trust_score', 'report_pointer')
+
+LEDGER_SCHEMA = pa.schema([
+    ('host_uid', pa.string()),
+    ('scan_time', pa.int64()),
+    ('summary_hash', pa.binary(32)),
+    ('trust_score', pa.uint16()),
+    ('report_pointer', pa.string()),
+]) if pa is not None else None
+
+
+class ArrowInputError(Exception):
+    """Custom exception for Arrow input errors."""
+    pass
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ArrowInputError("pyarrow is required for Arrow/Parquet input (pip install 'pgdn-publisher[arrow]')")
+
+
+def read_record_batches(path: str, batch_rows: int = READ_BATCH_ROWS,
+                        columns: Optional[Sequence[str]] = INPUT_COLUMNS) -> Iterator['pa.RecordBatch']:
+    """
+    Read record batches from a Parquet or Arrow IPC file.
+
+    Args:
+        path: .parquet/.pq file, or .arrow/.feather/.ipc file
+        batch_rows: Rows per batch for Parquet input
+        columns: Parquet columns to read, when present in the file (None reads all)
+
+    Returns:
+        Iterator of record batches
+    """
+    _require_pyarrow()
+
+    if path.lower().endswith(IPC_SUFFIXES):
+        with pa.memory_map(path, 'r') as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                source.seek(0)
+                batches = pa.ipc.open_stream(source)
+            yield from batches
+        return
+
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    if columns is not None:
+        columns = [name for name in columns if name in parquet_file.schema_arrow.names]
+    yield from parquet_file.iter_batches(batch_size=batch_rows, columns=columns)
+
+
+def to_ledger_batch(batch: 'pa.RecordBatch', first_row: int = 0, network: str = 'zksync',
+                    now: Optional[float] = None) -> Tuple['pa.RecordBatch', List[RejectedScan]]:
+    """
+    Validate a record batch of scans and convert it to LEDGER_SCHEMA, column by column.
+
+    Missing values get the same defaults as dictionary scans: host_uid falls
+    back to validator_id, scan_time to now, trust_score to 0 and
+    report_pointer to scan_<scan_id>_<now>. Rows are checked as in
+    validation.validate_scans; summary_hash may be hex strings (with or
+    without 0x), 32-byte binary or fixed_size_binary(32).
+
+    Args:
+        batch: Input record batch
+        first_row: Position of the batch's first row in the input
+        network: Network whose scan_time unit to produce ('zksync' or 'sui')
+        now: Current time in seconds (defaults to time.time())
+
+    Returns:
+        The clean rows as a LEDGER_SCHEMA batch, and the rejected rows with
+        their input positions
+
+    Raises:
+        ArrowInputError: If a column is missing or has an unusable type
+    """
+    _require_pyarrow()
+    now = time.time() if now is None else now
+    rows = batch.num_rows
+    names = batch.schema.names
+    reasons = np.full(rows, None, dtype=object)
+
+    def column(name: str) -> Optional['pa.Array']:
+        return batch.column(names.index(name)) if name in names else None
+
+    def reject(mask: Any, reason: str) -> None:
+        if isinstance(mask, (pa.Array, pa.ChunkedArray)):
+            mask = mask.to_numpy(zero_copy_only=False)
+        reasons[mask & np.equal(reasons, None)] = reason
+
+    host_uid = _string_column(column('host_uid'), rows)
+    if column('validator_id') is not None:
+        host_uid = pc.coalesce(host_uid, _string_column(column('validator_id'), rows))
+    host_uid = host_uid.fill_null('unknown_host')
+    reject(pc.greater(pc.utf8_length(host_uid), MAX_HOST_UID_LENGTH),
+           f'host_uid must be a string of at most {MAX_HOST_UID_LENGTH} characters')
+
+    report_pointer = _string_column(column('report_pointer'), rows)
+    if report_pointer.null_count:
+        scan_ids = _string_column(column('scan_id'), rows).fill_null('unknown')
+        defaults = pc.binary_join_element_wise('scan_', scan_ids, f'_{int(now)}', '')
+        report_pointer = pc.coalesce(report_pointer, defaults)
+    reject(pc.greater(pc.utf8_length(report_pointer), MAX_REPORT_POINTER_LENGTH),
+           f'report_pointer must be a string of at most {MAX_REPORT_POINTER_LENGTH} characters')
+
+    scan_time = column('scan_time')
+    if scan_time is not None and pa.types.is_timestamp(scan_time.type):
+        # Timestamps carry their unit and are cast straight to the network's
+        unit = _TIMESTAMP_UNITS[SCAN_TIME_UNITS.get(network, 1)]
+        now_value = int(normalize_scan_times(np.array([now]), network)[0])
+        scan_time = pc.cast(pc.cast(scan_time, pa.timestamp(unit, tz=scan_time.type.tz), safe=False), pa.int64())
+        scan_time = scan_time.fill_null(now_value).to_numpy()
+        reject(scan_time < 0, 'scan_time is not a valid timestamp')
+    else:
+        if scan_time is None:
+            scan_time = pa.nulls(rows, pa.float64())
+        # Checked as floats first: the unchecked int64 cast wraps NaN,
+        # infinity and out-of-range values into plausible timestamps
+        values = _numeric(scan_time, pa.float64(), 'scan_time').fill_null(now).to_numpy()
+        valid = np.isfinite(values) & (values >= 0) & (values < SCAN_TIME_LIMIT)
+        reject(~valid, 'scan_time is not a valid timestamp')
+        converted = normalize_scan_times(np.where(valid, values, 0.0), network, now)
+        if pa.types.is_integer(scan_time.type):
+            # Integer columns are converted exactly, not through float64
+            exact = valid & scan_time.is_valid().to_numpy(zero_copy_only=False)
+            ints = _numeric(scan_time, pa.int64(), 'scan_time').fill_null(0).to_numpy()
+            converted[exact] = normalize_scan_times(ints[exact], network, now)
+        scan_time = converted
+
+    trust_score = column('trust_score')
+    if trust_score is None:
+        trust_score = pa.nulls(rows, pa.float64())
+    trust_score = _numeric(trust_score, pa.float64(), 'trust_score').fill_null(0).to_numpy()
+    reject(~np.isfinite(trust_score), 'trust_score is not a number')
+
+    summary_hash = _summary_hash_column(column('summary_hash'), rows, reject)
+
+    clean = np.equal(reasons, None)
+    rejected = [RejectedScan(first_row + int(i), reasons[i]) for i in np.flatnonzero(~clean)]
+    ledger_batch = pa.RecordBatch.from_arrays(
+        [
+            host_uid,
+            pa.array(scan_time),
+            summary_hash,
+            pa.array(clamp_scores(trust_score)),
+            report_pointer
+        ],
+        schema=LEDGER_SCHEMA
+    )
+    if rejected:
+        ledger_batch = ledger_batch.filter(pa.array(clean))
+    return ledger_batch, rejected
+
+
+def ledger_records(batch: 'pa.RecordBatch') -> List[ScanRecord]:
+    """
+    ScanRecords of the rows of a ledger batch.
+
+    Args:
+        batch: Record batch with LEDGER_SCHEMA, as returned by to_ledger_batch
+    """
+    return [ScanRecord(*row) for row in zip(*(batch.column(i).to_pylist() for i in range(batch.num_columns)))]
+
+
+def _string_column(array: Optional['pa.Array'], rows: int) -> 'pa.Array':
+    if array is None:
+        return pa.nulls(rows, pa.string())
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    return pc.cast(array, pa.string())
+
+
+def _numeric(array: 'pa.Array', target: 'pa.DataType', name: str) -> 'pa.Array':
+    try:
+        return pc.cast(array, target, safe=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ArrowInputError(f"{name} column must be numeric: {e}")
+
+
+def _summary_hash_column(array: Optional['pa.Array'], rows: int,
+                         reject: Callable[[Any, str], None]) -> 'pa.Array':
+    """Convert summary hashes to fixed_size_binary(32), rejecting malformed rows (left as zeros)."""
+    if array is None:
+        raise ArrowInputError("summary_hash column is required")
+    if array.type == pa.binary(32) and not array.null_count:
+        return array
+
+    digests = np.zeros((rows, 32), dtype=np.uint8)
+    reject(array.is_null(), 'summary_hash is required')
+
+    if pa.types.is_fixed_size_binary(array.type) or pa.types.is_binary(array.type) or pa.types.is_large_binary(array.type):
+        well_formed = pc.equal(pc.binary_length(array), 32).fill_null(False).to_numpy(zero_copy_only=False)
+        reject(~well_formed, 'summary_hash must be exactly 32 bytes (64 hex characters)')
+        raw = pc.cast(array.filter(pa.array(well_formed)), pa.binary())
+        if len(raw):
+            digests[well_formed] = _packed_values(raw, 32)
+    elif pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        # Hex strings: strip the prefix, check lengths, then decode all well-formed rows at once
+        digits = pc.replace_substring_regex(array, pattern='^0x', replacement='')
+        well_formed = pc.equal(pc.binary_length(digits), 64).fill_null(False).to_numpy(zero_copy_only=False)
+        reject(~well_formed, 'summary_hash must be exactly 32 bytes (64 hex characters)')
+        hex_digits = pc.cast(digits.filter(pa.array(well_formed)), pa.string())
+        if len(hex_digits):
+            decoded, valid = decode_hex_digests(_packed_values(hex_digits, 64))
+            digests[well_formed] = decoded
+            invalid = np.zeros(rows, dtype=bool)
+            invalid[well_formed] = ~valid
+            reject(invalid, 'summary_hash is not valid hex')
+    else:
+        raise ArrowInputError(f"Unsupported summary_hash column type: {array.type}")
+
+    return pa.FixedSizeBinaryArray.from_buffers(pa.binary(32), rows, [None, pa.py_buffer(digests)])
+
+
+def _packed_values(array: 'pa.Array', width: int) -> np.ndarray:
+    """View a binary/string array whose values all have the given byte width as a (rows, width) uint8 array."""
+    rows = len(array)
+    start = int(np.frombuffer(array.buffers()[1], dtype=np.int32)[array.offset])
+    data = np.frombuffer(array.buffers()[2], dtype=np.uint8)
+    return data[start:start + width * rows].reshape(rows, width)
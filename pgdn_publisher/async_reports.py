@@ -0,0 +1,470 @@
+"""
+Asynchronous report publishing for PGDN Publisher.
+
+AsyncReportPublisher shares report formatting with ReportPublisher and talks
+to Walrus through a single pooled aiohttp session, so services that run an
+event loop can publish and retrieve thousands of reports with
+``asyncio.gather`` instead of pushing blocking calls onto threads.
+"""
+
+import asyncio
+import json
+import time
+import zlib
+from collections.abc import Iterable as IterableABC
+from typing import Dict, Any, Optional, List, Tuple, Union, AsyncIterator, AsyncIterable, Iterable
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, see the 'async' extra
+    aiohttp = None
+
+from .config import PublisherConfig
+from .reports import (
+    ReportFormatter,
+    ReportReader,
+    ReportPublisher,
+    ReportError,
+    PublishResult,
+    IndexCache,
+    parse_walrus_store_response,
+    blob_variant,
+    RetrievalSteps,
+)
+from .blob_map import content_hash
+from .sections import encode_sectioned_report
+from .streaming import iter_report_json, iter_gzip, is_gzip
+
+
+# Chunk size used when streaming response bodies
+STREAM_CHUNK_SIZE = 64 * 1024
+
+BlobBody = Union[str, bytes, AsyncIterable[bytes], Iterable[bytes]]
+
+
+class AsyncReportPublisher(ReportFormatter, ReportReader):
+    """Asyncio publisher for scan reports, backed by a pooled aiohttp session."""
+
+    def __init__(self, config: PublisherConfig, max_connections: int = 100,
+                 max_concurrency: Optional[int] = None):
+        """
+        Initialize async report publisher.
+
+        Args:
+            config: Publisher configuration
+            max_connections: Size of the shared HTTP connection pool
+            max_concurrency: Maximum in-flight Walrus requests (defaults to max_connections)
+        """
+        if aiohttp is None:
+            raise ReportError("aiohttp is required for AsyncReportPublisher (pip install 'pgdn-publisher[async]')")
+
+        self.config = config
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency or max_connections
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bundle_indexes = IndexCache()
+        self._section_tables = IndexCache()
+
+        # Local destinations, delta state and the report index stay synchronous
+        # and run in the default executor
+        self._local = ReportPublisher(config)
+
+    async def __aenter__(self) -> 'AsyncReportPublisher':
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """Create the shared HTTP session on first use inside the running loop."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                # Bound connection setup and stalls, not total transfer time, so large
+                # streamed bodies are not cut off
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    sock_connect=self.config.walrus_timeout,
+                    sock_read=self.config.walrus_timeout
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session and local stores."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        await asyncio.get_running_loop().run_in_executor(None, self._local.close)
+
+    def _walrus_headers(self, content_type: Optional[str] = None) -> Dict[str, str]:
+        return self._local._walrus_headers(content_type)
+
+    async def store_blob(self, data: BlobBody, content_type: str = 'application/octet-stream') -> PublishResult:
+        """
+        Upload a blob to Walrus.
+
+        Args:
+            data: Blob bytes/text, or an (async) iterable of byte chunks sent with chunked transfer encoding
+            content_type: Content-Type header for the upload
+        """
+        if not self.config.walrus_api_key:
+            return PublishResult(
+                success=False,
+                destination='walrus',
+                error='Walrus API key not configured'
+            )
+
+        if isinstance(data, IterableABC) and not isinstance(data, (str, bytes, bytearray)):
+            data = _aiter_chunks(data)
+
+        try:
+            session = await self._get_session()
+            async with self._semaphore:
+                async with session.put(
+                    f"{self.config.walrus_api_url}/v1/store",
+                    data=data,
+                    headers=self._walrus_headers(content_type)
+                ) as response:
+                    body = await response.read()
+
+            if response.status != 200:
+                return PublishResult(
+                    success=False,
+                    destination='walrus',
+                    error=f'HTTP {response.status}: {body.decode("utf-8", "replace")}'
+                )
+
+            walrus_hash = parse_walrus_store_response(json.loads(body))
+            if walrus_hash:
+                return PublishResult(
+                    success=True,
+                    destination='walrus',
+                    identifier=walrus_hash
+                )
+            return PublishResult(
+                success=False,
+                destination='walrus',
+                error='No blob ID returned from Walrus'
+            )
+
+        except asyncio.TimeoutError:
+            return PublishResult(
+                success=False,
+                destination='walrus',
+                error='Request timeout'
+            )
+        except Exception as e:
+            return PublishResult(
+                success=False,
+                destination='walrus',
+                error=str(e)
+            )
+
+    async def _blob_exists(self, blob_id: str) -> Optional[bool]:
+        """Check whether a blob is still available on Walrus (None if the check failed)."""
+        try:
+            session = await self._get_session()
+            async with self._semaphore:
+                async with session.head(
+                    f"{self.config.walrus_api_url}/v1/{blob_id}",
+                    headers=self._walrus_headers()
+                ) as response:
+                    status = response.status
+        except Exception:
+            return None
+
+        if status in (200, 206):
+            return True
+        if status == 404:
+            return False
+        return None
+
+    async def _known_blob(self, key: str) -> Optional[str]:
+        """Return the blob already stored for a content hash, if it is still valid."""
+        loop = asyncio.get_running_loop()
+        blob_map = self._local._get_blob_map()
+        mapping = await loop.run_in_executor(None, blob_map.get, key)
+        if mapping is None:
+            return None
+
+        if time.time() - mapping.verified_at <= self.config.walrus_dedup_ttl:
+            return mapping.blob_id
+
+        exists = await self._blob_exists(mapping.blob_id)
+        if exists:
+            await loop.run_in_executor(None, blob_map.touch, key)
+            return mapping.blob_id
+        if exists is False:
+            await loop.run_in_executor(None, blob_map.forget, key)
+        return None
+
+    async def publish_to_walrus(self, report: Dict[str, Any]) -> PublishResult:
+        """
+        Publish report to Walrus decentralized storage.
+
+        With walrus_dedup enabled, content already stored (and still available)
+        is not uploaded again; the recorded blob ID is returned instead.
+        """
+        if not self.config.walrus_dedup:
+            return await self._upload_report(report)
+
+        loop = asyncio.get_running_loop()
+        try:
+            key = content_hash(report, blob_variant(self.config))
+            blob_id = await self._known_blob(key)
+        except Exception as e:
+            return PublishResult(
+                success=False,
+                destination='walrus',
+                error=f'Blob map lookup failed: {e}'
+            )
+
+        if blob_id:
+            return PublishResult(
+                success=True,
+                destination='walrus',
+                identifier=blob_id
+            )
+
+        result = await self._upload_report(report)
+        if result.success:
+            try:
+                await loop.run_in_executor(None, self._local._get_blob_map().put, key, result.identifier)
+            except Exception as e:
+                # The report is stored; only future deduplication is affected
+                result.error = f'Blob map update failed: {e}'
+        return result
+
+    async def _upload_report(self, report: Dict[str, Any]) -> PublishResult:
+        """Encode and upload a report using the configured layout."""
+        if self.config.report_layout == 'sectioned':
+            try:
+                return await self.store_blob(encode_sectioned_report(report))
+            except Exception as e:
+                return PublishResult(
+                    success=False,
+                    destination='walrus',
+                    error=str(e)
+                )
+
+        if self.config.walrus_compression == 'gzip':
+            return await self.store_blob(iter_gzip(iter_report_json(report)), 'application/gzip')
+        if self.config.walrus_streaming:
+            return await self.store_blob(iter_report_json(report), 'application/json')
+
+        return await self.store_blob(json.dumps(report, default=str), 'application/json')
+
+    async def _timed(self, name: str, operation, timeout: Optional[float]) -> PublishResult:
+        """Await one destination, recording its duration and applying its timeout."""
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(operation, timeout)
+        except asyncio.TimeoutError:
+            result = PublishResult(
+                success=False,
+                destination=name,
+                error=f'Timed out after {timeout}s'
+            )
+        except Exception as e:
+            result = PublishResult(success=False, destination=name, error=str(e))
+        result.duration = time.monotonic() - started
+        return result
+
+    async def publish(self, scan_data: Dict[str, Any], destinations: Optional[List[str]] = None) -> Dict[str, PublishResult]:
+        """
+        Publish report to specified destinations concurrently.
+
+        Args:
+            scan_data: Scan data to format and publish
+            destinations: Destination names registered on the publisher. Defaults to walrus and local_file.
+
+        Returns:
+            Dictionary mapping destination names to PublishResult objects
+        """
+        if destinations is None:
+            destinations = ['walrus', 'local_file']
+
+        loop = asyncio.get_running_loop()
+        report = self._format_report(scan_data)
+
+        delta = None
+        full_report = None
+        if self.config.report_delta_mode != 'off' and 'walrus' in destinations:
+            delta = await loop.run_in_executor(None, self._local._get_delta_encoder().encode, report)
+            full_report, report = report, delta.record
+
+        operations = []
+        for name in destinations:
+            if name == 'walrus':
+                # Socket timeouts bound the request itself; an overall deadline here would
+                # also count time spent queued behind max_concurrency
+                operations.append(self._timed(name, self.publish_to_walrus(report), None))
+                continue
+
+            destination = self._local.get_destination(name)
+            if destination is None:
+                operations.append(_resolved(PublishResult(
+                    success=False,
+                    destination=name,
+                    error=f'Unknown destination: {name}'
+                )))
+                continue
+
+            operations.append(self._timed(
+                name,
+                loop.run_in_executor(None, destination.publish, report, full_report),
+                destination.timeout
+            ))
+
+        results = dict(zip(destinations, await asyncio.gather(*operations)))
+
+        walrus = results.get('walrus')
+        if walrus is not None and walrus.success:
+            walrus.report_hash = content_hash(delta.report if delta is not None else report)
+            if delta is not None:
+                await loop.run_in_executor(None, self._local._delta_encoder.commit, delta, walrus.identifier)
+
+        return results
+
+    async def publish_many(self, scans: List[Dict[str, Any]],
+                           destinations: Optional[List[str]] = None) -> List[Dict[str, PublishResult]]:
+        """Publish many scans concurrently; Walrus traffic is bounded by max_concurrency."""
+        return await asyncio.gather(*(self.publish(scan_data, destinations) for scan_data in scans))
+
+    async def _fetch_blob(self, blob_id: str, byte_range: Optional[Tuple[int, int]] = None) -> Tuple[bytes, bool]:
+        """
+        Fetch blob bytes from Walrus, optionally as an HTTP range request.
+
+        Returns:
+            Tuple of (content, whether the aggregator returned only the requested range)
+        """
+        if not self.config.walrus_api_key:
+            raise ReportError("Walrus API key not configured")
+
+        headers = self._walrus_headers()
+        if byte_range is not None:
+            offset, length = byte_range
+            headers['Range'] = f'bytes={offset}-{offset + length - 1}'
+
+        session = await self._get_session()
+        async with self._semaphore:
+            async with session.get(f"{self.config.walrus_api_url}/v1/{blob_id}", headers=headers) as response:
+                body = await response.read()
+
+        if response.status == 206:
+            return body, True
+        elif response.status == 200:
+            return body, False
+        else:
+            raise ReportError(f'HTTP {response.status}: {body.decode("utf-8", "replace")}')
+
+    async def retrieve_stream(self, blob_id: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Stream a blob's raw bytes from Walrus without buffering the whole body."""
+        if not self.config.walrus_api_key:
+            raise ReportError("Walrus API key not configured")
+
+        session = await self._get_session()
+        # The semaphore bounds requests being started, not bodies being read: a
+        # slow consumer of this stream must not hold a slot others need. Open
+        # connections stay bounded by the connector limit.
+        async with self._semaphore:
+            response = await session.get(
+                f"{self.config.walrus_api_url}/v1/{blob_id}",
+                headers=self._walrus_headers()
+            )
+        async with response:
+            if response.status != 200:
+                body = await response.text()
+                raise ReportError(f'HTTP {response.status}: {body}')
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def retrieve_to_file(self, blob_id: str, path: str, decompress: bool = True) -> int:
+        """
+        Stream a blob from Walrus into a local file.
+
+        Args:
+            blob_id: Walrus blob ID
+            path: Destination file path
+            decompress: Transparently gunzip blobs stored with gzip compression
+
+        Returns:
+            Number of bytes written
+        """
+        loop = asyncio.get_running_loop()
+        decompressor = None
+        written = 0
+        with open(path, 'wb') as f:
+            async for chunk in self.retrieve_stream(blob_id):
+                if written == 0 and decompressor is None and decompress and is_gzip(chunk):
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                await loop.run_in_executor(None, f.write, chunk)
+                written += len(chunk)
+            if decompressor is not None:
+                remainder = decompressor.flush()
+                f.write(remainder)
+                written += len(remainder)
+        return written
+
+    async def retrieve_from_walrus(self, walrus_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a report from Walrus storage.
+
+        Args:
+            walrus_hash: Blob ID, or a bundled report pointer (``blobId#uid`` or ``blobId#offset:len``)
+        """
+        if not self.config.walrus_api_key:
+            raise ReportError("Walrus API key not configured")
+
+        try:
+            return await self._run(self._report_steps(walrus_hash))
+        except Exception as e:
+            raise ReportError(f'Failed to retrieve from Walrus: {e}')
+
+    async def retrieve_section(self, walrus_hash: str, section: str) -> Any:
+        """
+        Retrieve a single top-level section of a report from Walrus.
+
+        Downloads as little as ReportPublisher.retrieve_section does for each
+        layout (section table and section, or a bundled report's range).
+        """
+        if not self.config.walrus_api_key:
+            raise ReportError("Walrus API key not configured")
+
+        try:
+            return await self._run(self._section_steps(walrus_hash, section))
+        except ReportError:
+            raise
+        except Exception as e:
+            raise ReportError(f'Failed to retrieve section from Walrus: {e}')
+
+    async def retrieve_many(self, walrus_hashes: List[str]) -> List[Union[Dict[str, Any], ReportError]]:
+        """Retrieve many reports concurrently; failed retrievals are returned as ReportError instances."""
+        return await asyncio.gather(
+            *(self.retrieve_from_walrus(walrus_hash) for walrus_hash in walrus_hashes),
+            return_exceptions=True
+        )
+
+    async def _run(self, steps: RetrievalSteps) -> Any:
+        """Drive retrieval steps (see ReportReader) with aiohttp reads."""
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(await self._fetch_blob(*request))
+        except StopIteration as finished:
+            return finished.value
+
+
+async def _aiter_chunks(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+async def _resolved(result: PublishResult) -> PublishResult:
+    return result
@@ -0,0 +1,103 @@
+"""
+Content-addressed map of reports already stored on Walrus.
+
+Every report uploaded to Walrus is recorded under a canonical hash of its
+content. Publishing the same content again (a retry after a timeout, or an
+identical report in deterministic mode) reuses the recorded blob ID instead
+of uploading it again, as long as the blob is still available on Walrus.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from dataclasses import dataclass
+
+
+@dataclass
+class BlobMapping:
+    """Blob stored on Walrus for a content hash."""
+    content_hash: str
+    blob_id: str
+    stored_at: float
+    verified_at: float  # last time the blob was known to exist on Walrus
+
+
+def content_hash(report: Dict[str, Any], variant: str = '') -> str:
+    """
+    Canonical hash of a report's content.
+
+    Args:
+        report: Report (or delta record)
+        variant: Encoding of the stored blob (layout, compression), so the same
+            report stored in different encodings maps to different blobs
+    """
+    canonical = json.dumps(report, sort_keys=True, separators=(',', ':'), default=str)
+    digest = hashlib.sha256(variant.encode('utf-8'))
+    digest.update(canonical.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class BlobMap:
+    """SQLite-backed content hash -> Walrus blob ID map."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the blob map database."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS content_blobs (
+                content_hash TEXT PRIMARY KEY,
+                blob_id TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                verified_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, content_hash: str) -> Optional[BlobMapping]:
+        """Return the blob recorded for a content hash, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob_id, stored_at, verified_at FROM content_blobs WHERE content_hash = ?",
+                (content_hash,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return BlobMapping(content_hash, *row)
+
+    def put(self, content_hash: str, blob_id: str) -> None:
+        """Record the blob just stored for a content hash."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO content_blobs VALUES (?, ?, ?, ?)",
+                (content_hash, blob_id, now, now)
+            )
+            self._conn.commit()
+
+    def touch(self, content_hash: str) -> None:
+        """Mark a recorded blob as verified to still exist."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE content_blobs SET verified_at = ? WHERE content_hash = ?",
+                (time.time(), content_hash)
+            )
+            self._conn.commit()
+
+    def forget(self, content_hash: str) -> None:
+        """Drop a mapping whose blob is no longer available."""
+        with self._lock:
+            self._conn.execute("DELETE FROM content_blobs WHERE content_hash = ?", (content_hash,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
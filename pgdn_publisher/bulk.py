@@ -0,0 +1,470 @@
+"""
+Bulk NDJSON export and publishing.
+
+Blob IDs are read one per line, retrieved concurrently and written as one
+JSON record per line in completion order:
+
+    {"walrus_hash": "...", "success": true, "report": {...}}
+    {"walrus_hash": "...", "success": false, "error": "..."}
+
+An export can be resumed: IDs that already have a successful record in the
+output file are skipped, and failed ones are retried.
+
+Scans read as NDJSON can likewise be published to report destinations or the
+ledger through one publisher, with one result record per scan:
+
+    {"index": 0, "scan_id": 123, "success": true, ...}
+
+A line that is not a JSON object gets a failed record with its index and the
+parse error, and the run continues. A ledger batch whose transaction reverted
+is retried scan by scan, like one that failed to send; rows whose
+confirmation failed otherwise are reported as failed.
+
+Both directions consume their input lazily with a bounded number of
+operations in flight, so memory use does not grow with the input.
+"""
+
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from dataclasses import asdict
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Iterator, Set, TextIO, Callable, Union, TYPE_CHECKING
+
+from .scan_reader import InvalidScan
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from .reports import ReportPublisher
+    from .ledger import LedgerPublisher
+    from .records import ScanRecord
+
+
+# Successful records start with the blob ID, so resuming does not need to
+# parse whole reports
+_SUCCESS_PREFIX = re.compile(r'\{"walrus_hash": ("(?:[^"\\]|\\.)*"), "success": true')
+
+
+def read_blob_ids(lines: Iterable[str]) -> Iterator[str]:
+    """Yield blob IDs from lines of text, skipping blank lines and # comments."""
+    for line in lines:
+        blob_id = line.strip()
+        if blob_id and not blob_id.startswith('#'):
+            yield blob_id
+
+
+def read_scans(lines: Iterable[str], keep_invalid: bool = False) -> Iterator[Union[Dict[str, Any], InvalidScan]]:
+    """
+    Yield scans from NDJSON lines, skipping blank lines.
+
+    Args:
+        lines: Lines of text
+        keep_invalid: Yield an InvalidScan for a line that is not a JSON object
+            instead of raising ValueError
+    """
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            try:
+                scan = json.loads(line)
+            except json.JSONDecodeError as e:
+                scan = InvalidScan(f"Invalid JSON on line {number}: {e}")
+            else:
+                if not isinstance(scan, dict):
+                    scan = InvalidScan(f"Line {number} is not a JSON object")
+            if isinstance(scan, InvalidScan) and not keep_invalid:
+                raise ValueError(scan.error)
+            yield scan
+
+
+def completed_blob_ids(path: str) -> Set[str]:
+    """
+    Collect the blob IDs already exported successfully to an NDJSON file.
+
+    A trailing partial line left by an interrupted export is truncated so
+    that appending continues on a clean line.
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(path):
+        return completed
+
+    with open(path, 'rb+') as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            valid_end += len(line)
+            match = _SUCCESS_PREFIX.match(line.decode('utf-8', 'replace'))
+            if match:
+                completed.add(json.loads(match.group(1)))
+        f.truncate(valid_end)
+
+    return completed
+
+
+def export_reports(publisher: 'ReportPublisher', blob_ids: Iterable[str], output: TextIO,
+                   window: Optional[int] = None, skip: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """
+    Retrieve reports concurrently and write them to output as NDJSON.
+
+    Args:
+        publisher: Publisher used for retrieval
+        blob_ids: Blob IDs or bundled report pointers to export
+        output: Text stream receiving one record per line
+        window: Maximum concurrent retrievals (defaults to walrus_pool_size)
+        skip: Blob IDs to leave out, e.g. those completed by an earlier run
+
+    Returns:
+        Counts of 'retrieved', 'failed' and 'skipped' blob IDs
+    """
+    skip = skip or set()
+    counts = {'retrieved': 0, 'failed': 0, 'skipped': 0}
+    seen: Set[str] = set()
+
+    def pending() -> Iterator[str]:
+        for blob_id in blob_ids:
+            if blob_id in skip or blob_id in seen:
+                counts['skipped'] += 1
+                continue
+            seen.add(blob_id)
+            yield blob_id
+
+    for blob_id, report, error in publisher.retrieve_as_completed(pending(), window):
+        if error is None:
+            record = {'walrus_hash': blob_id, 'success': True, 'report': report}
+            counts['retrieved'] += 1
+        else:
+            record = {'walrus_hash': blob_id, 'success': False, 'error': error}
+            counts['failed'] += 1
+        output.write(json.dumps(record, default=str) + '\n')
+        output.flush()
+
+    return counts
+
+
+# Batch transactions in flight at once per publisher account on ledgers that sign locally
+LEDGER_WINDOW = 4
+
+# Hosts remembered by _in_host_order before finished batches are forgotten
+HOST_ORDER_PRUNE = 10000
+
+
+def publish_reports(publisher: 'ReportPublisher', scans: Iterable[Dict[str, Any]], output: TextIO,
+                    destinations: Optional[List[str]] = None, window: Optional[int] = None) -> Dict[str, int]:
+    """
+    Publish reports for a stream of scans concurrently and write one NDJSON result per scan.
+
+    Args:
+        publisher: Publisher shared by all scans
+        scans: Scan data dictionaries (an InvalidScan gets a failed record)
+        output: Text stream receiving one record per scan, in completion order
+        destinations: Report destinations (defaults to walrus and local_file)
+        window: Maximum scans in flight (defaults to walrus_pool_size)
+
+    Returns:
+        Counts of 'published' and 'failed' scans; a scan counts as published
+        when at least one destination succeeded
+    """
+    counts = {'published': 0, 'failed': 0}
+
+    def publish(item: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(item[1], InvalidScan):
+            raise ValueError(item[1].error)
+        results = publisher.publish(item[1], destinations)
+        return {
+            'success': any(result.success for result in results.values()),
+            'results': {name: asdict(result) for name, result in results.items()}
+        }
+
+    for (index, scan), outcome, error in _as_completed(publish, enumerate(scans),
+                                                       window or publisher.config.walrus_pool_size):
+        record = outcome if error is None else {'success': False, 'error': error}
+        counts['published' if record['success'] else 'failed'] += 1
+        _write(output, {'index': index, 'scan_id': _scan_id(scan), **record})
+
+    return counts
+
+
+def publish_ledger(publisher: 'LedgerPublisher', scans: Iterable[Dict[str, Any]], output: TextIO,
+                   batch_size: int = 50, window: Optional[int] = None,
+                   wait_for_confirmation: bool = True) -> Dict[str, int]:
+    """
+    Publish a stream of scans to the ledger in batches and write one NDJSON result per scan.
+
+    Each batch is validated in one pass before any network work (see
+    validation.validate_scans); rejected scans get a failed record with the
+    reason. The rest are grouped into batch transactions where the network
+    supports them, and a batch that fails is retried scan by scan. A host's
+    scans are published in input order: a batch waits for the batches in
+    flight that hold earlier scans of its hosts.
+
+    Args:
+        publisher: Ledger publisher shared by all batches
+        scans: Scan data dictionaries (summary_hash required; an InvalidScan gets a failed record)
+        output: Text stream receiving one record per scan, in completion order
+        batch_size: Scans per transaction (scans are grouped by account first
+            when several publisher accounts are configured)
+        window: Batches in flight at once (defaults to LEDGER_WINDOW per publisher
+            account on networks that sign transactions locally, otherwise 1; under
+            a publish cooldown, enough to fill publish_cooldown_max_batch)
+        wait_for_confirmation: Wait for each transaction to confirm
+
+    Returns:
+        Counts of 'published' and 'failed' scans
+    """
+    from .validation import validate_scans
+
+    counts = {'published': 0, 'failed': 0}
+    network = publisher.config.network
+    chunk_size = batch_size * publisher.account_count
+
+    def chunks() -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        chunk = []
+        for index, scan in enumerate(scans):
+            if isinstance(scan, InvalidScan):
+                _record(output, counts, index, 'scan_id', None, {'success': False, 'error': scan.error})
+                continue
+            chunk.append((index, scan))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def batches() -> Iterator[Tuple[List[int], List[Any], List['ScanRecord']]]:
+        for chunk in chunks():
+            validated = validate_scans([scan for _, scan in chunk], network)
+            for rejected in validated.rejected:
+                index, scan = chunk[rejected.index]
+                _record(output, counts, index, 'scan_id', _scan_id(scan), {'success': False, 'error': rejected.reason})
+            if len(validated):
+                yield (
+                    [chunk[position][0] for position in validated.index],
+                    [_scan_id(chunk[position][1]) for position in validated.index],
+                    validated.records()
+                )
+
+    _publish_records(publisher, batches(), output, 'scan_id', counts, batch_size, window, wait_for_confirmation)
+    return counts
+
+
+def publish_ledger_batches(publisher: 'LedgerPublisher', record_batches: Iterable['pa.RecordBatch'],
+                           output: TextIO, batch_size: int = 50, window: Optional[int] = None,
+                           wait_for_confirmation: bool = True) -> Dict[str, int]:
+    """
+    Publish columnar scans (Arrow record batches) to the ledger and write one NDJSON result per row.
+
+    Each record batch is validated and converted to the ledger columns in one
+    pass and sliced into transactions without building a dictionary per row.
+
+    Args:
+        publisher: Ledger publisher shared by all transactions
+        record_batches: Record batches with the scan columns (see arrow_input)
+        output: Text stream receiving one record per row, in completion order
+        batch_size: Rows per transaction
+        window: Transactions in flight at once (defaults as for publish_ledger)
+        wait_for_confirmation: Wait for each transaction to confirm
+
+    Returns:
+        Counts of 'published' and 'failed' rows
+    """
+    import numpy as np
+    from .arrow_input import to_ledger_batch, ledger_records
+
+    counts = {'published': 0, 'failed': 0}
+    network = publisher.config.network
+    slice_size = batch_size * publisher.account_count
+
+    def slices() -> Iterator[Tuple[List[int], List[Any], List['ScanRecord']]]:
+        first_row = 0
+        for record_batch in record_batches:
+            ledger_batch, rejected = to_ledger_batch(record_batch, first_row, network)
+            clean = np.ones(record_batch.num_rows, dtype=bool)
+            for row in rejected:
+                clean[row.index - first_row] = False
+                _record(output, counts, row.index, 'host_uid', None, {'success': False, 'error': row.reason})
+
+            indexes = (first_row + np.flatnonzero(clean)).tolist()
+            for start in range(0, ledger_batch.num_rows, slice_size):
+                records = ledger_records(ledger_batch.slice(start, slice_size))
+                yield indexes[start:start + slice_size], [record.host_uid for record in records], records
+            first_row += record_batch.num_rows
+
+    _publish_records(publisher, slices(), output, 'host_uid', counts, batch_size, window, wait_for_confirmation)
+    return counts
+
+
+def _publish_records(publisher: 'LedgerPublisher', batches: Iterable[Tuple[List[int], List[Any], List['ScanRecord']]],
+                     output: TextIO, label: str, counts: Dict[str, int], batch_size: int,
+                     window: Optional[int], wait_for_confirmation: bool) -> None:
+    """Publish batches of (input positions, row labels, ScanRecords) and record every row's outcome."""
+    if window is None:
+        window = LEDGER_WINDOW * publisher.account_count if publisher.supports_signing else 1
+        if publisher.has_publish_cooldown:
+            # Batches waiting out the cooldown are merged into one transaction,
+            # so keep enough in flight to fill it
+            merged = -(-publisher.config.publish_cooldown_max_batch // batch_size)
+            window = max(window, merged * publisher.account_count)
+    if publisher.account_count > 1:
+        batches = _by_account(publisher, batches, batch_size)
+
+    def publish(item: Tuple[Tuple[List[int], List[Any], List['ScanRecord']], Set[threading.Event], threading.Event]
+                ) -> List[Dict[str, Any]]:
+        batch, earlier, done = item
+        try:
+            for event in earlier:
+                event.wait()
+            return publish_batch(batch[2])
+        finally:
+            done.set()
+
+    def publish_batch(records: List['ScanRecord']) -> List[Dict[str, Any]]:
+        if len(records) == 1:
+            return [_publish_one(publisher, records[0], wait_for_confirmation)]
+        try:
+            outcomes = _row_outcomes(publisher.publish_batch(records, wait_for_confirmation), len(records))
+        except Exception:
+            # Retry row by row to isolate the row that made the batch fail
+            return [_publish_one(publisher, record, wait_for_confirmation) for record in records]
+        # A reverted transaction published none of its rows, so they can be
+        # sent again one by one like a batch that failed to send
+        return [
+            _publish_one(publisher, record, wait_for_confirmation) if outcome.get('reverted') else outcome
+            for record, outcome in zip(records, outcomes)
+        ]
+
+    for ((indexes, labels, _), _, _), outcomes, error in _as_completed(publish, _in_host_order(batches), window):
+        for position, index in enumerate(indexes):
+            outcome = outcomes[position] if error is None else {'success': False, 'error': error}
+            _record(output, counts, index, label, labels[position], outcome)
+
+
+def _in_host_order(batches: Iterable[Tuple[List[int], List[Any], List['ScanRecord']]]
+                   ) -> Iterator[Tuple[Tuple[List[int], List[Any], List['ScanRecord']], Set[threading.Event], threading.Event]]:
+    """
+    Pair each batch with the completion events of the earlier batches sharing a host, and its own event.
+
+    Batches in flight sign concurrently, so an account's nonces are not
+    handed out in input order. A batch holding a host's later scans waits
+    until the batch with its earlier scans has finished, which keeps each
+    host's scans in order; batches of different hosts still overlap.
+    """
+    last: Dict[str, threading.Event] = {}
+    limit = HOST_ORDER_PRUNE
+    for batch in batches:
+        done = threading.Event()
+        hosts = {record.host_uid for record in batch[2]}
+        earlier = {last[host] for host in hosts if host in last}
+        for host in hosts:
+            last[host] = done
+        if len(last) > limit:
+            # Only hosts of unfinished batches need remembering
+            last = {host: event for host, event in last.items() if not event.is_set()}
+            limit = max(HOST_ORDER_PRUNE, 2 * len(last))
+        yield batch, earlier, done
+
+
+def _by_account(publisher: 'LedgerPublisher', batches: Iterable[Tuple[List[int], List[Any], List['ScanRecord']]],
+                batch_size: int) -> Iterator[Tuple[List[int], List[Any], List['ScanRecord']]]:
+    """
+    Regroup batches into single-account batches of batch_size rows, so each becomes one full transaction.
+
+    A partly filled batch is sent once it has waited for account_count
+    incoming batches, so rows of a quiet account are not held back.
+    """
+    pending: Dict[int, Tuple[int, Tuple[List[int], List[Any], List['ScanRecord']]]] = {}
+    for number, batch in enumerate(batches):
+        for row in zip(*batch):
+            account = publisher.account_for(row[2].host_uid)
+            buffered = pending.setdefault(account, (number, ([], [], [])))[1]
+            for column, value in zip(buffered, row):
+                column.append(value)
+            if len(buffered[2]) >= batch_size:
+                yield pending.pop(account)[1]
+
+        for account, (started, buffered) in list(pending.items()):
+            if number - started >= publisher.account_count:
+                yield pending.pop(account)[1]
+
+    for _, buffered in pending.values():
+        yield buffered
+
+
+def _publish_one(publisher: 'LedgerPublisher', record: 'ScanRecord', wait_for_confirmation: bool) -> Dict[str, Any]:
+    try:
+        return _row_outcomes(publisher.publish_batch([record], wait_for_confirmation), 1)[0]
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def _row_outcomes(result: Dict[str, Any], rows: int) -> List[Dict[str, Any]]:
+    """
+    Split the result of publishing several rows into one outcome per row.
+
+    A row whose transaction was sent but did not confirm (reverted or timed
+    out, see confirmation_error) is not successful.
+    """
+    if 'results' in result:
+        # Networks without batch transactions publish row by row, and several
+        # publisher accounts report the rows of each account's transaction
+        outcomes = result['results']
+    else:
+        shared = {key: value for key, value in result.items() if key not in ('summary_hashes', 'count')}
+        outcomes = [dict(shared, summary_hash=summary_hash, batch_size=rows) for summary_hash in result['summary_hashes']]
+    return [dict(outcome, success=False) if outcome.get('confirmation_error') else outcome for outcome in outcomes]
+
+
+def _record(output: TextIO, counts: Dict[str, int], index: int, label: str, value: Any,
+            outcome: Dict[str, Any]) -> None:
+    counts['published' if outcome.get('success') else 'failed'] += 1
+    _write(output, {'index': index, label: value, **outcome})
+
+
+def _as_completed(function: Callable[[Any], Any], items: Iterable[Any],
+                  window: int) -> Iterator[Tuple[Any, Any, Optional[str]]]:
+    """
+    Apply function to items with at most window calls in flight, yielding (item, result, error) as each finishes.
+
+    If reading items raises, the calls already in flight are still waited
+    for and yielded before the error is re-raised.
+    """
+    pending = {}
+    items = iter(items)
+
+    with ThreadPoolExecutor(max_workers=window, thread_name_prefix='pgdn-bulk') as executor:
+        while True:
+            try:
+                for item in items:
+                    pending[executor.submit(function, item)] = item
+                    if len(pending) >= window:
+                        break
+            except Exception:
+                yield from _finished(pending, as_completed(list(pending)))
+                raise
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from _finished(pending, done)
+
+
+def _finished(pending: Dict[Any, Any], futures: Iterable[Any]) -> Iterator[Tuple[Any, Any, Optional[str]]]:
+    """Remove finished futures from pending, yielding (item, result, error) for each."""
+    for future in futures:
+        item = pending.pop(future)
+        try:
+            yield item, future.result(), None
+        except Exception as e:
+            yield item, None, str(e)
+
+
+def _write(output: TextIO, record: Dict[str, Any]) -> None:
+    output.write(json.dumps(record, default=str) + '\n')
+    output.flush()
+
+
+def _scan_id(scan: Union[Dict[str, Any], InvalidScan]) -> Any:
+    if isinstance(scan, InvalidScan):
+        return None
+    return scan.get('scan_id', scan.get('id', 'unknown'))
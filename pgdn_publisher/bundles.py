@@ -0,0 +1,186 @@
+"""
+Report bundling for Walrus storage.
+
+A bundle packs many formatted reports into a single blob so that storage cost
+and upload latency are paid once per bundle instead of once per scan.
+
+Blob layout::
+
+    +-----------+-----------+-------------+----------------+------------------+
+    | magic (8) | version 2 | index len 4 | index (JSON)   | report bodies... |
+    +-----------+-----------+-------------+----------------+------------------+
+
+The index maps each report's key to ``[offset, length]`` relative to the
+start of the report bodies, so a single report can be fetched with one HTTP
+range request once the index is known. The key is the report uid; a report
+whose uid is already in the bundle (batch-formatted scans without a distinct
+scan_id share one) gets its position in the bundle appended, ``uid.3``.
+"""
+
+import json
+import re
+import struct
+from typing import Dict, Any, List, Optional, Tuple
+
+
+BUNDLE_MAGIC = b'PGDNBNDL'
+BUNDLE_VERSION = 1
+
+# magic, version, index length (big-endian)
+_PREAMBLE = struct.Struct('>8sHI')
+PREAMBLE_SIZE = _PREAMBLE.size
+
+_RANGE_POINTER = re.compile(r'^(\d+):(\d+)$')
+
+
+class BundleError(Exception):
+    """Custom exception for report bundle errors."""
+    pass
+
+
+class ReportBundle:
+    """Accumulates formatted reports for storage as a single Walrus blob."""
+
+    def __init__(self, max_reports: int = 1000, max_bytes: int = 10 * 1024 * 1024):
+        """Initialize an empty bundle with size limits."""
+        self.max_reports = max_reports
+        self.max_bytes = max_bytes
+        self._entries: List[Tuple[str, bytes]] = []
+        self._uids = set()
+        self._body_size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def uids(self) -> List[str]:
+        """Report keys (uids, made unique within the bundle) in the order they were added."""
+        return [uid for uid, _ in self._entries]
+
+    def can_add(self, body_size: int) -> bool:
+        """Check whether a report body of the given size fits in the bundle."""
+        if not self._entries:
+            return True
+        if len(self._entries) >= self.max_reports:
+            return False
+        return self._body_size + body_size <= self.max_bytes
+
+    def add(self, report: Dict[str, Any]) -> bool:
+        """
+        Add a formatted report to the bundle.
+
+        Returns:
+            False if the bundle is full and the report was not added
+        """
+        uid = report.get('uid')
+        if not uid:
+            raise BundleError("Report has no uid")
+
+        body = json.dumps(report, default=str, separators=(',', ':')).encode('utf-8')
+        if not self.can_add(len(body)):
+            return False
+
+        position = len(self._entries)
+        while uid in self._uids:
+            uid = f"{report['uid']}.{position}"
+            position += 1
+
+        self._entries.append((uid, body))
+        self._uids.add(uid)
+        self._body_size += len(body)
+        return True
+
+    def encode(self) -> Tuple[bytes, Dict[str, Tuple[int, int]]]:
+        """
+        Encode the bundle into blob bytes.
+
+        Returns:
+            Tuple of (blob bytes, mapping of uid to absolute (offset, length))
+        """
+        if not self._entries:
+            raise BundleError("Cannot encode an empty bundle")
+
+        index = {}
+        position = 0
+        for uid, body in self._entries:
+            index[uid] = [position, len(body)]
+            position += len(body)
+
+        index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+        preamble = _PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_bytes))
+        data_start = len(preamble) + len(index_bytes)
+
+        blob = b''.join([preamble, index_bytes] + [body for _, body in self._entries])
+        locations = {uid: (data_start + offset, length) for uid, (offset, length) in index.items()}
+        return blob, locations
+
+
+def is_bundle(data: bytes) -> bool:
+    """Check whether blob data starts with the bundle magic."""
+    return data[:len(BUNDLE_MAGIC)] == BUNDLE_MAGIC
+
+
+def read_preamble(data: bytes) -> Tuple[int, int]:
+    """
+    Parse the bundle preamble.
+
+    Returns:
+        Tuple of (index length, absolute offset of the first report body)
+    """
+    if len(data) < PREAMBLE_SIZE:
+        raise BundleError("Bundle preamble is truncated")
+
+    magic, version, index_length = _PREAMBLE.unpack_from(data)
+    if magic != BUNDLE_MAGIC:
+        raise BundleError("Blob is not a report bundle")
+    if version != BUNDLE_VERSION:
+        raise BundleError(f"Unsupported bundle version: {version}")
+
+    return index_length, PREAMBLE_SIZE + index_length
+
+
+def decode_index(data: bytes) -> Dict[str, Tuple[int, int]]:
+    """
+    Decode the bundle index from the leading bytes of a bundle blob.
+
+    Returns:
+        Mapping of uid to absolute (offset, length) within the blob
+    """
+    index_length, data_start = read_preamble(data)
+    if len(data) < data_start:
+        raise BundleError("Bundle index is truncated")
+
+    try:
+        index = json.loads(data[PREAMBLE_SIZE:data_start])
+    except ValueError as e:
+        raise BundleError(f"Invalid bundle index: {e}")
+
+    return {uid: (data_start + offset, length) for uid, (offset, length) in index.items()}
+
+
+def parse_report_pointer(pointer: str) -> Tuple[str, Optional[str], Optional[Tuple[int, int]]]:
+    """
+    Split a report pointer into its parts.
+
+    Supported forms are ``blobId``, ``blobId#uid`` and ``blobId#offset:len``.
+
+    Returns:
+        Tuple of (blob id, report uid or None, (offset, length) or None)
+    """
+    blob_id, _, fragment = pointer.partition('#')
+    if not fragment:
+        return blob_id, None, None
+
+    match = _RANGE_POINTER.match(fragment)
+    if match:
+        return blob_id, None, (int(match.group(1)), int(match.group(2)))
+
+    return blob_id, fragment, None
+
+
+def format_report_pointer(blob_id: str, uid: str, location: Tuple[int, int], style: str = 'uid') -> str:
+    """Build the ledger report pointer for a bundled report."""
+    if style == 'range':
+        offset, length = location
+        return f"{blob_id}#{offset}:{length}"
+    return f"{blob_id}#{uid}"
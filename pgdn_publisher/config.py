@@ -3,7 +3,7 @@ Configuration management for PGDN Publisher.
 """
 
 import os
-from typing import Optional
+from typing import Optional, List
 from dataclasses import dataclass
 
 
@@ -16,17 +16,67 @@ class PublisherConfig:
     
     # Blockchain configuration
     rpc_url: str = "https://sepolia.era.zksync.dev"
+    rpc_urls: Optional[List[str]] = None  # several endpoints: pooled with hedged reads (rpc_url is the first)
+    rpc_hedge_percentile: float = 0.9  # latency percentile after which a read is also sent elsewhere
+    rpc_broadcast_fanout: int = 3  # endpoints receiving each raw transaction
+    rpc_breaker_failures: int = 3  # consecutive failures that take an endpoint out of the pool
+    rpc_breaker_reset: float = 30.0  # seconds before it is probed again
     contract_address: Optional[str] = None
     private_key: Optional[str] = None
+    private_keys: Optional[List[str]] = None  # several publisher keys: scans are sharded across accounts
     gas_limit: int = 10000000
     gas_price_gwei: float = 0.25
+    publish_cooldown_margin: float = 1.0  # seconds added to the contract's publish cooldown
+    publish_cooldown_max_batch: int = 500  # most scans merged into one transaction during a cooldown
     
     # Walrus configuration
     walrus_api_url: str = "https://publisher-devnet.walrus.space"
     walrus_api_key: Optional[str] = None
+    walrus_timeout: float = 30.0
+    walrus_pool_size: int = 32  # pooled HTTP connections (and default bulk retrieval window)
+    walrus_streaming: bool = False  # encode and upload report bodies incrementally
+    walrus_compression: Optional[str] = None  # None or 'gzip' (implies streaming)
+    walrus_dedup: bool = False  # reuse blobs already stored for identical content (from_env: on with report_deterministic)
+    walrus_dedup_ttl: float = 3600.0  # seconds before a known blob is re-checked on Walrus
+    walrus_dedup_path: Optional[str] = None  # defaults to <reports_dir>/blob_map.sqlite
+    
+    # Bundle configuration
+    bundle_max_reports: int = 1000
+    bundle_max_bytes: int = 10 * 1024 * 1024
+    bundle_pointer_style: str = "uid"  # 'uid' -> blobId#uid, 'range' -> blobId#offset:len
     
     # Report configuration
     reports_dir: str = "reports"
+    local_file_timeout: float = 30.0
+    destination_workers: int = 8
+    report_deterministic: bool = False  # derive uid and generated_at from scan content only
+    report_layout: str = "json"  # 'json' or 'sectioned' (Walrus blobs with per-section retrieval)
+    report_delta_mode: str = "off"  # 'off', 'unchanged' or 'diff'
+    report_delta_max_chain: int = 10
+    report_state_path: Optional[str] = None  # defaults to <reports_dir>/host_state.sqlite
+    
+    # Local store configuration
+    local_store_backend: str = "files"  # 'files' (one JSON file per report) or 'segments'
+    segment_max_bytes: int = 64 * 1024 * 1024
+    segment_fsync_every: int = 100
+    segment_retention_days: Optional[float] = None
+    segment_compact_ratio: Optional[float] = 0.5  # dead fraction at which a sealed segment is compacted
+    report_index_enabled: bool = True
+    report_index_path: Optional[str] = None  # defaults to <reports_dir>/index.sqlite
+    
+    # Outbox configuration
+    outbox_path: Optional[str] = None  # defaults to <reports_dir>/outbox.sqlite
+    outbox_batch_size: int = 50  # scans per ledger transaction
+    outbox_max_attempts: int = 5
+    outbox_poll_interval: float = 2.0  # also the base retry backoff, in seconds
+    
+    # Daemon configuration
+    daemon_socket: Optional[str] = None  # defaults to a per-user socket in the temp directory
+    
+    # Merkle anchoring configuration
+    anchor_dir: Optional[str] = None  # defaults to <reports_dir>/anchors
+    anchor_host_uid: str = "pgdn-merkle-anchor"  # host_uid of the ledger entries holding roots
+    anchor_manifest_destination: str = "local"  # 'local' or 'walrus'
     
     @classmethod
     def from_env(cls, network: Optional[str] = None) -> 'PublisherConfig':
@@ -44,20 +94,82 @@ class PublisherConfig:
             default_gas_limit = 10000000
             default_gas_price = 0.25  # Gwei
         
+        # Only deterministic reports repeat, so only they are deduplicated by default
+        deterministic = os.getenv('REPORT_DETERMINISTIC', 'false').lower() in ('1', 'true', 'yes')
+        
+        rpc_value = os.getenv('ZKSYNC_RPC_URL', default_rpc) if network_name == 'zksync' else os.getenv('SUI_RPC_URL', default_rpc)
+        rpc_urls = [url.strip() for url in rpc_value.split(',') if url.strip()]
+        
         return cls(
             network=network_name,
-            rpc_url=os.getenv('ZKSYNC_RPC_URL', default_rpc) if network_name == 'zksync' else os.getenv('SUI_RPC_URL', default_rpc),
+            rpc_url=rpc_urls[0] if rpc_urls else default_rpc,
+            rpc_urls=rpc_urls if len(rpc_urls) > 1 else None,
+            rpc_hedge_percentile=float(os.getenv('RPC_HEDGE_PERCENTILE', cls.rpc_hedge_percentile)),
+            rpc_broadcast_fanout=int(os.getenv('RPC_BROADCAST_FANOUT', cls.rpc_broadcast_fanout)),
+            rpc_breaker_failures=int(os.getenv('RPC_BREAKER_FAILURES', cls.rpc_breaker_failures)),
+            rpc_breaker_reset=float(os.getenv('RPC_BREAKER_RESET', cls.rpc_breaker_reset)),
             contract_address=os.getenv('CONTRACT_ADDRESS'),
             private_key=os.getenv('PRIVATE_KEY'),
+            private_keys=[key.strip() for key in os.environ['PRIVATE_KEYS'].split(',') if key.strip()] if os.getenv('PRIVATE_KEYS') else None,
             gas_limit=int(os.getenv('GAS_BUDGET', os.getenv('GAS_LIMIT', default_gas_limit))),
             gas_price_gwei=float(os.getenv('GAS_PRICE_GWEI', default_gas_price)),
+            publish_cooldown_margin=float(os.getenv('PUBLISH_COOLDOWN_MARGIN', cls.publish_cooldown_margin)),
+            publish_cooldown_max_batch=int(os.getenv('PUBLISH_COOLDOWN_MAX_BATCH', cls.publish_cooldown_max_batch)),
             walrus_api_url=os.getenv('WALRUS_API_URL', cls.walrus_api_url),
             walrus_api_key=os.getenv('WALRUS_API_KEY'),
-            reports_dir=os.getenv('REPORTS_DIR', cls.reports_dir)
+            walrus_timeout=float(os.getenv('WALRUS_TIMEOUT', cls.walrus_timeout)),
+            walrus_pool_size=int(os.getenv('WALRUS_POOL_SIZE', cls.walrus_pool_size)),
+            walrus_streaming=os.getenv('WALRUS_STREAMING', 'false').lower() in ('1', 'true', 'yes'),
+            walrus_compression=os.getenv('WALRUS_COMPRESSION') or None,
+            walrus_dedup=os.getenv('WALRUS_DEDUP', str(deterministic)).lower() in ('1', 'true', 'yes'),
+            walrus_dedup_ttl=float(os.getenv('WALRUS_DEDUP_TTL', cls.walrus_dedup_ttl)),
+            walrus_dedup_path=os.getenv('WALRUS_DEDUP_PATH'),
+            bundle_max_reports=int(os.getenv('WALRUS_BUNDLE_MAX_REPORTS', cls.bundle_max_reports)),
+            bundle_max_bytes=int(os.getenv('WALRUS_BUNDLE_MAX_BYTES', cls.bundle_max_bytes)),
+            bundle_pointer_style=os.getenv('WALRUS_BUNDLE_POINTER_STYLE', cls.bundle_pointer_style),
+            reports_dir=os.getenv('REPORTS_DIR', cls.reports_dir),
+            local_file_timeout=float(os.getenv('LOCAL_FILE_TIMEOUT', cls.local_file_timeout)),
+            destination_workers=int(os.getenv('REPORT_DESTINATION_WORKERS', cls.destination_workers)),
+            report_deterministic=deterministic,
+            report_layout=os.getenv('REPORT_LAYOUT', cls.report_layout),
+            report_delta_mode=os.getenv('REPORT_DELTA_MODE', cls.report_delta_mode),
+            report_delta_max_chain=int(os.getenv('REPORT_DELTA_MAX_CHAIN', cls.report_delta_max_chain)),
+            report_state_path=os.getenv('REPORT_STATE_PATH'),
+            local_store_backend=os.getenv('LOCAL_STORE_BACKEND', cls.local_store_backend),
+            segment_max_bytes=int(os.getenv('REPORT_SEGMENT_MAX_BYTES', cls.segment_max_bytes)),
+            segment_fsync_every=int(os.getenv('REPORT_SEGMENT_FSYNC_EVERY', cls.segment_fsync_every)),
+            segment_retention_days=float(os.environ['REPORT_SEGMENT_RETENTION_DAYS']) if os.getenv('REPORT_SEGMENT_RETENTION_DAYS') else None,
+            segment_compact_ratio=None if os.getenv('REPORT_SEGMENT_COMPACT_RATIO', '').lower() == 'off' else float(os.getenv('REPORT_SEGMENT_COMPACT_RATIO') or cls.segment_compact_ratio),
+            report_index_enabled=os.getenv('REPORT_INDEX_ENABLED', 'true').lower() not in ('0', 'false', 'no'),
+            report_index_path=os.getenv('REPORT_INDEX_PATH'),
+            outbox_path=os.getenv('OUTBOX_PATH'),
+            outbox_batch_size=int(os.getenv('OUTBOX_BATCH_SIZE', cls.outbox_batch_size)),
+            outbox_max_attempts=int(os.getenv('OUTBOX_MAX_ATTEMPTS', cls.outbox_max_attempts)),
+            outbox_poll_interval=float(os.getenv('OUTBOX_POLL_INTERVAL', cls.outbox_poll_interval)),
+            daemon_socket=os.getenv('PGDN_DAEMON_SOCKET'),
+            anchor_dir=os.getenv('ANCHOR_DIR'),
+            anchor_host_uid=os.getenv('ANCHOR_HOST_UID', cls.anchor_host_uid),
+            anchor_manifest_destination=os.getenv('ANCHOR_MANIFEST_DESTINATION', cls.anchor_manifest_destination)
         )
     
+    def rpc_endpoints(self) -> List[str]:
+        """RPC endpoints: rpc_urls if set, otherwise rpc_url alone."""
+        return list(self.rpc_urls) if self.rpc_urls else [self.rpc_url]
+    
+    def publisher_keys(self) -> List[str]:
+        """Publisher private keys: PRIVATE_KEYS if set, otherwise PRIVATE_KEY alone."""
+        if self.private_keys:
+            return list(self.private_keys)
+        return [self.private_key] if self.private_key else []
+    
+    def validate_reports(self) -> None:
+        """Validate report publishing settings."""
+        if self.report_delta_mode not in ('off', 'unchanged', 'diff'):
+            raise ValueError(f"REPORT_DELTA_MODE must be off, unchanged or diff (got {self.report_delta_mode!r})")
+    
     def validate(self) -> None:
         """Validate configuration."""
+        self.validate_reports()
         if self.network == 'sui':
             # For SUI, we use SUI CLI which doesn't need CONTRACT_ADDRESS or PRIVATE_KEY
             # The SUI CLI handles authentication and the contract addresses are in env vars
@@ -66,5 +178,5 @@ class PublisherConfig:
             # For other networks (zkSync), require CONTRACT_ADDRESS and PRIVATE_KEY
             if not self.contract_address:
                 raise ValueError("CONTRACT_ADDRESS is required")
-            if not self.private_key:
-                raise ValueError("PRIVATE_KEY is required")
\ No newline at end of file
+            if not self.publisher_keys():
+                raise ValueError("PRIVATE_KEY (or PRIVATE_KEYS) is required")
\ No newline at end of file
@@ -512,6 +512,118 @@ CONTRACT_ABI = [
     "stateMutability": "view",
     "type": "function"
   },
+  {
+    "inputs": [
+      {
+        "components": [
+          {
+            "internalType": "string",
+            "name": "hostUid",
+            "type": "string"
+          },
+          {
+            "internalType": "uint256",
+            "name": "scanTime",
+            "type": "uint256"
+          },
+          {
+            "internalType": "bytes32",
+            "name": "summaryHash",
+            "type": "bytes32"
+          },
+          {
+            "internalType": "uint16",
+            "name": "score",
+            "type": "uint16"
+          },
+          {
+            "internalType": "string",
+            "name": "reportPointer",
+            "type": "string"
+          }
+        ],
+        "internalType": "struct DePINScanLedgerV3.BatchScanRequest[]",
+        "name": "scans",
+        "type": "tuple[]"
+      }
+    ],
+    "name": "batchPublishScans",
+    "outputs": [
+      {
+        "internalType": "uint256",
+        "name": "batchId",
+        "type": "uint256"
+      }
+    ],
+    "stateMutability": "nonpayable",
+    "type": "function"
+  },
+  {
+    "inputs": [
+      {
+        "internalType": "bytes32[]",
+        "name": "summaryHashes",
+        "type": "bytes32[]"
+      }
+    ],
+    "name": "getBatchScanSummaries",
+    "outputs": [
+      {
+        "components": [
+          {
+            "internalType": "string",
+            "name": "hostUid",
+            "type": "string"
+          },
+          {
+            "internalType": "uint256",
+            "name": "scanTime",
+            "type": "uint256"
+          },
+          {
+            "internalType": "bytes32",
+            "name": "summaryHash",
+            "type": "bytes32"
+          },
+          {
+            "internalType": "uint16",
+            "name": "score",
+            "type": "uint16"
+          },
+          {
+            "internalType": "string",
+            "name": "reportPointer",
+            "type": "string"
+          },
+          {
+            "internalType": "string",
+            "name": "status",
+            "type": "string"
+          },
+          {
+            "internalType": "uint256",
+            "name": "deletedAt",
+            "type": "uint256"
+          },
+          {
+            "internalType": "string",
+            "name": "deletionReason",
+            "type": "string"
+          },
+          {
+            "internalType": "uint256",
+            "name": "reputationAtScan",
+            "type": "uint256"
+          }
+        ],
+        "internalType": "struct DePINScanLedgerV3.ScanSummary[]",
+        "name": "summaries",
+        "type": "tuple[]"
+      }
+    ],
+    "stateMutability": "view",
+    "type": "function"
+  },
   {
     "inputs": [],
     "name": "getContractInfo",
@@ -550,6 +662,25 @@ CONTRACT_ABI = [
     "stateMutability": "view",
     "type": "function"
   },
+  {
+    "inputs": [
+      {
+        "internalType": "address",
+        "name": "",
+        "type": "address"
+      }
+    ],
+    "name": "lastPublishTime",
+    "outputs": [
+      {
+        "internalType": "uint256",
+        "name": "",
+        "type": "uint256"
+      }
+    ],
+    "stateMutability": "view",
+    "type": "function"
+  },
   {
     "inputs": [],
     "name": "owner",
@@ -563,6 +694,19 @@ CONTRACT_ABI = [
     "stateMutability": "view",
     "type": "function"
   },
+  {
+    "inputs": [],
+    "name": "publishCooldown",
+    "outputs": [
+      {
+        "internalType": "uint256",
+        "name": "",
+        "type": "uint256"
+      }
+    ],
+    "stateMutability": "view",
+    "type": "function"
+  },
   {
     "inputs": [
       {
@@ -595,5 +739,64 @@ CONTRACT_ABI = [
     "outputs": [],
     "stateMutability": "nonpayable",
     "type": "function"
+  },
+  {
+    "inputs": [
+      {
+        "internalType": "bytes32",
+        "name": "",
+        "type": "bytes32"
+      }
+    ],
+    "name": "scanSummaries",
+    "outputs": [
+      {
+        "internalType": "string",
+        "name": "hostUid",
+        "type": "string"
+      },
+      {
+        "internalType": "uint256",
+        "name": "scanTime",
+        "type": "uint256"
+      },
+      {
+        "internalType": "bytes32",
+        "name": "summaryHash",
+        "type": "bytes32"
+      },
+      {
+        "internalType": "uint16",
+        "name": "score",
+        "type": "uint16"
+      },
+      {
+        "internalType": "string",
+        "name": "reportPointer",
+        "type": "string"
+      },
+      {
+        "internalType": "string",
+        "name": "status",
+        "type": "string"
+      },
+      {
+        "internalType": "uint256",
+        "name": "deletedAt",
+        "type": "uint256"
+      },
+      {
+        "internalType": "string",
+        "name": "deletionReason",
+        "type": "string"
+      },
+      {
+        "internalType": "uint256",
+        "name": "reputationAtScan",
+        "type": "uint256"
+      }
+    ],
+    "stateMutability": "view",
+    "type": "function"
   }
 ]
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Publish cooldown scheduling.
+
+The ledger contract rejects a publication from an account until
+publishCooldown seconds have passed since the account's lastPublishTime.
+Sending early wastes a gas estimate and a reverted transaction, so each
+account's transactions are held until they are eligible, and the scans
+that arrive in the meantime are published together in the next one.
+
+lastPublishTime is the timestamp of the block that included the previous
+publication, not the time it was broadcast. So the next transaction is held
+until the previous one is mined, and the cooldown is counted from that
+block's timestamp.
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable
+
+from .records import ScanRecord
+
+
+class _Pending:
+    """Records of one caller waiting for the account's next transaction."""
+
+    def __init__(self, records: List[ScanRecord]):
+        self.records = records
+        self.done = False
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+
+    def outcome(self) -> Dict[str, Any]:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class CooldownScheduler:
+    """Releases one account's transactions once its publish cooldown has passed."""
+
+    def __init__(self, cooldown: float, last_publish: float = 0.0, margin: float = 1.0, max_batch: int = 500,
+                 block_time: Optional[Callable[[str], Optional[float]]] = None):
+        """
+        Initialize the scheduler from the contract's state, read once.
+
+        Args:
+            cooldown: publishCooldown in seconds
+            last_publish: The account's lastPublishTime (Unix seconds, 0 if never)
+            margin: Seconds added to the cooldown for clock skew and inclusion delay
+            max_batch: Most scans merged into one transaction
+            block_time: Waits for a transaction to be mined and returns its
+                block's timestamp, or None if it reverted (and so did not
+                publish); without it the broadcast time is used
+        """
+        self.cooldown = cooldown
+        self.margin = margin
+        self.max_batch = max_batch
+        self._block_time = block_time
+        self._last_publish = last_publish
+        self._unmined: Optional[str] = None
+        self._send_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._queue: List[_Pending] = []
+        self._leader = False
+
+    @property
+    def eligible_at(self) -> float:
+        """Unix time from which the account may publish again."""
+        if not self._last_publish:
+            return 0.0
+        return self._last_publish + self.cooldown + self.margin
+
+    def is_eligible(self) -> bool:
+        return self._unmined is None and time.time() >= self.eligible_at
+
+    def _wait_eligible(self) -> None:
+        self._settle()
+        while True:
+            delay = self.eligible_at - time.time()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _settle(self) -> None:
+        """Wait for the previous transaction and count the cooldown from its block."""
+        tx_hash, self._unmined = self._unmined, None
+        if tx_hash is None:
+            return
+        try:
+            mined_at = self._block_time(tx_hash)
+        except Exception:
+            # Outcome unknown; now is no earlier than the broadcast
+            mined_at = time.time()
+        if mined_at is not None:
+            self._last_publish = mined_at
+
+    def _sent(self, tx_hash: str) -> None:
+        if self._block_time is None:
+            self._last_publish = time.time()
+        else:
+            self._unmined = tx_hash
+
+    def run(self, send: Callable[[], str]) -> str:
+        """Broadcast one transaction with send (returning its hash) once the cooldown allows."""
+        with self._send_lock:
+            self._wait_eligible()
+            tx_hash = send()
+            self._sent(tx_hash)
+            return tx_hash
+
+    def submit(self, records: List[ScanRecord],
+               send: Callable[[List[ScanRecord]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Publish records in the account's next transaction.
+
+        Callers arriving while the account cools down are merged into one
+        transaction (up to max_batch scans), sent by one of them when the
+        cooldown ends. Each caller gets the transaction's result with its
+        own 'summary_hashes' and the transaction's 'scans_in_transaction'.
+
+        Args:
+            records: Scans of this caller
+            send: Signs and broadcasts a list of records, returning a
+                result with 'summary_hashes' in record order
+
+        Raises:
+            The exception raised by send for the transaction holding the records
+        """
+        pending = _Pending(records)
+        with self._changed:
+            self._queue.append(pending)
+            while not pending.done:
+                if not self._leader:
+                    self._leader = True
+                    break
+                self._changed.wait()
+            else:
+                return pending.outcome()
+
+        # This caller sends transactions until its own records are out, then
+        # hands over to a caller still waiting
+        try:
+            while not pending.done:
+                with self._send_lock:
+                    self._wait_eligible()
+                    with self._changed:
+                        batch = self._take()
+                    self._send(batch, send)
+        finally:
+            with self._changed:
+                self._leader = False
+                self._changed.notify_all()
+        return pending.outcome()
+
+    def _take(self) -> List[_Pending]:
+        """Remove the queued callers that fit into one transaction (at least one)."""
+        batch = [self._queue.pop(0)]
+        size = len(batch[0].records)
+        while self._queue and size + len(self._queue[0].records) <= self.max_batch:
+            size += len(self._queue[0].records)
+            batch.append(self._queue.pop(0))
+        return batch
+
+    def _send(self, batch: List[_Pending], send: Callable[[List[ScanRecord]], Dict[str, Any]]) -> None:
+        merged = [record for pending in batch for record in pending.records]
+        try:
+            result = send(merged)
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+        else:
+            self._sent(result['transaction_hash'])
+            offset = 0
+            for pending in batch:
+                count = len(pending.records)
+                pending.result = dict(result, summary_hashes=result['summary_hashes'][offset:offset + count],
+                                      scans_in_transaction=len(merged))
+                offset += count
+
+        with self._changed:
+            for pending in batch:
+                pending.done = True
+            self._changed.notify_all()
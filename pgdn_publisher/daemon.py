@@ -0,0 +1,203 @@
+"""
+Long-running publisher daemon.
+
+``pgdn-publisher serve`` listens on a Unix socket and keeps warm publishers
+for each network (web3 connection, authorization check, pooled Walrus
+session), so CLI invocations forwarded to it skip the startup work. Requests
+and responses are single JSON lines.
+
+A request carries a fingerprint of the client's configuration; the daemon
+only serves clients whose configuration matches its own, otherwise the
+client falls back to running the command itself.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from dataclasses import asdict
+from typing import Dict, Any, Optional, Callable
+
+from .config import PublisherConfig
+
+
+# Path-valued configuration fields, compared as absolute paths
+_PATH_FIELDS = ('reports_dir', 'report_state_path', 'report_index_path', 'walrus_dedup_path', 'outbox_path', 'anchor_dir')
+
+# Seconds to wait for a connection to the daemon
+CONNECT_TIMEOUT = 1.0
+
+
+class DaemonError(Exception):
+    """Custom exception for publisher daemon errors."""
+    pass
+
+
+def default_socket_path() -> str:
+    """Per-user default socket path."""
+    user = os.getuid() if hasattr(os, 'getuid') else 'user'
+    return os.path.join(tempfile.gettempdir(), f'pgdn-publisher-{user}.sock')
+
+
+def config_fingerprint(config: PublisherConfig) -> str:
+    """Hash of a configuration, with relative paths resolved against the working directory."""
+    values = asdict(config)
+    for field in _PATH_FIELDS:
+        if values.get(field):
+            values[field] = os.path.abspath(values[field])
+    canonical = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PublisherPool:
+    """Configurations and ledger and report publishers kept warm per network."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._configs: Dict[Optional[str], PublisherConfig] = {}
+        self._publishers: Dict[tuple, Any] = {}
+        self._network_locks: Dict[str, threading.Lock] = {}
+
+    def config(self, network: Optional[str]) -> PublisherConfig:
+        """Configuration for a network (None for the default), built from the environment on first use."""
+        with self._lock:
+            if network not in self._configs:
+                self._configs[network] = PublisherConfig.from_env(network=network)
+            return self._configs[network]
+
+    def ledger(self, config: PublisherConfig):
+        """Return the LedgerPublisher for config.network, connecting on first use."""
+        from .ledger import LedgerPublisher
+        return self._get(('ledger', config.network), lambda: LedgerPublisher(config))
+
+    def reports(self, config: PublisherConfig):
+        """Return the ReportPublisher for config.network."""
+        from .reports import ReportPublisher
+        return self._get(('reports', config.network), lambda: ReportPublisher(config))
+
+    def network_lock(self, network: str) -> threading.Lock:
+        """Lock serialising ledger transactions on one network."""
+        with self._lock:
+            return self._network_locks.setdefault(network, threading.Lock())
+
+    def close(self) -> None:
+        """Close publishers that hold local resources."""
+        with self._lock:
+            publishers = list(self._publishers.values())
+            self._publishers.clear()
+        for publisher in publishers:
+            close = getattr(publisher, 'close', None)
+            if close is not None:
+                close()
+
+    def _get(self, key: tuple, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            publisher = self._publishers.get(key)
+        if publisher is not None:
+            return publisher
+
+        # Connect outside the pool lock; a concurrent first request for the
+        # same key may build a second publisher, of which one is kept
+        publisher = factory()
+        with self._lock:
+            return self._publishers.setdefault(key, publisher)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            response = self.server.dispatch(json.loads(line))
+        except Exception as e:
+            response = {'forwarded': False, 'error': f'Daemon error: {e}'}
+        self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+
+
+class PublisherDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server handing JSON requests to a dispatch function."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, dispatch: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        """
+        Bind the daemon socket.
+
+        Args:
+            socket_path: Unix socket path; a stale socket left by a dead daemon is replaced
+            dispatch: Called with each request; returns the response
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise DaemonError("Unix sockets are not supported on this platform")
+        if os.path.exists(socket_path):
+            if is_running(socket_path):
+                raise DaemonError(f"A publisher daemon is already listening on {socket_path}")
+            os.unlink(socket_path)
+
+        self.socket_path = socket_path
+        self.dispatch = dispatch
+        # Only the owning user may talk to a daemon holding their keys
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def is_running(socket_path: str) -> bool:
+    """Check whether a daemon accepts connections on socket_path."""
+    try:
+        with _connect(socket_path):
+            return True
+    except OSError:
+        return False
+
+
+def call_daemon(request: Dict[str, Any], socket_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Send a request to a running daemon.
+
+    Returns:
+        The daemon's response, or None when no daemon is listening
+    """
+    socket_path = socket_path or default_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+
+    try:
+        connection = _connect(socket_path)
+    except OSError:
+        return None
+
+    with connection:
+        # Publishing may wait for confirmations; only the connect is time-limited
+        connection.settimeout(None)
+        connection.sendall(json.dumps(request, default=str).encode('utf-8') + b'\n')
+        with connection.makefile('rb') as response:
+            line = response.readline()
+
+    if not line:
+        raise DaemonError("Daemon closed the connection without a response")
+    return json.loads(line)
+
+
+def _connect(socket_path: str) -> socket.socket:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(CONNECT_TIMEOUT)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        raise
+    return connection
@@ -0,0 +1,274 @@
+"""
+Delta report encoding for repeatedly scanned hosts.
+
+Most daily rescans produce a report identical to the previous one apart from
+timestamps. In delta mode the publisher remembers the last report stored for
+each host and publishes either a tiny "unchanged since blob X" record (when
+every section apart from the scan metadata and raw scan data is identical;
+raw scan data changes travel in the record as a diff) or a structural diff
+against the previous blob. Readers rebuild the full report by
+following the ``base`` pointers back to a full report; chains are bounded so
+a rebuild never needs more than ``max_chain_length`` extra fetches.
+"""
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+
+
+UNCHANGED_REPORT_TYPE = 'depin_validator_scan_unchanged'
+DELTA_REPORT_TYPE = 'depin_validator_scan_delta'
+DELTA_REPORT_TYPES = (UNCHANGED_REPORT_TYPE, DELTA_REPORT_TYPE)
+
+# Fields replaced from an "unchanged" record when rebuilding
+_UNCHANGED_FIELDS = ('uid', 'generated_at', 'scan_metadata')
+
+
+class DeltaError(Exception):
+    """Custom exception for delta report errors."""
+    pass
+
+
+@dataclass
+class HostState:
+    """Last report stored on Walrus for a host."""
+    host_uid: str
+    blob_id: str
+    sections_hash: str
+    chain_length: int
+    report: Dict[str, Any]
+
+
+@dataclass
+class DeltaResult:
+    """Outcome of delta-encoding a report."""
+    host_uid: str
+    record: Dict[str, Any]  # what gets published
+    report: Dict[str, Any]  # full report as a reader will rebuild it
+    sections_hash: str
+    chain_length: int  # 0 for a full report
+
+
+class HostStateStore:
+    """SQLite-backed store of the last published report per host."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the host state database."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS host_reports (
+                host_uid TEXT PRIMARY KEY,
+                blob_id TEXT NOT NULL,
+                assessment_hash TEXT NOT NULL,  -- sections_hash, named for existing databases
+                chain_length INTEGER NOT NULL,
+                report TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, host_uid: str) -> Optional[HostState]:
+        """Return the last stored state for a host, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob_id, assessment_hash, chain_length, report FROM host_reports WHERE host_uid = ?",
+                (host_uid,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        blob_id, stored_hash, chain_length, report = row
+        return HostState(host_uid, blob_id, stored_hash, chain_length, json.loads(report))
+
+    def put(self, state: HostState) -> None:
+        """Record the report just stored for a host."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO host_reports VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    state.host_uid,
+                    state.blob_id,
+                    state.sections_hash,
+                    state.chain_length,
+                    json.dumps(state.report, separators=(',', ':')),
+                    time.time()
+                )
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def sections_hash(report: Dict[str, Any]) -> str:
+    """
+    Canonical hash of every report section an "unchanged" record takes from its base.
+
+    The fields the record carries itself (uid, generated_at, scan_metadata
+    and the raw_scan_data diff) are left out; a change anywhere else
+    (security assessment, technical details, recommendations, ...) changes
+    the hash.
+    """
+    sections = {
+        key: value for key, value in report.items() if key not in _UNCHANGED_FIELDS and key != 'raw_scan_data'
+    }
+    canonical = json.dumps(sections, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def diff_reports(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List]:
+    """
+    Compute a structural diff between two JSON-compatible reports.
+
+    Nested dictionaries are diffed key by key; any other changed value
+    (including lists) is replaced whole.
+
+    Returns:
+        ``{'set': [[path, value], ...], 'remove': [path, ...]}``
+    """
+    changes = {'set': [], 'remove': []}
+    _diff(old, new, [], changes)
+    return changes
+
+
+def _diff(old: Any, new: Any, path: List[str], changes: Dict[str, List]) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                changes['remove'].append(path + [key])
+        for key, value in new.items():
+            if key in old:
+                _diff(old[key], value, path + [key], changes)
+            else:
+                changes['set'].append([path + [key], value])
+    elif old != new:
+        changes['set'].append([path, new])
+
+
+def apply_diff(base: Dict[str, Any], diff: Dict[str, List]) -> Dict[str, Any]:
+    """Apply a diff produced by diff_reports to a copy of base."""
+    result = copy.deepcopy(base)
+
+    for path in diff.get('remove', []):
+        parent = _resolve(result, path[:-1])
+        parent.pop(path[-1], None)
+
+    for path, value in diff.get('set', []):
+        if not path:
+            result = copy.deepcopy(value)
+            continue
+        parent = _resolve(result, path[:-1])
+        parent[path[-1]] = value
+
+    return result
+
+
+def _resolve(document: Dict[str, Any], path: List[str]) -> Dict[str, Any]:
+    node = document
+    for key in path:
+        node = node.setdefault(key, {})
+    return node
+
+
+class DeltaEncoder:
+    """Turns full reports into unchanged/delta records against per-host state."""
+
+    def __init__(self, store: HostStateStore, mode: str = 'diff', max_chain_length: int = 10):
+        """
+        Initialize delta encoder.
+
+        Args:
+            store: Per-host last report state
+            mode: 'unchanged' to only skip unchanged reports, 'diff' to also diff-encode changed ones
+            max_chain_length: Maximum records between a full report and any delta built on it
+        """
+        if mode not in ('unchanged', 'diff'):
+            raise DeltaError(f"Unsupported delta mode: {mode}")
+        self.store = store
+        self.mode = mode
+        self.max_chain_length = max_chain_length
+
+    def encode(self, report: Dict[str, Any]) -> DeltaResult:
+        """Encode a formatted report relative to the last report stored for its host."""
+        # Normalise to what a reader will see after a JSON round trip
+        report = json.loads(json.dumps(report, default=str))
+        host_uid = report.get('scan_metadata', {}).get('host_uid', 'unknown')
+        current_hash = sections_hash(report)
+
+        previous = self.store.get(host_uid) if host_uid != 'unknown' else None
+        if previous is None or previous.chain_length >= self.max_chain_length:
+            return DeltaResult(host_uid, report, report, current_hash, 0)
+
+        chain_length = previous.chain_length + 1
+        envelope = {
+            'uid': report['uid'],
+            'version': report.get('version', '1.0'),
+            'generated_at': report['generated_at'],
+            'scan_metadata': report['scan_metadata'],
+            'base': previous.blob_id,
+            'chain_length': chain_length
+        }
+
+        if previous.sections_hash == current_hash:
+            # raw_scan_data repeats per-scan fields (scan_id, scan_time, ...), so
+            # it is carried as a diff rather than taken from the base
+            record = dict(
+                envelope,
+                report_type=UNCHANGED_REPORT_TYPE,
+                raw_scan_data_diff=diff_reports(previous.report.get('raw_scan_data'), report.get('raw_scan_data'))
+            )
+            rebuilt = rebuild_from_base(previous.report, record)
+            return DeltaResult(host_uid, record, rebuilt, current_hash, chain_length)
+
+        if self.mode == 'diff':
+            record = dict(envelope, report_type=DELTA_REPORT_TYPE, diff=diff_reports(previous.report, report))
+            return DeltaResult(host_uid, record, report, current_hash, chain_length)
+
+        return DeltaResult(host_uid, report, report, current_hash, 0)
+
+    def commit(self, result: DeltaResult, blob_id: str) -> None:
+        """Record that a delta result was stored under blob_id."""
+        if result.host_uid == 'unknown':
+            return
+        self.store.put(HostState(
+            host_uid=result.host_uid,
+            blob_id=blob_id,
+            sections_hash=result.sections_hash,
+            chain_length=result.chain_length,
+            report=result.report
+        ))
+
+
+def is_delta_record(document: Any) -> bool:
+    """Check whether a retrieved document is an unchanged/delta record."""
+    return isinstance(document, dict) and document.get('report_type') in DELTA_REPORT_TYPES
+
+
+def is_delta_table(table: Dict[str, Any]) -> bool:
+    """Check whether a sectioned blob's section table is that of an unchanged/delta record."""
+    return 'base' in table and 'chain_length' in table
+
+
+def rebuild_from_base(base: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a single unchanged/delta record to its full base report."""
+    if record['report_type'] == UNCHANGED_REPORT_TYPE:
+        rebuilt = copy.deepcopy(base)
+        for field in _UNCHANGED_FIELDS:
+            rebuilt[field] = copy.deepcopy(record[field])
+        if 'raw_scan_data_diff' in record:
+            rebuilt['raw_scan_data'] = apply_diff(base.get('raw_scan_data'), record['raw_scan_data_diff'])
+        return rebuilt
+    return apply_diff(base, record['diff'])
+
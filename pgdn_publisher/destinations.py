@@ -0,0 +1,67 @@
+"""
+Pluggable report destinations for ReportPublisher.
+
+``ReportPublisher.publish`` fans a formatted report out to its destinations
+concurrently. Each destination has a name (the key in the returned results
+dictionary) and an optional timeout in seconds.
+"""
+
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .reports import ReportPublisher, PublishResult
+
+
+class ReportDestination:
+    """Base class for report publishing destinations."""
+
+    name: str = ''
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Initialize destination.
+
+        Args:
+            timeout: Seconds to wait for this destination before reporting a timeout (None waits forever)
+        """
+        self.timeout = timeout
+
+    def publish(self, report: Dict[str, Any], full_report: Optional[Dict[str, Any]] = None) -> 'PublishResult':
+        """
+        Publish a formatted report.
+
+        Args:
+            report: Report (or delta record) to publish
+            full_report: Full report when report is a delta record
+
+        Returns:
+            PublishResult for this destination
+        """
+        raise NotImplementedError
+
+
+class WalrusDestination(ReportDestination):
+    """Walrus decentralized storage destination."""
+
+    name = 'walrus'
+
+    def __init__(self, publisher: 'ReportPublisher', timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.publisher = publisher
+
+    def publish(self, report: Dict[str, Any], full_report: Optional[Dict[str, Any]] = None) -> 'PublishResult':
+        return self.publisher.publish_to_walrus(report)
+
+
+class LocalFileDestination(ReportDestination):
+    """Local file system (or segment store) destination."""
+
+    name = 'local_file'
+
+    def __init__(self, publisher: 'ReportPublisher', timeout: Optional[float] = None):
+        super().__init__(timeout)
+        self.publisher = publisher
+
+    def publish(self, report: Dict[str, Any], full_report: Optional[Dict[str, Any]] = None) -> 'PublishResult':
+        # Local copies are complete reports, even when Walrus gets a delta record
+        return self.publisher.publish_to_local_file(full_report or report)
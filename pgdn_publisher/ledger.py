@@ -2,10 +2,10 @@
 Blockchain ledger publishing functionality.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Sequence, Union
 
 from .config import PublisherConfig
-from .zksync_ledger import ZkSyncLedgerPublisher, ZkSyncLedgerError
+from .records import ScanRecord
 from .sui_ledger import SuiLedgerPublisher, SuiLedgerError
 
 
@@ -21,26 +21,159 @@ class LedgerPublisher:
         """Initialize ledger publisher based on network configuration."""
         self.config = config
         
-        # Create network-specific publisher
+        # Create network-specific publisher; the zkSync backend is imported on
+        # demand since web3 dominates the package's import time
         if config.network == 'sui':
             self._publisher = SuiLedgerPublisher(config)
+            self._backend_error = SuiLedgerError
         elif config.network == 'zksync':
-            self._publisher = ZkSyncLedgerPublisher(config)
+            from .zksync_ledger import ZkSyncLedgerPublisher, ZkSyncLedgerError
+            if len(config.publisher_keys()) > 1:
+                # Several keys: scans are sharded across the accounts by host_uid
+                from .sharded_ledger import ShardedZkSyncPublisher
+                self._publisher = ShardedZkSyncPublisher(config)
+            else:
+                self._publisher = ZkSyncLedgerPublisher(config)
+            self._backend_error = ZkSyncLedgerError
         else:
             raise LedgerError(f"Unsupported network: {config.network}")
     
-    def publish(self, scan_result: Dict[str, Any], wait_for_confirmation: bool = True) -> Dict[str, Any]:
-        """Publish scan result to blockchain ledger."""
+    def publish(self, scan_result: Union[Dict[str, Any], ScanRecord], wait_for_confirmation: bool = True) -> Dict[str, Any]:
+        """Publish scan result (dictionary or ScanRecord) to blockchain ledger."""
         try:
             return self._publisher.publish(scan_result, wait_for_confirmation)
-        except (ZkSyncLedgerError, SuiLedgerError) as e:
+        except self._backend_error as e:
+            raise LedgerError(str(e))
+    
+    def publish_batch(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]],
+                      wait_for_confirmation: bool = True) -> Dict[str, Any]:
+        """
+        Publish several scan results (dictionaries or ScanRecords).
+        
+        Networks with batch support publish them in one transaction; others
+        publish them one by one and return the individual results. A scan
+        that fails there gets a failed result instead of raising, so the
+        scans already published are not sent again by a retry.
+        """
+        if hasattr(self._publisher, 'publish_batch'):
+            try:
+                return self._publisher.publish_batch(scan_results, wait_for_confirmation)
+            except self._backend_error as e:
+                raise LedgerError(str(e))
+        
+        results = []
+        for scan_result in scan_results:
+            try:
+                results.append(self._publisher.publish(scan_result, wait_for_confirmation))
+            except Exception as e:
+                results.append({'success': False, 'error': str(e), 'network': self.config.network})
+        return {
+            'success': all(result.get('success') for result in results),
+            'count': len(results),
+            'results': results,
+            'network': self.config.network
+        }
+    
+    def close(self) -> None:
+        """Release threads held by the network publisher, if any."""
+        close = getattr(self._publisher, 'close', None)
+        if close is not None:
+            close()
+    
+    @property
+    def account_count(self) -> int:
+        """Number of accounts publishing concurrently (one unless several keys are configured)."""
+        return getattr(self._publisher, 'account_count', 1)
+    
+    @property
+    def has_publish_cooldown(self) -> bool:
+        """Whether the contract enforces a cooldown between an account's publications."""
+        return getattr(self._publisher, 'has_publish_cooldown', False)
+    
+    def account_for(self, host_uid: str) -> int:
+        """Position of the account publishing a host's scans (always 0 with a single account)."""
+        if hasattr(self._publisher, 'account_for'):
+            return self._publisher.account_for(host_uid)
+        return 0
+    
+    def partition(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]]) -> List[List[int]]:
+        """
+        Group scan positions by the account that publishes them.
+        
+        sign_publish accepts only scans of one group; with a single account
+        all scans form one group.
+        """
+        if hasattr(self._publisher, 'partition'):
+            return self._publisher.partition(scan_results)
+        return [list(range(len(scan_results)))] if scan_results else []
+    
+    @property
+    def supports_signing(self) -> bool:
+        """Whether transactions can be signed and broadcast as separate steps."""
+        return hasattr(self._publisher, 'sign_publish')
+    
+    def sign_publish(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]]) -> Dict[str, Any]:
+        """Sign (but do not send) a transaction publishing the given scan results."""
+        if not self.supports_signing:
+            raise LedgerError(f"Network {self.config.network} does not support separate signing")
+        try:
+            return self._publisher.sign_publish(scan_results)
+        except self._backend_error as e:
+            raise LedgerError(str(e))
+    
+    def broadcast_transaction(self, raw_transaction: str) -> str:
+        """Send a transaction returned by sign_publish and return its hash."""
+        if not self.supports_signing:
+            raise LedgerError(f"Network {self.config.network} does not support separate signing")
+        try:
+            return self._publisher.broadcast_transaction(raw_transaction)
+        except self._backend_error as e:
+            raise LedgerError(str(e))
+    
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a transaction receipt, or None while the transaction is pending."""
+        if not self.supports_signing:
+            raise LedgerError(f"Network {self.config.network} does not support receipt lookups")
+        try:
+            return self._publisher.get_transaction_receipt(tx_hash)
+        except Exception as e:
+            raise LedgerError(f"Receipt lookup failed: {e}")
+    
+    def transaction_state(self, tx_hash: str, nonce: int, raw_transaction: Optional[str] = None) -> str:
+        """
+        Classify a signed transaction as 'mined', 'pending', 'replaced' or 'unsent'.
+        
+        With several accounts, raw_transaction identifies the signing account
+        when it is no longer known locally.
+        """
+        if not self.supports_signing:
+            raise LedgerError(f"Network {self.config.network} does not support receipt lookups")
+        try:
+            if self.account_count > 1:
+                return self._publisher.transaction_state(tx_hash, nonce, raw_transaction)
+            return self._publisher.transaction_state(tx_hash, nonce)
+        except self._backend_error as e:
+            raise LedgerError(str(e))
+    
+    @property
+    def supports_summary_lookups(self) -> bool:
+        """Whether published summaries can be looked up by hash."""
+        return hasattr(self._publisher, 'get_scan_summaries')
+    
+    def get_scan_summaries(self, summary_hashes: List[bytes]) -> List[Dict[str, Any]]:
+        """Look up published summaries by their 32-byte hashes."""
+        if not self.supports_summary_lookups:
+            raise LedgerError(f"Network {self.config.network} does not support summary lookups")
+        try:
+            return self._publisher.get_scan_summaries(summary_hashes)
+        except self._backend_error as e:
             raise LedgerError(str(e))
     
     def get_status(self) -> Dict[str, Any]:
         """Get ledger connection status."""
         try:
             return self._publisher.get_status()
-        except (ZkSyncLedgerError, SuiLedgerError) as e:
+        except self._backend_error as e:
             return {
                 'connected': False,
                 'network': self.config.network,
@@ -0,0 +1,386 @@
+"""
+Segmented append-only local report store.
+
+Reports are appended as length-prefixed records to rotating segment files
+instead of one pretty-printed JSON file per report. Writes are fsynced in
+groups, a compact sidecar index per segment maps report uid and scan_id to
+(segment, offset, length), and reads go through read-only memory maps.
+
+Segment record layout::
+
+    +----------+---------+------------------+------------+-----+---------+
+    | length 4 | crc32 4 | written_at (f64) | uid len 2  | uid | payload |
+    +----------+---------+------------------+------------+-----+---------+
+
+``length`` covers everything after the 16-byte header and ``crc32`` is taken
+over the same bytes. Each time a segment is sealed, sealed segments past the
+retention period are deleted and those mostly made of superseded or expired
+records are compacted (see SegmentStore.maintain). Index entries in ``segment_NNNNNNNN.idx`` are::
+
+    offset 8 | length 4 | uid len 2 | uid | scan_id len 2 | scan_id
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Any, Optional, Tuple, List
+
+
+_RECORD_HEADER = struct.Struct('>IId')
+_KEY_LENGTH = struct.Struct('>H')
+_INDEX_ENTRY = struct.Struct('>QI')
+
+_SEGMENT_NAME = re.compile(r'^segment_(\d{8})\.log$')
+
+
+class SegmentStoreError(Exception):
+    """Custom exception for segment store errors."""
+    pass
+
+
+class SegmentStore:
+    """Append-only report store backed by rotating segment files."""
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024,
+                 fsync_every: int = 100, fsync_interval: float = 1.0,
+                 retention_seconds: Optional[float] = None, compact_dead_ratio: Optional[float] = None):
+        """
+        Open (and create if needed) a segment store.
+
+        Args:
+            directory: Directory holding segment and index files
+            segment_max_bytes: Size after which a new segment is started
+            fsync_every: Appends between fsyncs
+            fsync_interval: Maximum seconds between fsyncs while appending
+            retention_seconds: Age after which records are dropped by maintain (None keeps them)
+            compact_dead_ratio: Fraction of dead bytes at which maintain compacts a
+                sealed segment (None disables compaction)
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.retention_seconds = retention_seconds
+        self.compact_dead_ratio = compact_dead_ratio
+
+        self._lock = threading.RLock()
+        self._by_uid: Dict[str, Tuple[int, int, int]] = {}
+        self._by_scan_id: Dict[str, str] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._maintaining = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = self._list_segments()
+        for segment in self._segments:
+            self._load_index(segment)
+
+        self._active = self._segments[-1] if self._segments else 1
+        if not self._segments:
+            self._segments.append(self._active)
+        self._log = open(self._segment_path(self._active), 'ab')
+        self._idx = open(self._index_path(self._active), 'ab')
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment:08d}.log")
+
+    def _index_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment_{segment:08d}.idx")
+
+    def _list_segments(self) -> List[int]:
+        segments = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_NAME.match(name)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def _load_index(self, segment: int) -> None:
+        """Load a segment's sidecar index, rebuilding it from the segment if missing."""
+        path = self._index_path(segment)
+        if not os.path.exists(path):
+            self._rebuild_index(segment)
+            return
+
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        position = 0
+        while position + _INDEX_ENTRY.size <= len(data):
+            offset, length = _INDEX_ENTRY.unpack_from(data, position)
+            position += _INDEX_ENTRY.size
+            uid, position = _read_key(data, position)
+            scan_id, position = _read_key(data, position)
+            if uid is None or scan_id is None:
+                break  # torn write at the end of the index
+            self._remember(uid, scan_id, segment, offset, length)
+
+    def _rebuild_index(self, segment: int) -> None:
+        """Recreate a segment's sidecar index by scanning its records."""
+        with open(self._index_path(segment), 'wb') as idx:
+            for offset, length, _, uid, payload in self._scan_segment(segment):
+                scan_id = str(json.loads(payload).get('scan_metadata', {}).get('scan_id', ''))
+                idx.write(_index_entry(uid, scan_id, offset, length))
+                self._remember(uid, scan_id, segment, offset, length)
+
+    def _remember(self, uid: str, scan_id: str, segment: int, offset: int, length: int) -> None:
+        self._by_uid[uid] = (segment, offset, length)
+        if scan_id:
+            self._by_scan_id[scan_id] = uid
+
+    def _scan_segment(self, segment: int):
+        """Yield (offset, length, written_at, uid, payload) for every intact record in a segment."""
+        with open(self._segment_path(segment), 'rb') as f:
+            data = f.read()
+
+        position = 0
+        while position + _RECORD_HEADER.size <= len(data):
+            length, crc, written_at = _RECORD_HEADER.unpack_from(data, position)
+            body = data[position + _RECORD_HEADER.size:position + _RECORD_HEADER.size + length]
+            if len(body) < length or zlib.crc32(body) != crc:
+                break  # torn write at the end of the segment
+            uid, payload_start = _read_key(body, 0)
+            yield position, _RECORD_HEADER.size + length, written_at, uid, body[payload_start:]
+            position += _RECORD_HEADER.size + length
+
+    def append(self, report: Dict[str, Any]) -> Tuple[str, int, int]:
+        """
+        Append a formatted report.
+
+        Returns:
+            Tuple of (segment path, record offset, record length)
+        """
+        uid = report.get('uid')
+        if not uid:
+            raise SegmentStoreError("Report has no uid")
+        scan_id = str(report.get('scan_metadata', {}).get('scan_id', ''))
+
+        payload = json.dumps(report, default=str, separators=(',', ':')).encode('utf-8')
+        return self._append_record(uid, scan_id, payload, time.time())
+
+    def _append_record(self, uid: str, scan_id: str, payload: bytes, written_at: float) -> Tuple[str, int, int]:
+        body = _encode_key(uid) + payload
+        record = _RECORD_HEADER.pack(len(body), zlib.crc32(body), written_at) + body
+
+        with self._lock:
+            rotated = self._log.tell() > 0 and self._log.tell() + len(record) > self.segment_max_bytes
+            if rotated:
+                self._rotate()
+
+            offset = self._log.tell()
+            self._log.write(record)
+            self._log.flush()
+            self._idx.write(_index_entry(uid, scan_id, offset, len(record)))
+            self._idx.flush()
+            self._remember(uid, scan_id, self._active, offset, len(record))
+
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+            location = self._segment_path(self._active), offset, len(record)
+            # Compaction re-appends records itself, so it must not start again from there
+            if rotated and not self._maintaining:
+                self.maintain()
+            return location
+
+    def _sync(self) -> None:
+        os.fsync(self._log.fileno())
+        os.fsync(self._idx.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _rotate(self) -> None:
+        """Seal the active segment and start a new one."""
+        self._sync()
+        self._log.close()
+        self._idx.close()
+        self._active += 1
+        self._segments.append(self._active)
+        self._log = open(self._segment_path(self._active), 'ab')
+        self._idx = open(self._index_path(self._active), 'ab')
+
+    def flush(self) -> None:
+        """Fsync any appends not yet synced to disk."""
+        with self._lock:
+            if self._unsynced:
+                self._sync()
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        """Return a read-only memory map of a segment covering at least end bytes."""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            with open(self._segment_path(segment), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def read_at(self, segment: int, offset: int, length: int) -> Dict[str, Any]:
+        """Read and decode the report stored at a record location."""
+        with self._lock:
+            mapped = self._map(segment, offset + length)
+            record = mapped[offset:offset + length]
+
+        body_length, crc, _ = _RECORD_HEADER.unpack_from(record)
+        body = record[_RECORD_HEADER.size:]
+        if len(body) != body_length or zlib.crc32(body) != crc:
+            raise SegmentStoreError(f"Corrupt record at segment {segment} offset {offset}")
+
+        _, payload_start = _read_key(body, 0)
+        return json.loads(body[payload_start:])
+
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        """Return the report with the given uid, if stored."""
+        location = self._by_uid.get(uid)
+        if location is None:
+            return None
+        return self.read_at(*location)
+
+    def get_by_scan_id(self, scan_id: Any) -> Optional[Dict[str, Any]]:
+        """Return the most recently stored report for a scan_id, if any."""
+        uid = self._by_scan_id.get(str(scan_id))
+        return self.get(uid) if uid is not None else None
+
+    def _drop_segment(self, segment: int) -> None:
+        """Delete a sealed segment and forget its index entries."""
+        mapped = self._maps.pop(segment, None)
+        if mapped is not None:
+            mapped.close()
+
+        for uid in [uid for uid, location in self._by_uid.items() if location[0] == segment]:
+            del self._by_uid[uid]
+        for scan_id in [scan_id for scan_id, uid in self._by_scan_id.items() if uid not in self._by_uid]:
+            del self._by_scan_id[scan_id]
+
+        os.remove(self._segment_path(segment))
+        if os.path.exists(self._index_path(segment)):
+            os.remove(self._index_path(segment))
+        self._segments.remove(segment)
+
+    def expire(self, max_age_seconds: float) -> int:
+        """
+        Delete sealed segments whose newest record is older than max_age_seconds.
+
+        Returns:
+            Number of segments removed
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        with self._lock:
+            for segment in list(self._segments):
+                if segment == self._active:
+                    continue
+                if os.path.getmtime(self._segment_path(segment)) < cutoff:
+                    self._drop_segment(segment)
+                    removed += 1
+        return removed
+
+    def maintain(self) -> Dict[str, int]:
+        """
+        Apply the store's retention and compaction settings to the sealed segments.
+
+        Runs after every rotation; can also be called directly (see the
+        ``compact-store`` CLI command).
+
+        Returns:
+            Number of segments 'expired' and 'compacted'
+        """
+        with self._lock:
+            self._maintaining = True
+            try:
+                expired = self.expire(self.retention_seconds) if self.retention_seconds is not None else 0
+                compacted = 0
+                if self.compact_dead_ratio is not None:
+                    compacted = self.compact(self.retention_seconds, self.compact_dead_ratio)
+            finally:
+                self._maintaining = False
+        return {'expired': expired, 'compacted': compacted}
+
+    def compact(self, max_age_seconds: Optional[float] = None, min_dead_ratio: float = 0.5) -> int:
+        """
+        Rewrite sealed segments that are mostly superseded or expired records.
+
+        Live records of a qualifying segment are re-appended to the active
+        segment (keeping their original write time) and the old segment is
+        deleted.
+
+        Args:
+            max_age_seconds: Also drop records written longer ago than this
+            min_dead_ratio: Fraction of dead bytes at which a segment is rewritten
+
+        Returns:
+            Number of segments compacted
+        """
+        cutoff = time.time() - max_age_seconds if max_age_seconds is not None else None
+        compacted = 0
+
+        with self._lock:
+            # Segments sealed while live records are re-appended are left for the next pass
+            active = self._active
+            for segment in list(self._segments):
+                if segment >= active:
+                    continue
+
+                live = []
+                total = 0
+                for offset, length, written_at, uid, payload in self._scan_segment(segment):
+                    total += length
+                    if self._by_uid.get(uid) != (segment, offset, length):
+                        continue
+                    if cutoff is not None and written_at < cutoff:
+                        continue
+                    live.append((uid, written_at, payload))
+
+                live_bytes = sum(_RECORD_HEADER.size + _KEY_LENGTH.size + len(uid.encode('utf-8')) + len(payload)
+                                 for uid, _, payload in live)
+                if total == 0 or (total - live_bytes) / total < min_dead_ratio:
+                    continue
+
+                scan_ids = {uid: scan_id for scan_id, uid in self._by_scan_id.items()}
+                for uid, written_at, payload in live:
+                    self._append_record(uid, scan_ids.get(uid, ''), payload, written_at)
+                self._sync()
+                self._drop_segment(segment)
+                compacted += 1
+
+        return compacted
+
+    def close(self) -> None:
+        """Fsync pending appends and release file handles and maps."""
+        with self._lock:
+            if self._log.closed:
+                return
+            self._sync()
+            self._log.close()
+            self._idx.close()
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+
+def _encode_key(key: str) -> bytes:
+    encoded = key.encode('utf-8')
+    return _KEY_LENGTH.pack(len(encoded)) + encoded
+
+
+def _read_key(data: bytes, position: int) -> Tuple[Optional[str], int]:
+    if position + _KEY_LENGTH.size > len(data):
+        return None, len(data)
+    (length,) = _KEY_LENGTH.unpack_from(data, position)
+    start = position + _KEY_LENGTH.size
+    if start + length > len(data):
+        return None, len(data)
+    return data[start:start + length].decode('utf-8'), start + length
+
+
+def _index_entry(uid: str, scan_id: str, offset: int, length: int) -> bytes:
+    return _INDEX_ENTRY.pack(offset, length) + _encode_key(uid) + _encode_key(scan_id)
@@ -0,0 +1,218 @@
+"""
+Disk-backed Merkle trees over scan summary hashes.
+
+Leaves are keccak256(0x00 || summary_hash) and inner nodes
+keccak256(0x01 || left || right); an odd node at the end of a level is
+carried up unchanged. The prefixes keep a leaf from being passed off as an
+inner node, and keccak256 keeps proofs checkable by an EVM contract.
+
+Every level is written to one file as it is built and read back through a
+memory map, so memory use does not grow with the number of leaves.
+"""
+
+import mmap
+import os
+from dataclasses import dataclass
+from typing import Optional, List, Iterable, Iterator
+
+from eth_hash.auto import keccak
+
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+HASH_SIZE = 32
+
+# Nodes hashed per read/write while building a level
+CHUNK_NODES = 65536
+
+
+class MerkleError(Exception):
+    """Custom exception for Merkle tree errors."""
+    pass
+
+
+def leaf_hash(summary_hash: bytes) -> bytes:
+    """Leaf node of a 32-byte summary hash."""
+    return keccak(LEAF_PREFIX + summary_hash)
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Inner node of two child nodes."""
+    return keccak(NODE_PREFIX + left + right)
+
+
+@dataclass
+class MerkleProof:
+    """Inclusion proof of one leaf: its position and the sibling nodes from the leaf level up."""
+    leaf_index: int
+    leaf_count: int
+    siblings: List[bytes]
+
+    def to_hex(self) -> str:
+        """Siblings concatenated as one 0x-prefixed hex string."""
+        return '0x' + b''.join(self.siblings).hex()
+
+    @classmethod
+    def from_hex(cls, leaf_index: int, leaf_count: int, path: str) -> 'MerkleProof':
+        """Proof from a leaf position and the hex string returned by to_hex."""
+        data = bytes.fromhex(path[2:] if path.startswith('0x') else path)
+        if len(data) % HASH_SIZE:
+            raise MerkleError("Proof path is not a whole number of 32-byte nodes")
+        return cls(leaf_index, leaf_count, [data[i:i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)])
+
+    def compute_root(self, summary_hash: bytes) -> Optional[bytes]:
+        """
+        Root implied by the proof for a summary hash.
+
+        Returns:
+            The root, or None if the proof does not fit its leaf position
+        """
+        if not 0 <= self.leaf_index < self.leaf_count:
+            return None
+
+        node = leaf_hash(summary_hash)
+        index, size = self.leaf_index, self.leaf_count
+        siblings = iter(self.siblings)
+        while size > 1:
+            if index % 2:
+                node = node_hash(next(siblings, b''), node)
+            elif index + 1 < size:
+                node = node_hash(node, next(siblings, b''))
+            index, size = index // 2, (size + 1) // 2
+
+        if next(siblings, None) is not None:
+            return None
+        return node
+
+
+def verify_proof(summary_hash: bytes, proof: MerkleProof, root: bytes) -> bool:
+    """Check that a summary hash is a leaf of the tree with the given root."""
+    if any(len(sibling) != HASH_SIZE for sibling in proof.siblings):
+        return False
+    return proof.compute_root(summary_hash) == root
+
+
+class MerkleTree:
+    """Merkle tree whose levels are stored back to back in one file."""
+
+    def __init__(self, path: str, level_sizes: List[int]):
+        """
+        Open a tree written by build.
+
+        Args:
+            path: Tree file
+            level_sizes: Nodes per level, leaves first
+        """
+        self.path = path
+        self.level_sizes = level_sizes
+        self._offsets = []
+        offset = 0
+        for size in level_sizes:
+            self._offsets.append(offset)
+            offset += size * HASH_SIZE
+
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def build(cls, summary_hashes: Iterable[bytes], path: str) -> 'MerkleTree':
+        """
+        Build a tree from a stream of 32-byte summary hashes.
+
+        Args:
+            summary_hashes: Leaves in order; consumed once
+            path: File to write the tree to (overwritten)
+
+        Raises:
+            MerkleError: If there are no leaves or a hash is not 32 bytes
+        """
+        with open(path, 'w+b') as f:
+            count = 0
+            chunk = []
+            for summary_hash in summary_hashes:
+                if len(summary_hash) != HASH_SIZE:
+                    raise MerkleError(f"Leaf {count + len(chunk)} is not a 32-byte hash")
+                chunk.append(leaf_hash(summary_hash))
+                if len(chunk) >= CHUNK_NODES:
+                    f.write(b''.join(chunk))
+                    count += len(chunk)
+                    chunk = []
+            f.write(b''.join(chunk))
+            count += len(chunk)
+            if not count:
+                raise MerkleError("Cannot build a Merkle tree without leaves")
+
+            level_sizes = [count]
+            offset = 0
+            while level_sizes[-1] > 1:
+                size = level_sizes[-1]
+                # Each pass reads an even number of nodes, so pairs never straddle two reads
+                for start in range(0, size, 2 * CHUNK_NODES):
+                    f.seek(offset + start * HASH_SIZE)
+                    data = f.read(min(2 * CHUNK_NODES, size - start) * HASH_SIZE)
+                    parents = [
+                        keccak(NODE_PREFIX + data[i:i + 2 * HASH_SIZE]) if i + HASH_SIZE < len(data)
+                        else data[i:i + HASH_SIZE]
+                        for i in range(0, len(data), 2 * HASH_SIZE)
+                    ]
+                    f.seek(0, os.SEEK_END)
+                    f.write(b''.join(parents))
+                offset += size * HASH_SIZE
+                level_sizes.append((size + 1) // 2)
+
+        return cls(path, level_sizes)
+
+    @property
+    def leaf_count(self) -> int:
+        return self.level_sizes[0]
+
+    @property
+    def root(self) -> bytes:
+        return self._node(len(self.level_sizes) - 1, 0)
+
+    def _node(self, level: int, index: int) -> bytes:
+        start = self._offsets[level] + index * HASH_SIZE
+        return self._data[start:start + HASH_SIZE]
+
+    def proof(self, leaf_index: int) -> MerkleProof:
+        """Inclusion proof of one leaf."""
+        if not 0 <= leaf_index < self.leaf_count:
+            raise MerkleError(f"Leaf index {leaf_index} out of range")
+
+        siblings = []
+        index = leaf_index
+        for level, size in enumerate(self.level_sizes[:-1]):
+            sibling = index ^ 1
+            if sibling < size:
+                siblings.append(self._node(level, sibling))
+            index //= 2
+        return MerkleProof(leaf_index, self.leaf_count, siblings)
+
+    def proofs(self) -> Iterator[MerkleProof]:
+        """
+        Inclusion proofs of all leaves, in leaf order.
+
+        Siblings above the leaf level change only every 2**level leaves and
+        are reused, so the whole pass reads about two nodes per leaf.
+        """
+        levels = list(enumerate(self.level_sizes[:-1]))
+        cached = [(-1, None)] * len(levels)
+        for leaf_index in range(self.leaf_count):
+            siblings = []
+            for level, size in levels:
+                sibling = (leaf_index >> level) ^ 1
+                if sibling < size:
+                    if cached[level][0] != sibling:
+                        cached[level] = (sibling, self._node(level, sibling))
+                    siblings.append(cached[level][1])
+            yield MerkleProof(leaf_index, self.leaf_count, siblings)
+
+    def close(self) -> None:
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> 'MerkleTree':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
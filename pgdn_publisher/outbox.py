@@ -0,0 +1,599 @@
+"""
+Durable outbox for scans waiting to be published.
+
+Scanners enqueue scans with a cheap local SQLite insert and return
+immediately. An OutboxWorker drains the outbox: it stores reports on Walrus,
+signs ledger transactions (batching several scans into one
+``batchPublishScans`` call), broadcasts them and waits for receipts. Every
+step is recorded before the next one starts, so a worker restarted after a
+crash continues where the previous one stopped.
+
+Entry states::
+
+    pending -> stored -> signed -> submitted -> confirmed
+                  ^        |          |
+                  +--------+----------+  (retried)      -> failed
+
+A signed transaction is written to the outbox before it is broadcast. After
+a restart the same signed transaction is broadcast again instead of a new
+one, so its nonce guarantees a scan is never published twice.
+
+Entries are not claimed row by row, so only one worker may drain an outbox
+at a time. A worker holds a lease on the outbox, renewed before every step
+and before each transaction is signed or sent, so a pass held up by the
+publish cooldown stops once another worker has taken over; another worker
+is refused until the lease is released or has expired.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Optional, List, Iterable
+from dataclasses import dataclass
+
+from .config import PublisherConfig
+from .blob_map import content_hash
+
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+STORED = 'stored'
+SIGNED = 'signed'
+SUBMITTED = 'submitted'
+CONFIRMED = 'confirmed'
+FAILED = 'failed'
+
+STATES = (PENDING, STORED, SIGNED, SUBMITTED, CONFIRMED, FAILED)
+
+# Scans inserted (and committed) at a time by enqueue_many
+ENQUEUE_CHUNK = 1000
+
+# Seconds a worker's lease lasts without being renewed
+WORKER_LEASE = 300.0
+
+# Longest wait between worker passes after repeated errors
+MAX_ERROR_BACKOFF = 60.0
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scan TEXT NOT NULL,
+        state TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        report_pointer TEXT,
+        tx_hash TEXT,
+        nonce INTEGER,
+        raw_tx TEXT,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_outbox_state ON outbox (state, id)",
+    "CREATE INDEX IF NOT EXISTS idx_outbox_tx ON outbox (tx_hash)",
+    """
+    CREATE TABLE IF NOT EXISTS outbox_worker (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        owner TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+]
+
+class OutboxError(Exception):
+    """Custom exception for outbox errors."""
+    pass
+
+
+_COLUMNS = ('id', 'scan', 'state', 'attempts', 'report_pointer', 'tx_hash', 'nonce', 'raw_tx', 'result', 'error')
+
+
+@dataclass
+class OutboxEntry:
+    """A scan in the outbox and how far its publication has got."""
+    id: int
+    scan: Dict[str, Any]
+    state: str
+    attempts: int = 0
+    report_pointer: Optional[str] = None
+    tx_hash: Optional[str] = None
+    nonce: Optional[int] = None
+    raw_tx: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class Outbox:
+    """SQLite (WAL mode) outbox of scans and their publication state."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the outbox database."""
+        self.path = path
+        self._lock = threading.Lock()
+        # Scanners and the worker may use the same file from different processes
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def enqueue(self, scan: Dict[str, Any]) -> int:
+        """Add a scan to the outbox and return its entry ID."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (scan, state, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (json.dumps(scan, default=str), PENDING, now, now)
+            )
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def enqueue_many(self, scans: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add several scans and return how many were added.
+
+        Scans are read and committed ENQUEUE_CHUNK at a time, so a long input
+        neither sits in memory nor holds the database lock while it is read;
+        if the input fails part way, the chunks before it stay enqueued.
+        """
+        scans = iter(scans)
+        added = 0
+        while True:
+            now = time.time()
+            rows = [(json.dumps(scan, default=str), PENDING, now, now) for scan in islice(scans, ENQUEUE_CHUNK)]
+            if not rows:
+                return added
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT INTO outbox (scan, state, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            added += len(rows)
+
+    def fetch(self, state: str, limit: int = 100, retry_delay: float = 0.0) -> List[OutboxEntry]:
+        """
+        Return the oldest entries in a state.
+
+        Args:
+            state: Entry state
+            limit: Maximum number of entries
+            retry_delay: Base backoff in seconds; an entry that failed n times is
+                only returned retry_delay * (2**n - 1) seconds after its last failure
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {', '.join(_COLUMNS)} FROM outbox
+                WHERE state = ? AND updated_at + ? * ((1 << MIN(attempts, 16)) - 1) <= ?
+                ORDER BY id LIMIT ?
+                """,
+                (state, retry_delay, time.time(), limit)
+            ).fetchall()
+        return [_entry(row) for row in rows]
+
+    def get(self, entry_id: int) -> Optional[OutboxEntry]:
+        """Return one entry by ID."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM outbox WHERE id = ?",
+                (entry_id,)
+            ).fetchone()
+        return _entry(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of entries in each state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall()
+        counts = {state: 0 for state in STATES}
+        counts.update(dict(rows))
+        return counts
+
+    def mark_stored(self, entry_id: int, scan: Dict[str, Any]) -> None:
+        """Record that the scan's report is stored and the scan is ready for the ledger."""
+        self._update(
+            "UPDATE outbox SET state = ?, scan = ?, report_pointer = ?, error = NULL, updated_at = ? WHERE id = ?",
+            [(STORED, json.dumps(scan, default=str), scan.get('report_pointer'), time.time(), entry_id)]
+        )
+
+    def mark_signed(self, entry_ids: List[int], tx_hash: str, nonce: int, raw_tx: str) -> None:
+        """Record a signed transaction for entries before it is broadcast."""
+        now = time.time()
+        with self._lock:
+            # This record is what prevents double publishing after a crash, so
+            # make it durable even against power loss
+            self._conn.execute("PRAGMA synchronous=FULL")
+            try:
+                self._conn.executemany(
+                    "UPDATE outbox SET state = ?, tx_hash = ?, nonce = ?, raw_tx = ?, updated_at = ? WHERE id = ?",
+                    [(SIGNED, tx_hash, nonce, raw_tx, now, entry_id) for entry_id in entry_ids]
+                )
+                self._conn.commit()
+            finally:
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def mark_submitted(self, entry_ids: List[int], tx_hash: Optional[str] = None) -> None:
+        """Record that entries' transaction was accepted by the network."""
+        self._update(
+            "UPDATE outbox SET state = ?, tx_hash = COALESCE(?, tx_hash), error = NULL, updated_at = ? WHERE id = ?",
+            [(SUBMITTED, tx_hash, time.time(), entry_id) for entry_id in entry_ids]
+        )
+
+    def mark_confirmed(self, entry_ids: List[int], result: Dict[str, Any]) -> None:
+        """Record that entries are published; the signed transaction is no longer needed."""
+        self._update(
+            "UPDATE outbox SET state = ?, result = ?, raw_tx = NULL, error = NULL, updated_at = ? WHERE id = ?",
+            [(CONFIRMED, json.dumps(result, default=str), time.time(), entry_id) for entry_id in entry_ids]
+        )
+
+    def mark_failed(self, entry_ids: List[int], error: str) -> None:
+        """Give up on entries."""
+        self._update(
+            "UPDATE outbox SET state = ?, raw_tx = NULL, error = ?, updated_at = ? WHERE id = ?",
+            [(FAILED, error, time.time(), entry_id) for entry_id in entry_ids]
+        )
+
+    def retry(self, entry_ids: List[int], state: str, error: str, max_attempts: int) -> None:
+        """
+        Count a failed attempt and move entries back to state, or to failed
+        once they have used up max_attempts. Any signed transaction is discarded.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                """
+                UPDATE outbox
+                SET attempts = attempts + 1,
+                    state = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END,
+                    tx_hash = NULL, nonce = NULL, raw_tx = NULL,
+                    error = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                [(max_attempts, FAILED, state, error, now, entry_id) for entry_id in entry_ids]
+            )
+            self._conn.commit()
+
+    def purge(self, older_than: float) -> int:
+        """Delete confirmed entries last updated more than older_than seconds ago."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE state = ? AND updated_at < ?",
+                (CONFIRMED, time.time() - older_than)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def acquire_worker(self, owner: str, lease: float = WORKER_LEASE) -> bool:
+        """
+        Take or renew the worker lease; returns False while another owner holds it.
+
+        Args:
+            owner: Unique name of the worker
+            lease: Seconds until the lease expires unless renewed
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO outbox_worker (id, owner, expires_at) VALUES (1, ?, ?)",
+                (owner, now + lease)
+            )
+            cursor = self._conn.execute(
+                "UPDATE outbox_worker SET owner = ?, expires_at = ? WHERE id = 1 AND (owner = ? OR expires_at <= ?)",
+                (owner, now + lease, owner, now)
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def release_worker(self, owner: str) -> None:
+        """Give up the worker lease if owner holds it."""
+        self._update("DELETE FROM outbox_worker WHERE owner = ?", [(owner,)])
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, statement: str, rows: List[tuple]) -> None:
+        with self._lock:
+            self._conn.executemany(statement, rows)
+            self._conn.commit()
+
+
+def _entry(row: tuple) -> OutboxEntry:
+    values = dict(zip(_COLUMNS, row))
+    values['scan'] = json.loads(values['scan'])
+    if values['result'] is not None:
+        values['result'] = json.loads(values['result'])
+    return OutboxEntry(**values)
+
+
+def open_outbox(config: PublisherConfig) -> Outbox:
+    """Open the outbox configured by outbox_path (default <reports_dir>/outbox.sqlite)."""
+    path = config.outbox_path
+    if path is None:
+        os.makedirs(config.reports_dir, exist_ok=True)
+        path = os.path.join(config.reports_dir, 'outbox.sqlite')
+    return Outbox(path)
+
+
+class OutboxWorker:
+    """Drains an outbox: Walrus storage, batched ledger transactions and confirmation."""
+
+    def __init__(self, config: PublisherConfig,
+                 outbox: Optional[Outbox] = None,
+                 report_publisher: Optional[Any] = None,
+                 ledger_publisher: Optional[Any] = None,
+                 store_reports: bool = True,
+                 walrus_workers: int = 8):
+        """
+        Initialize outbox worker.
+
+        Args:
+            config: Publisher configuration (outbox_batch_size, outbox_max_attempts, outbox_poll_interval)
+            outbox: Outbox to drain (opened from config if omitted)
+            report_publisher: ReportPublisher for Walrus storage (created from config if omitted)
+            ledger_publisher: LedgerPublisher (created from config if omitted)
+            store_reports: Store a report on Walrus for scans without a report_pointer
+            walrus_workers: Concurrent Walrus uploads
+        """
+        self.config = config
+        self.outbox = outbox or open_outbox(config)
+        if report_publisher is None and store_reports:
+            from .reports import ReportPublisher
+            report_publisher = ReportPublisher(config)
+        if ledger_publisher is None:
+            from .ledger import LedgerPublisher
+            ledger_publisher = LedgerPublisher(config)
+        self.report_publisher = report_publisher
+        self.ledger_publisher = ledger_publisher
+        self.store_reports = store_reports
+        self.walrus_workers = walrus_workers
+        self.batch_size = config.outbox_batch_size
+        self.max_attempts = config.outbox_max_attempts
+        self.retry_delay = config.outbox_poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.last_error: Optional[str] = None
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """
+        Drain the outbox until stop is set, sleeping outbox_poll_interval when idle.
+
+        A failed pass (database locked, another worker holding the lease, an
+        unexpected error) does not stop the worker: the error is logged and
+        kept in last_error, and the next pass waits twice as long,
+        up to MAX_ERROR_BACKOFF seconds.
+        """
+        stop = stop or threading.Event()
+        failures = 0
+        while not stop.is_set():
+            try:
+                progress = self.run_once()
+            except Exception as e:
+                failures += 1
+                self.last_error = str(e)
+                logger.warning("Outbox worker pass failed: %s", e)
+                stop.wait(min(self.config.outbox_poll_interval * 2 ** min(failures, 16), MAX_ERROR_BACKOFF))
+                continue
+            failures = 0
+            self.last_error = None
+            if not any(progress.values()):
+                stop.wait(self.config.outbox_poll_interval)
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Make one pass over every stage.
+
+        Returns:
+            Number of entries moved by each step ('recovered', 'stored', 'submitted', 'confirmed')
+
+        Raises:
+            OutboxError: If another worker holds the outbox lease
+        """
+        progress = {}
+        for step, run_step in (('recovered', self._recover_signed),
+                               ('stored', self._store_pending),
+                               ('submitted', self._submit_stored),
+                               ('confirmed', self._confirm_submitted)):
+            self._hold_lease()
+            progress[step] = run_step()
+        return progress
+
+    def _hold_lease(self) -> None:
+        """Renew the worker lease; raises OutboxError if another worker has taken it over."""
+        if not self.outbox.acquire_worker(self.owner):
+            raise OutboxError(f"Another worker is draining {self.outbox.path}")
+
+    def _store_pending(self) -> int:
+        """Store reports for pending entries on Walrus and attach their blob IDs."""
+        entries = self.outbox.fetch(PENDING, self.batch_size * self.walrus_workers, self.retry_delay)
+        if not entries:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=self.walrus_workers, thread_name_prefix='pgdn-outbox') as executor:
+            outcomes = list(executor.map(self._store_report, entries))
+
+        for entry, (scan, error) in zip(entries, outcomes):
+            if error is None:
+                self.outbox.mark_stored(entry.id, scan)
+            else:
+                self.outbox.retry([entry.id], PENDING, error, self.max_attempts)
+        return len(entries)
+
+    def _store_report(self, entry: OutboxEntry) -> tuple:
+        """Walrus step for one entry; returns (scan ready for the ledger, error)."""
+        scan = entry.scan
+        if scan.get('report_pointer') or not self.store_reports:
+            return scan, None
+
+        try:
+            report = self.report_publisher._format_report(scan)
+            walrus = self.report_publisher.publish_formatted(report, ['walrus'])['walrus']
+        except Exception as e:
+            return None, str(e)
+        if not walrus.success:
+            return None, walrus.error
+
+        scan = dict(scan, report_pointer=walrus.identifier)
+        if not scan.get('summary_hash'):
+            scan['summary_hash'] = '0x' + content_hash(report)
+        return scan, None
+
+    def _submit_stored(self) -> int:
+        """Sign and broadcast ledger transactions for stored entries, batch_size scans per transaction."""
+        entries = self.outbox.fetch(STORED, self.batch_size * 10, self.retry_delay)
+        if not self.ledger_publisher.supports_signing:
+            return self._publish_unsigned(entries)
+
+        # Transactions are signed with consecutive local nonces and broadcast
+        # without waiting for earlier ones to be mined; with several publisher
+        # accounts each batch is split into one transaction per account
+        batches = []
+        for start in range(0, len(entries), self.batch_size):
+            chunk = entries[start:start + self.batch_size]
+            for group in self.ledger_publisher.partition([entry.scan for entry in chunk]):
+                batches.append([chunk[position] for position in group])
+
+        for batch in batches:
+            # Broadcasting may wait out the publish cooldown, so the lease is
+            # renewed before every transaction rather than once per pass
+            self._hold_lease()
+            try:
+                signed = self.ledger_publisher.sign_publish([entry.scan for entry in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    self.outbox.retry([batch[0].id], STORED, str(e), self.max_attempts)
+                    continue
+                # Sign one by one so a single bad scan does not hold back the batch
+                for entry in batch:
+                    self._hold_lease()
+                    try:
+                        signed = self.ledger_publisher.sign_publish([entry.scan])
+                    except Exception as entry_error:
+                        self.outbox.retry([entry.id], STORED, str(entry_error), self.max_attempts)
+                        continue
+                    if not self._broadcast([entry], signed):
+                        return len(entries)
+                continue
+
+            if not self._broadcast(batch, signed):
+                # The node rejected a transaction; later nonces would not be
+                # accepted either, so leave the rest for the next pass
+                return len(entries)
+        return len(entries)
+
+    def _broadcast(self, entries: List[OutboxEntry], signed: Dict[str, Any]) -> bool:
+        """Record a signed transaction, then send it; returns whether the node accepted it."""
+        ids = [entry.id for entry in entries]
+        self.outbox.mark_signed(ids, signed['transaction_hash'], signed['nonce'], signed['raw_transaction'])
+        try:
+            tx_hash = self.ledger_publisher.broadcast_transaction(signed['raw_transaction'])
+        except Exception:
+            # Left in the signed state; recovery decides whether the same
+            # transaction is re-sent or the scans are signed again
+            return False
+        self.outbox.mark_submitted(ids, tx_hash)
+        return True
+
+    def _publish_unsigned(self, entries: List[OutboxEntry]) -> int:
+        """Publish on networks without separate signing, one scan at a time."""
+        for entry in entries:
+            self._hold_lease()
+            # Marked before the call: if the process dies mid-publish the entry is
+            # reported for manual checking instead of being published again
+            self.outbox.mark_submitted([entry.id])
+            try:
+                result = self.ledger_publisher.publish(entry.scan, wait_for_confirmation=True)
+            except Exception as e:
+                self.outbox.retry([entry.id], STORED, str(e), self.max_attempts)
+                continue
+            self.outbox.mark_confirmed([entry.id], result)
+        return len(entries)
+
+    def _recover_signed(self) -> int:
+        """Re-send transactions that were signed but not (known to be) accepted."""
+        recovered = 0
+        for tx_hash, entries in _by_transaction(self.outbox.fetch(SIGNED, self.batch_size * 100)).items():
+            ids = [entry.id for entry in entries]
+            self._hold_lease()
+            try:
+                self.ledger_publisher.broadcast_transaction(entries[0].raw_tx)
+                self.outbox.mark_submitted(ids)
+            except Exception as e:
+                try:
+                    state = self.ledger_publisher.transaction_state(tx_hash, entries[0].nonce, entries[0].raw_tx)
+                except Exception:
+                    continue  # node unreachable; try again on the next pass
+                if state in ('mined', 'pending'):
+                    self.outbox.mark_submitted(ids)
+                elif state == 'replaced':
+                    self.outbox.retry(ids, STORED, f"Transaction {tx_hash} was replaced", self.max_attempts)
+                else:
+                    # The nonce is unused, so signing again cannot publish twice
+                    self.outbox.retry(ids, STORED, str(e), self.max_attempts)
+            recovered += len(ids)
+        return recovered
+
+    def _confirm_submitted(self) -> int:
+        """Check receipts of submitted transactions."""
+        confirmed = 0
+        for tx_hash, entries in _by_transaction(self.outbox.fetch(SUBMITTED, self.batch_size * 100)).items():
+            ids = [entry.id for entry in entries]
+            if tx_hash is None:
+                # Interrupted publish on a network without separate signing
+                self.outbox.mark_failed(ids, "Interrupted while publishing; check the ledger before re-enqueueing")
+                continue
+
+            try:
+                receipt = self.ledger_publisher.get_transaction_receipt(tx_hash)
+                if receipt is None:
+                    state = self.ledger_publisher.transaction_state(tx_hash, entries[0].nonce, entries[0].raw_tx)
+                    if state == 'replaced':
+                        self.outbox.retry(ids, STORED, f"Transaction {tx_hash} was replaced", self.max_attempts)
+                    elif state == 'unsent':
+                        # Dropped by the node; the same transaction is sent again
+                        self.outbox.mark_signed(ids, tx_hash, entries[0].nonce, entries[0].raw_tx)
+                    continue
+            except Exception:
+                continue  # node unreachable; try again on the next pass
+
+            if receipt.get('status') == 0:
+                self.outbox.retry(ids, STORED, f"Transaction {tx_hash} reverted", self.max_attempts)
+            else:
+                self.outbox.mark_confirmed(ids, {
+                    'transaction_hash': tx_hash,
+                    'block_number': receipt.get('blockNumber'),
+                    'gas_used': receipt.get('gasUsed'),
+                    'batch_size': len(ids)
+                })
+                confirmed += len(ids)
+        return confirmed
+
+    def close(self) -> None:
+        """Release the worker lease and close the outbox and the publishers."""
+        try:
+            self.outbox.release_worker(self.owner)
+        finally:
+            self.outbox.close()
+        if self.report_publisher is not None:
+            self.report_publisher.close()
+        close = getattr(self.ledger_publisher, 'close', None)
+        if close is not None:
+            close()
+
+
+def _by_transaction(entries: List[OutboxEntry]) -> Dict[Optional[str], List[OutboxEntry]]:
+    groups: Dict[Optional[str], List[OutboxEntry]] = {}
+    for entry in entries:
+        groups.setdefault(entry.tx_hash, []).append(entry)
+    return groups
@@ -0,0 +1,261 @@
+"""
+Streaming publish pipeline: format -> Walrus -> ledger.
+
+Scans flow through three stages connected by bounded queues, each stage
+running in its own worker threads. While one scan waits for its ledger
+transaction the next ones are already being formatted and uploaded, so
+throughput is set by the slowest stage rather than the sum of all of them.
+The blob ID returned by Walrus becomes the scan's ``report_pointer`` on the
+ledger.
+"""
+
+import queue
+import threading
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Callable
+from dataclasses import dataclass
+
+from .config import PublisherConfig
+from .reports import ReportPublisher, PublishResult
+from .blob_map import content_hash
+
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Seconds between checks for a cancelled pipeline while blocked on a queue
+_POLL_INTERVAL = 0.1
+
+
+class PipelineError(Exception):
+    """Custom exception for publish pipeline errors."""
+    pass
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of pushing one scan through the pipeline."""
+    index: int  # position of the scan in the input
+    scan_id: Any
+    success: bool
+    report_pointer: Optional[str] = None
+    walrus: Optional[PublishResult] = None
+    ledger: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    stage: Optional[str] = None  # stage that failed
+
+
+@dataclass
+class _Item:
+    index: int
+    scan: Dict[str, Any]
+    report: Optional[Dict[str, Any]] = None
+    walrus: Optional[PublishResult] = None
+    result: Optional[PipelineResult] = None
+
+
+class PublishPipeline:
+    """Overlapping format, Walrus and ledger stages for a stream of scans."""
+
+    def __init__(self, config: PublisherConfig,
+                 report_publisher: Optional[ReportPublisher] = None,
+                 ledger_publisher: Optional[Any] = None,
+                 queue_size: int = 64,
+                 walrus_workers: int = 8,
+                 ledger_workers: int = 1,
+                 wait_for_confirmation: bool = True,
+                 local_copy: bool = False):
+        """
+        Initialize publish pipeline.
+
+        Args:
+            config: Publisher configuration
+            report_publisher: Publisher for the Walrus stage (created from config if omitted)
+            ledger_publisher: LedgerPublisher for the ledger stage (created from config if omitted)
+            queue_size: Capacity of each queue between stages
+            walrus_workers: Concurrent Walrus uploads
+            ledger_workers: Concurrent ledger submissions; keep at 1 unless the
+                ledger backend assigns nonces safely across threads
+            wait_for_confirmation: Wait for each ledger transaction to confirm
+            local_copy: Also store each report with the local_file destination
+        """
+        self.config = config
+        self.report_publisher = report_publisher or ReportPublisher(config)
+        if ledger_publisher is None:
+            from .ledger import LedgerPublisher
+            ledger_publisher = LedgerPublisher(config)
+        self.ledger_publisher = ledger_publisher
+        self.queue_size = queue_size
+        self.walrus_workers = walrus_workers
+        self.ledger_workers = ledger_workers
+        self.wait_for_confirmation = wait_for_confirmation
+        self.destinations = ['walrus', 'local_file'] if local_copy else ['walrus']
+
+    def run(self, scans: Iterable[Dict[str, Any]]) -> Iterator[PipelineResult]:
+        """
+        Push scans through the pipeline.
+
+        The input is consumed lazily; at most queue_size scans wait between any
+        two stages.
+
+        Args:
+            scans: Scan data dictionaries
+
+        Returns:
+            Iterator of PipelineResult objects in completion order
+        """
+        cancelled = threading.Event()
+        formatted: queue.Queue = queue.Queue(self.queue_size)
+        stored: queue.Queue = queue.Queue(self.queue_size)
+        results: queue.Queue = queue.Queue(self.queue_size)
+        failures: List[BaseException] = []
+
+        def put(target: queue.Queue, item: Any) -> bool:
+            while not cancelled.is_set():
+                try:
+                    target.put(item, timeout=_POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(source: queue.Queue) -> Any:
+            while not cancelled.is_set():
+                try:
+                    return source.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def format_stage() -> None:
+            try:
+                for index, scan in enumerate(scans):
+                    item = _Item(index, scan)
+                    try:
+                        item.report = self.report_publisher._format_report(scan)
+                    except Exception as e:
+                        item.result = self._failed(item, 'format', str(e))
+                    if not put(formatted, item):
+                        return
+            except BaseException as e:
+                # The scan source itself failed; finish what was read and re-raise in run()
+                failures.append(e)
+            put(formatted, _DONE)
+
+        threads = [threading.Thread(target=format_stage, name='pgdn-pipeline-format', daemon=True)]
+        threads += self._stage('walrus', self.walrus_workers, formatted, stored, self._store, get, put)
+        threads += self._stage('ledger', self.ledger_workers, stored, results, self._publish, get, put)
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                yield item.result
+        finally:
+            # Stops the stages if the caller abandons the iterator early; threads
+            # still blocked on the scan source are daemons and need no join
+            cancelled.set()
+
+        for thread in threads:
+            thread.join()
+
+        if failures:
+            raise PipelineError(f"Reading scans failed: {failures[0]}") from failures[0]
+
+    def _stage(self, name: str, workers: int, source: queue.Queue, target: queue.Queue,
+               handler: Callable[[_Item], None], get: Callable[[queue.Queue], Any],
+               put: Callable[[queue.Queue, Any], bool]) -> List[threading.Thread]:
+        """Create the worker threads of one stage; the last worker to finish passes on the end marker."""
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def work() -> None:
+            while True:
+                item = get(source)
+                if item is _DONE:
+                    # Let sibling workers see the end marker too
+                    put(source, _DONE)
+                    break
+                if item.result is None:
+                    try:
+                        handler(item)
+                    except Exception as e:
+                        item.result = self._failed(item, name, str(e))
+                if not put(target, item):
+                    break
+
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                put(target, _DONE)
+
+        return [
+            threading.Thread(target=work, name=f'pgdn-pipeline-{name}-{position}', daemon=True)
+            for position in range(workers)
+        ]
+
+    def _store(self, item: _Item) -> None:
+        """Walrus stage: store the report and turn its blob ID into the report pointer."""
+        publish_results = self.report_publisher.publish_formatted(item.report, self.destinations)
+        item.walrus = publish_results['walrus']
+        if not item.walrus.success:
+            item.result = self._failed(item, 'walrus', item.walrus.error)
+            return
+
+        scan = dict(item.scan, report_pointer=item.walrus.identifier)
+        if not scan.get('summary_hash'):
+            # Commit to the content of the report the pointer resolves to (in delta
+            # mode the rebuilt report, not the delta record stored in the blob)
+            scan['summary_hash'] = '0x' + (item.walrus.report_hash or content_hash(item.report))
+        item.scan = scan
+        item.report = None
+
+    def _publish(self, item: _Item) -> None:
+        """Ledger stage: publish the scan summary pointing at the stored report."""
+        ledger = self.ledger_publisher.publish(item.scan, wait_for_confirmation=self.wait_for_confirmation)
+        item.result = PipelineResult(
+            index=item.index,
+            scan_id=_scan_id(item.scan),
+            success=True,
+            report_pointer=item.scan['report_pointer'],
+            walrus=item.walrus,
+            ledger=ledger
+        )
+
+    @staticmethod
+    def _failed(item: _Item, stage: str, error: Optional[str]) -> PipelineResult:
+        return PipelineResult(
+            index=item.index,
+            scan_id=_scan_id(item.scan),
+            success=False,
+            report_pointer=item.scan.get('report_pointer'),
+            walrus=item.walrus,
+            error=error,
+            stage=stage
+        )
+
+
+def _scan_id(scan: Dict[str, Any]) -> Any:
+    return scan.get('scan_id', scan.get('id', 'unknown'))
+
+
+def run_pipeline(scans: Iterable[Dict[str, Any]], config: Optional[PublisherConfig] = None,
+                 **options) -> Iterator[PipelineResult]:
+    """
+    Convenience function to stream scans through format -> Walrus -> ledger.
+
+    Args:
+        scans: Scan data dictionaries
+        config: Publisher configuration (defaults to environment config)
+        **options: Keyword arguments for PublishPipeline
+
+    Returns:
+        Iterator of PipelineResult objects in completion order
+    """
+    if config is None:
+        config = PublisherConfig.from_env()
+
+    return PublishPipeline(config, **options).run(scans)
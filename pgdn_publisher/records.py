@@ -0,0 +1,50 @@
+"""
+Compact scan records for the ledger publish path.
+
+Scan dictionaries are converted to ScanRecord once, where they enter a
+publisher or batch API (see validation.scan_records); from there on a scan is
+five slots in the field order of the contract's ScanSummary struct, with the
+summary hash held as 32 raw bytes.
+"""
+
+from typing import Any
+
+
+class ScanRecord:
+    """One scan summary as published to the ledger."""
+
+    __slots__ = ('host_uid', 'scan_time', 'summary_hash', 'score', 'report_pointer')
+
+    def __init__(self, host_uid: str, scan_time: int, summary_hash: bytes, score: int, report_pointer: str):
+        """
+        Args:
+            host_uid: Scanned host identifier
+            scan_time: Scan time in the target network's unit
+            summary_hash: 32-byte summary digest
+            score: Trust score, 0..65535
+            report_pointer: Pointer to the full report
+        """
+        self.host_uid = host_uid
+        self.scan_time = scan_time
+        self.summary_hash = summary_hash
+        self.score = score
+        self.report_pointer = report_pointer
+
+    @property
+    def summary_hash_hex(self) -> str:
+        """Summary hash as 0x-prefixed hex."""
+        return '0x' + self.summary_hash.hex()
+
+    def as_tuple(self) -> tuple:
+        """Contract-ready (host_uid, scan_time, summary_hash, score, report_pointer) tuple."""
+        return (self.host_uid, self.scan_time, self.summary_hash, self.score, self.report_pointer)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ScanRecord):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __repr__(self) -> str:
+        return (f"ScanRecord(host_uid={self.host_uid!r}, scan_time={self.scan_time}, "
+                f"summary_hash={self.summary_hash_hex}, score={self.score}, "
+                f"report_pointer={self.report_pointer!r})")
@@ -0,0 +1,169 @@
+"""
+Columnar batch evaluation of report rules.
+
+A batch of scans is turned into columns (trust scores, port-set bitmaps,
+vulnerability counts, SSL expiry flags) and risk levels and recommendation
+flags are computed with NumPy in one pass over the batch. Report records are
+only built afterwards.
+"""
+
+import numbers
+from itertools import chain
+from typing import Dict, Any, List
+
+import numpy as np
+
+from .report_rules import (
+    RISK_LEVEL_THRESHOLDS,
+    DEFAULT_RISK_LEVEL,
+    PORT_RECOMMENDATIONS,
+    VULNERABILITY_RECOMMENDATION,
+    EXPIRED_SSL_RECOMMENDATION,
+    LOW_TRUST_THRESHOLD,
+    LOW_TRUST_RECOMMENDATION,
+)
+
+
+RISK_LEVELS = [level for _, level in RISK_LEVEL_THRESHOLDS] + [DEFAULT_RISK_LEVEL]
+
+# Bit of each rule port in a scan's port bitmap; looking a port up here
+# matches it exactly as ``port in open_ports`` does (22.0 and numpy integers
+# equal 22, strings do not)
+_RULE_PORT_BITS = {port: bit for bit, (port, _) in enumerate(PORT_RECOMMENDATIONS)}
+
+# Port flags plus the three non-port rules are packed into one int64 key
+# together with the vulnerability count
+if len(PORT_RECOMMENDATIONS) > 32:
+    raise ValueError("At most 32 port rules are supported")
+
+
+def scan_columns(scans: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Extract the rule inputs of a batch of scans as columns.
+
+    Returns:
+        Dictionary with 'trust_score', 'port_bitmap', 'vuln_count' and 'ssl_expired' arrays
+    """
+    count = len(scans)
+    open_ports = [scan.get('open_ports', []) for scan in scans]
+    port_counts = np.fromiter((len(ports) for ports in open_ports), dtype=np.int64, count=count)
+
+    # Flatten the rule bit of every open port (-1 for ports no rule covers)
+    # with the index of the scan it belongs to
+    port_bits = np.fromiter(
+        (_rule_bit(port) for port in chain.from_iterable(open_ports)),
+        dtype=np.int64,
+        count=int(port_counts.sum())
+    )
+    owners = np.repeat(np.arange(count), port_counts)
+
+    port_bitmap = np.zeros(count, dtype=np.uint64)
+    hits = port_bits >= 0
+    if hits.any():
+        np.bitwise_or.at(port_bitmap, owners[hits], np.left_shift(np.uint64(1), port_bits[hits].astype(np.uint64)))
+
+    return {
+        'trust_score': _trust_scores(scans),
+        'port_bitmap': port_bitmap,
+        'vuln_count': np.fromiter((len(scan.get('vulnerabilities', [])) for scan in scans), dtype=np.int64, count=count),
+        'ssl_expired': np.fromiter((bool(scan.get('ssl_info', {}).get('expired', False)) for scan in scans), dtype=bool, count=count),
+    }
+
+
+def _rule_bit(port: Any) -> int:
+    """Bit of the port rule ``port`` equals, or -1 when no rule covers it."""
+    try:
+        return _RULE_PORT_BITS.get(port, -1)
+    except TypeError:
+        # Unhashable values never equal an integer port
+        return -1
+
+
+def _trust_scores(scans: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Trust scores of a batch as floats.
+
+    Raises:
+        TypeError: For a score the per-scan rules cannot compare (strings,
+            None), instead of coercing it the way NumPy would
+    """
+    scores = [scan.get('trust_score', 0) for scan in scans]
+    for score in scores:
+        if not isinstance(score, numbers.Real):
+            # Compare as _calculate_risk_level does, so the same scores fail
+            score >= RISK_LEVEL_THRESHOLDS[-1][0]
+    return np.array(scores, dtype=np.float64)
+
+
+def risk_level_indexes(trust_scores: np.ndarray) -> np.ndarray:
+    """Map trust scores to indexes into RISK_LEVELS."""
+    levels = np.full(len(trust_scores), len(RISK_LEVEL_THRESHOLDS), dtype=np.int64)
+    # Lowest threshold first so higher thresholds overwrite
+    for position in range(len(RISK_LEVEL_THRESHOLDS) - 1, -1, -1):
+        levels[trust_scores >= RISK_LEVEL_THRESHOLDS[position][0]] = position
+    return levels
+
+
+def recommendation_flags(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Evaluate every recommendation rule for every scan.
+
+    Returns:
+        Boolean matrix of shape (scans, rules); columns follow the order of
+        PORT_RECOMMENDATIONS followed by vulnerabilities, SSL expiry and low trust
+    """
+    port_bits = np.left_shift(np.uint64(1), np.arange(len(PORT_RECOMMENDATIONS), dtype=np.uint64))
+    port_flags = (columns['port_bitmap'][:, None] & port_bits[None, :]) != 0
+
+    return np.column_stack([
+        port_flags,
+        columns['vuln_count'] > 0,
+        columns['ssl_expired'],
+        columns['trust_score'] < LOW_TRUST_THRESHOLD,
+    ])
+
+
+def batch_rules(scans: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    Compute risk level and recommendations for a batch of scans.
+
+    Returns:
+        List of (risk_level, recommendations) tuples in input order
+    """
+    if not scans:
+        return []
+
+    columns = scan_columns(scans)
+    levels = risk_level_indexes(columns['trust_score'])
+    flags = recommendation_flags(columns)
+
+    vulnerability_column = len(PORT_RECOMMENDATIONS)
+    messages = [message for _, message in PORT_RECOMMENDATIONS] + [
+        None,  # formatted per scan with its vulnerability count
+        EXPIRED_SSL_RECOMMENDATION,
+        LOW_TRUST_RECOMMENDATION,
+    ]
+
+    # Scans with the same flags (and vulnerability count, when flagged) share a
+    # recommendation list, so each distinct combination is rendered only once
+    codes = flags.astype(np.int64) @ np.left_shift(np.int64(1), np.arange(flags.shape[1], dtype=np.int64))
+    vuln_counts = np.where(flags[:, vulnerability_column], columns['vuln_count'], 0)
+    keys = vuln_counts * (1 << flags.shape[1]) + codes
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+    templates = []
+    for key in unique_keys.tolist():
+        vuln_count, code = divmod(key, 1 << flags.shape[1])
+        templates.append([
+            message if column != vulnerability_column else VULNERABILITY_RECOMMENDATION.format(count=vuln_count)
+            for column, message in enumerate(messages)
+            if code >> column & 1
+        ])
+
+    risk_levels = np.array(RISK_LEVELS, dtype=object)[levels].tolist()
+    results = [
+        (risk_level, list(templates[template]))
+        for risk_level, template in zip(risk_levels, inverse.reshape(-1).tolist())
+    ]
+
+    return results
@@ -0,0 +1,186 @@
+"""
+Queryable SQLite index over locally published reports.
+
+The index is kept up to date by ``ReportPublisher.publish_to_local_file`` and
+answers lookups such as "all CRITICAL reports for host X in the last 30 days"
+from B-tree indexes without opening report files.
+"""
+
+import glob
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS reports (
+        uid TEXT PRIMARY KEY,
+        scan_id TEXT,
+        host_uid TEXT,
+        validator_id TEXT,
+        trust_score INTEGER,
+        risk_level TEXT,
+        generated_at REAL,
+        location TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_reports_host_time ON reports (host_uid, generated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_host_risk_time ON reports (host_uid, risk_level, generated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_validator_time ON reports (validator_id, generated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_risk_time ON reports (risk_level, generated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_score ON reports (trust_score)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_scan_id ON reports (scan_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_time ON reports (generated_at)",
+]
+
+_COLUMNS = ('uid', 'scan_id', 'host_uid', 'validator_id', 'trust_score', 'risk_level', 'generated_at', 'location')
+
+ORDER_COLUMNS = ('generated_at', 'trust_score')
+
+
+class ReportIndexError(Exception):
+    """Custom exception for report index errors."""
+    pass
+
+
+class ReportIndex:
+    """SQLite index of local reports by host, validator, scan, score, risk level and time."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the report index database."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def add(self, report: Dict[str, Any], location: str) -> None:
+        """Index a formatted report stored at location."""
+        metadata = report.get('scan_metadata', {})
+        assessment = report.get('security_assessment', {})
+
+        row = (
+            report.get('uid'),
+            _text(metadata.get('scan_id')),
+            _text(metadata.get('host_uid')),
+            _text(metadata.get('validator_id')),
+            assessment.get('trust_score'),
+            assessment.get('risk_level'),
+            _timestamp(report.get('generated_at')),
+            location
+        )
+        if not row[0]:
+            raise ReportIndexError("Report has no uid")
+
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO reports ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                row
+            )
+            self._conn.commit()
+
+    def query(self,
+              host_uid: Optional[str] = None,
+              validator_id: Optional[str] = None,
+              scan_id: Optional[Any] = None,
+              risk_level: Optional[str] = None,
+              min_score: Optional[int] = None,
+              max_score: Optional[int] = None,
+              since: Optional[float] = None,
+              until: Optional[float] = None,
+              order_by: str = 'generated_at',
+              descending: bool = True,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Query indexed reports.
+
+        Args:
+            host_uid: Only reports for this host
+            validator_id: Only reports for this validator
+            scan_id: Only reports for this scan
+            risk_level: Only reports with this risk level (e.g. 'CRITICAL')
+            min_score: Minimum trust score (inclusive)
+            max_score: Maximum trust score (inclusive)
+            since: Earliest generation time as a Unix timestamp (inclusive)
+            until: Latest generation time as a Unix timestamp (inclusive)
+            order_by: 'generated_at' or 'trust_score'
+            descending: Sort order
+            limit: Maximum number of rows (top-N)
+
+        Returns:
+            List of index rows as dictionaries
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ReportIndexError(f"Cannot order by {order_by}; expected one of {', '.join(ORDER_COLUMNS)}")
+
+        conditions = []
+        params: List[Any] = []
+        for column, value in (('host_uid', host_uid), ('validator_id', validator_id),
+                              ('scan_id', _text(scan_id)), ('risk_level', risk_level)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        for column, operator, value in (('trust_score', '>=', min_score), ('trust_score', '<=', max_score),
+                                        ('generated_at', '>=', since), ('generated_at', '<=', until)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM reports"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def index_directory(self, reports_dir: str) -> int:
+        """
+        Index existing ``scan_report_*.json`` files in a reports directory.
+
+        Returns:
+            Number of reports indexed
+        """
+        count = 0
+        for path in glob.glob(os.path.join(reports_dir, 'scan_report_*.json')):
+            try:
+                with open(path, 'r') as f:
+                    report = json.load(f)
+                self.add(report, path)
+                count += 1
+            except (ValueError, ReportIndexError):
+                continue
+        return count
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    """Convert an ISO timestamp or epoch value to a Unix timestamp."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
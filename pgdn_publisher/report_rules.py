@@ -0,0 +1,35 @@
+"""
+Rule tables for report risk levels and recommendations.
+
+Both the per-scan formatter and the columnar batch formatter read these
+tables, so adding a rule here changes every report path at once without
+adding per-scan branching.
+"""
+
+from typing import List, Tuple
+
+
+# (minimum trust score, risk level), highest threshold first
+RISK_LEVEL_THRESHOLDS: List[Tuple[float, str]] = [
+    (80, 'LOW'),
+    (60, 'MEDIUM'),
+    (40, 'HIGH'),
+]
+
+# Risk level for scores below every threshold
+DEFAULT_RISK_LEVEL = 'CRITICAL'
+
+# (open port, recommendation), in the order recommendations are emitted
+PORT_RECOMMENDATIONS: List[Tuple[int, str]] = [
+    (22, "Ensure SSH is properly secured with key-based authentication"),
+    (2375, "CRITICAL: Docker API exposed without authentication - secure immediately"),
+]
+
+# Formatted with the number of vulnerabilities found
+VULNERABILITY_RECOMMENDATION = "Address {count} identified vulnerabilities"
+
+EXPIRED_SSL_RECOMMENDATION = "Renew expired SSL certificates"
+
+# Scores below this get the general posture recommendation
+LOW_TRUST_THRESHOLD = 70
+LOW_TRUST_RECOMMENDATION = "Overall security posture needs improvement"
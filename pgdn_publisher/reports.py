@@ -4,12 +4,61 @@ Report publishing functionality for PGDN Publisher.
 
 import json
 import os
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
+from itertools import chain
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterable, Iterator, Generator
+from datetime import datetime, timezone
 from dataclasses import dataclass
 
 from .config import PublisherConfig
+from .destinations import ReportDestination, WalrusDestination, LocalFileDestination
+from .bundles import (
+    ReportBundle,
+    BundleError,
+    decode_index,
+    format_report_pointer,
+    parse_report_pointer,
+    read_preamble,
+)
+from .report_rules import (
+    RISK_LEVEL_THRESHOLDS,
+    DEFAULT_RISK_LEVEL,
+    PORT_RECOMMENDATIONS,
+    VULNERABILITY_RECOMMENDATION,
+    EXPIRED_SSL_RECOMMENDATION,
+    LOW_TRUST_THRESHOLD,
+    LOW_TRUST_RECOMMENDATION,
+)
+from .streaming import iter_report_json, iter_gzip, iter_gunzip, is_gzip, gunzip, STREAM_CHUNK_SIZE
+from .local_store import SegmentStore
+from .report_index import ReportIndex
+from .blob_map import BlobMap, content_hash
+from .delta import DeltaEncoder, DeltaError, HostStateStore, is_delta_record, is_delta_table, rebuild_from_base
+from .sections import (
+    decode_section,
+    decode_section_table,
+    decode_sectioned_report,
+    encode_sectioned_report,
+    is_sectioned,
+    section_table_size,
+)
+
+
+# Leading bytes fetched to read a bundle index in one request
+BUNDLE_INDEX_PROBE_SIZE = 64 * 1024
+
+# Leading bytes fetched to read a sectioned report's header and section table
+SECTION_TABLE_PROBE_SIZE = 4 * 1024
+
+# Number of bundle indexes and section tables kept in memory per publisher
+INDEX_CACHE_SIZE = 256
+
+# Retrieval steps: yield (blob_id, byte range or None), receive (content, partial)
+RetrievalSteps = Generator[Tuple[str, Optional[Tuple[int, int]]], Tuple[bytes, bool], Any]
 
 
 class ReportError(Exception):
@@ -24,37 +73,161 @@ class PublishResult:
     destination: str
     identifier: Optional[str] = None  # file path, walrus hash, etc.
     error: Optional[str] = None
+    duration: Optional[float] = None  # seconds spent publishing to this destination
+    report_hash: Optional[str] = None  # walrus: content hash of the report the identifier resolves to
 
 
-class ReportPublisher:
-    """Publisher for scan reports to various destinations."""
+def parse_walrus_store_response(result: Dict[str, Any]) -> Optional[str]:
+    """Extract the blob ID from a Walrus store response body (new or already certified blob)."""
+    created = result.get('newlyCreated')
+    if created:
+        return created.get('blobId') or created.get('blobObject', {}).get('blobId')
+    return result.get('alreadyCertified', {}).get('blobId')
+
+
+def blob_variant(config: PublisherConfig) -> str:
+    """Describe how reports are encoded into blobs, for content-hash lookups."""
+    return f"{config.report_layout}:{config.walrus_compression or ''}"
+
+
+def decode_report_blob(content: bytes) -> Dict[str, Any]:
+    """Decode a report blob stored in the JSON (optionally gzipped) or the sectioned layout."""
+    if is_gzip(content):
+        content = gunzip(content)
+    if is_sectioned(content):
+        return decode_sectioned_report(content)
+    return json.loads(content)
+
+
+def select_section(report: Dict[str, Any], section: str, walrus_hash: str) -> Any:
+    """Return one top-level section of a decoded report."""
+    if section not in report:
+        raise ReportError(f"Section {section} not found in report {walrus_hash}")
+    return report[section]
+
+
+def deterministic_time(scan_time: Any) -> str:
+    """
+    generated_at of a deterministic report, as an ISO timestamp.
     
-    def __init__(self, config: PublisherConfig):
-        """Initialize report publisher."""
-        self.config = config
+    This is the scan's own time (epoch values in s, ms, us or ns are
+    converted). A scan without scan_time gets the start of the current UTC
+    day, which keeps identical rescans of that day identical while the
+    report stays findable by time in the report index.
+    """
+    if scan_time is None:
+        now = datetime.now(timezone.utc)
+        return now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    if isinstance(scan_time, (int, float)) and not isinstance(scan_time, bool):
+        seconds = scan_time
+        for limit in (1e11, 1e14, 1e17):
+            if scan_time < limit:
+                break
+            seconds /= 1000
+        try:
+            return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+        except (OverflowError, OSError, ValueError):
+            pass
+    return str(scan_time)
+
+
+class IndexCache:
+    """
+    Least-recently-used cache of blob indexes (bundle indexes, section tables).
+    
+    Shared by the retrievals of one publisher, which may run on many threads
+    (retrieve_as_completed), so every access holds a lock.
+    """
+    
+    def __init__(self, size: int = INDEX_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Dict[str, Tuple[int, int]]]' = OrderedDict()
+    
+    def get(self, blob_id: str) -> Optional[Dict[str, Tuple[int, int]]]:
+        """Return a cached index, marking it as recently used."""
+        with self._lock:
+            index = self._entries.get(blob_id)
+            if index is not None:
+                self._entries.move_to_end(blob_id)
+            return index
+    
+    def put(self, blob_id: str, index: Dict[str, Tuple[int, int]]) -> None:
+        """Remember a blob index, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[blob_id] = index
+            self._entries.move_to_end(blob_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+class ReportFormatter:
+    """Formats scan data into reports; shared by the sync and async publishers."""
     
     def _format_report(self, scan_data: Dict[str, Any]) -> Dict[str, Any]:
         """Format scan data into standardized report structure."""
+        now = datetime.now()
+        return self._build_report(
+            scan_data,
+            self._calculate_risk_level(scan_data.get('trust_score', 0)),
+            self._generate_recommendations(scan_data),
+            now.isoformat(),
+            int(now.timestamp())
+        )
+    
+    def format_reports_batch(self, scans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Format a batch of scans into reports.
+        
+        Risk levels and recommendations are evaluated for the whole batch at
+        once on columnar data (see report_batch), then the report records are
+        built. Output matches _format_report for each scan, except that the
+        whole batch shares one generation timestamp.
+        
+        Args:
+            scans: Scan data to format
+        
+        Returns:
+            List of formatted reports in input order
+        """
+        from .report_batch import batch_rules
+        
+        now = datetime.now()
+        generated_at, uid_time = now.isoformat(), int(now.timestamp())
+        return [
+            self._build_report(scan_data, risk_level, recommendations, generated_at, uid_time)
+            for scan_data, (risk_level, recommendations) in zip(scans, batch_rules(scans))
+        ]
+    
+    def _build_report(self, scan_data: Dict[str, Any], risk_level: str, recommendations: List[str],
+                      generated_at: str, uid_time: int) -> Dict[str, Any]:
+        """Build the report record from scan data and evaluated rules."""
         scan_id = scan_data.get('scan_id', scan_data.get('id', 'unknown'))
         
+        # Deterministic reports carry no wall-clock data, so identical scans
+        # produce byte-identical reports
+        deterministic = self.config.report_deterministic
+        if deterministic:
+            generated_at = deterministic_time(scan_data.get('scan_time'))
+        
         # Create unique identifier for this report
-        report_uid = f"depin_scan_{scan_id}_{int(datetime.now().timestamp())}"
+        report_uid = f"depin_scan_{scan_id}_{uid_time}"
         
-        return {
+        report = {
             'uid': report_uid,
             'report_type': 'depin_validator_scan',
             'version': '1.0',
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': generated_at,
             'scan_metadata': {
                 'scan_id': scan_id,
                 'host_uid': scan_data.get('host_uid', 'unknown'),
                 'validator_id': scan_data.get('validator_id', 'unknown'),
-                'scan_timestamp': scan_data.get('scan_time', datetime.now().isoformat()),
+                'scan_timestamp': scan_data.get('scan_time', generated_at),
                 'ip_address': scan_data.get('ip_address', 'unknown')
             },
             'security_assessment': {
                 'trust_score': scan_data.get('trust_score', 0),
-                'risk_level': self._calculate_risk_level(scan_data.get('trust_score', 0)),
+                'risk_level': risk_level,
                 'open_ports': scan_data.get('open_ports', []),
                 'services_detected': scan_data.get('services', []),
                 'vulnerabilities': scan_data.get('vulnerabilities', []),
@@ -67,47 +240,251 @@ class ReportPublisher:
                 'web_technologies': scan_data.get('web_tech', {}),
                 'docker_exposure': scan_data.get('docker_api', {})
             },
-            'recommendations': self._generate_recommendations(scan_data),
+            'recommendations': recommendations,
             'raw_scan_data': scan_data
         }
+        
+        if deterministic:
+            # Identify the report by its content instead of the time it was generated
+            del report['uid']
+            report = {'uid': f"depin_scan_{scan_id}_{content_hash(report)[:16]}", **report}
+        
+        return report
     
     def _calculate_risk_level(self, trust_score: int) -> str:
         """Calculate risk level based on trust score."""
-        if trust_score >= 80:
-            return 'LOW'
-        elif trust_score >= 60:
-            return 'MEDIUM'
-        elif trust_score >= 40:
-            return 'HIGH'
-        else:
-            return 'CRITICAL'
+        for threshold, risk_level in RISK_LEVEL_THRESHOLDS:
+            if trust_score >= threshold:
+                return risk_level
+        return DEFAULT_RISK_LEVEL
     
     def _generate_recommendations(self, scan_data: Dict[str, Any]) -> List[str]:
         """Generate security recommendations based on scan results."""
         recommendations = []
         
         open_ports = scan_data.get('open_ports', [])
-        if 22 in open_ports:
-            recommendations.append("Ensure SSH is properly secured with key-based authentication")
-        if 2375 in open_ports:
-            recommendations.append("CRITICAL: Docker API exposed without authentication - secure immediately")
+        for port, recommendation in PORT_RECOMMENDATIONS:
+            if port in open_ports:
+                recommendations.append(recommendation)
         
         vulnerabilities = scan_data.get('vulnerabilities', [])
         if vulnerabilities:
-            recommendations.append(f"Address {len(vulnerabilities)} identified vulnerabilities")
+            recommendations.append(VULNERABILITY_RECOMMENDATION.format(count=len(vulnerabilities)))
         
         ssl_info = scan_data.get('ssl_info', {})
         if ssl_info.get('expired', False):
-            recommendations.append("Renew expired SSL certificates")
+            recommendations.append(EXPIRED_SSL_RECOMMENDATION)
         
         trust_score = scan_data.get('trust_score', 0)
-        if trust_score < 70:
-            recommendations.append("Overall security posture needs improvement")
+        if trust_score < LOW_TRUST_THRESHOLD:
+            recommendations.append(LOW_TRUST_RECOMMENDATION)
         
         return recommendations
     
-    def publish_to_walrus(self, report: Dict[str, Any]) -> PublishResult:
-        """Publish report to Walrus decentralized storage."""
+
+class ReportReader:
+    """
+    Walrus retrieval logic shared by the sync and async publishers.
+    
+    Each retrieval is a generator that yields the reads it needs as
+    ``(blob_id, (offset, length) or None)`` and is sent back
+    ``(content, whether only that range was returned)``. ReportPublisher
+    drives the steps with blocking requests and AsyncReportPublisher with
+    aiohttp, so bundle, section and delta handling exist only once.
+    Subclasses provide ``config``, ``_bundle_indexes`` and ``_section_tables``.
+    """
+    
+    def _report_steps(self, walrus_hash: str) -> RetrievalSteps:
+        """Retrieve a report, rebuilding it if a delta record is stored."""
+        document = yield from self._document_steps(walrus_hash)
+        return (yield from self._rebuild_steps(document))
+    
+    def _rebuild_steps(self, document: Dict[str, Any]) -> RetrievalSteps:
+        """Rebuild a full report by following a delta record's base pointers."""
+        records = []
+        while is_delta_record(document):
+            if len(records) >= self.config.report_delta_max_chain:
+                raise DeltaError(f"Delta chain for {records[0].get('uid')} exceeds "
+                                 f"{self.config.report_delta_max_chain} records")
+            records.append(document)
+            document = yield from self._document_steps(document['base'])
+        
+        for delta in reversed(records):
+            document = rebuild_from_base(document, delta)
+        return document
+    
+    def _document_steps(self, walrus_hash: str) -> RetrievalSteps:
+        """Retrieve and decode the document stored under a blob ID or report pointer."""
+        if '#' in walrus_hash:
+            return (yield from self._bundled_report_steps(walrus_hash))
+        
+        content, _ = yield walrus_hash, None
+        return decode_report_blob(content)
+    
+    def _bundled_report_steps(self, pointer: str) -> RetrievalSteps:
+        """Retrieve a single report from a bundle, fetching only its byte range when possible."""
+        blob_id, uid, location = parse_report_pointer(pointer)
+        full_blob = None
+        
+        if location is None:
+            index = self._bundle_indexes.get(blob_id)
+            if index is None:
+                data, partial = yield blob_id, (0, BUNDLE_INDEX_PROBE_SIZE)
+                full_blob = None if partial else data
+                
+                _, data_start = read_preamble(data)
+                if len(data) < data_start:
+                    rest, _ = yield blob_id, (len(data), data_start - len(data))
+                    data += rest
+                
+                index = decode_index(data)
+                self._bundle_indexes.put(blob_id, index)
+            
+            location = index.get(uid)
+            if location is None:
+                raise ReportError(f"Report {uid} not found in bundle {blob_id}")
+        
+        return json.loads((yield from _read_range(blob_id, location, full_blob)))
+    
+    def _section_steps(self, walrus_hash: str, section: str) -> RetrievalSteps:
+        """Retrieve one top-level section of a report, downloading as little as the layout allows."""
+        if '#' in walrus_hash:
+            return select_section((yield from self._report_steps(walrus_hash)), section, walrus_hash)
+        
+        blob_id = walrus_hash
+        full_blob = None
+        table = self._section_tables.get(blob_id)
+        if table is None:
+            data, partial = yield blob_id, (0, SECTION_TABLE_PROBE_SIZE)
+            if not partial:
+                full_blob = data
+            
+            # Gzip-compressed and plain JSON reports are decoded whole
+            if is_gzip(data) or not is_sectioned(data):
+                if full_blob is None:
+                    full_blob, _ = yield blob_id, None
+                report = yield from self._rebuild_steps(decode_report_blob(full_blob))
+                return select_section(report, section, blob_id)
+            
+            size = section_table_size(data)
+            if len(data) < size:
+                rest, _ = yield blob_id, (len(data), size - len(data))
+                data += rest
+            
+            table = decode_section_table(data)
+            self._section_tables.put(blob_id, table)
+        
+        if is_delta_table(table):
+            # A delta record's sections are not the report's; rebuild it
+            return select_section((yield from self._report_steps(blob_id)), section, blob_id)
+        
+        location = table.get(section)
+        if location is None:
+            raise ReportError(f"Section {section} not found in report {blob_id}")
+        
+        return decode_section((yield from _read_range(blob_id, location, full_blob)))
+
+
+def _read_range(blob_id: str, location: Tuple[int, int], full_blob: Optional[bytes]) -> RetrievalSteps:
+    """Read one byte range of a blob, or slice it from the full blob when that was already downloaded."""
+    offset, length = location
+    if full_blob is None:
+        data, partial = yield blob_id, location
+        if partial:
+            return data
+        # Aggregator does not support range requests
+        full_blob = data
+    return full_blob[offset:offset + length]
+
+
+class ReportPublisher(ReportFormatter, ReportReader):
+    """Publisher for scan reports to various destinations."""
+    
+    def __init__(self, config: PublisherConfig):
+        """Initialize report publisher."""
+        config.validate_reports()
+        self.config = config
+        self._bundle_indexes = IndexCache()
+        self._section_tables = IndexCache()
+        self._delta_encoder: Optional[DeltaEncoder] = None
+        self._segment_store: Optional[SegmentStore] = None
+        self._report_index: Optional[ReportIndex] = None
+        self._blob_map: Optional[BlobMap] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._http: Optional[requests.Session] = None
+        self._destinations: Dict[str, ReportDestination] = {}
+        # Stores and pools below are opened on first use, possibly by several
+        # destination, pipeline or daemon threads at once
+        self._init_lock = threading.Lock()
+        self.register_destination(WalrusDestination(self, timeout=config.walrus_timeout))
+        self.register_destination(LocalFileDestination(self, timeout=config.local_file_timeout))
+    
+    def register_destination(self, destination: ReportDestination) -> None:
+        """Add or replace a publishing destination, keyed by its name."""
+        self._destinations[destination.name] = destination
+    
+    def get_destination(self, name: str) -> Optional[ReportDestination]:
+        """Return the registered destination with the given name, if any."""
+        return self._destinations.get(name)
+    
+    def _get_delta_encoder(self) -> DeltaEncoder:
+        """Open the per-host state store used by delta mode on first use."""
+        if self._delta_encoder is None:
+            with self._init_lock:
+                if self._delta_encoder is None:
+                    state_path = self.config.report_state_path
+                    if state_path is None:
+                        os.makedirs(self.config.reports_dir, exist_ok=True)
+                        state_path = os.path.join(self.config.reports_dir, 'host_state.sqlite')
+                    self._delta_encoder = DeltaEncoder(
+                        HostStateStore(state_path),
+                        mode=self.config.report_delta_mode,
+                        max_chain_length=self.config.report_delta_max_chain
+                    )
+        return self._delta_encoder
+    
+    def _get_blob_map(self) -> BlobMap:
+        """Open the content hash -> blob ID map on first use."""
+        if self._blob_map is None:
+            with self._init_lock:
+                if self._blob_map is None:
+                    map_path = self.config.walrus_dedup_path
+                    if map_path is None:
+                        os.makedirs(self.config.reports_dir, exist_ok=True)
+                        map_path = os.path.join(self.config.reports_dir, 'blob_map.sqlite')
+                    self._blob_map = BlobMap(map_path)
+        return self._blob_map
+    
+    def _http_session(self) -> requests.Session:
+        """Return the pooled HTTP session used for Walrus requests."""
+        if self._http is None:
+            with self._init_lock:
+                if self._http is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.config.walrus_pool_size
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._http = session
+        return self._http
+    
+    def _walrus_headers(self, content_type: Optional[str] = None) -> Dict[str, str]:
+        """Build request headers for the Walrus API."""
+        headers = {
+            'Authorization': f'Bearer {self.config.walrus_api_key}'
+        }
+        if content_type:
+            headers['Content-Type'] = content_type
+        return headers
+    
+    def _store_blob(self, data: Union[str, bytes, Iterable[bytes]], content_type: str) -> PublishResult:
+        """
+        Upload raw blob data to Walrus and return its blob ID.
+        
+        An iterable of byte chunks is sent with chunked transfer encoding.
+        """
         if not self.config.walrus_api_key:
             return PublishResult(
                 success=False,
@@ -116,25 +493,16 @@ class ReportPublisher:
             )
         
         try:
-            # Prepare data for Walrus
-            report_json = json.dumps(report, default=str)
-            
-            headers = {
-                'Authorization': f'Bearer {self.config.walrus_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
             # Upload to Walrus
-            response = requests.put(
+            response = self._http_session().put(
                 f"{self.config.walrus_api_url}/v1/store",
-                data=report_json,
-                headers=headers,
-                timeout=30
+                data=data,
+                headers=self._walrus_headers(content_type),
+                timeout=self.config.walrus_timeout
             )
             
             if response.status_code == 200:
-                result = response.json()
-                walrus_hash = result.get('newlyCreated', {}).get('blobId')
+                walrus_hash = parse_walrus_store_response(response.json())
                 
                 if walrus_hash:
                     return PublishResult(
@@ -168,8 +536,380 @@ class ReportPublisher:
                 error=str(e)
             )
     
+    def _fetch_blob(self, blob_id: str, byte_range: Optional[Tuple[int, int]] = None) -> Tuple[bytes, bool]:
+        """
+        Fetch blob bytes from Walrus, optionally as an HTTP range request.
+        
+        Args:
+            blob_id: Walrus blob ID
+            byte_range: Optional (offset, length) to request
+        
+        Returns:
+            Tuple of (content, whether the aggregator returned only the requested range)
+        """
+        if not self.config.walrus_api_key:
+            raise ReportError("Walrus API key not configured")
+        
+        headers = self._walrus_headers()
+        if byte_range is not None:
+            offset, length = byte_range
+            headers['Range'] = f'bytes={offset}-{offset + length - 1}'
+        
+        response = self._http_session().get(
+            f"{self.config.walrus_api_url}/v1/{blob_id}",
+            headers=headers,
+            timeout=self.config.walrus_timeout
+        )
+        
+        if response.status_code == 206:
+            return response.content, True
+        elif response.status_code == 200:
+            return response.content, False
+        else:
+            raise ReportError(f'HTTP {response.status_code}: {response.text}')
+    
+    def _blob_exists(self, blob_id: str) -> Optional[bool]:
+        """Check whether a blob is still available on Walrus (None if the check failed)."""
+        try:
+            response = self._http_session().head(
+                f"{self.config.walrus_api_url}/v1/{blob_id}",
+                headers=self._walrus_headers(),
+                timeout=self.config.walrus_timeout
+            )
+        except Exception:
+            return None
+        
+        if response.status_code in (200, 206):
+            return True
+        if response.status_code == 404:
+            return False
+        return None
+    
+    def _known_blob(self, key: str) -> Optional[str]:
+        """Return the blob already stored for a content hash, if it is still valid."""
+        blob_map = self._get_blob_map()
+        mapping = blob_map.get(key)
+        if mapping is None:
+            return None
+        
+        if time.time() - mapping.verified_at <= self.config.walrus_dedup_ttl:
+            return mapping.blob_id
+        
+        exists = self._blob_exists(mapping.blob_id)
+        if exists:
+            blob_map.touch(key)
+            return mapping.blob_id
+        if exists is False:
+            blob_map.forget(key)
+        return None
+    
+    def publish_to_walrus(self, report: Dict[str, Any]) -> PublishResult:
+        """
+        Publish report to Walrus decentralized storage.
+        
+        With walrus_dedup enabled, content already stored (and still available)
+        is not uploaded again; the recorded blob ID is returned instead.
+        """
+        if not self.config.walrus_dedup:
+            return self._upload_report(report)
+        
+        try:
+            key = content_hash(report, blob_variant(self.config))
+            blob_id = self._known_blob(key)
+        except Exception as e:
+            return PublishResult(
+                success=False,
+                destination='walrus',
+                error=f'Blob map lookup failed: {e}'
+            )
+        
+        if blob_id:
+            return PublishResult(
+                success=True,
+                destination='walrus',
+                identifier=blob_id
+            )
+        
+        result = self._upload_report(report)
+        if result.success:
+            try:
+                self._blob_map.put(key, result.identifier)
+            except Exception as e:
+                # The report is stored; only future deduplication is affected
+                result.error = f'Blob map update failed: {e}'
+        return result
+    
+    def _upload_report(self, report: Dict[str, Any]) -> PublishResult:
+        """Encode and upload a report using the configured layout."""
+        if self.config.report_layout == 'sectioned':
+            try:
+                report_blob = encode_sectioned_report(report)
+            except Exception as e:
+                return PublishResult(
+                    success=False,
+                    destination='walrus',
+                    error=str(e)
+                )
+            return self._store_blob(report_blob, 'application/octet-stream')
+        
+        if self.config.walrus_streaming or self.config.walrus_compression:
+            return self.publish_to_walrus_streaming(report, self.config.walrus_compression)
+        
+        # Prepare data for Walrus
+        report_json = json.dumps(report, default=str)
+        return self._store_blob(report_json, 'application/json')
+    
+    def publish_to_walrus_streaming(self, report: Dict[str, Any], compression: Optional[str] = None) -> PublishResult:
+        """
+        Publish report to Walrus, encoding and sending it incrementally.
+        
+        The JSON body is produced chunk by chunk and sent with chunked transfer
+        encoding, so peak memory does not grow with report size.
+        
+        Args:
+            report: Formatted report
+            compression: None or 'gzip' (compressed while streaming)
+        """
+        chunks = iter_report_json(report)
+        content_type = 'application/json'
+        
+        if compression == 'gzip':
+            chunks = iter_gzip(chunks)
+            content_type = 'application/gzip'
+        elif compression:
+            return PublishResult(
+                success=False,
+                destination='walrus',
+                error=f'Unsupported compression: {compression}'
+            )
+        
+        return self._store_blob(chunks, content_type)
+    
+    def store_file_to_walrus(self, path: str, content_type: str = 'application/octet-stream') -> PublishResult:
+        """
+        Upload a local file to Walrus as one blob, streaming it from disk.
+        
+        Args:
+            path: File to upload
+            content_type: Content type sent with the blob
+        """
+        def chunks() -> Iterator[bytes]:
+            with open(path, 'rb') as f:
+                yield from iter(lambda: f.read(STREAM_CHUNK_SIZE), b'')
+        
+        return self._store_blob(chunks(), content_type)
+    
+    def retrieve_to_file(self, walrus_hash: str, path: str, decompress: bool = True) -> int:
+        """
+        Stream a blob from Walrus into a local file without buffering the whole body.
+        
+        Args:
+            walrus_hash: Walrus blob ID
+            path: Destination file path
+            decompress: Transparently gunzip blobs stored with gzip compression
+        
+        Returns:
+            Number of bytes written
+        """
+        if not self.config.walrus_api_key:
+            raise ReportError("Walrus API key not configured")
+        
+        try:
+            with self._http_session().get(
+                f"{self.config.walrus_api_url}/v1/{walrus_hash}",
+                headers=self._walrus_headers(),
+                timeout=self.config.walrus_timeout,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    raise ReportError(f'HTTP {response.status_code}: {response.text}')
+                
+                chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                first = next(chunks, b'')
+                chunks = chain([first], chunks)
+                if decompress and is_gzip(first):
+                    chunks = iter_gunzip(chunks)
+                
+                written = 0
+                with open(path, 'wb') as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                        written += len(chunk)
+                return written
+                
+        except Exception as e:
+            raise ReportError(f'Failed to retrieve from Walrus: {e}')
+    
+    def _store_bundle(self, bundle: ReportBundle) -> List[PublishResult]:
+        """Store a bundle as one Walrus blob and return one result per report."""
+        try:
+            blob, locations = bundle.encode()
+        except BundleError as e:
+            return [PublishResult(success=False, destination='walrus', error=str(e)) for _ in range(len(bundle))]
+        
+        stored = self._store_blob(blob, 'application/octet-stream')
+        if not stored.success:
+            return [PublishResult(success=False, destination='walrus', error=stored.error) for _ in range(len(bundle))]
+        
+        self._bundle_indexes.put(stored.identifier, locations)
+        
+        return [
+            PublishResult(
+                success=True,
+                destination='walrus',
+                identifier=format_report_pointer(
+                    stored.identifier, uid, locations[uid], self.config.bundle_pointer_style
+                )
+            )
+            for uid in bundle.uids
+        ]
+    
+    def publish_bundle_to_walrus(self, reports: List[Dict[str, Any]]) -> List[PublishResult]:
+        """
+        Publish formatted reports to Walrus packed into as few blobs as possible.
+        
+        Each successful result's identifier is a report pointer of the form
+        ``blobId#uid`` (or ``blobId#offset:len`` with the 'range' pointer style),
+        ready to be used as the ledger ``report_pointer``.
+        
+        Args:
+            reports: Formatted reports
+        
+        Returns:
+            List of PublishResult objects in the same order as reports
+        """
+        results: List[Optional[PublishResult]] = [None] * len(reports)
+        
+        def new_bundle() -> ReportBundle:
+            return ReportBundle(self.config.bundle_max_reports, self.config.bundle_max_bytes)
+        
+        def flush(bundle: ReportBundle, positions: List[int]) -> None:
+            for position, result in zip(positions, self._store_bundle(bundle)):
+                results[position] = result
+        
+        bundle, positions = new_bundle(), []
+        for position, report in enumerate(reports):
+            try:
+                if not bundle.add(report):
+                    flush(bundle, positions)
+                    bundle, positions = new_bundle(), []
+                    bundle.add(report)
+                positions.append(position)
+            except BundleError as e:
+                results[position] = PublishResult(success=False, destination='walrus', error=str(e))
+        
+        if len(bundle):
+            flush(bundle, positions)
+        
+        return results
+    
+    def _get_segment_store(self) -> SegmentStore:
+        """Open the segmented local store on first use, expiring old segments."""
+        if self._segment_store is None:
+            with self._init_lock:
+                if self._segment_store is None:
+                    retention = self.config.segment_retention_days
+                    store = SegmentStore(
+                        os.path.join(self.config.reports_dir, 'segments'),
+                        segment_max_bytes=self.config.segment_max_bytes,
+                        fsync_every=self.config.segment_fsync_every,
+                        retention_seconds=retention * 86400 if retention is not None else None,
+                        compact_dead_ratio=self.config.segment_compact_ratio
+                    )
+                    if retention is not None:
+                        store.expire(retention * 86400)
+                    self._segment_store = store
+        return self._segment_store
+    
+    def compact_local_store(self) -> Dict[str, int]:
+        """
+        Expire and compact the segmented local store now instead of at its next rotation.
+        
+        Returns:
+            Number of segments 'expired' and 'compacted'
+        """
+        try:
+            return self._get_segment_store().maintain()
+        except Exception as e:
+            raise ReportError(f'Failed to compact local store: {e}')
+    
+    def publish_to_segment_store(self, report: Dict[str, Any]) -> PublishResult:
+        """Append report to the segmented local store."""
+        try:
+            segment_path, offset, length = self._get_segment_store().append(report)
+            return PublishResult(
+                success=True,
+                destination='local_file',
+                identifier=f"{segment_path}#{offset}:{length}"
+            )
+        except Exception as e:
+            return PublishResult(
+                success=False,
+                destination='local_file',
+                error=str(e)
+            )
+    
+    def retrieve_from_local_store(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a report from the segmented local store.
+        
+        Args:
+            key: Report uid or scan_id
+        """
+        try:
+            store = self._get_segment_store()
+            return store.get(key) or store.get_by_scan_id(key)
+        except Exception as e:
+            raise ReportError(f'Failed to read from local store: {e}')
+    
+    def get_report_index(self) -> ReportIndex:
+        """Open the local report index on first use."""
+        if self._report_index is None:
+            with self._init_lock:
+                if self._report_index is None:
+                    index_path = self.config.report_index_path
+                    if index_path is None:
+                        os.makedirs(self.config.reports_dir, exist_ok=True)
+                        index_path = os.path.join(self.config.reports_dir, 'index.sqlite')
+                    self._report_index = ReportIndex(index_path)
+        return self._report_index
+    
+    def close(self) -> None:
+        """Flush and close local stores and worker threads opened by this publisher."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._segment_store is not None:
+            self._segment_store.close()
+            self._segment_store = None
+        if self._report_index is not None:
+            self._report_index.close()
+            self._report_index = None
+        if self._blob_map is not None:
+            self._blob_map.close()
+            self._blob_map = None
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+    
     def publish_to_local_file(self, report: Dict[str, Any]) -> PublishResult:
-        """Publish report to local file system."""
+        """Publish report to local file system and record it in the report index."""
+        if self.config.local_store_backend == 'segments':
+            result = self.publish_to_segment_store(report)
+        else:
+            result = self._write_report_file(report)
+        
+        if result.success and self.config.report_index_enabled:
+            try:
+                self.get_report_index().add(report, result.identifier)
+            except Exception as e:
+                # The report itself was stored; surface the index failure without failing the publish
+                result.error = f'Report index update failed: {e}'
+        
+        return result
+    
+    def _write_report_file(self, report: Dict[str, Any]) -> PublishResult:
+        """Write report to its own JSON file in the reports directory."""
         try:
             # Create reports directory
             os.makedirs(self.config.reports_dir, exist_ok=True)
@@ -211,7 +951,22 @@ class ReportPublisher:
         
         Args:
             scan_data: Scan data to format and publish
-            destinations: List of destinations ('walrus', 'local_file'). Defaults to both.
+            destinations: List of registered destination names ('walrus', 'local_file', ...).
+                Defaults to walrus and local_file. Destinations run concurrently.
+        
+        Returns:
+            Dictionary mapping destination names to PublishResult objects
+        """
+        # Format the report
+        return self.publish_formatted(self._format_report(scan_data), destinations)
+    
+    def publish_formatted(self, report: Dict[str, Any], destinations: Optional[List[str]] = None) -> Dict[str, PublishResult]:
+        """
+        Publish an already formatted report to specified destinations.
+        
+        Args:
+            report: Report produced by _format_report or format_reports_batch
+            destinations: List of registered destination names. Defaults to walrus and local_file.
         
         Returns:
             Dictionary mapping destination names to PublishResult objects
@@ -219,48 +974,211 @@ class ReportPublisher:
         if destinations is None:
             destinations = ['walrus', 'local_file']
         
-        # Format the report
-        report = self._format_report(scan_data)
+        # In delta mode publish an unchanged/diff record against the host's last Walrus blob;
+        # other destinations still get the report itself
+        delta = None
+        full_report = None
+        if self.config.report_delta_mode != 'off' and 'walrus' in destinations:
+            delta = self._get_delta_encoder().encode(report)
+            full_report, report = report, delta.record
+        
+        results = self._fan_out(report, destinations, full_report)
         
-        results = {}
+        walrus = results.get('walrus')
+        if walrus is not None and walrus.success:
+            # In delta mode the blob holds a delta record; the identifier resolves to the rebuilt report
+            walrus.report_hash = content_hash(delta.report if delta is not None else report)
+            if delta is not None:
+                self._delta_encoder.commit(delta, walrus.identifier)
         
-        for destination in destinations:
-            if destination == 'walrus':
-                results['walrus'] = self.publish_to_walrus(report)
-            elif destination == 'local_file':
-                results['local_file'] = self.publish_to_local_file(report)
+        return results
+    
+    def _run_destination(self, destination: ReportDestination, report: Dict[str, Any],
+                         full_report: Optional[Dict[str, Any]]) -> PublishResult:
+        """Publish to one destination, recording how long it took."""
+        started = time.monotonic()
+        try:
+            result = destination.publish(report, full_report)
+        except Exception as e:
+            result = PublishResult(success=False, destination=destination.name, error=str(e))
+        result.duration = time.monotonic() - started
+        return result
+    
+    def _fan_out(self, report: Dict[str, Any], destinations: List[str],
+                 full_report: Optional[Dict[str, Any]] = None) -> Dict[str, PublishResult]:
+        """Publish a report to several destinations concurrently, honouring per-destination timeouts."""
+        results: Dict[str, PublishResult] = {}
+        selected = []
+        for name in destinations:
+            destination = self._destinations.get(name)
+            if destination is None:
+                results[name] = PublishResult(
+                    success=False,
+                    destination=name,
+                    error=f'Unknown destination: {name}'
+                )
             else:
-                results[destination] = PublishResult(
+                selected.append(destination)
+        
+        if len(selected) == 1:
+            # Nothing to overlap with; skip the thread hand-off
+            results[selected[0].name] = self._run_destination(selected[0], report, full_report)
+            return {name: results[name] for name in destinations}
+        
+        if self._executor is None:
+            with self._init_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config.destination_workers,
+                        thread_name_prefix='pgdn-report'
+                    )
+        
+        started = time.monotonic()
+        futures = [
+            (destination, self._executor.submit(self._run_destination, destination, report, full_report))
+            for destination in selected
+        ]
+        
+        for destination, future in futures:
+            timeout = None
+            if destination.timeout is not None:
+                timeout = max(0.0, destination.timeout - (time.monotonic() - started))
+            try:
+                results[destination.name] = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                results[destination.name] = PublishResult(
                     success=False,
-                    destination=destination,
-                    error=f'Unknown destination: {destination}'
+                    destination=destination.name,
+                    error=f'Timed out after {destination.timeout}s',
+                    duration=time.monotonic() - started
                 )
         
-        return results
+        return {name: results[name] for name in destinations}
+    
+    def publish_bundle(self, scans: List[Dict[str, Any]], destinations: Optional[List[str]] = None) -> List[Dict[str, PublishResult]]:
+        """
+        Publish many reports, bundling the Walrus uploads.
+        
+        Args:
+            scans: Scan data to format and publish
+            destinations: List of destinations ('walrus', 'local_file'). Defaults to both.
+        
+        Returns:
+            One mapping of destination names to PublishResult objects per scan, in input order
+        """
+        if destinations is None:
+            destinations = ['walrus', 'local_file']
+        
+        reports = self.format_reports_batch(scans)
+        
+        results: List[Dict[str, PublishResult]] = [{} for _ in reports]
+        
+        if 'walrus' in destinations:
+            for report_results, result in zip(results, self.publish_bundle_to_walrus(reports)):
+                report_results['walrus'] = result
+        
+        # Remaining destinations are published per report, concurrently across destinations
+        others = [destination for destination in destinations if destination != 'walrus']
+        if others:
+            for report_results, report in zip(results, reports):
+                report_results.update(self._fan_out(report, others))
+        
+        return [
+            {destination: report_results[destination] for destination in destinations}
+            for report_results in results
+        ]
     
     def retrieve_from_walrus(self, walrus_hash: str) -> Optional[Dict[str, Any]]:
-        """Retrieve a report from Walrus storage."""
+        """
+        Retrieve a report from Walrus storage.
+        
+        Args:
+            walrus_hash: Blob ID, or a bundled report pointer (``blobId#uid`` or ``blobId#offset:len``)
+        """
         if not self.config.walrus_api_key:
             raise ReportError("Walrus API key not configured")
         
         try:
-            headers = {
-                'Authorization': f'Bearer {self.config.walrus_api_key}'
-            }
-            
-            response = requests.get(
-                f"{self.config.walrus_api_url}/v1/{walrus_hash}",
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise ReportError(f'HTTP {response.status_code}: {response.text}')
-                
+            return self._retrieve_report(walrus_hash)
         except Exception as e:
             raise ReportError(f'Failed to retrieve from Walrus: {e}')
+    
+    def retrieve_as_completed(self, walrus_hashes: Iterable[str],
+                              window: Optional[int] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Retrieve many reports concurrently, yielding each as soon as it arrives.
+        
+        The input is consumed lazily and at most ``window`` retrievals are in
+        flight at once, so arbitrarily long ID streams use bounded memory.
+        
+        Args:
+            walrus_hashes: Blob IDs or bundled report pointers
+            window: Maximum concurrent retrievals (defaults to walrus_pool_size)
+        
+        Returns:
+            Iterator of (walrus_hash, report, error) tuples in completion order;
+            exactly one of report and error is set
+        """
+        window = window or self.config.walrus_pool_size
+        pending = {}
+        hashes = iter(walrus_hashes)
+        
+        with ThreadPoolExecutor(max_workers=window, thread_name_prefix='pgdn-retrieve') as executor:
+            while True:
+                for walrus_hash in hashes:
+                    pending[executor.submit(self.retrieve_from_walrus, walrus_hash)] = walrus_hash
+                    if len(pending) >= window:
+                        break
+                
+                if not pending:
+                    return
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    walrus_hash = pending.pop(future)
+                    try:
+                        yield walrus_hash, future.result(), None
+                    except Exception as e:
+                        yield walrus_hash, None, str(e)
+    
+    def _run(self, steps: RetrievalSteps) -> Any:
+        """Drive retrieval steps with blocking Walrus reads."""
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(self._fetch_blob(*request))
+        except StopIteration as finished:
+            return finished.value
+    
+    def _retrieve_report(self, walrus_hash: str) -> Dict[str, Any]:
+        """Retrieve a document and rebuild the full report if it is a delta record."""
+        return self._run(self._report_steps(walrus_hash))
+    
+    def retrieve_section(self, walrus_hash: str, section: str) -> Any:
+        """
+        Retrieve a single top-level section of a report from Walrus.
+        
+        For sectioned reports only the section table and the requested section
+        are downloaded (via HTTP range requests) and decoded. Reports stored in
+        the plain JSON layout are downloaded in full; bundled reports only
+        their own byte range.
+        
+        Args:
+            walrus_hash: Blob ID, or a bundled report pointer (``blobId#uid`` or ``blobId#offset:len``)
+            section: Top-level report field, e.g. 'security_assessment'
+        
+        Returns:
+            Decoded section value
+        """
+        if not self.config.walrus_api_key:
+            raise ReportError("Walrus API key not configured")
+        
+        try:
+            return self._run(self._section_steps(walrus_hash, section))
+        except ReportError:
+            raise
+        except Exception as e:
+            raise ReportError(f'Failed to retrieve section from Walrus: {e}')
 
 
 def publish_report(scan_data: Dict[str, Any], 
@@ -0,0 +1,258 @@
+"""
+Pooled JSON-RPC endpoints for the zkSync ledger.
+
+With several endpoints (comma-separated ZKSYNC_RPC_URL) a slow or
+rate-limiting node no longer stalls publication:
+
+- every endpoint keeps a moving window of latencies and its recent errors;
+- reads and receipt polls go to the fastest healthy endpoint and are
+  hedged: if no answer arrives within that endpoint's latency percentile,
+  the request is also sent to the next fastest and the first answer wins;
+- raw transactions are broadcast to several endpoints in parallel;
+- an endpoint failing repeatedly is skipped (circuit breaker open) until a
+  reset period has passed; then a single probe request decides whether it
+  rejoins the pool.
+
+JSON-RPC error responses (such as a reverted call) are answers, not
+endpoint failures; only transport errors, timeouts and HTTP errors count.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Optional, List
+
+from web3 import Web3
+from web3.exceptions import ProviderConnectionError
+from web3.providers.base import JSONBaseProvider
+from web3.providers.rpc import HTTPProvider
+
+from .config import PublisherConfig
+
+
+# Latency samples kept per endpoint
+LATENCY_WINDOW = 100
+
+# Hedge delay while an endpoint has too few samples for a percentile
+DEFAULT_HEDGE_DELAY = 0.5
+MIN_HEDGE_SAMPLES = 5
+MIN_HEDGE_DELAY = 0.02
+
+# Methods that must not be hedged (sent once per chosen endpoint)
+BROADCAST_METHODS = ('eth_sendRawTransaction',)
+
+
+class RpcPoolError(Exception):
+    """Custom exception for RPC endpoint pool errors."""
+    pass
+
+
+class Endpoint:
+    """One RPC endpoint with its latency window and circuit breaker state."""
+
+    def __init__(self, url: str):
+        self.url = url
+        # Failures surface at once; the pool retries on other endpoints
+        self.provider = HTTPProvider(url, exception_retry_configuration=None)
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.last_error: Optional[str] = None
+
+    def latency(self) -> float:
+        """Mean of the latency window (0 while unmeasured, so new endpoints get tried)."""
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def hedge_delay(self, percentile: float) -> float:
+        if len(self.latencies) < MIN_HEDGE_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        ordered = sorted(self.latencies)
+        return max(ordered[min(int(len(ordered) * percentile), len(ordered) - 1)], MIN_HEDGE_DELAY)
+
+
+class RpcEndpointPool(JSONBaseProvider):
+    """web3 provider spreading requests over several JSON-RPC endpoints."""
+
+    def __init__(self, urls: List[str], hedge_percentile: float = 0.9, broadcast_fanout: int = 3,
+                 breaker_failures: int = 3, breaker_reset: float = 30.0):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: Endpoint URLs
+            hedge_percentile: Latency percentile after which a read is also sent to the next endpoint
+            broadcast_fanout: Endpoints receiving each raw transaction
+            breaker_failures: Consecutive failures that open an endpoint's circuit breaker
+            breaker_reset: Seconds before an open breaker lets a request through again
+        """
+        super().__init__()
+        if not urls:
+            raise RpcPoolError("At least one RPC endpoint is required")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.hedge_percentile = hedge_percentile
+        self.broadcast_fanout = broadcast_fanout
+        self.breaker_failures = breaker_failures
+        self.breaker_reset = breaker_reset
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=8 * len(urls), thread_name_prefix='pgdn-rpc')
+
+    def __str__(self) -> str:
+        return f"RPC endpoint pool {', '.join(endpoint.url for endpoint in self.endpoints)}"
+
+    def _ranked(self) -> List[Endpoint]:
+        """
+        Endpoints to use, fastest first.
+
+        An endpoint whose breaker has reset is put first for one probe
+        request (claimed by _submit); endpoints behind an open breaker are
+        used only if no other is left.
+        """
+        now = time.time()
+        with self._lock:
+            closed, probes = [], []
+            for endpoint in self.endpoints:
+                if endpoint.consecutive_failures < self.breaker_failures:
+                    closed.append(endpoint)
+                elif endpoint.open_until <= now and not endpoint.probing:
+                    probes.append(endpoint)
+            if not closed and not probes:
+                return sorted(self.endpoints, key=lambda endpoint: endpoint.open_until)
+            return probes + sorted(closed, key=Endpoint.latency)
+
+    def _submit(self, endpoint: Endpoint, method: str, params: Any) -> Optional[Future]:
+        """
+        Start a request to an endpoint.
+
+        A probe of a reset breaker is claimed here, when it is actually
+        sent; returns None if another request is already probing the endpoint.
+        """
+        with self._lock:
+            if endpoint.consecutive_failures >= self.breaker_failures and endpoint.open_until <= time.time():
+                if endpoint.probing:
+                    return None
+                endpoint.probing = True
+        return self._executor.submit(self._call, endpoint, method, params)
+
+    def _call(self, endpoint: Endpoint, method: str, params: Any) -> Dict[str, Any]:
+        """Send one request to an endpoint and update its statistics."""
+        start = time.perf_counter()
+        try:
+            response = endpoint.provider.make_request(method, params)
+        except Exception as e:
+            with self._lock:
+                endpoint.requests += 1
+                endpoint.errors += 1
+                endpoint.consecutive_failures += 1
+                endpoint.probing = False
+                endpoint.last_error = str(e)
+                if endpoint.consecutive_failures >= self.breaker_failures:
+                    endpoint.open_until = time.time() + self.breaker_reset
+            raise
+
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.latencies.append(time.perf_counter() - start)
+            endpoint.consecutive_failures = 0
+            endpoint.probing = False
+        return response
+
+    def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        if method in BROADCAST_METHODS:
+            return self._broadcast(method, params)
+        return self._hedged(method, params)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        """Whether any endpoint answers; web3's check only treats OSError as a failed connection."""
+        try:
+            return super().is_connected(show_traceback)
+        except RpcPoolError as e:
+            if show_traceback:
+                raise ProviderConnectionError(f"Problem connecting to provider with error: {e}")
+            return False
+
+    def _hedged(self, method: str, params: Any) -> Dict[str, Any]:
+        """Ask the fastest endpoint, adding the next one whenever the last is slow or fails."""
+        candidates = iter(self._ranked())
+        pending = {}
+        last_error: Optional[Exception] = None
+
+        while True:
+            endpoint = next(candidates, None)
+            if endpoint is not None:
+                future = self._submit(endpoint, method, params)
+                if future is None:
+                    continue  # being probed by another request
+                pending[future] = endpoint
+            elif not pending:
+                raise RpcPoolError(f"All RPC endpoints failed for {method}: {last_error}")
+
+            delay = endpoint.hedge_delay(self.hedge_percentile) if endpoint is not None else None
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+
+    def _broadcast(self, method: str, params: Any) -> Dict[str, Any]:
+        """Send to several endpoints at once and return the first accepting answer."""
+        pending = []
+        for endpoint in self._ranked():
+            if len(pending) >= max(self.broadcast_fanout, 1):
+                break
+            future = self._submit(endpoint, method, params)
+            if future is not None:
+                pending.append(future)
+        rejected: Optional[Dict[str, Any]] = None
+        last_error: Optional[Exception] = None
+
+        while pending:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            pending = list(not_done)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if 'error' not in response:
+                    return response
+                # e.g. 'already known' from a node that got it from a peer;
+                # returned only if no endpoint accepts the transaction
+                rejected = rejected or response
+
+        if rejected is not None:
+            return rejected
+        raise RpcPoolError(f"All RPC endpoints failed for {method}: {last_error}")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Latency, error and circuit breaker state of every endpoint."""
+        with self._lock:
+            return [{
+                'url': endpoint.url,
+                'healthy': endpoint.consecutive_failures < self.breaker_failures,
+                'latency_ms': round(endpoint.latency() * 1000, 1),
+                'hedge_delay_ms': round(endpoint.hedge_delay(self.hedge_percentile) * 1000, 1),
+                'requests': endpoint.requests,
+                'errors': endpoint.errors,
+                'last_error': endpoint.last_error
+            } for endpoint in self.endpoints]
+
+
+def create_web3(config: PublisherConfig) -> Web3:
+    """Web3 connection to the configured endpoint, or to a pool of them when several are set."""
+    urls = config.rpc_endpoints()
+    if len(urls) == 1:
+        return Web3(Web3.HTTPProvider(urls[0]))
+    return Web3(RpcEndpointPool(
+        urls,
+        hedge_percentile=config.rpc_hedge_percentile,
+        broadcast_fanout=config.rpc_broadcast_fanout,
+        breaker_failures=config.rpc_breaker_failures,
+        breaker_reset=config.rpc_breaker_reset
+    ))
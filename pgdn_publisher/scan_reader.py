@@ -0,0 +1,162 @@
+"""
+Parallel reader for large NDJSON scan files.
+
+The file is memory-mapped and split into byte ranges that end on newlines.
+Worker processes map the same file, parse and validate their range and send
+back the scans, so JSON decoding runs on all cores instead of one. Scans are
+yielded either in file order or chunk by chunk as soon as each is parsed.
+
+A line that is not a JSON object does not fail its chunk: it is returned as
+an InvalidScan in its place, so bulk publishing can record it as a failed
+scan and carry on.
+"""
+
+import json
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Union
+
+
+# Bytes per parsing task; large enough to amortize inter-process overhead
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Columnar scan files, read with arrow_input instead of as NDJSON
+IPC_SUFFIXES = ('.arrow', '.feather', '.ipc')
+COLUMNAR_SUFFIXES = IPC_SUFFIXES + ('.parquet', '.pq')
+
+
+@dataclass
+class InvalidScan:
+    """A line of scan input that could not be read as a scan."""
+    error: str
+
+
+def is_columnar_path(path: str) -> bool:
+    """Whether a scan file is Arrow/Parquet rather than NDJSON."""
+    return path.lower().endswith(COLUMNAR_SUFFIXES)
+
+
+def chunk_ranges(path: str, chunk_bytes: int = CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """
+    Split a file into newline-aligned byte ranges.
+
+    Args:
+        path: File to split
+        chunk_bytes: Approximate size of each range
+
+    Returns:
+        List of (start, end) offsets covering the whole file
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            newline = data.find(b'\n', min(start + chunk_bytes, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(path: str, start: int, end: int) -> List[Union[Dict[str, Any], InvalidScan]]:
+    """
+    Parse the scans in one byte range of an NDJSON file.
+
+    Lines that are not valid JSON or not a JSON object are returned as
+    InvalidScan in their position.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        chunk = data[start:end]
+
+    scans: List[Union[Dict[str, Any], InvalidScan]] = []
+    offset = start
+    for line in chunk.split(b'\n'):
+        if line.strip():
+            try:
+                scan = json.loads(line)
+            except ValueError as e:
+                scan = InvalidScan(f"Invalid JSON at byte {offset}: {e}")
+            else:
+                if not isinstance(scan, dict):
+                    scan = InvalidScan(f"Scan at byte {offset} is not a JSON object")
+            scans.append(scan)
+        offset += len(line) + 1
+    return scans
+
+
+def _checked(scans: List[Union[Dict[str, Any], InvalidScan]],
+             keep_invalid: bool) -> Iterator[Union[Dict[str, Any], InvalidScan]]:
+    for scan in scans:
+        if isinstance(scan, InvalidScan) and not keep_invalid:
+            raise ValueError(scan.error)
+        yield scan
+
+
+def read_scan_file(path: str, workers: Optional[int] = None, ordered: bool = True,
+                   chunk_bytes: int = CHUNK_BYTES,
+                   keep_invalid: bool = False) -> Iterator[Union[Dict[str, Any], InvalidScan]]:
+    """
+    Read scans from an NDJSON file, parsing chunks in a process pool.
+
+    At most two chunks per worker are parsed ahead of the consumer, so memory
+    stays bounded however large the file is. Files of a single chunk are
+    parsed in the calling process.
+
+    Args:
+        path: NDJSON file with one scan per line
+        workers: Parser processes (defaults to the CPU count)
+        ordered: Yield scans in file order; otherwise chunks are yielded as
+            soon as they are parsed, in any order
+        chunk_bytes: Approximate bytes per parsing task
+        keep_invalid: Yield an InvalidScan for each line that is not a scan;
+            otherwise the first one raises ValueError when it is reached
+
+    Returns:
+        Iterator of scan dictionaries
+    """
+    ranges = chunk_ranges(path, chunk_bytes)
+    workers = workers or os.cpu_count() or 1
+    if len(ranges) <= 1 or workers <= 1:
+        for start, end in ranges:
+            yield from _checked(parse_chunk(path, start, end), keep_invalid)
+        return
+
+    window = workers * 2
+    pending = {}
+    remaining = iter(ranges)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            order = deque()  # futures in file order, used when ordered
+            while True:
+                for start, end in remaining:
+                    future = executor.submit(parse_chunk, path, start, end)
+                    pending[future] = start
+                    if ordered:
+                        order.append(future)
+                    if len(pending) >= window:
+                        break
+
+                if not pending:
+                    return
+
+                if ordered:
+                    future = order.popleft()
+                    del pending[future]
+                    yield from _checked(future.result(), keep_invalid)
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del pending[future]
+                        yield from _checked(future.result(), keep_invalid)
+        finally:
+            # Stop parsing ahead when the consumer stops early or a chunk fails
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,112 @@
+"""
+Sectioned report layout for partial retrieval from Walrus.
+
+Each top-level report field is encoded independently so a reader can fetch
+and decode one section (for example ``security_assessment``) without
+downloading ``raw_scan_data`` or ``technical_details``.
+
+Blob layout::
+
+    +-----------+-----------+-------------+---------------------------+-------------+
+    | magic (8) | version 2 | count 2     | table: count x (name 32,  | sections... |
+    |           |           |             |   offset 8, length 4)     |             |
+    +-----------+-----------+-------------+---------------------------+-------------+
+
+Offsets in the section table are absolute within the blob.
+"""
+
+import json
+import struct
+from typing import Dict, Any, Tuple
+
+
+SECTION_MAGIC = b'PGDNSECT'
+SECTION_VERSION = 1
+
+# magic, version, section count (big-endian)
+_HEADER = struct.Struct('>8sHH')
+# section name, absolute offset, length
+_ENTRY = struct.Struct('>32sQI')
+
+HEADER_SIZE = _HEADER.size
+ENTRY_SIZE = _ENTRY.size
+MAX_SECTION_NAME_LENGTH = 32
+
+
+class SectionError(Exception):
+    """Custom exception for sectioned report errors."""
+    pass
+
+
+def encode_sectioned_report(report: Dict[str, Any]) -> bytes:
+    """Encode a formatted report as a sectioned blob, one section per top-level field."""
+    names = []
+    bodies = []
+    for name, value in report.items():
+        encoded_name = name.encode('utf-8')
+        if len(encoded_name) > MAX_SECTION_NAME_LENGTH:
+            raise SectionError(f"Section name too long: {name}")
+        names.append(encoded_name)
+        bodies.append(json.dumps(value, default=str, separators=(',', ':')).encode('utf-8'))
+
+    offset = HEADER_SIZE + ENTRY_SIZE * len(bodies)
+    table = []
+    for encoded_name, body in zip(names, bodies):
+        table.append(_ENTRY.pack(encoded_name, offset, len(body)))
+        offset += len(body)
+
+    header = _HEADER.pack(SECTION_MAGIC, SECTION_VERSION, len(bodies))
+    return b''.join([header] + table + bodies)
+
+
+def is_sectioned(data: bytes) -> bool:
+    """Check whether blob data starts with the sectioned report magic."""
+    return data[:len(SECTION_MAGIC)] == SECTION_MAGIC
+
+
+def section_table_size(data: bytes) -> int:
+    """Return the number of leading bytes needed to read the full section table."""
+    if len(data) < HEADER_SIZE:
+        raise SectionError("Sectioned report header is truncated")
+
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != SECTION_MAGIC:
+        raise SectionError("Blob is not a sectioned report")
+    if version != SECTION_VERSION:
+        raise SectionError(f"Unsupported sectioned report version: {version}")
+
+    return HEADER_SIZE + ENTRY_SIZE * count
+
+
+def decode_section_table(data: bytes) -> Dict[str, Tuple[int, int]]:
+    """
+    Decode the section table from the leading bytes of a sectioned blob.
+
+    Returns:
+        Mapping of section name to absolute (offset, length), in report order
+    """
+    size = section_table_size(data)
+    if len(data) < size:
+        raise SectionError("Section table is truncated")
+
+    table = {}
+    for position in range(HEADER_SIZE, size, ENTRY_SIZE):
+        name, offset, length = _ENTRY.unpack_from(data, position)
+        table[name.rstrip(b'\x00').decode('utf-8')] = (offset, length)
+    return table
+
+
+def decode_section(data: bytes) -> Any:
+    """Decode a single section body."""
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        raise SectionError(f"Invalid section data: {e}")
+
+
+def decode_sectioned_report(data: bytes) -> Dict[str, Any]:
+    """Decode a complete sectioned blob back into a report dictionary."""
+    return {
+        name: decode_section(data[offset:offset + length])
+        for name, (offset, length) in decode_section_table(data).items()
+    }
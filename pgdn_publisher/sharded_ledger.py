@@ -0,0 +1,317 @@
+"""
+Multi-account zkSync ledger publishing.
+
+Every transaction of one account is ordered by its nonce, so a single key
+serializes all publication. With several authorized keys (PRIVATE_KEYS),
+scans are spread over the accounts by consistent hashing on host_uid (as
+validated, so falling back to validator_id): a host always maps to the same
+account, which keeps each host's scans in order,
+while the accounts sign and send independently with their own nonce
+tracking. Adding or removing a key only moves the hosts of that key.
+"""
+
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Dict, Any, Optional, List, Sequence, Union, Callable
+
+from eth_account import Account
+from eth_utils import keccak
+
+from .config import PublisherConfig
+from .records import ScanRecord
+from .rpc_pool import RpcEndpointPool, create_web3
+from .validation import ValidationError, scan_host_uid, scan_records
+from .zksync_ledger import ZkSyncLedgerPublisher, ZkSyncLedgerError
+
+
+# Points per account on the hash ring; more points spread hosts more evenly
+RING_REPLICAS = 128
+
+# Signed transactions whose account is remembered by hash; older ones are
+# found by recovering the signer from the raw transaction
+SIGNER_CACHE_SIZE = 4096
+
+
+class HashRing:
+    """Consistent hash ring assigning keys to members."""
+    
+    def __init__(self, members: Sequence[str], replicas: int = RING_REPLICAS):
+        """
+        Build the ring.
+        
+        Args:
+            members: Member names (their positions are returned by lookup)
+            replicas: Ring points per member
+        """
+        points = sorted(
+            (_ring_hash(f'{member}#{replica}'), position)
+            for position, member in enumerate(members)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._positions = [position for _, position in points]
+    
+    def lookup(self, key: str) -> int:
+        """Position of the member owning a key."""
+        index = bisect.bisect(self._hashes, _ring_hash(key)) % len(self._hashes)
+        return self._positions[index]
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.sha256(value.encode('utf-8')).digest()[:8], 'big')
+
+
+def _host_uid(scan: Union[Dict[str, Any], ScanRecord]) -> str:
+    return scan.host_uid if isinstance(scan, ScanRecord) else str(scan_host_uid(scan))
+
+
+def _normalize_hash(tx_hash: str) -> str:
+    tx_hash = tx_hash.lower()
+    return tx_hash[2:] if tx_hash.startswith('0x') else tx_hash
+
+
+class ShardedZkSyncPublisher:
+    """zkSync publisher spreading scans over several publisher accounts by host_uid."""
+    
+    def __init__(self, config: PublisherConfig):
+        """
+        Initialize one account per publisher key, sharing one RPC connection.
+        
+        Each account's authorization is checked once, here. Keys of the same
+        account are used once.
+        """
+        self.config = config
+        self.config.validate()
+        
+        self.w3 = create_web3(config)
+        if not self.w3.is_connected():
+            raise ZkSyncLedgerError(f"Failed to connect to RPC at {', '.join(config.rpc_endpoints())}")
+        
+        keys = {}
+        for key in config.publisher_keys():
+            keys.setdefault(Account.from_key(key).address, key)
+        
+        self.accounts: List[ZkSyncLedgerPublisher] = [
+            ZkSyncLedgerPublisher(replace(config, private_key=key, private_keys=None), w3=self.w3)
+            for key in keys.values()
+        ]
+        self._ring = HashRing([address.lower() for address in keys])
+        
+        self._lock = threading.Lock()
+        self._signers: 'OrderedDict[str, int]' = OrderedDict()
+        self._health = [{'published': 0, 'failed': 0, 'last_error': None} for _ in self.accounts]
+        self._executor = ThreadPoolExecutor(max_workers=len(self.accounts), thread_name_prefix='pgdn-account')
+    
+    @property
+    def account_count(self) -> int:
+        return len(self.accounts)
+    
+    @property
+    def has_publish_cooldown(self) -> bool:
+        return any(publisher.has_publish_cooldown for publisher in self.accounts)
+    
+    def account_for(self, host_uid: str) -> int:
+        """Position (in accounts) of the account publishing a host's scans."""
+        return self._ring.lookup(host_uid)
+    
+    def partition(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]]) -> List[List[int]]:
+        """Group scan positions by publishing account, in order of first appearance."""
+        groups: Dict[int, List[int]] = {}
+        for position, scan in enumerate(scan_results):
+            groups.setdefault(self.account_for(_host_uid(scan)), []).append(position)
+        return list(groups.values())
+    
+    def _records(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]]) -> List[ScanRecord]:
+        """Validate scans once, so routing and signing see the same host_uid."""
+        try:
+            return scan_records(scan_results, 'zksync')
+        except ValidationError as e:
+            raise ZkSyncLedgerError(str(e))
+    
+    def _track(self, account: int, call: Callable[[], Dict[str, Any]], rows: int) -> Dict[str, Any]:
+        """Run a publication on one account, recording its health, and tag the result with the account."""
+        try:
+            result = call()
+        except Exception as e:
+            with self._lock:
+                self._health[account]['failed'] += rows
+                self._health[account]['last_error'] = str(e)
+            raise
+        with self._lock:
+            health = self._health[account]
+            if result.get('reverted'):
+                # Mined, but none of the scans were published
+                health['failed'] += rows
+                health['last_error'] = result.get('confirmation_error')
+            else:
+                health['published'] += rows
+                health['last_error'] = None
+        result['account'] = self.accounts[account].account.address
+        return result
+    
+    def publish(self, scan_result: Union[Dict[str, Any], ScanRecord], wait_for_confirmation: bool = True) -> Dict[str, Any]:
+        """Publish a scan result from the account its host maps to."""
+        record = self._records([scan_result])[0]
+        account = self.account_for(record.host_uid)
+        return self._track(account, lambda: self.accounts[account].publish(record, wait_for_confirmation), 1)
+    
+    def publish_batch(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]],
+                      wait_for_confirmation: bool = True) -> Dict[str, Any]:
+        """
+        Publish several scan results, one batchPublishScans transaction per account.
+        
+        The accounts' transactions are sent concurrently. If only some of them
+        fail, the result has one entry per scan under 'results'.
+        """
+        if not scan_results:
+            raise ZkSyncLedgerError("No scan results to publish")
+        records = self._records(scan_results)
+        
+        groups = self.partition(records)
+        if len(groups) == 1:
+            account = self.account_for(records[0].host_uid)
+            return self._track(account, lambda: self.accounts[account].publish_batch(records, wait_for_confirmation),
+                               len(records))
+        
+        def publish_group(group: List[int]) -> Dict[str, Any]:
+            account = self.account_for(records[group[0]].host_uid)
+            return self._track(account, lambda: self.accounts[account].publish_batch(
+                [records[position] for position in group], wait_for_confirmation), len(group))
+        
+        futures = [(group, self._executor.submit(publish_group, group)) for group in groups]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+        errors = []
+        for group, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append(e)
+                for position in group:
+                    results[position] = {'success': False, 'error': str(e), 'network': 'zksync'}
+                continue
+            shared = {key: value for key, value in result.items() if key not in ('summary_hashes', 'count')}
+            for position, summary_hash in zip(group, result['summary_hashes']):
+                results[position] = dict(shared, summary_hash=summary_hash, batch_size=len(group))
+        
+        if len(errors) == len(groups):
+            raise ZkSyncLedgerError(str(errors[0]))
+        return {
+            'success': not errors,
+            'count': len(records),
+            'results': results,
+            'network': 'zksync'
+        }
+    
+    def sign_publish(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]]) -> Dict[str, Any]:
+        """
+        Sign (but do not send) a transaction publishing scans of one account.
+        
+        Raises:
+            ZkSyncLedgerError: If the scans map to more than one account (split them with partition)
+        """
+        if not scan_results:
+            raise ZkSyncLedgerError("No scan results to publish")
+        records = self._records(scan_results)
+        if len(self.partition(records)) > 1:
+            raise ZkSyncLedgerError("Scans map to several publisher accounts; sign each partition separately")
+        
+        account = self.account_for(records[0].host_uid)
+        signed = self.accounts[account].sign_publish(records)
+        signed['account'] = self.accounts[account].account.address
+        with self._lock:
+            self._signers[_normalize_hash(signed['transaction_hash'])] = account
+            while len(self._signers) > SIGNER_CACHE_SIZE:
+                self._signers.popitem(last=False)
+        return signed
+    
+    def _signer(self, tx_hash: str, raw_transaction: Optional[str] = None) -> ZkSyncLedgerPublisher:
+        """Account that signed a transaction."""
+        with self._lock:
+            account = self._signers.get(_normalize_hash(tx_hash))
+        if account is not None:
+            return self.accounts[account]
+        
+        try:
+            if raw_transaction is not None:
+                sender = Account.recover_transaction(raw_transaction)
+            else:
+                sender = self.w3.eth.get_transaction(tx_hash)['from']
+        except Exception as e:
+            raise ZkSyncLedgerError(f"Cannot determine the signer of {tx_hash}: {e}")
+        for publisher in self.accounts:
+            if publisher.account.address.lower() == sender.lower():
+                return publisher
+        raise ZkSyncLedgerError(f"Transaction {tx_hash} was not signed by a configured publisher key")
+    
+    def broadcast_transaction(self, raw_transaction: str) -> str:
+        """Send a transaction returned by sign_publish through its account."""
+        data = raw_transaction[2:] if raw_transaction.startswith('0x') else raw_transaction
+        tx_hash = keccak(bytes.fromhex(data)).hex()
+        return self._signer(tx_hash, raw_transaction).broadcast_transaction(raw_transaction)
+    
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the receipt of a mined transaction, or None while it is pending."""
+        return self.accounts[0].get_transaction_receipt(tx_hash)
+    
+    def transaction_state(self, tx_hash: str, nonce: int, raw_transaction: Optional[str] = None) -> str:
+        """
+        Classify a signed transaction against the nonce of the account that signed it.
+        
+        Args:
+            tx_hash: Transaction hash
+            nonce: Nonce the transaction was signed with
+            raw_transaction: Signed transaction, used to find the account after a restart
+        """
+        return self._signer(tx_hash, raw_transaction).transaction_state(tx_hash, nonce)
+    
+    def reset_nonce(self) -> None:
+        """Forget every account's local nonce."""
+        for publisher in self.accounts:
+            publisher.reset_nonce()
+    
+    def get_scan_summaries(self, summary_hashes: List[bytes]) -> List[Dict[str, Any]]:
+        """Look up published summaries by hash in one eth_call."""
+        return self.accounts[0].get_scan_summaries(summary_hashes)
+    
+    def close(self) -> None:
+        """Stop the threads sending the accounts' transactions."""
+        self._executor.shutdown(wait=True)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get connection status with the balance and health of every account."""
+        accounts = []
+        contract_info = {}
+        for publisher, health in zip(self.accounts, self._health):
+            status = publisher.get_status()
+            contract_info = contract_info or status.pop('contract_info', {})
+            with self._lock:
+                health = dict(health)
+            accounts.append({
+                'account_address': publisher.account.address,
+                'connected': status['connected'],
+                'balance_wei': status.get('balance_wei'),
+                'balance_eth': status.get('balance_eth'),
+                'is_publisher': status.get('is_publisher', False),
+                'is_owner': status.get('is_owner', False),
+                'healthy': status['connected'] and bool(status.get('balance_wei')) and health['last_error'] is None,
+                'next_publish_at': status.get('next_publish_at'),
+                'error': status.get('error'),
+                **health
+            })
+        
+        return {
+            'connected': all(account['connected'] for account in accounts),
+            'network': 'zksync',
+            'rpc_url': self.config.rpc_url,
+            'rpc_endpoints': self.w3.provider.stats() if isinstance(self.w3.provider, RpcEndpointPool) else None,
+            'contract_address': self.accounts[0].contract_address,
+            'account_count': len(accounts),
+            'healthy_accounts': sum(account['healthy'] for account in accounts),
+            'balance_wei': sum(account['balance_wei'] or 0 for account in accounts),
+            'accounts': accounts,
+            'contract_info': contract_info
+        }
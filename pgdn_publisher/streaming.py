@@ -0,0 +1,67 @@
+"""
+Incremental encoding helpers for streaming Walrus uploads and downloads.
+
+Reports are serialised with ``JSONEncoder.iterencode`` and optionally gzip
+compressed chunk by chunk, so an upload never holds the full encoded body in
+memory. Gzip blobs are recognised on retrieval by their magic bytes.
+"""
+
+import gzip
+import json
+import zlib
+from typing import Dict, Any, Iterable, Iterator
+
+
+# Target size of chunks handed to the HTTP client
+STREAM_CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def iter_report_json(report: Dict[str, Any], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Encode a report as JSON incrementally, yielding UTF-8 chunks of about chunk_size bytes."""
+    encoder = json.JSONEncoder(default=str)
+    buffer = []
+    buffered = 0
+    for fragment in encoder.iterencode(report):
+        encoded = fragment.encode('utf-8')
+        buffer.append(encoded)
+        buffered += len(encoded)
+        if buffered >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a stream of chunks without buffering the whole input."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_gunzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Decompress a gzip stream chunk by chunk."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        decompressed = decompressor.decompress(chunk)
+        if decompressed:
+            yield decompressed
+    remainder = decompressor.flush()
+    if remainder:
+        yield remainder
+
+
+def is_gzip(data: bytes) -> bool:
+    """Check whether blob data starts with the gzip magic."""
+    return data[:2] == GZIP_MAGIC
+
+
+def gunzip(data: bytes) -> bytes:
+    """Decompress a complete gzip blob."""
+    return gzip.decompress(data)
@@ -3,12 +3,13 @@ SUI blockchain ledger publishing functionality.
 """
 
 import json
-import time
 import os
 import subprocess
-from typing import Dict, Any, Optional
+import sys
+from typing import Dict, Any, Optional, List, Sequence, Union
 
 from .config import PublisherConfig
+from .records import ScanRecord
 
 
 class SuiLedgerError(Exception):
@@ -41,49 +42,26 @@ class SuiLedgerPublisher:
         except (subprocess.TimeoutExpired, FileNotFoundError):
             raise SuiLedgerError("SUI CLI not found. Please install and configure the SUI CLI")
     
-    def _format_scan_for_ledger(self, scan_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Format scan result for SUI blockchain submission."""
-        host_uid = scan_result.get('host_uid') or scan_result.get('validator_id', 'unknown_host')
-        scan_time = scan_result.get('scan_time')
-        if scan_time is None:
-            scan_time = int(time.time() * 1000)  # SUI uses milliseconds
-        trust_score = max(0, min(65535, int(scan_result.get('trust_score', 0))))
-        
-        # Require summary_hash to be provided
-        summary_hash = scan_result.get('summary_hash')
-        if not summary_hash:
-            raise SuiLedgerError("summary_hash is required in scan data")
-        
-        # Convert summary hash to bytes for SUI
-        if summary_hash.startswith('0x'):
-            summary_hash = summary_hash[2:]
-        
+    def _to_records(self, scans: Sequence[Union[Dict[str, Any], ScanRecord]]) -> List[ScanRecord]:
+        """Convert scan dictionaries to ScanRecords with scan_time in milliseconds (SUI's unit)."""
+        # Imported here so loading the SUI backend does not load NumPy
+        from .validation import ValidationError, scan_records
         try:
-            summary_hash_bytes = bytes.fromhex(summary_hash)
-        except ValueError:
-            raise SuiLedgerError(f"Invalid summary_hash format: {summary_hash}")
-        
-        report_pointer = scan_result.get('report_pointer') or f"scan_{scan_result.get('scan_id', 'unknown')}_{int(time.time())}"
-        
-        return {
-            'host_uid': host_uid,
-            'scan_time': scan_time,
-            'summary_hash_bytes': summary_hash_bytes,
-            'score': trust_score,
-            'report_pointer': report_pointer
-        }
+            return scan_records(scans, 'sui')
+        except ValidationError as e:
+            raise SuiLedgerError(str(e))
     
-    def _build_sui_command(self, ledger_data: Dict[str, Any]) -> list:
+    def _build_sui_command(self, record: ScanRecord) -> list:
         """Build SUI CLI command for publishing scan summary."""
-        summary_hash_array = f"[{','.join(str(b) for b in ledger_data['summary_hash_bytes'])}]"
+        summary_hash_array = f"[{','.join(str(b) for b in record.summary_hash)}]"
         
         # Use environment variable directly if available, otherwise use config
         gas_budget = os.getenv('GAS_BUDGET', str(self.config.gas_limit))
         
         # Log the gas budget being used
-        print(f"DEBUG: Using gas budget: {gas_budget}")
-        print(f"DEBUG: Config gas_limit: {self.config.gas_limit}")
-        print(f"DEBUG: GAS_BUDGET env var: {os.getenv('GAS_BUDGET')}")
+        print(f"DEBUG: Using gas budget: {gas_budget}", file=sys.stderr)
+        print(f"DEBUG: Config gas_limit: {self.config.gas_limit}", file=sys.stderr)
+        print(f"DEBUG: GAS_BUDGET env var: {os.getenv('GAS_BUDGET')}", file=sys.stderr)
         
         cmd = [
             "sui", "client", "call", "--json",
@@ -93,16 +71,16 @@ class SuiLedgerPublisher:
             "--args", 
             self.registry_id, 
             self.admin_cap_id, 
-            ledger_data['host_uid'], 
-            str(ledger_data['scan_time']),
+            record.host_uid, 
+            str(record.scan_time),
             summary_hash_array, 
-            str(ledger_data['score']), 
-            ledger_data['report_pointer'], 
+            str(record.score), 
+            record.report_pointer, 
             "0x6",
             "--gas-budget", gas_budget
         ]
         
-        print(f"DEBUG: Full SUI command: {' '.join(cmd)}")
+        print(f"DEBUG: Full SUI command: {' '.join(cmd)}", file=sys.stderr)
         return cmd
     
     def _execute_sui_transaction(self, cmd: list) -> Dict[str, Any]:
@@ -168,14 +146,14 @@ class SuiLedgerPublisher:
                 raise
             raise SuiLedgerError(f"Unexpected error: {e}")
     
-    def publish(self, scan_result: Dict[str, Any], wait_for_confirmation: bool = True) -> Dict[str, Any]:
+    def publish(self, scan_result: Union[Dict[str, Any], ScanRecord], wait_for_confirmation: bool = True) -> Dict[str, Any]:
         """Publish scan result to SUI blockchain ledger."""
         try:
-            # Format scan data
-            ledger_data = self._format_scan_for_ledger(scan_result)
+            # Convert scan data
+            record = self._to_records([scan_result])[0]
             
             # Build SUI command
-            cmd = self._build_sui_command(ledger_data)
+            cmd = self._build_sui_command(record)
             
             # Execute transaction
             sui_result = self._execute_sui_transaction(cmd)
@@ -183,12 +161,12 @@ class SuiLedgerPublisher:
             result = {
                 'success': True,
                 'transaction_hash': sui_result.get('digest', 'unknown'),
-                'summary_hash': '0x' + ledger_data['summary_hash_bytes'].hex(),
-                'host_uid': ledger_data['host_uid'],
-                'score': ledger_data['score'],
+                'summary_hash': record.summary_hash_hex,
+                'host_uid': record.host_uid,
+                'score': record.score,
                 'confirmed': True,  # SUI CLI waits for confirmation by default
                 'network': 'sui',
-                'scan_time': ledger_data['scan_time']
+                'scan_time': record.scan_time
             }
             
             if 'effects' in sui_result:
@@ -0,0 +1,276 @@
+"""
+Vectorized pre-publish validation of scan batches.
+
+A batch of scans is checked and normalized in one pass before any network
+work starts:
+- summary_hash must be 32 bytes of hex (``0x`` optional) and is decoded with a lookup table over all rows at once
+- trust_score is clamped to 0..65535 (NaN and infinity are rejected)
+- scan_time must be a finite, non-negative timestamp that fits an int64 and is converted to the unit the target network expects (seconds on zkSync, milliseconds on Sui), whatever unit it was given in; zero means now on zkSync
+- host_uid and report_pointer are length-checked
+
+Rows that fail are returned with the reason instead of aborting the batch.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .records import ScanRecord
+
+
+MAX_TRUST_SCORE = 65535
+MAX_HOST_UID_LENGTH = 128
+MAX_REPORT_POINTER_LENGTH = 256
+
+# scan_time values at or above this do not fit an int64 (nanoseconds after 2262)
+SCAN_TIME_LIMIT = 2.0 ** 63
+
+# scan_time units per second expected by each network
+SCAN_TIME_UNITS = {'zksync': 1, 'sui': 1000}
+
+# Networks on which a zero scan_time stands for the current time
+ZERO_SCAN_TIME_IS_NOW = {'zksync'}
+
+# Magnitude limits used to detect the unit of a timestamp: values below
+# 1e11 are seconds (until the year 5138), below 1e14 milliseconds, below
+# 1e17 microseconds, anything larger nanoseconds
+_UNIT_LIMITS = np.array([1e11, 1e14, 1e17])
+_UNIT_DIVISORS = np.array([1, 1000, 1000000, 1000000000], dtype=np.int64)
+
+# Hex digit values by byte, 255 for anything that is not a hex digit
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+for _digit in range(16):
+    _HEX_VALUES[ord('0123456789abcdef'[_digit])] = _digit
+    _HEX_VALUES[ord('0123456789ABCDEF'[_digit])] = _digit
+
+
+class ValidationError(Exception):
+    """Custom exception for scan validation errors."""
+    pass
+
+
+@dataclass
+class RejectedScan:
+    """A scan that failed validation."""
+    index: int  # position of the scan in the input
+    reason: str
+
+
+@dataclass
+class ValidatedBatch:
+    """Scans that passed validation, as ledger columns, and the rejected ones."""
+    index: np.ndarray  # input positions of the clean rows
+    host_uid: List[str]
+    scan_time: np.ndarray  # int64, in the network's unit
+    summary_hash: np.ndarray  # (rows, 32) uint8
+    trust_score: np.ndarray  # uint16
+    report_pointer: List[str]
+    rejected: List[RejectedScan] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def records(self) -> List[ScanRecord]:
+        """The clean rows as ScanRecords."""
+        return [
+            ScanRecord(*row) for row in zip(
+                self.host_uid,
+                self.scan_time.tolist(),
+                [digest.tobytes() for digest in self.summary_hash],
+                self.trust_score.tolist(),
+                self.report_pointer
+            )
+        ]
+
+
+def decode_hex_digests(chars: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode rows of 64 hex characters.
+
+    Args:
+        chars: (rows, 64) uint8 array of ASCII hex digits
+
+    Returns:
+        (rows, 32) uint8 digests and a boolean mask of rows that were valid hex
+    """
+    nibbles = _HEX_VALUES[chars]
+    valid = (nibbles != 255).all(axis=1)
+    digests = np.ascontiguousarray((nibbles[:, 0::2] << 4) | nibbles[:, 1::2])
+    return digests, valid
+
+
+def normalize_scan_times(values: np.ndarray, network: str, now: Optional[float] = None) -> np.ndarray:
+    """
+    Convert timestamps in seconds, milliseconds, microseconds or nanoseconds to the network's unit.
+
+    Each value is converted straight from its detected unit, so sub-second
+    precision survives on Sui; integer arrays are converted exactly and
+    float arrays are truncated to whole units. A zero scan_time on zkSync
+    means "now", as it always has for the zkSync publisher.
+
+    Args:
+        values: int64 or float64 timestamps, each in any of the supported units
+        network: Target network name
+        now: Current time in seconds used for zero zkSync timestamps (defaults to time.time())
+    """
+    values = np.asarray(values)
+    if network in ZERO_SCAN_TIME_IS_NOW and (values == 0).any():
+        values = np.where(values == 0, time.time() if now is None else now, values)
+
+    per_second = SCAN_TIME_UNITS.get(network, 1)
+    given = _UNIT_DIVISORS[np.searchsorted(_UNIT_LIMITS, values, side='right')]
+    if np.issubdtype(values.dtype, np.integer):
+        values = values.astype(np.int64)
+        return np.where(
+            given >= per_second,
+            values // np.maximum(given // per_second, 1),
+            values * (per_second // given)
+        )
+    # Dividing by the exact ratio keeps whole-unit values exact
+    ratio = given / per_second
+    converted = np.where(ratio >= 1, values / ratio, values * (per_second / given))
+    return np.floor(converted).astype(np.int64)
+
+
+def clamp_scores(values: np.ndarray) -> np.ndarray:
+    """Clamp trust scores to the 0..65535 range of the ledger field."""
+    return np.clip(values, 0, MAX_TRUST_SCORE).astype(np.uint16)
+
+
+def scan_host_uid(scan: Dict[str, Any]) -> Any:
+    """host_uid of a scan dictionary, falling back to validator_id, then 'unknown_host'."""
+    return scan.get('host_uid') or scan.get('validator_id', 'unknown_host')
+
+
+def validate_scans(scans: Sequence[Dict[str, Any]], network: str = 'zksync',
+                   now: Optional[float] = None) -> ValidatedBatch:
+    """
+    Validate and normalize a batch of scan dictionaries.
+
+    Defaults match the single-scan publishers: host_uid falls back to
+    validator_id, scan_time to now, trust_score to 0 and report_pointer to
+    scan_<scan_id>_<now>.
+
+    Args:
+        scans: Scan data dictionaries
+        network: Network whose scan_time unit to produce ('zksync' or 'sui')
+        now: Current time in seconds (defaults to time.time())
+
+    Returns:
+        ValidatedBatch with the clean rows and the rejected ones
+    """
+    now = time.time() if now is None else now
+    rows = len(scans)
+    reasons = np.full(rows, None, dtype=object)
+
+    def reject(mask: np.ndarray, reason: str) -> None:
+        # Each row keeps the first reason it was rejected for
+        reasons[mask & np.equal(reasons, None)] = reason
+
+    # One pass over the dictionaries to extract the columns
+    host_uid = [scan_host_uid(scan) for scan in scans]
+    report_pointer = [
+        scan.get('report_pointer') or f"scan_{scan.get('scan_id', 'unknown')}_{int(now)}" for scan in scans
+    ]
+    hashes = [scan.get('summary_hash') or '' for scan in scans]
+    times = [scan.get('scan_time') for scan in scans]
+    scan_time = _numeric_column(times, now)
+    trust_score = _numeric_column([scan.get('trust_score') for scan in scans], 0)
+
+    reject(np.array([not value for value in hashes], dtype=bool), 'summary_hash is required')
+    reject(~np.isfinite(trust_score), 'trust_score is not a number')
+    reject(~np.isfinite(scan_time) | (scan_time < 0) | (scan_time >= SCAN_TIME_LIMIT), 'scan_time is not a valid timestamp')
+    reject(
+        np.fromiter((not isinstance(value, str) or len(value) > MAX_HOST_UID_LENGTH for value in host_uid), bool, rows),
+        f'host_uid must be a string of at most {MAX_HOST_UID_LENGTH} characters'
+    )
+    reject(
+        np.fromiter((not isinstance(value, str) or len(value) > MAX_REPORT_POINTER_LENGTH for value in report_pointer), bool, rows),
+        f'report_pointer must be a string of at most {MAX_REPORT_POINTER_LENGTH} characters'
+    )
+
+    # Hex digits of all well-formed hashes are decoded together
+    digits = [value[2:] if isinstance(value, str) and value.startswith('0x') else value for value in hashes]
+    well_formed = np.fromiter((isinstance(value, str) and len(value) == 64 for value in digits), bool, rows)
+    reject(~well_formed, 'summary_hash must be exactly 32 bytes (64 hex characters)')
+    summary_hash = np.zeros((rows, 32), dtype=np.uint8)
+    if well_formed.any():
+        blob = ''.join(value for value, ok in zip(digits, well_formed) if ok).encode('ascii', 'replace')
+        digests, valid = decode_hex_digests(np.frombuffer(blob, dtype=np.uint8).reshape(-1, 64))
+        summary_hash[well_formed] = digests
+        invalid = np.zeros(rows, dtype=bool)
+        invalid[well_formed] = ~valid
+        reject(invalid, 'summary_hash is not valid hex')
+
+    clean = np.equal(reasons, None)
+    keep = np.flatnonzero(clean)
+    normalized = normalize_scan_times(scan_time[clean], network, now)
+    # Integer timestamps are converted again without going through float64,
+    # which cannot hold nanoseconds exactly
+    integral = np.fromiter((_is_integer(times[i]) for i in keep), bool, len(keep))
+    if integral.any():
+        exact = np.array([times[i] for i in keep[integral]], dtype=np.int64)
+        normalized[integral] = normalize_scan_times(exact, network, now)
+    return ValidatedBatch(
+        index=keep,
+        host_uid=[host_uid[i] for i in keep],
+        scan_time=normalized,
+        summary_hash=summary_hash[clean],
+        trust_score=clamp_scores(trust_score[clean]),
+        report_pointer=[report_pointer[i] for i in keep],
+        rejected=[RejectedScan(int(i), reasons[i]) for i in np.flatnonzero(~clean)]
+    )
+
+
+def _numeric_column(values: List[Any], default: float) -> np.ndarray:
+    """Float column with missing values set to default and unparseable ones to NaN."""
+    try:
+        return np.array([default if value is None else value for value in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_to_float(value, default) for value in values], dtype=np.float64)
+
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
+def _to_float(value: Any, default: float) -> float:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def scan_records(scans: Sequence[Union[Dict[str, Any], ScanRecord]], network: str = 'zksync',
+                 now: Optional[float] = None) -> List[ScanRecord]:
+    """
+    Convert scan dictionaries to ScanRecords; records already converted are passed through.
+
+    Args:
+        scans: Scan data dictionaries or ScanRecords
+        network: Network whose scan_time unit to produce ('zksync' or 'sui')
+        now: Current time in seconds (defaults to time.time())
+
+    Returns:
+        One ScanRecord per scan, in input order
+
+    Raises:
+        ValidationError: If a scan fails validation
+    """
+    positions = [i for i, scan in enumerate(scans) if not isinstance(scan, ScanRecord)]
+    if not positions:
+        return list(scans)
+
+    validated = validate_scans([scans[i] for i in positions], network, now)
+    if validated.rejected:
+        rejected = validated.rejected[0]
+        raise ValidationError(f"Invalid scan at position {positions[rejected.index]}: {rejected.reason}")
+
+    records = list(scans)
+    for position, record in zip(positions, validated.records()):
+        records[position] = record
+    return records
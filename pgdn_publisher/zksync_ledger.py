@@ -3,16 +3,23 @@ zkSync blockchain ledger publishing functionality.
 """
 
 import json
-import time
 import os
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, List, Sequence, Union
 from web3 import Web3
 from web3.contract import Contract
-from web3.exceptions import ContractLogicError
+from web3.exceptions import ContractLogicError, TransactionNotFound
 from eth_account import Account
 
 from .config import PublisherConfig
+from .abi_encoder import (
+    compiled_function, encode_publish, encode_scan_summary_lookup, decode_scan_summary_lookup, transaction_fields
+)
 from .contract_abi import CONTRACT_ABI
+from .cooldown import CooldownScheduler
+from .records import ScanRecord
+from .rpc_pool import RpcEndpointPool, create_web3
+from .validation import ValidationError, scan_records
 
 
 class ZkSyncLedgerError(Exception):
@@ -20,21 +27,38 @@ class ZkSyncLedgerError(Exception):
     pass
 
 
+class ZkSyncRevertError(ZkSyncLedgerError):
+    """Raised when a transaction was mined but reverted, so none of its scans were published."""
+    pass
+
+
 class ZkSyncLedgerPublisher:
     """Publisher for zkSync blockchain ledger operations."""
     
-    def __init__(self, config: PublisherConfig):
-        """Initialize zkSync ledger publisher."""
+    def __init__(self, config: PublisherConfig, w3: Optional[Web3] = None):
+        """
+        Initialize zkSync ledger publisher.
+        
+        Args:
+            config: Publisher configuration; the first publisher key signs
+            w3: Existing connection to share (one per publisher otherwise)
+        """
         self.config = config
         self.config.validate()
         
-        # Initialize Web3 connection
-        self.w3 = Web3(Web3.HTTPProvider(config.rpc_url))
-        if not self.w3.is_connected():
-            raise ZkSyncLedgerError(f"Failed to connect to RPC at {config.rpc_url}")
+        # Initialize Web3 connection (pooled when several endpoints are configured)
+        if w3 is None:
+            w3 = create_web3(config)
+            if not w3.is_connected():
+                raise ZkSyncLedgerError(f"Failed to connect to RPC at {', '.join(config.rpc_endpoints())}")
+        self.w3 = w3
         
-        # Initialize account
-        self.account = Account.from_key(config.private_key)
+        # Initialize account; nonces are handed out locally so several
+        # transactions can be signed before any of them is mined
+        self.account = Account.from_key(config.publisher_keys()[0])
+        self._nonce_lock = threading.Lock()
+        self._next_nonce: Optional[int] = None
+        self._chain_id: Optional[int] = None
         self.contract_address = Web3.to_checksum_address(config.contract_address)
         
         # Load contract ABI
@@ -46,6 +70,9 @@ class ZkSyncLedgerPublisher:
         
         # Check authorization
         self._check_authorization()
+        
+        # Publications are held back while the contract's cooldown runs
+        self._cooldown = self._load_cooldown()
     
     def _load_contract_abi(self) -> list:
         """Load contract ABI from embedded data."""
@@ -67,6 +94,41 @@ class ZkSyncLedgerPublisher:
         except Exception as e:
             raise ZkSyncLedgerError(f"Authorization check failed: {e}")
     
+    @property
+    def has_publish_cooldown(self) -> bool:
+        return self._cooldown is not None
+    
+    def _call(self, name: str, *args: Any) -> tuple:
+        """eth_call a view function of the contract."""
+        function = compiled_function(name)
+        data = self.w3.eth.call({'to': self.contract_address, 'data': '0x' + function.encode_call(*args).hex()})
+        return function.decode_output(bytes(data))
+    
+    def _load_cooldown(self) -> Optional[CooldownScheduler]:
+        """Read the publish cooldown and this account's last publication once; None without a cooldown."""
+        try:
+            cooldown = self._call('publishCooldown')[0]
+            if not cooldown:
+                return None
+            last_publish = self._call('lastPublishTime', self.account.address)[0]
+        except Exception:
+            # Contract versions without a cooldown
+            return None
+        return CooldownScheduler(
+            cooldown,
+            last_publish,
+            self.config.publish_cooldown_margin,
+            self.config.publish_cooldown_max_batch,
+            block_time=self._block_time
+        )
+    
+    def _block_time(self, tx_hash: str, timeout: int = 120) -> Optional[float]:
+        """Timestamp of the block that mined a transaction, or None if it reverted."""
+        receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+        if receipt['status'] == 0:
+            return None
+        return float(self.w3.eth.get_block(receipt['blockNumber'])['timestamp'])
+    
     def _generate_summary_hash(self, scan_data: Dict[str, Any]) -> str:
         """Generate deterministic hash for scan summary."""
         summary_data = {
@@ -81,119 +143,272 @@ class ZkSyncLedgerPublisher:
         hash_bytes = self.w3.keccak(text=json_str)
         return '0x' + hash_bytes.hex()
     
-    def _format_scan_for_ledger(self, scan_result: Dict[str, Any]) -> Dict[str, Any]:
-        """Format scan result for blockchain submission."""
-        host_uid = scan_result.get('host_uid') or scan_result.get('validator_id', 'unknown_host')
-        scan_time = scan_result.get('scan_time') or int(time.time())
-        trust_score = max(0, min(65535, int(scan_result.get('trust_score', 0))))
-        
-        summary_data = {
-            'host_uid': host_uid,
-            'scan_time': scan_time,
-            'trust_score': trust_score,
-            'vulnerabilities': scan_result.get('vulnerabilities', []),
-            'open_ports': scan_result.get('open_ports', []),
-            'services': scan_result.get('services', []),
-            'ssl_info': scan_result.get('ssl_info', {}),
-            'scan_type': scan_result.get('scan_type', 'unknown')
-        }
-        
-        # Require summary_hash to be provided
-        summary_hash = scan_result.get('summary_hash')
-        if not summary_hash:
-            raise ZkSyncLedgerError("summary_hash is required in scan data")
+    def _to_records(self, scans: Sequence[Union[Dict[str, Any], ScanRecord]]) -> List[ScanRecord]:
+        """Convert scan dictionaries to ScanRecords with scan_time in seconds."""
+        try:
+            return scan_records(scans, 'zksync')
+        except ValidationError as e:
+            raise ZkSyncLedgerError(str(e))
+    
+    def _allocate_nonce(self) -> int:
+        """Return the next nonce for this account, syncing with the chain on first use."""
+        with self._nonce_lock:
+            if self._next_nonce is None:
+                self._next_nonce = self.w3.eth.get_transaction_count(self.account.address, 'pending')
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+    
+    def reset_nonce(self) -> None:
+        """Forget the local nonce so the next transaction re-reads it from the chain."""
+        with self._nonce_lock:
+            self._next_nonce = None
+    
+    def _get_chain_id(self) -> int:
+        """Chain id of the network, read once."""
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+    
+    def _sign_transaction(self, calldata: bytes, gas_limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Build and sign a contract transaction without sending it.
         
-        report_pointer = scan_result.get('report_pointer') or f"scan_{scan_result.get('scan_id', 'unknown')}_{int(time.time())}"
+        The transaction fields are assembled directly (see abi_encoder)
+        rather than through web3's build_transaction.
         
-        return {
-            'host_uid': host_uid,
-            'scan_time': scan_time,
-            'summary_hash': summary_hash,
-            'score': trust_score,
-            'report_pointer': report_pointer,
-            'summary_data': summary_data
-        }
-    
-    def _send_transaction(self, function_call, gas_limit: Optional[int] = None) -> str:
-        """Send transaction to contract."""
+        Returns:
+            Dictionary with 'raw_transaction' (hex), 'transaction_hash' and 'nonce'
+        """
         try:
-            nonce = self.w3.eth.get_transaction_count(self.account.address, 'pending')
-            
+            if gas_limit is None and self._cooldown is not None and not self._cooldown.is_eligible():
+                # Estimating inside the cooldown would only revert
+                gas_limit = self.config.gas_limit
             if gas_limit is None:
                 try:
-                    estimated_gas = function_call.estimate_gas({'from': self.account.address})
+                    estimated_gas = self.w3.eth.estimate_gas({
+                        'from': self.account.address,
+                        'to': self.contract_address,
+                        'data': '0x' + calldata.hex()
+                    })
                     gas_limit = int(estimated_gas * 1.2)  # 20% buffer
                 except Exception:
                     gas_limit = self.config.gas_limit
             
-            transaction_params = {
-                'from': self.account.address,
-                'nonce': nonce,
-                'gas': gas_limit,
-                'gasPrice': self.w3.to_wei(self.config.gas_price_gwei, 'gwei'),
-            }
-            
-            transaction = function_call.build_transaction(transaction_params)
+            chain_id = self._get_chain_id()
+            nonce = self._allocate_nonce()
+            transaction = transaction_fields(
+                self.contract_address,
+                calldata,
+                nonce,
+                gas_limit,
+                self.w3.to_wei(self.config.gas_price_gwei, 'gwei'),
+                chain_id
+            )
             signed_txn = self.account.sign_transaction(transaction)
             
             raw_transaction = getattr(signed_txn, 'rawTransaction', None) or getattr(signed_txn, 'raw_transaction', None)
             if raw_transaction is None:
                 raise ZkSyncLedgerError("Could not get raw transaction")
             
-            tx_hash = self.w3.eth.send_raw_transaction(raw_transaction)
-            return tx_hash.hex()
+            return {
+                'raw_transaction': bytes(raw_transaction).hex(),
+                'transaction_hash': signed_txn.hash.hex(),
+                'nonce': nonce
+            }
             
         except Exception as e:
+            # Release the nonce if it was allocated
+            self.reset_nonce()
+            raise ZkSyncLedgerError(f"Transaction signing failed: {e}")
+    
+    def broadcast_transaction(self, raw_transaction: str) -> str:
+        """
+        Send a transaction signed by _sign_transaction, once the publish cooldown allows.
+        
+        Broadcasting the same signed transaction again is safe: its nonce
+        lets at most one copy be mined.
+        """
+        if self._cooldown is not None:
+            return self._cooldown.run(lambda: self._broadcast(raw_transaction))
+        return self._broadcast(raw_transaction)
+    
+    def _broadcast(self, raw_transaction: str) -> str:
+        """Send a signed transaction right away."""
+        try:
+            if raw_transaction.startswith('0x'):
+                raw_transaction = raw_transaction[2:]
+            tx_hash = self.w3.eth.send_raw_transaction(bytes.fromhex(raw_transaction))
+            return tx_hash.hex()
+        except Exception as e:
+            # The local nonce may now be ahead of the chain
+            self.reset_nonce()
             raise ZkSyncLedgerError(f"Transaction failed: {e}")
     
+    def _send_records(self, records: List[ScanRecord]) -> Dict[str, Any]:
+        """
+        Publish records in one transaction, merged with other pending records while the cooldown runs.
+        
+        Returns:
+            Dictionary with 'transaction_hash', 'nonce' and the records' 'summary_hashes'
+        """
+        if not records:
+            raise ZkSyncLedgerError("No scan results to publish")
+        if self._cooldown is not None:
+            return self._cooldown.submit(records, self._sign_and_broadcast)
+        return self._sign_and_broadcast(records)
+    
+    def _sign_and_broadcast(self, records: List[ScanRecord]) -> Dict[str, Any]:
+        signed = self.sign_publish(records)
+        signed['transaction_hash'] = self._broadcast(signed.pop('raw_transaction'))
+        return signed
+    
+    def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the receipt of a mined transaction, or None while it is pending."""
+        try:
+            return dict(self.w3.eth.get_transaction_receipt(tx_hash))
+        except TransactionNotFound:
+            return None
+    
     def _wait_for_confirmation(self, tx_hash: str, timeout: int = 120) -> Dict[str, Any]:
         """Wait for transaction confirmation."""
         try:
             receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
-            
-            if receipt.status == 0:
-                raise ZkSyncLedgerError(f"Transaction failed: {tx_hash}")
-            
-            return dict(receipt)
-            
         except Exception as e:
             raise ZkSyncLedgerError(f"Transaction confirmation failed: {e}")
+        
+        if receipt.status == 0:
+            raise ZkSyncRevertError(f"Transaction reverted: {tx_hash}")
+        return dict(receipt)
     
-    def publish(self, scan_result: Dict[str, Any], wait_for_confirmation: bool = True) -> Dict[str, Any]:
-        """Publish scan result to zkSync blockchain ledger."""
+    def transaction_state(self, tx_hash: str, nonce: int) -> str:
+        """
+        Classify a signed transaction.
+        
+        Returns:
+            'mined' (a receipt exists), 'pending' (known to the node), 'replaced'
+            (another transaction used its nonce) or 'unsent' (nonce still unused)
+        """
         try:
-            # Format scan data
-            ledger_data = self._format_scan_for_ledger(scan_result)
+            if self.get_transaction_receipt(tx_hash) is not None:
+                return 'mined'
+            try:
+                self.w3.eth.get_transaction(tx_hash)
+                return 'pending'
+            except TransactionNotFound:
+                pass
             
-            # Convert summary hash to bytes32
-            summary_hash_hex = ledger_data['summary_hash']
-            if summary_hash_hex.startswith('0x'):
-                summary_hash_hex = summary_hash_hex[2:]
+            if self.w3.eth.get_transaction_count(self.account.address, 'latest') > nonce:
+                # It may have been mined since the first receipt check
+                return 'mined' if self.get_transaction_receipt(tx_hash) is not None else 'replaced'
+            return 'unsent'
+        except Exception as e:
+            raise ZkSyncLedgerError(f"Transaction lookup failed: {e}")
+    
+    def _records_calldata(self, records: List[ScanRecord]) -> bytes:
+        """Calldata of publishScanSummary for one record, or batchPublishScans for several."""
+        return encode_publish([record.as_tuple() for record in records])
+    
+    def get_scan_summaries(self, summary_hashes: List[bytes]) -> List[Dict[str, Any]]:
+        """
+        Look up published summaries by hash in one eth_call.
+        
+        Args:
+            summary_hashes: 32-byte summary hashes
+        
+        Returns:
+            One dictionary per hash (see abi_encoder.SCAN_SUMMARY_FIELDS); hashes
+            never published come back with empty fields
+        """
+        if not summary_hashes:
+            return []
+        try:
+            data = self.w3.eth.call({
+                'to': self.contract_address,
+                'data': '0x' + encode_scan_summary_lookup(summary_hashes).hex()
+            })
+            return decode_scan_summary_lookup(bytes(data), len(summary_hashes))
+        except Exception as e:
+            raise ZkSyncLedgerError(f"Summary lookup failed: {e}")
+    
+    def sign_publish(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]]) -> Dict[str, Any]:
+        """
+        Sign (but do not send) a transaction publishing one or more scan results.
+        
+        Several scans are published with a single batchPublishScans call.
+        Scan dictionaries are validated as a batch before any RPC work.
+        
+        Returns:
+            Dictionary with 'raw_transaction', 'transaction_hash', 'nonce' and 'summary_hashes'
+        """
+        if not scan_results:
+            raise ZkSyncLedgerError("No scan results to publish")
+        
+        records = self._to_records(scan_results)
+        signed = self._sign_transaction(self._records_calldata(records))
+        signed['summary_hashes'] = [record.summary_hash_hex for record in records]
+        return signed
+    
+    def publish_batch(self, scan_results: Sequence[Union[Dict[str, Any], ScanRecord]],
+                      wait_for_confirmation: bool = True) -> Dict[str, Any]:
+        """
+        Publish several scan results in one batchPublishScans transaction.
+        
+        While the publish cooldown runs, the scans wait and are published
+        together with other pending scans of this account.
+        """
+        try:
+            records = self._to_records(scan_results)
+            sent = self._send_records(records)
             
-            # Ensure exactly 64 characters for bytes32 (32 bytes * 2 chars per byte)
-            if len(summary_hash_hex) != 64:
-                raise ZkSyncLedgerError(f"summary_hash must be exactly 32 bytes (64 hex characters), got {len(summary_hash_hex)} characters")
+            result = {
+                'success': True,
+                'transaction_hash': sent['transaction_hash'],
+                'nonce': sent['nonce'],
+                'summary_hashes': sent['summary_hashes'],
+                'count': len(records),
+                'confirmed': False,
+                'network': 'zksync'
+            }
+            if 'scans_in_transaction' in sent:
+                result['scans_in_transaction'] = sent['scans_in_transaction']
+            tx_hash = sent['transaction_hash']
             
-            summary_hash_bytes = bytes.fromhex(summary_hash_hex)
+            if wait_for_confirmation:
+                try:
+                    receipt = self._wait_for_confirmation(tx_hash)
+                    result.update({
+                        'confirmed': True,
+                        'block_number': receipt['blockNumber'],
+                        'gas_used': receipt['gasUsed']
+                    })
+                except Exception as e:
+                    result['confirmation_error'] = str(e)
+                    if isinstance(e, ZkSyncRevertError):
+                        result['reverted'] = True
             
-            # Create function call
-            function_call = self.contract.functions.publishScanSummary(
-                ledger_data['host_uid'],
-                ledger_data['scan_time'],
-                summary_hash_bytes,
-                ledger_data['score'],
-                ledger_data['report_pointer']
-            )
+            return result
+            
+        except ContractLogicError as e:
+            raise ZkSyncLedgerError(f"Contract error: {e}")
+        except Exception as e:
+            raise ZkSyncLedgerError(f"Batch publication failed: {e}")
+    
+    def publish(self, scan_result: Union[Dict[str, Any], ScanRecord], wait_for_confirmation: bool = True) -> Dict[str, Any]:
+        """Publish scan result to zkSync blockchain ledger."""
+        try:
+            # Convert scan data
+            record = self._to_records([scan_result])[0]
             
-            # Send transaction
-            tx_hash = self._send_transaction(function_call)
+            # Send transaction (after the publish cooldown, if any)
+            tx_hash = self._send_records([record])['transaction_hash']
             
             result = {
                 'success': True,
                 'transaction_hash': tx_hash,
-                'summary_hash': ledger_data['summary_hash'],
-                'host_uid': ledger_data['host_uid'],
-                'score': ledger_data['score'],
+                'summary_hash': record.summary_hash_hex,
+                'host_uid': record.host_uid,
+                'score': record.score,
                 'confirmed': False,
                 'network': 'zksync'
             }
@@ -210,6 +425,8 @@ class ZkSyncLedgerPublisher:
                 except Exception as e:
                     # Transaction sent but confirmation failed
                     result['confirmation_error'] = str(e)
+                    if isinstance(e, ZkSyncRevertError):
+                        result['reverted'] = True
             
             return result
             
@@ -242,12 +459,15 @@ class ZkSyncLedgerPublisher:
                 'connected': True,
                 'network': 'zksync',
                 'rpc_url': self.config.rpc_url,
+                'rpc_endpoints': self.w3.provider.stats() if isinstance(self.w3.provider, RpcEndpointPool) else None,
                 'contract_address': self.contract_address,
                 'account_address': self.account.address,
                 'balance_wei': balance,
                 'balance_eth': float(self.w3.from_wei(balance, 'ether')),
                 'is_publisher': getattr(self, 'is_publisher', False),
                 'is_owner': getattr(self, 'is_owner', False),
+                'publish_cooldown': self._cooldown.cooldown if self._cooldown else 0,
+                'next_publish_at': self._cooldown.eligible_at if self._cooldown else None,
                 'contract_info': contract_info
             }
             
@@ -20,6 +20,10 @@ setup(
     packages=['pgdn_publisher'],
     py_modules=['cli', '__main__'],
     install_requires=read_requirements(),
+    extras_require={
+        'async': ['aiohttp>=3.8.0'],
+        'arrow': ['pyarrow>=10.0.0'],
+    },
     entry_points={
         'console_scripts': [
             'pgdn-publisher=cli:main',
@@ -0,0 +1,115 @@
+"""
+Shared fixtures: an in-memory Walrus aggregator/publisher and a report publisher bound to it.
+"""
+
+import hashlib
+import json
+import re
+
+import pytest
+
+from pgdn_publisher.config import PublisherConfig
+from pgdn_publisher.reports import ReportPublisher
+
+
+_RANGE = re.compile(r'bytes=(\d+)-(\d+)')
+
+
+class FakeResponse:
+    """The parts of requests.Response the publisher uses."""
+
+    def __init__(self, status_code, content=b'', payload=None):
+        self.status_code = status_code
+        self.content = content
+        self._payload = payload
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self):
+        return self._payload
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class FakeWalrus:
+    """Stores blobs in memory and serves (range) reads like a Walrus aggregator."""
+
+    def __init__(self, ranges=True):
+        self.ranges = ranges
+        self.blobs = {}
+        self.requests = []
+
+    def put(self, url, data=None, headers=None, timeout=None):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        elif not isinstance(data, (bytes, bytearray)):
+            data = b''.join(data)
+        blob_id = hashlib.sha256(data).hexdigest()[:32]
+        self.blobs[blob_id] = bytes(data)
+        return FakeResponse(200, payload={'newlyCreated': {'blobObject': {'blobId': blob_id}}})
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        blob_id = url.rsplit('/', 1)[-1]
+        byte_range = (headers or {}).get('Range')
+        self.requests.append((blob_id, byte_range))
+        if blob_id not in self.blobs:
+            return FakeResponse(404, b'blob not found')
+
+        data = self.blobs[blob_id]
+        match = _RANGE.match(byte_range or '')
+        if match and self.ranges:
+            return FakeResponse(206, data[int(match.group(1)):int(match.group(2)) + 1])
+        return FakeResponse(200, data)
+
+    def head(self, url, headers=None, timeout=None):
+        return FakeResponse(200 if url.rsplit('/', 1)[-1] in self.blobs else 404)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def walrus():
+    return FakeWalrus()
+
+
+@pytest.fixture
+def make_publisher(tmp_path, walrus):
+    """Build a ReportPublisher talking to the fake Walrus, with config overrides."""
+    publishers = []
+
+    def make(**overrides):
+        settings = dict(walrus_api_key='test-key', reports_dir=str(tmp_path / 'reports'), walrus_dedup=False)
+        settings.update(overrides)
+        publisher = ReportPublisher(PublisherConfig(**settings))
+        publisher._http = walrus
+        publishers.append(publisher)
+        return publisher
+
+    yield make
+    for publisher in publishers:
+        publisher.close()
+
+
+def scan(host_uid='host-1', scan_id=1, trust_score=80, **fields):
+    """A scan result with the fields the publishers read."""
+    return dict({
+        'host_uid': host_uid,
+        'scan_id': scan_id,
+        'scan_time': 1700000000000,
+        'trust_score': trust_score,
+        'open_ports': [22, 443],
+        'vulnerabilities': [],
+        'ssl_info': {'expired': False},
+        'summary_hash': '0x' + hashlib.sha256(json.dumps([host_uid, scan_id, trust_score]).encode()).hexdigest()
+    }, **fields)
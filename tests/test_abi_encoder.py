@@ -0,0 +1,112 @@
+"""
+The precompiled ABI encoder must produce exactly what web3's contract functions produce.
+"""
+
+import pytest
+from eth_abi import encode
+from eth_account import Account
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+
+from pgdn_publisher.abi_encoder import (
+    SCAN_SUMMARY_FIELDS, compiled_function, decode_scan_summary_lookup, encode_publish,
+    encode_scan_summary_lookup, transaction_fields
+)
+from pgdn_publisher.contract_abi import CONTRACT_ABI
+
+
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + '5a' * 20)
+PRIVATE_KEY = '0x' + '42' * 32
+CHAIN_ID = 300
+
+
+class CannedProvider(JSONBaseProvider):
+    """Answers every JSON-RPC method with a fixed result."""
+
+    def __init__(self, answers):
+        super().__init__()
+        self.answers = answers
+
+    def make_request(self, method, params):
+        return {'jsonrpc': '2.0', 'id': 1, 'result': self.answers[method]}
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+
+def contract(answers=None):
+    w3 = Web3(CannedProvider(dict({'eth_chainId': hex(CHAIN_ID)}, **(answers or {}))))
+    return w3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
+
+
+def summary(n):
+    # Varying string lengths exercise the dynamic offsets and padding
+    return (f'validator-{n}' * (n % 4 + 1), 1700000000 + n, bytes([n % 256]) * 32, (n * 977) % 65536,
+            f'walrus-blob-{n}#{n * 31}' if n % 3 else '')
+
+
+def stored_summary(n):
+    return summary(n) + (('active', 'deleted')[n % 2], n * 11, 'reason ' * (n % 3), n * 7)
+
+
+@pytest.mark.parametrize('count', [1, 2, 7, 100])
+def test_publish_calldata_matches_web3(count):
+    summaries = [summary(n) for n in range(count)]
+    if count == 1:
+        expected = contract().encode_abi('publishScanSummary', args=list(summaries[0]))
+    else:
+        expected = contract().encode_abi('batchPublishScans', args=[summaries])
+
+    assert '0x' + encode_publish(summaries).hex() == expected
+
+
+@pytest.mark.parametrize('count', [1, 2, 25])
+def test_lookup_calldata_matches_web3(count):
+    hashes = [bytes([n]) * 32 for n in range(count)]
+    if count == 1:
+        expected = contract().encode_abi('scanSummaries', args=hashes)
+    else:
+        expected = contract().encode_abi('getBatchScanSummaries', args=[hashes])
+
+    assert '0x' + encode_scan_summary_lookup(hashes).hex() == expected
+
+
+@pytest.mark.parametrize('count', [1, 2, 25])
+def test_lookup_decoding_matches_web3(count):
+    rows = [stored_summary(n) for n in range(count)]
+    hashes = [row[2] for row in rows]
+    if count == 1:
+        data = encode(compiled_function('scanSummaries').output_types, rows[0])
+        call = contract({'eth_call': '0x' + data.hex()}).functions.scanSummaries(hashes[0])
+        expected = [tuple(call.call())]
+    else:
+        data = encode(compiled_function('getBatchScanSummaries').output_types, [rows])
+        call = contract({'eth_call': '0x' + data.hex()}).functions.getBatchScanSummaries(hashes)
+        expected = [tuple(row) for row in call.call()]
+
+    decoded = decode_scan_summary_lookup(data, count)
+
+    assert [tuple(row[field] for field in SCAN_SUMMARY_FIELDS) for row in decoded] == expected
+    assert expected == rows
+
+
+@pytest.mark.parametrize('count', [1, 3])
+def test_signed_transaction_matches_build_transaction(count):
+    account = Account.from_key(PRIVATE_KEY)
+    summaries = [summary(n) for n in range(count)]
+    nonce, gas, gas_price = 41, 750000, Web3.to_wei(0.25, 'gwei')
+
+    if count == 1:
+        function = contract().functions.publishScanSummary(*summaries[0])
+    else:
+        function = contract().functions.batchPublishScans(summaries)
+    built = function.build_transaction({
+        'from': account.address, 'nonce': nonce, 'gas': gas, 'gasPrice': gas_price, 'chainId': CHAIN_ID
+    })
+    fields = transaction_fields(CONTRACT_ADDRESS, encode_publish(summaries), nonce, gas, gas_price, CHAIN_ID)
+
+    assert fields == {key: value for key, value in built.items() if key != 'from'}
+    ours = account.sign_transaction(fields)
+    theirs = account.sign_transaction(built)
+    assert ours.raw_transaction == theirs.raw_transaction
+    assert ours.hash == theirs.hash
@@ -0,0 +1,129 @@
+"""
+Merkle trees, proofs and anchoring scan sets with one ledger entry.
+"""
+
+import io
+import json
+import os
+
+import pytest
+
+from pgdn_publisher.anchor import anchor_scans, verify_record
+from pgdn_publisher.config import PublisherConfig
+from pgdn_publisher.merkle import MerkleError, MerkleTree, leaf_hash, node_hash, verify_proof
+
+from conftest import scan
+
+
+class FakeRootLedger:
+    """Records the published root entry and returns a configurable result."""
+
+    def __init__(self, config, result=None, error=None):
+        self.config = config
+        self.result = result or {'success': True, 'transaction_hash': '0xroot', 'confirmed': True}
+        self.error = error
+        self.published = []
+
+    def publish(self, scan_result, wait_for_confirmation=True):
+        self.published.append(scan_result)
+        if self.error is not None:
+            raise self.error
+        return dict(self.result)
+
+
+def naive_root(summary_hashes):
+    level = [leaf_hash(value) for value in summary_hashes]
+    while len(level) > 1:
+        pairs = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        level = pairs + ([level[-1]] if len(level) % 2 else [])
+    return level[0]
+
+
+def hashes(count):
+    return [bytes([n % 256, n // 256]) * 16 for n in range(count)]
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 4, 5, 7, 8, 9, 16, 17, 33])
+def test_every_proof_verifies_at_odd_and_power_of_two_sizes(tmp_path, count):
+    summary_hashes = hashes(count)
+
+    with MerkleTree.build(iter(summary_hashes), str(tmp_path / 'tree')) as tree:
+        assert tree.root == naive_root(summary_hashes)
+        proofs = list(tree.proofs())
+        assert proofs == [tree.proof(index) for index in range(count)]
+        root = tree.root
+
+    for summary_hash, proof in zip(summary_hashes, proofs):
+        assert verify_proof(summary_hash, proof, root)
+    # A proof does not carry over to another leaf or position
+    if count > 1:
+        assert not verify_proof(summary_hashes[0], proofs[1], root)
+        proofs[-1].leaf_index = count
+        assert not verify_proof(summary_hashes[-1], proofs[-1], root)
+
+
+def test_empty_tree_is_an_error(tmp_path):
+    with pytest.raises(MerkleError):
+        MerkleTree.build(iter([]), str(tmp_path / 'tree'))
+
+
+def anchor_config(tmp_path):
+    return PublisherConfig(reports_dir=str(tmp_path / 'reports'))
+
+
+def anchor(ledger, scans):
+    output = io.StringIO()
+    counts = anchor_scans(ledger, scans, output)
+    return counts, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_anchored_scans_get_verifiable_proofs(tmp_path):
+    ledger = FakeRootLedger(anchor_config(tmp_path))
+    scans = [scan(host_uid=f'host-{n}', scan_id=n) for n in range(5)] + [scan(scan_id=9, summary_hash='0x12')]
+
+    counts, records = anchor(ledger, scans)
+
+    assert counts['published'] == 5 and counts['failed'] == 1
+    assert ledger.published[0]['summary_hash'] == counts['root']
+    assert os.path.exists(counts['manifest'])
+    proofs = [record for record in records if record['success']]
+    assert [record['leaf_index'] for record in proofs] == list(range(5))
+    assert all(verify_record(record) for record in proofs)
+    assert not verify_record(dict(proofs[0], summary_hash=proofs[1]['summary_hash']))
+
+
+@pytest.mark.parametrize('result', [
+    {'success': True, 'transaction_hash': '0xroot', 'confirmed': False,
+     'confirmation_error': 'Transaction reverted: 0xroot', 'reverted': True},
+    {'success': True, 'transaction_hash': '0xroot', 'confirmed': False,
+     'confirmation_error': 'Transaction confirmation failed: timed out'},
+])
+def test_unconfirmed_root_fails_every_scan(tmp_path, result):
+    counts, records = anchor(FakeRootLedger(anchor_config(tmp_path), result=result), [scan(scan_id=n) for n in range(3)])
+
+    assert counts == {'published': 0, 'failed': 3}
+    assert all(not record['success'] and 'proof' not in record for record in records)
+    assert records[0]['transaction_hash'] == '0xroot'
+    assert 'not confirmed' in records[0]['error']
+
+
+def test_manifest_storage_failure_fails_every_scan(tmp_path):
+    config = anchor_config(tmp_path)
+    config.anchor_manifest_destination = 'ipfs'
+    ledger = FakeRootLedger(config)
+
+    counts, records = anchor(ledger, [scan(scan_id=n) for n in range(4)])
+
+    assert counts == {'published': 0, 'failed': 4}
+    assert [record['index'] for record in records] == [0, 1, 2, 3]
+    assert 'Unsupported manifest destination' in records[0]['error']
+    assert not ledger.published
+
+
+def test_root_publication_error_fails_every_scan(tmp_path):
+    ledger = FakeRootLedger(anchor_config(tmp_path), error=RuntimeError('nonce too low'))
+
+    counts, records = anchor(ledger, [scan(scan_id=n) for n in range(2)])
+
+    assert counts == {'published': 0, 'failed': 2}
+    assert records[0]['error'] == 'Anchor publication failed: nonce too low'
@@ -0,0 +1,101 @@
+"""
+AsyncReportPublisher retrieval, sharing its logic with ReportPublisher.
+"""
+
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web
+
+from pgdn_publisher.async_reports import AsyncReportPublisher
+from pgdn_publisher.config import PublisherConfig
+
+from conftest import scan
+
+
+def async_publisher(walrus, tmp_path, **overrides):
+    """An AsyncReportPublisher reading from the fake Walrus."""
+    settings = dict(walrus_api_key='test-key', reports_dir=str(tmp_path / 'reports'), walrus_dedup=False)
+    settings.update(overrides)
+    publisher = AsyncReportPublisher(PublisherConfig(**settings))
+
+    async def fetch_blob(blob_id, byte_range=None):
+        headers = {}
+        if byte_range is not None:
+            offset, length = byte_range
+            headers['Range'] = f'bytes={offset}-{offset + length - 1}'
+        response = walrus.get(f'/v1/{blob_id}', headers=headers)
+        assert response.status_code in (200, 206)
+        return response.content, response.status_code == 206
+
+    publisher._fetch_blob = fetch_blob
+    return publisher
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'walrus_compression': 'gzip'},
+    {'report_layout': 'sectioned'},
+    {'report_delta_mode': 'diff'},
+    {'report_delta_mode': 'unchanged', 'report_layout': 'sectioned'},
+])
+def test_async_retrieval_matches_sync(make_publisher, walrus, tmp_path, overrides):
+    publisher = make_publisher(**overrides)
+    publisher.publish(scan(trust_score=30))
+    blob_id = publisher.publish(scan(trust_score=30 if 'unchanged' in str(overrides) else 70))['walrus'].identifier
+    bundled = publisher.publish_bundle([scan(scan_id=n) for n in range(3)], ['walrus'])[1]['walrus'].identifier
+
+    async def retrieve():
+        reader = async_publisher(walrus, tmp_path, **overrides)
+        try:
+            return (
+                await reader.retrieve_from_walrus(blob_id),
+                await reader.retrieve_section(blob_id, 'security_assessment'),
+                await reader.retrieve_section(bundled, 'scan_metadata'),
+            )
+        finally:
+            await reader.close()
+
+    report, assessment, metadata = asyncio.run(retrieve())
+
+    assert report == publisher.retrieve_from_walrus(blob_id)
+    assert assessment == publisher.retrieve_section(blob_id, 'security_assessment')
+    assert metadata['scan_id'] == 1
+
+
+def test_retrieve_stream_releases_its_slot_before_yielding(tmp_path):
+    body = b'x' * (256 * 1024)
+
+    async def blob(request):
+        return web.Response(body=body)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/v1/{blob_id}', blob)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        publisher = AsyncReportPublisher(PublisherConfig(
+            walrus_api_key='test-key',
+            walrus_api_url=f'http://127.0.0.1:{port}',
+            reports_dir=str(tmp_path)
+        ), max_connections=4, max_concurrency=1)
+        try:
+            stream = publisher.retrieve_stream('slow', chunk_size=1024)
+            first = await stream.__anext__()
+            # The stream is paused mid-body; another request must still get through
+            content, partial = await asyncio.wait_for(publisher._fetch_blob('other'), 5)
+            rest = b''.join([chunk async for chunk in stream])
+        finally:
+            await publisher.close()
+            await runner.cleanup()
+        return first + rest, content
+
+    streamed, content = asyncio.run(run())
+    assert streamed == body
+    assert content == body
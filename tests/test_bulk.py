@@ -0,0 +1,260 @@
+"""
+Bulk NDJSON publishing: per-line failures, reverted batches and account grouping.
+"""
+
+import io
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pgdn_publisher.bulk import (
+    _as_completed, _by_account, publish_ledger, publish_ledger_batches, publish_reports, read_scans
+)
+from pgdn_publisher.config import PublisherConfig
+from pgdn_publisher.ledger import LedgerPublisher
+from pgdn_publisher.records import ScanRecord
+from pgdn_publisher.scan_reader import InvalidScan, parse_chunk, read_scan_file
+from pgdn_publisher.sui_ledger import SuiLedgerError
+from pgdn_publisher.validation import scan_records
+
+from conftest import scan
+
+
+class FakeBatchLedger:
+    """Publishes batches in memory; batches containing a host in revert are mined but revert."""
+
+    supports_signing = True
+    has_publish_cooldown = False
+
+    def __init__(self, accounts=1, revert=(), unconfirmed=False):
+        self.config = SimpleNamespace(network='zksync', publish_cooldown_max_batch=50)
+        self.account_count = accounts
+        self.revert = set(revert)
+        self.unconfirmed = unconfirmed
+        self.batches = []
+        self.records = []
+
+    def account_for(self, host_uid):
+        return int(host_uid.rsplit('-', 1)[1]) % self.account_count
+
+    def publish_batch(self, records, wait_for_confirmation=True):
+        self.batches.append([record.host_uid for record in records])
+        self.records.extend(records)
+        result = {
+            'success': True,
+            'transaction_hash': f'0x{len(self.batches):064x}',
+            'summary_hashes': [record.summary_hash_hex for record in records],
+            'count': len(records),
+            'confirmed': True,
+            'network': 'zksync'
+        }
+        if any(record.host_uid in self.revert for record in records):
+            result.update(confirmed=False, confirmation_error='Transaction reverted', reverted=True)
+        elif self.unconfirmed:
+            result.update(confirmed=False, confirmation_error='Transaction confirmation failed: timed out')
+        return result
+
+
+class FakeSuiBackend:
+    """Publishes scans one at a time, failing for the hosts in fail."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def publish(self, record, wait_for_confirmation=True):
+        self.calls.append(record.host_uid)
+        if record.host_uid in self.fail:
+            raise SuiLedgerError(f'{record.host_uid} rejected')
+        return {'success': True, 'transaction_hash': f'tx-{len(self.calls)}', 'network': 'sui'}
+
+
+def results(output):
+    return {record['index']: record for record in map(json.loads, output.getvalue().splitlines())}
+
+
+def test_read_scans_marks_invalid_lines():
+    lines = [json.dumps(scan()), '{not json', '', '[1, 2]', json.dumps(scan(scan_id=2))]
+
+    scans = list(read_scans(lines, keep_invalid=True))
+
+    assert [type(item) for item in scans] == [dict, InvalidScan, InvalidScan, dict]
+    assert 'line 2' in scans[1].error
+    assert 'not a JSON object' in scans[2].error
+    with pytest.raises(ValueError, match='line 2'):
+        list(read_scans(lines))
+
+
+def test_parse_chunk_keeps_going_after_a_bad_line(tmp_path):
+    path = tmp_path / 'scans.ndjson'
+    path.write_text('{"scan_id": 1}\n{broken\n"text"\n{"scan_id": 2}\n')
+
+    scans = parse_chunk(str(path), 0, path.stat().st_size)
+
+    assert scans[0] == {'scan_id': 1} and scans[3] == {'scan_id': 2}
+    assert 'byte 15' in scans[1].error
+    assert isinstance(scans[2], InvalidScan)
+
+
+def test_read_scan_file_in_parallel_keeps_invalid_lines_in_place(tmp_path):
+    path = tmp_path / 'scans.ndjson'
+    lines = [json.dumps({'scan_id': n}) if n % 5 else 'oops' for n in range(40)]
+    path.write_text('\n'.join(lines) + '\n')
+
+    scans = list(read_scan_file(str(path), workers=2, chunk_bytes=64, keep_invalid=True))
+
+    assert len(scans) == 40
+    assert all(isinstance(item, InvalidScan) == (n % 5 == 0) for n, item in enumerate(scans))
+    with pytest.raises(ValueError, match='Invalid JSON'):
+        list(read_scan_file(str(path), workers=2, chunk_bytes=64))
+
+
+def test_publish_ledger_records_invalid_lines_and_continues():
+    lines = [json.dumps(scan(host_uid='host-0')), 'garbage', json.dumps(scan(host_uid='host-1'))]
+    output = io.StringIO()
+
+    counts = publish_ledger(FakeBatchLedger(), read_scans(lines, keep_invalid=True), output, batch_size=10)
+
+    records = results(output)
+    assert counts == {'published': 2, 'failed': 1}
+    assert records[1] == {'index': 1, 'scan_id': None, 'success': False, 'error': records[1]['error']}
+    assert 'Invalid JSON on line 2' in records[1]['error']
+    assert records[0]['success'] and records[2]['success']
+
+
+def test_publish_reports_records_invalid_lines(make_publisher):
+    lines = [json.dumps(scan()), '{"unterminated": ', json.dumps(scan(scan_id=2))]
+    output = io.StringIO()
+
+    counts = publish_reports(make_publisher(), read_scans(lines, keep_invalid=True), output, ['walrus'], window=2)
+
+    assert counts == {'published': 2, 'failed': 1}
+    assert not results(output)[1]['success']
+
+
+def test_reverted_batch_is_retried_scan_by_scan():
+    ledger = FakeBatchLedger(revert={'host-2'})
+    output = io.StringIO()
+    scans = [scan(host_uid=f'host-{n}', scan_id=n) for n in range(4)]
+
+    counts = publish_ledger(ledger, scans, output, batch_size=4)
+
+    assert counts == {'published': 3, 'failed': 1}
+    assert ledger.batches == [['host-0', 'host-1', 'host-2', 'host-3'], ['host-0'], ['host-1'], ['host-2'], ['host-3']]
+    records = results(output)
+    assert not records[2]['success'] and records[2]['confirmation_error'] == 'Transaction reverted'
+    assert all(records[n]['success'] for n in (0, 1, 3))
+
+
+def test_scan_by_scan_network_does_not_publish_a_scan_twice():
+    ledger = LedgerPublisher.__new__(LedgerPublisher)
+    ledger.config = PublisherConfig(network='sui')
+    ledger._publisher = FakeSuiBackend(fail={'host-2'})
+    ledger._backend_error = SuiLedgerError
+    output = io.StringIO()
+
+    counts = publish_ledger(ledger, [scan(host_uid=f'host-{n}', scan_id=n) for n in range(4)], output, batch_size=4)
+
+    assert counts == {'published': 3, 'failed': 1}
+    assert ledger._publisher.calls == ['host-0', 'host-1', 'host-2', 'host-3']
+    assert results(output)[2]['error'] == 'host-2 rejected'
+
+
+def test_unconfirmed_batch_fails_its_rows_without_resending():
+    ledger = FakeBatchLedger(unconfirmed=True)
+    output = io.StringIO()
+
+    counts = publish_ledger(ledger, [scan(host_uid=f'host-{n}') for n in range(3)], output, batch_size=3)
+
+    assert counts == {'published': 0, 'failed': 3}
+    assert len(ledger.batches) == 1
+
+
+def test_a_hosts_batches_are_published_in_input_order():
+    events = []
+
+    class SlowLedger(FakeBatchLedger):
+        def publish_batch(self, records, wait_for_confirmation=True):
+            label = ','.join(f'{record.host_uid}/{record.score}' for record in records)
+            events.append(('start', label))
+            time.sleep(0.1 if label == 'host-0/1' else 0.01)
+            events.append(('end', label))
+            return super().publish_batch(records, wait_for_confirmation)
+
+    scans = [scan(host_uid='host-0', trust_score=1), scan(host_uid='host-1', trust_score=1),
+             scan(host_uid='host-0', trust_score=2), scan(host_uid='host-2', trust_score=1)]
+
+    counts = publish_ledger(SlowLedger(), scans, io.StringIO(), batch_size=1, window=4)
+
+    assert counts == {'published': 4, 'failed': 0}
+    assert events.index(('start', 'host-0/2')) > events.index(('end', 'host-0/1'))
+    # Batches of other hosts are not held back
+    assert events.index(('end', 'host-1/1')) < events.index(('end', 'host-0/1'))
+    assert events.index(('end', 'host-2/1')) < events.index(('end', 'host-0/1'))
+
+
+def test_in_flight_results_are_kept_when_the_input_fails():
+    def items():
+        yield from range(3)
+        raise ValueError('input closed')
+
+    def slow(item):
+        time.sleep(0.05)
+        return item * 2
+
+    seen = []
+    with pytest.raises(ValueError, match='input closed'):
+        for item, result, error in _as_completed(slow, items(), window=8):
+            seen.append((item, result))
+
+    assert sorted(seen) == [(0, 0), (1, 2), (2, 4)]
+
+
+def test_by_account_groups_rows_into_full_single_account_batches():
+    ledger = FakeBatchLedger(accounts=2)
+
+    def batch(*hosts):
+        return (list(hosts), list(hosts), [SimpleNamespace(host_uid=f'host-{host}') for host in hosts])
+
+    batches = [batch(0, 1, 2, 3), batch(4), batch(6), batch(5), batch(8), batch()]
+
+    grouped = [indexes for indexes, _, _ in _by_account(ledger, batches, batch_size=2)]
+
+    # host-5 waits account_count batches for a partner, host-8 is flushed at the end
+    assert grouped == [[0, 2], [1, 3], [4, 6], [5], [8]]
+
+
+def test_bulk_ndjson_reaches_the_ledger_as_records():
+    scans = [scan(host_uid=f'host-{n}', scan_id=n, trust_score=n * 20, report_pointer=f'walrus:{n}') for n in range(5)]
+    lines = [json.dumps(data) for data in scans]
+    ledger = FakeBatchLedger()
+
+    counts = publish_ledger(ledger, read_scans(lines), io.StringIO(), batch_size=2)
+
+    assert counts == {'published': 5, 'failed': 0}
+    assert all(type(record) is ScanRecord for record in ledger.records)
+    expected = scan_records(scans, 'zksync')
+    assert sorted(ledger.records, key=lambda record: record.host_uid) == expected
+
+
+def test_bulk_arrow_batches_reach_the_ledger_as_the_same_records():
+    pa = pytest.importorskip('pyarrow')
+    scans = [scan(host_uid=f'host-{n}', scan_id=n, trust_score=n * 20, report_pointer=f'walrus:{n}') for n in range(5)]
+    columns = {name: [data[name] for data in scans]
+               for name in ('host_uid', 'scan_id', 'scan_time', 'summary_hash', 'trust_score', 'report_pointer')}
+    from_lines, from_arrow = FakeBatchLedger(), FakeBatchLedger()
+
+    publish_ledger(from_lines, read_scans(json.dumps(data) for data in scans), io.StringIO(), batch_size=2)
+    output = io.StringIO()
+    counts = publish_ledger_batches(from_arrow, [pa.record_batch(columns)], output, batch_size=2)
+
+    assert counts == {'published': 5, 'failed': 0}
+    assert sorted(record['host_uid'] for record in results(output).values()) == [data['host_uid'] for data in scans]
+
+    def by_host(records):
+        return sorted(records, key=lambda record: record.host_uid)
+
+    # Both inputs leave scan_time (ms) to the same seconds normalization
+    assert by_host(from_arrow.records) == by_host(from_lines.records)
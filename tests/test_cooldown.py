@@ -0,0 +1,171 @@
+"""
+Holding an account's transactions until its publish cooldown has passed.
+"""
+
+import threading
+import time
+
+import pytest
+
+from pgdn_publisher.cooldown import CooldownScheduler
+from pgdn_publisher.records import ScanRecord
+
+
+def record(n):
+    return ScanRecord(f'host-{n}', 1700000000 + n, bytes([n]) * 32, n, f'blob-{n}')
+
+
+class Sender:
+    """Signs and broadcasts nothing; returns results like ZkSyncLedgerPublisher._sign_and_broadcast."""
+
+    def __init__(self):
+        self.transactions = []
+
+    def __call__(self, records):
+        self.transactions.append([item.host_uid for item in records])
+        return {
+            'transaction_hash': f'0x{len(self.transactions):064x}',
+            'nonce': len(self.transactions) - 1,
+            'summary_hashes': [item.summary_hash_hex for item in records]
+        }
+
+
+def submit_all(scheduler, send, groups):
+    """Submit each group from its own thread, in order, and return their results."""
+    results = [None] * len(groups)
+
+    def submit(position):
+        results[position] = scheduler.submit(groups[position], send)
+
+    threads = []
+    for position in range(len(groups)):
+        queued = len(scheduler._queue)
+        thread = threading.Thread(target=submit, args=(position,))
+        thread.start()
+        threads.append(thread)
+        while len(scheduler._queue) == queued and thread.is_alive():
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def test_callers_waiting_out_the_cooldown_share_one_transaction():
+    scheduler = CooldownScheduler(cooldown=10, last_publish=time.time() - 9.7, margin=0)
+    send = Sender()
+    groups = [[record(0), record(1)], [record(2)], [record(3), record(4), record(5)]]
+
+    results = submit_all(scheduler, send, groups)
+
+    assert send.transactions == [[f'host-{n}' for n in range(6)]]
+    for group, result in zip(groups, results):
+        assert result['summary_hashes'] == [item.summary_hash_hex for item in group]
+        assert result['scans_in_transaction'] == 6
+        assert result['transaction_hash'] == f'0x{1:064x}'
+
+
+def test_merged_transactions_respect_max_batch_and_arrival_order():
+    scheduler = CooldownScheduler(cooldown=10, last_publish=time.time() - 9.7, margin=0, max_batch=3)
+    send = Sender()
+    groups = [[record(0), record(1)], [record(2)], [record(3), record(4)], [record(5)]]
+
+    def send_and_shorten(records):
+        # The second transaction would otherwise wait out a full cooldown
+        scheduler.cooldown = 0
+        return send(records)
+
+    results = submit_all(scheduler, send_and_shorten, groups)
+
+    assert send.transactions == [['host-0', 'host-1', 'host-2'], ['host-3', 'host-4', 'host-5']]
+    assert [result['scans_in_transaction'] for result in results] == [3, 3, 3, 3]
+
+
+def test_failed_send_reaches_every_merged_caller():
+    scheduler = CooldownScheduler(cooldown=10, last_publish=time.time() - 9.8, margin=0)
+
+    def send(records):
+        raise RuntimeError('nonce too low')
+
+    errors = []
+
+    def submit(n):
+        try:
+            scheduler.submit([record(n)], send)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=submit, args=(n,)) for n in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert errors == ['nonce too low'] * 3
+    assert scheduler._last_publish < time.time() - 9
+
+
+def test_cooldown_counts_from_the_block_timestamp():
+    broadcast = time.time()
+    mined = []
+
+    def block_time(tx_hash):
+        mined.append(tx_hash)
+        return broadcast + 30  # included well after it was sent
+
+    scheduler = CooldownScheduler(cooldown=60, margin=1, block_time=block_time)
+    assert scheduler.is_eligible()
+
+    scheduler.submit([record(0)], Sender())
+
+    # Not eligible until the previous transaction is known to be mined
+    assert not scheduler.is_eligible()
+    assert mined == []
+    scheduler._settle()
+    assert mined == [f'0x{1:064x}']
+    assert scheduler.eligible_at == broadcast + 30 + 60 + 1
+
+
+def test_next_send_waits_for_the_previous_transaction():
+    released = threading.Event()
+    order = []
+
+    def block_time(tx_hash):
+        released.wait(5)
+        order.append(('mined', tx_hash))
+        return time.time() - 100  # long enough ago that the cooldown has passed
+
+    scheduler = CooldownScheduler(cooldown=10, margin=0, block_time=block_time)
+
+    def send():
+        order.append(('sent', len(order)))
+        return f'0x{len(order):064x}'
+
+    scheduler.run(send)
+    second = threading.Thread(target=scheduler.run, args=(send,))
+    second.start()
+    time.sleep(0.05)
+    assert [event for event, _ in order] == ['sent']
+    released.set()
+    second.join(5)
+
+    assert [event for event, _ in order] == ['sent', 'mined', 'sent']
+
+
+@pytest.mark.parametrize('outcome, expected', [(None, 1000.0), (RuntimeError('timeout'), None)])
+def test_reverted_or_unknown_previous_transaction(outcome, expected):
+    def block_time(tx_hash):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    scheduler = CooldownScheduler(cooldown=10, last_publish=1000.0, margin=0, block_time=block_time)
+    scheduler.run(lambda: '0xabc')
+    before = time.time()
+    scheduler._settle()
+
+    if expected is None:
+        # Unknown: counted from now, never earlier than the broadcast
+        assert scheduler._last_publish >= before
+    else:
+        # A reverted transaction did not move the contract's lastPublishTime
+        assert scheduler._last_publish == expected
@@ -0,0 +1,117 @@
+"""
+Publisher daemon: request dispatch, the per-network ledger lock and the socket round trip.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import cli
+from pgdn_publisher.daemon import PublisherDaemon, PublisherPool, call_daemon, config_fingerprint
+
+from conftest import scan
+
+
+class FakeLedger:
+    """Answers status and publishes instantly."""
+
+    def __init__(self):
+        self.published = []
+
+    def get_status(self):
+        return {'connected': True, 'network': 'zksync'}
+
+    def publish(self, scan_result, wait_for_confirmation=True):
+        self.published.append(scan_result)
+        return {'success': True, 'transaction_hash': '0xabc'}
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setenv('PGDN_NETWORK', 'zksync')
+    monkeypatch.setenv('REPORTS_DIR', str(tmp_path))
+    pool = PublisherPool()
+    config = pool.config('zksync')
+    pool._publishers[('ledger', config.network)] = FakeLedger()
+    yield pool
+    pool.close()
+
+
+def request(pool, *argv):
+    return {'argv': ['--network', 'zksync', *argv], 'fingerprint': config_fingerprint(pool.config('zksync'))}
+
+
+def run_in_thread(function):
+    thread = threading.Thread(target=function, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_config_is_built_once_per_network(pool):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        configs = list(executor.map(pool.config, ['sui'] * 16))
+
+    assert all(config is configs[0] for config in configs)
+    assert configs[0].network == 'sui'
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['ledger', '--scan-data', '{}', '--bogus'], 'unrecognized arguments: --bogus'),
+    (['ledger'], 'one of the arguments --scan-data --scan-file is required'),
+    (['--help'], 'exited with status 0'),
+])
+def test_argument_errors_are_returned_to_the_client(pool, argv, message):
+    response = cli.dispatch_request(request(pool, *argv), pool)
+
+    assert response['forwarded'] is False
+    assert message in response['error']
+
+
+def test_status_does_not_wait_for_ledger_transactions(pool):
+    responses = []
+    with pool.network_lock('zksync'):
+        thread = run_in_thread(lambda: responses.append(cli.dispatch_request(request(pool, 'status'), pool)))
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+    assert responses[0]['result']['status']['connected'] is True
+
+
+def test_ledger_requests_wait_for_the_network_lock(pool):
+    responses = []
+    scan_data = json.dumps(scan())
+    with pool.network_lock('zksync'):
+        thread = run_in_thread(
+            lambda: responses.append(cli.dispatch_request(request(pool, 'ledger', '--scan-data', scan_data), pool))
+        )
+        thread.join(timeout=0.2)
+        assert thread.is_alive()
+
+    thread.join(timeout=5)
+    assert responses[0]['result']['success']
+    assert len(pool.ledger(pool.config('zksync')).published) == 1
+
+
+def test_mismatched_configuration_is_declined(pool):
+    response = cli.dispatch_request(dict(request(pool, 'status'), fingerprint='other'), pool)
+
+    assert response == {'forwarded': False, 'error': "Client configuration differs from the daemon's"}
+
+
+def test_requests_round_trip_over_the_socket(pool, tmp_path):
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = PublisherDaemon(socket_path, lambda message: cli.dispatch_request(message, pool))
+    thread = run_in_thread(server.serve_forever)
+    try:
+        response = call_daemon(request(pool, 'status'), socket_path)
+        declined = call_daemon(request(pool, 'ledger', '--scan-data', '{}', '--bogus'), socket_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+    assert response['forwarded'] and response['result']['command'] == 'status'
+    assert 'unrecognized arguments' in declined['error']
+    assert call_daemon(request(pool, 'status'), socket_path) is None
@@ -0,0 +1,74 @@
+"""
+Import-time budgets for pgdn_publisher and the CLI.
+
+Each scenario is imported in fresh interpreters and the best run is compared
+with its budget; scenarios that must not load web3 fail if they do.
+IMPORT_TIME_SCALE multiplies every budget (e.g. 3 on slow machines) and
+``off`` skips the timing checks, keeping only the loaded-module checks.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 3
+
+# name: (statements to time, budget in milliseconds, modules that must stay unloaded, modules required)
+SCENARIOS = {
+    'package': ('import pgdn_publisher', 50, ('web3', 'requests'), ()),
+    'config': ('from pgdn_publisher import PublisherConfig', 50, ('web3', 'requests'), ()),
+    'cli': ('import cli', 80, ('web3', 'requests'), ()),
+    'cli report': ('import cli\nfrom pgdn_publisher.reports import publish_report', 400, ('web3', 'eth_account'), ('requests',)),
+    'cli retrieve': ('import cli\nfrom pgdn_publisher.reports import ReportPublisher', 400, ('web3', 'eth_account'), ('requests',)),
+    'cli ledger (sui)': ('import cli\nfrom pgdn_publisher.ledger import LedgerPublisher', 150, ('web3', 'eth_account'), ()),
+    'cli ledger (zksync)': ('import cli\nfrom pgdn_publisher.zksync_ledger import ZkSyncLedgerPublisher', 3000, (), ('web3',)),
+}
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+exec({statements!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def budget_scale():
+    value = os.getenv('IMPORT_TIME_SCALE', '1')
+    return None if value.lower() == 'off' else float(value)
+
+
+def measure(statements, forbidden, runs):
+    """Best import time in milliseconds over runs, and forbidden modules that were loaded."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.getenv('PYTHONPATH')])))
+    best, loaded = None, []
+    for _ in range(runs):
+        probe = _PROBE.format(statements=statements, forbidden=tuple(forbidden))
+        output = subprocess.run(
+            [sys.executable, '-c', probe], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        best = sample['ms'] if best is None else min(best, sample['ms'])
+        loaded = sample['loaded']
+    return best, loaded
+
+
+@pytest.mark.parametrize('name', list(SCENARIOS))
+def test_import_stays_within_budget(name):
+    statements, budget, forbidden, required = SCENARIOS[name]
+    missing = [module for module in required if importlib.util.find_spec(module) is None]
+    if missing:
+        pytest.skip(f"{', '.join(missing)} not installed")
+    scale = budget_scale()
+
+    elapsed, loaded = measure(statements, forbidden, RUNS if scale is not None else 1)
+
+    assert not loaded, f"{name} loaded {', '.join(loaded)}"
+    if scale is not None:
+        assert elapsed <= budget * scale, f"{name} took {elapsed:.1f} ms (budget {budget * scale:.0f} ms)"
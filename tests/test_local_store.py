@@ -0,0 +1,124 @@
+"""
+Segmented local store: appends, rotation, expiry and compaction.
+"""
+
+import dataclasses
+import os
+import time
+from types import SimpleNamespace
+
+from pgdn_publisher.local_store import SegmentStore
+
+from conftest import scan
+
+
+def report(uid, scan_id, size=100):
+    return {'uid': uid, 'scan_metadata': {'scan_id': scan_id}, 'padding': 'x' * size}
+
+
+def segment_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.log'))
+
+
+def test_append_and_lookup_survive_reopening(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    path, offset, length = store.append(report('r1', 1))
+    store.append(report('r2', 2))
+    store.append(report('r1-again', 1))
+    store.close()
+
+    # Without its sidecar index the segment is scanned again
+    os.remove(tmp_path / 'segment_00000001.idx')
+    reopened = SegmentStore(str(tmp_path))
+
+    assert reopened.get('r2')['scan_metadata']['scan_id'] == 2
+    assert reopened.get_by_scan_id(1)['uid'] == 'r1-again'
+    assert reopened.read_at(1, offset, length)['uid'] == 'r1'
+    assert reopened.get('missing') is None
+    reopened.close()
+
+
+def test_appends_rotate_into_new_segments(tmp_path):
+    store = SegmentStore(str(tmp_path), segment_max_bytes=400)
+    locations = [store.append(report(f'r{n}', n)) for n in range(6)]
+
+    assert len(segment_files(tmp_path)) == 3
+    assert [os.path.basename(path) for path, _, _ in locations[:3]] == ['segment_00000001.log'] * 2 + ['segment_00000002.log']
+    assert [store.get(f'r{n}')['uid'] for n in range(6)] == [f'r{n}' for n in range(6)]
+    store.close()
+
+
+def test_expire_drops_old_sealed_segments_only(tmp_path):
+    store = SegmentStore(str(tmp_path), segment_max_bytes=400)
+    for n in range(6):
+        store.append(report(f'r{n}', n))
+    old = time.time() - 7200
+    for name in segment_files(tmp_path):
+        os.utime(tmp_path / name, (old, old))
+
+    assert store.expire(3600) == 2
+
+    assert segment_files(tmp_path) == ['segment_00000003.log']
+    assert store.get('r0') is None and store.get_by_scan_id(0) is None
+    assert store.get('r5')['uid'] == 'r5'
+    store.close()
+
+
+def test_compact_rewrites_mostly_superseded_segments(tmp_path):
+    store = SegmentStore(str(tmp_path), segment_max_bytes=400)
+    store.append(report('kept', 1))
+    for n in range(5):
+        store.append(report('updated', 2, size=100 + n))
+
+    assert store.compact(min_dead_ratio=0.5) == 2
+
+    assert store.get('kept')['uid'] == 'kept'
+    assert store.get_by_scan_id(2)['padding'] == 'x' * 104
+    store.close()
+    reopened = SegmentStore(str(tmp_path))
+    assert reopened.get('kept')['uid'] == 'kept'
+    assert reopened.get('updated')['padding'] == 'x' * 104
+    reopened.close()
+
+
+def test_compact_drops_records_past_their_age(tmp_path):
+    store = SegmentStore(str(tmp_path), segment_max_bytes=400)
+    store._append_record('old', '1', ('{"uid": "old", "padding": "%s"}' % ('x' * 200)).encode(), time.time() - 7200)
+    store.append(report('new', 2))
+    store.append(report('active', 3, size=300))
+
+    assert store.compact(max_age_seconds=3600) == 1
+
+    assert store.get('old') is None
+    assert store.get('new')['uid'] == 'new'
+    store.close()
+
+
+def test_rotation_compacts_superseded_segments(tmp_path):
+    store = SegmentStore(str(tmp_path), segment_max_bytes=400, compact_dead_ratio=0.5)
+    for n in range(12):
+        store.append(report('updated', 1, size=100 + n))
+
+    # Superseded segments are rewritten as the store rotates instead of piling up
+    assert len(segment_files(tmp_path)) <= 2
+    assert store.get('updated')['padding'] == 'x' * 111
+    store.close()
+
+
+def test_compact_store_command(make_publisher):
+    import cli
+
+    publisher = make_publisher(local_store_backend='segments', segment_max_bytes=2000, segment_compact_ratio=None)
+    for n in range(6):
+        publisher.publish(scan(scan_id=1, trust_score=n), ['local_file'])
+    publisher.close()
+    segments = segment_files(os.path.join(publisher.config.reports_dir, 'segments'))
+    assert len(segments) > 2
+    args = SimpleNamespace(command='compact-store')
+
+    result = cli.run_command(args, dataclasses.replace(publisher.config, segment_compact_ratio=0.5))
+
+    assert result == {'success': True, 'command': 'compact-store', 'expired': 0, 'compacted': len(segments) - 1}
+    reopened = make_publisher(local_store_backend='segments')
+    assert reopened.retrieve_from_local_store('1')['security_assessment']['trust_score'] == 5
+    assert not cli.run_command(args, make_publisher().config)['success']
@@ -0,0 +1,174 @@
+"""
+Outbox storage, the single-worker lease and recovery after a worker restart.
+"""
+
+import logging
+import threading
+
+import pytest
+
+from pgdn_publisher.config import PublisherConfig
+from pgdn_publisher.outbox import (
+    CONFIRMED, ENQUEUE_CHUNK, PENDING, SIGNED, STORED, Outbox, OutboxError, OutboxWorker
+)
+
+from conftest import scan
+
+
+class FakeSigningLedger:
+    """A ledger whose nonces and mined transactions are tracked in memory."""
+
+    supports_signing = True
+
+    def __init__(self):
+        self.signed = []
+        self.broadcasts = []
+        self.mined = set()
+        self.unreachable = False
+
+    def partition(self, scan_results):
+        return [list(range(len(scan_results)))]
+
+    def sign_publish(self, scan_results):
+        nonce = len(self.signed)
+        self.signed.append(list(scan_results))
+        return {
+            'transaction_hash': f'0x{nonce:064x}',
+            'nonce': nonce,
+            'raw_transaction': f'0xraw{nonce}'
+        }
+
+    def broadcast_transaction(self, raw_transaction):
+        if self.unreachable:
+            raise ConnectionError('node unreachable')
+        self.broadcasts.append(raw_transaction)
+        tx_hash = f"0x{int(raw_transaction[len('0xraw'):]):064x}"
+        self.mined.add(tx_hash)
+        return tx_hash
+
+    def transaction_state(self, tx_hash, nonce, raw_transaction=None):
+        return 'mined' if tx_hash in self.mined else 'unsent'
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.mined:
+            return None
+        return {'status': 1, 'blockNumber': 7, 'gasUsed': 21000}
+
+
+def make_worker(path, ledger):
+    config = PublisherConfig(outbox_path=str(path), outbox_batch_size=10, outbox_poll_interval=0.0)
+    return OutboxWorker(config, outbox=Outbox(str(path)), ledger_publisher=ledger, store_reports=False)
+
+
+def pointed_scan(n):
+    return scan(host_uid=f'host-{n}', scan_id=n, report_pointer=f'blob-{n}')
+
+
+def test_enqueue_many_reads_the_input_in_chunks(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite'))
+    consumed = []
+
+    def scans():
+        for n in range(ENQUEUE_CHUNK + 5):
+            consumed.append(n)
+            yield {'host_uid': f'host-{n}'}
+        raise RuntimeError('input closed')
+
+    with pytest.raises(RuntimeError):
+        outbox.enqueue_many(scans())
+
+    # The complete first chunk was committed before the input failed
+    assert outbox.counts()[PENDING] == ENQUEUE_CHUNK
+    assert outbox.enqueue_many(iter([{'host_uid': 'a'}, {'host_uid': 'b'}])) == 2
+    outbox.close()
+
+
+def test_restarted_worker_resends_the_signed_transaction(tmp_path):
+    path = tmp_path / 'outbox.sqlite'
+    ledger = FakeSigningLedger()
+    worker = make_worker(path, ledger)
+    worker.outbox.enqueue_many([pointed_scan(n) for n in range(3)])
+
+    ledger.unreachable = True
+    worker.run_once()
+    assert worker.outbox.counts()[SIGNED] == 3
+    worker.close()
+
+    # A new process opens the same outbox once the node is back
+    ledger.unreachable = False
+    restarted = make_worker(path, ledger)
+    progress = restarted.run_once()
+
+    assert progress['recovered'] == 3
+    assert progress['confirmed'] == 3
+    assert restarted.outbox.counts()[CONFIRMED] == 3
+    assert len(ledger.signed) == 1
+    assert ledger.broadcasts == ['0xraw0']
+    assert restarted.outbox.get(1).result['transaction_hash'] == f'0x{0:064x}'
+    restarted.close()
+
+
+def test_only_one_worker_drains_an_outbox(tmp_path):
+    path = tmp_path / 'outbox.sqlite'
+    first = make_worker(path, FakeSigningLedger())
+    second = make_worker(path, FakeSigningLedger())
+
+    first.run_once()
+    with pytest.raises(OutboxError, match='Another worker'):
+        second.run_once()
+
+    first.close()
+    second.run_once()
+    second.close()
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    outbox = Outbox(str(tmp_path / 'outbox.sqlite'))
+
+    assert outbox.acquire_worker('crashed', lease=-1)
+    assert outbox.acquire_worker('next')
+    assert not outbox.acquire_worker('crashed')
+    outbox.close()
+
+
+def test_run_backs_off_after_errors(tmp_path, caplog):
+    worker = make_worker(tmp_path / 'outbox.sqlite', FakeSigningLedger())
+    stop = threading.Event()
+    passes = []
+
+    def run_once():
+        passes.append(len(passes))
+        if len(passes) == 3:
+            stop.set()
+        raise OutboxError('database is locked')
+
+    worker.run_once = run_once
+    with caplog.at_level(logging.WARNING, logger='pgdn_publisher.outbox'):
+        worker.run(stop)
+
+    assert len(passes) == 3
+    assert worker.last_error == 'database is locked'
+    assert caplog.messages == ['Outbox worker pass failed: database is locked'] * 3
+    worker.close()
+
+
+def test_worker_stops_signing_once_its_lease_is_taken_over(tmp_path):
+    ledger = FakeSigningLedger()
+    worker = make_worker(tmp_path / 'outbox.sqlite', ledger)
+    worker.batch_size = 1
+    worker.outbox.enqueue_many([pointed_scan(n) for n in range(3)])
+    broadcast = ledger.broadcast_transaction
+
+    def slow_broadcast(raw_transaction):
+        # The lease runs out while the first transaction waits to be sent
+        worker.outbox.acquire_worker(worker.owner, lease=-1)
+        worker.outbox.acquire_worker('other')
+        return broadcast(raw_transaction)
+
+    ledger.broadcast_transaction = slow_broadcast
+    with pytest.raises(OutboxError, match='Another worker'):
+        worker.run_once()
+
+    assert len(ledger.signed) == 1
+    assert worker.outbox.counts()[STORED] == 2
+    worker.close()
@@ -0,0 +1,62 @@
+"""
+PublishPipeline with a fake ledger.
+"""
+
+import threading
+import time
+
+from pgdn_publisher.blob_map import content_hash
+from pgdn_publisher.pipeline import PublishPipeline
+
+from conftest import scan
+
+
+class RecordingLedger:
+    """Ledger publisher that records the scans it is given."""
+
+    def __init__(self):
+        self.published = []
+        self._lock = threading.Lock()
+
+    def publish(self, scan_data, wait_for_confirmation=True):
+        with self._lock:
+            self.published.append(scan_data)
+        return {'success': True, 'transaction_hash': '0x' + '00' * 32}
+
+
+def run(publisher, scans, **options):
+    ledger = RecordingLedger()
+    pipeline = PublishPipeline(publisher.config, report_publisher=publisher, ledger_publisher=ledger, **options)
+    return list(pipeline.run(scans)), ledger
+
+
+def test_default_summary_hash_matches_the_retrievable_report(make_publisher):
+    publisher = make_publisher(report_delta_mode='diff')
+    scans = [dict(scan(trust_score=score), summary_hash=None) for score in (40, 40, 90)]
+
+    for data in scans:
+        results, ledger = run(publisher, [data])
+        assert results[0].success
+        published = ledger.published[0]
+        report = publisher.retrieve_from_walrus(published['report_pointer'])
+        assert published['summary_hash'] == '0x' + content_hash(report)
+
+
+def test_walrus_workers_open_one_store_each(make_publisher, monkeypatch):
+    import pgdn_publisher.reports as reports
+
+    opened = []
+    original = reports.HostStateStore
+
+    def counting_store(path):
+        opened.append(path)
+        # Widen the window in which other workers could open a second store
+        time.sleep(0.05)
+        return original(path)
+
+    monkeypatch.setattr(reports, 'HostStateStore', counting_store)
+    publisher = make_publisher(report_delta_mode='unchanged')
+    results, _ = run(publisher, [scan(host_uid=f'host-{n}', scan_id=n) for n in range(64)], walrus_workers=16)
+
+    assert all(result.success for result in results)
+    assert len(opened) == 1
@@ -0,0 +1,98 @@
+"""
+ScanRecord construction from scan dictionaries, validated batches and Arrow batches.
+"""
+
+import pytest
+
+from pgdn_publisher.abi_encoder import SCAN_SUMMARY_FIELDS, encode_publish
+from pgdn_publisher.records import ScanRecord
+from pgdn_publisher.validation import ValidationError, scan_records, validate_scans
+
+from conftest import scan
+
+
+NOW = 1700000000
+DIGEST = bytes(range(32))
+
+
+def record(host_uid='host-1', scan_time=NOW, summary_hash=DIGEST, score=80, report_pointer='walrus:blob'):
+    return ScanRecord(host_uid, scan_time, summary_hash, score, report_pointer)
+
+
+def test_record_fields_follow_the_contract_struct():
+    data = record()
+
+    assert data.as_tuple() == ('host-1', NOW, DIGEST, 80, 'walrus:blob')
+    # Published fields come first in the struct; the rest are set by the contract
+    assert ScanRecord.__slots__ == SCAN_SUMMARY_FIELDS[:len(ScanRecord.__slots__)]
+    assert data.summary_hash_hex == '0x' + DIGEST.hex()
+    assert repr(data) == (f"ScanRecord(host_uid='host-1', scan_time={NOW}, summary_hash=0x{DIGEST.hex()}, "
+                          f"score=80, report_pointer='walrus:blob')")
+
+
+def test_records_compare_by_value_and_hold_no_other_attributes():
+    assert record() == record()
+    assert record() != record(score=81)
+    assert record() != record().as_tuple()
+    assert not hasattr(record(), '__dict__')
+    with pytest.raises(AttributeError):
+        record().trust_score = 80
+
+
+def test_scan_dictionaries_become_records():
+    data = scan(host_uid='host-7', scan_time=1700000000123, trust_score=70000, report_pointer='walrus:abc')
+
+    zksync, = scan_records([data], 'zksync')
+    sui, = scan_records([data], 'sui')
+
+    assert zksync == ScanRecord('host-7', NOW, bytes.fromhex(data['summary_hash'][2:]), 65535, 'walrus:abc')
+    assert sui.scan_time == 1700000000123
+    assert isinstance(zksync.summary_hash, bytes) and isinstance(zksync.score, int)
+
+
+def test_records_are_passed_through_in_place():
+    existing = record(host_uid='already-converted')
+    scans = [scan(host_uid='host-0'), existing, scan(host_uid='host-2')]
+
+    records = scan_records(scans, 'zksync', now=NOW)
+
+    assert [data.host_uid for data in records] == ['host-0', 'already-converted', 'host-2']
+    assert records[1] is existing
+    only_records = [existing, record()]
+    assert scan_records(only_records) == only_records
+
+
+def test_rejected_position_counts_records_before_it():
+    with pytest.raises(ValidationError, match='position 2: summary_hash is required'):
+        scan_records([record(), scan(), scan(summary_hash=None)])
+
+
+def test_validated_batch_and_arrow_batch_build_the_same_records():
+    pa = pytest.importorskip('pyarrow')
+    from pgdn_publisher.arrow_input import ledger_records, to_ledger_batch
+
+    scans = [scan(host_uid=f'host-{n}', trust_score=n * 30, report_pointer=f'walrus:{n}') for n in range(4)]
+    columns = {name: [data[name] for data in scans]
+               for name in ('host_uid', 'scan_time', 'summary_hash', 'trust_score', 'report_pointer')}
+
+    ledger_batch, rejected = to_ledger_batch(pa.record_batch(columns), network='zksync', now=NOW)
+
+    assert not rejected
+    assert ledger_records(ledger_batch) == validate_scans(scans, 'zksync', now=NOW).records()
+
+
+def test_zksync_calldata_is_the_same_for_records_and_dictionaries():
+    pytest.importorskip('web3')
+    from pgdn_publisher.zksync_ledger import ZkSyncLedgerPublisher
+
+    publisher = ZkSyncLedgerPublisher.__new__(ZkSyncLedgerPublisher)
+    publisher._sign_transaction = lambda calldata: {'calldata': calldata}
+    scans = [scan(host_uid='host-0'), scan(host_uid='host-1', trust_score=20)]
+    records = scan_records(scans, 'zksync')
+
+    from_records = publisher.sign_publish(records)
+    mixed = publisher.sign_publish([scans[0], records[1]])
+
+    assert from_records == mixed
+    assert from_records['calldata'] == encode_publish([data.as_tuple() for data in records])
+    assert from_records['summary_hashes'] == [data['summary_hash'] for data in scans]
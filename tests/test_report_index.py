@@ -0,0 +1,107 @@
+"""
+SQLite index over local reports: inserts, lookups and range/top-N queries.
+"""
+
+import json
+
+import pytest
+
+from pgdn_publisher.report_index import ReportIndex, ReportIndexError
+
+DAY = 86400
+NOW = 1700000000
+
+
+def report(uid, host_uid='host-1', scan_id=1, trust_score=80, risk_level='LOW', generated_at=NOW, validator_id='v-1'):
+    return {
+        'uid': uid,
+        'generated_at': generated_at,
+        'scan_metadata': {'scan_id': scan_id, 'host_uid': host_uid, 'validator_id': validator_id},
+        'security_assessment': {'trust_score': trust_score, 'risk_level': risk_level},
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ReportIndex(str(tmp_path / 'index.sqlite'))
+    yield index
+    index.close()
+
+
+def uids(rows):
+    return [row['uid'] for row in rows]
+
+
+def test_add_and_lookup_by_scan_id(index):
+    index.add(report('r1', scan_id=7, trust_score=35, risk_level='CRITICAL'), '/reports/r1.json')
+
+    assert index.query(scan_id=7) == [{
+        'uid': 'r1', 'scan_id': '7', 'host_uid': 'host-1', 'validator_id': 'v-1', 'trust_score': 35,
+        'risk_level': 'CRITICAL', 'generated_at': float(NOW), 'location': '/reports/r1.json',
+    }]
+    assert index.query(scan_id='7') == index.query(scan_id=7)
+    assert index.query(scan_id=8) == []
+
+
+def test_adding_a_uid_again_replaces_its_row(index):
+    index.add(report('r1', trust_score=35), 'segments:1:0:100')
+    index.add(report('r1', trust_score=90), 'segments:2:0:100')
+
+    assert [(row['trust_score'], row['location']) for row in index.query()] == [(90, 'segments:2:0:100')]
+
+
+def test_report_without_uid_is_rejected(index):
+    with pytest.raises(ReportIndexError, match='no uid'):
+        index.add(report(None), 'r.json')
+
+
+def test_iso_timestamps_are_indexed_as_unix_time(index):
+    index.add(report('r1', generated_at='2023-11-14T22:13:20+00:00'), 'r1.json')
+    index.add(report('r2', generated_at='not a time'), 'r2.json')
+
+    assert uids(index.query(since=NOW, until=NOW)) == ['r1']
+    assert {row['uid']: row['generated_at'] for row in index.query()} == {'r1': float(NOW), 'r2': None}
+
+
+def test_latest_report_per_host(index):
+    for n, host in enumerate(['host-1', 'host-2', 'host-1', 'host-2', 'host-1']):
+        index.add(report(f'r{n}', host_uid=host, generated_at=NOW + n), f'r{n}.json')
+
+    latest = {host: uids(index.query(host_uid=host, limit=1)) for host in ('host-1', 'host-2', 'host-3')}
+
+    assert latest == {'host-1': ['r4'], 'host-2': ['r3'], 'host-3': []}
+    assert uids(index.query(host_uid='host-1', descending=False)) == ['r0', 'r2', 'r4']
+
+
+def test_risk_level_in_a_time_range(index):
+    index.add(report('old', risk_level='CRITICAL', generated_at=NOW - 40 * DAY), 'old.json')
+    index.add(report('recent', risk_level='CRITICAL', generated_at=NOW - DAY), 'recent.json')
+    index.add(report('low', risk_level='LOW', generated_at=NOW - DAY), 'low.json')
+    index.add(report('other-host', host_uid='host-2', risk_level='CRITICAL', generated_at=NOW), 'other.json')
+
+    rows = index.query(host_uid='host-1', risk_level='CRITICAL', since=NOW - 30 * DAY, until=NOW)
+
+    assert uids(rows) == ['recent']
+
+
+def test_top_n_by_trust_score_within_bounds(index):
+    for n, score in enumerate([10, 95, 50, 70, 85]):
+        index.add(report(f'r{n}', trust_score=score, validator_id='v-2' if n % 2 else 'v-1'), f'r{n}.json')
+
+    assert uids(index.query(order_by='trust_score', limit=2)) == ['r1', 'r4']
+    assert uids(index.query(min_score=50, max_score=85, order_by='trust_score', descending=False)) == ['r2', 'r3', 'r4']
+    assert uids(index.query(validator_id='v-2', order_by='trust_score')) == ['r1', 'r3']
+    with pytest.raises(ReportIndexError, match='Cannot order by'):
+        index.query(order_by='uid')
+
+
+def test_index_directory_skips_unreadable_reports(index, tmp_path):
+    reports_dir = tmp_path / 'reports'
+    reports_dir.mkdir()
+    (reports_dir / 'scan_report_1_1.json').write_text(json.dumps(report('r1')))
+    (reports_dir / 'scan_report_2_1.json').write_text('{not json')
+    (reports_dir / 'scan_report_3_1.json').write_text(json.dumps(report(None)))
+    (reports_dir / 'other.json').write_text(json.dumps(report('r4')))
+
+    assert index.index_directory(str(reports_dir)) == 1
+    assert [row['location'] for row in index.query()] == [str(reports_dir / 'scan_report_1_1.json')]
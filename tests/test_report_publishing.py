@@ -0,0 +1,215 @@
+"""
+Report publishing to local files and Walrus.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from pgdn_publisher.config import PublisherConfig
+from pgdn_publisher.destinations import ReportDestination
+from pgdn_publisher.reports import PublishResult, ReportPublisher, decode_report_blob
+
+from conftest import scan
+
+
+def test_delta_mode_writes_full_report_locally(make_publisher):
+    publisher = make_publisher(report_delta_mode='unchanged')
+    publisher.publish(scan(scan_id=1))
+    results = publisher.publish(scan(scan_id=2))
+
+    with open(results['local_file'].identifier) as f:
+        stored = json.load(f)
+    assert stored['report_type'] == 'depin_validator_scan'
+    assert stored['security_assessment']['trust_score'] == 80
+    assert publisher.retrieve_from_walrus(results['walrus'].identifier)['uid'] == stored['uid']
+
+
+def test_unchanged_record_keeps_raw_scan_data_changes(make_publisher, walrus):
+    publisher = make_publisher(report_delta_mode='unchanged')
+    publisher.publish(scan(scan_id=1, agent='scanner-1.0'))
+    results = publisher.publish(scan(scan_id=2, agent='scanner-1.1'))
+
+    record = decode_report_blob(walrus.blobs[results['walrus'].identifier])
+    assert record['report_type'] == 'depin_validator_scan_unchanged'
+    rebuilt = publisher.retrieve_from_walrus(results['walrus'].identifier)
+    assert rebuilt['raw_scan_data']['agent'] == 'scanner-1.1'
+    assert rebuilt['raw_scan_data']['scan_id'] == 2
+    with open(results['local_file'].identifier) as f:
+        assert json.load(f) == rebuilt
+
+
+def test_changed_technical_details_are_not_published_as_unchanged(make_publisher, walrus):
+    publisher = make_publisher(report_delta_mode='unchanged')
+    publisher.publish(scan(scan_id=1))
+    results = publisher.publish(scan(scan_id=2, banners={'22': 'OpenSSH_9.6'}))
+
+    assert decode_report_blob(walrus.blobs[results['walrus'].identifier])['report_type'] == 'depin_validator_scan'
+    rebuilt = publisher.retrieve_from_walrus(results['walrus'].identifier)
+    assert rebuilt['technical_details']['service_banners'] == {'22': 'OpenSSH_9.6'}
+
+
+def test_invalid_delta_mode_is_rejected_up_front(tmp_path):
+    config = PublisherConfig(reports_dir=str(tmp_path), report_delta_mode='sometimes')
+    with pytest.raises(ValueError, match='REPORT_DELTA_MODE'):
+        ReportPublisher(config)
+    with pytest.raises(ValueError, match='REPORT_DELTA_MODE'):
+        config.validate()
+
+
+def test_dedup_follows_deterministic_mode(monkeypatch):
+    monkeypatch.delenv('WALRUS_DEDUP', raising=False)
+    monkeypatch.delenv('REPORT_DETERMINISTIC', raising=False)
+    assert PublisherConfig.from_env().walrus_dedup is False
+    assert PublisherConfig().walrus_dedup is False
+
+    monkeypatch.setenv('REPORT_DETERMINISTIC', 'true')
+    assert PublisherConfig.from_env().walrus_dedup is True
+
+    monkeypatch.setenv('WALRUS_DEDUP', 'false')
+    assert PublisherConfig.from_env().walrus_dedup is False
+
+
+def test_non_deterministic_reports_create_no_blob_map(make_publisher, tmp_path):
+    publisher = make_publisher(walrus_dedup=PublisherConfig().walrus_dedup)
+    publisher.publish(scan(), ['walrus'])
+
+    assert publisher._blob_map is None
+    assert not (tmp_path / 'reports' / 'blob_map.sqlite').exists()
+
+
+def test_deterministic_rescans_reuse_the_stored_blob(make_publisher, walrus):
+    publisher = make_publisher(report_deterministic=True, walrus_dedup=True)
+    first = publisher.publish(scan(), ['walrus'])['walrus']
+    second = publisher.publish(scan(), ['walrus'])['walrus']
+
+    assert first.identifier == second.identifier
+    assert len(walrus.blobs) == 1
+
+
+@pytest.mark.parametrize('scan_time', [1700000000, 1700000000000, 1700000000000000, 1700000000000000000])
+def test_deterministic_generated_at_is_the_scan_time(make_publisher, scan_time):
+    publisher = make_publisher(report_deterministic=True)
+    report = publisher._format_report(scan(scan_time=scan_time))
+
+    assert report['generated_at'] == '2023-11-14T22:13:20+00:00'
+
+
+def test_deterministic_report_without_scan_time_stays_indexed_by_time(make_publisher):
+    publisher = make_publisher(report_deterministic=True)
+    data = scan()
+    del data['scan_time']
+
+    first = publisher._format_report(data)
+    assert first == publisher._format_report(data)
+    assert first['generated_at'].endswith('T00:00:00+00:00')
+
+    publisher.publish_formatted(first, ['local_file'])
+    since = time.time() - 2 * 86400
+    assert [row['uid'] for row in publisher.get_report_index().query(since=since)] == [first['uid']]
+
+
+def test_batch_formatting_matches_per_scan_formatting(make_publisher):
+    import numpy as np
+
+    publisher = make_publisher()
+    scans = [
+        scan(scan_id=1, open_ports=[22.0, 2375]),
+        scan(scan_id=2),
+        scan(scan_id=3, open_ports=['22', None, [2375]], trust_score=39.5),
+        scan(scan_id=4, open_ports=[True, 443], trust_score=float('nan'), vulnerabilities=['CVE-1', 'CVE-2']),
+        scan(scan_id=5, trust_score=True, ssl_info={'expired': 1}),
+        scan(scan_id=6, open_ports=[], trust_score=60),
+    ]
+    scans[1].update(open_ports=[np.int64(22), np.float32(2375)], trust_score=np.int64(65))
+    del scans[5]['trust_score']
+
+    def rules(report):
+        return report['security_assessment']['risk_level'], report['recommendations']
+
+    batch = publisher.format_reports_batch(scans)
+    assert [rules(report) for report in batch] == [rules(publisher._format_report(data)) for data in scans]
+    assert rules(batch[1]) == ('MEDIUM', [
+        "Ensure SSH is properly secured with key-based authentication",
+        "CRITICAL: Docker API exposed without authentication - secure immediately",
+        "Overall security posture needs improvement",
+    ])
+
+
+@pytest.mark.parametrize('trust_score', ['85', None])
+def test_batch_formatting_rejects_scores_per_scan_formatting_rejects(make_publisher, trust_score):
+    publisher = make_publisher()
+    scans = [scan(scan_id=1), scan(scan_id=2, trust_score=trust_score)]
+
+    with pytest.raises(TypeError):
+        publisher._format_report(scans[1])
+    with pytest.raises(TypeError):
+        publisher.format_reports_batch(scans)
+
+
+class FakeDestination(ReportDestination):
+    """Publishes after an optional wait, or raises."""
+
+    def __init__(self, name, timeout=None, wait=None, error=None):
+        super().__init__(timeout)
+        self.name = name
+        self.wait = wait
+        self.error = error
+
+    def publish(self, report, full_report=None):
+        if self.wait is not None:
+            self.wait()
+        if self.error:
+            raise RuntimeError(self.error)
+        return PublishResult(success=True, destination=self.name, identifier=report['uid'])
+
+
+def test_fan_out_publishes_to_destinations_concurrently(make_publisher):
+    publisher = make_publisher()
+    # Each destination only returns once the other one has started
+    barrier = threading.Barrier(2, timeout=5)
+    for name in ('first', 'second'):
+        publisher.register_destination(FakeDestination(name, wait=barrier.wait))
+
+    results = publisher.publish(scan(), ['second', 'missing', 'first'])
+
+    assert list(results) == ['second', 'missing', 'first']
+    assert results['first'].success and results['second'].success
+    assert results['missing'].error == 'Unknown destination: missing'
+    assert all(results[name].duration >= 0 for name in ('first', 'second'))
+
+
+def test_fan_out_times_out_slow_destinations_only(make_publisher):
+    publisher = make_publisher()
+    release = threading.Event()
+    publisher.register_destination(FakeDestination('slow', timeout=0.2, wait=lambda: release.wait(5)))
+    publisher.register_destination(FakeDestination('slower', timeout=0.3, wait=lambda: release.wait(5)))
+    publisher.register_destination(FakeDestination('fast', timeout=0.2))
+    publisher.register_destination(FakeDestination('broken', error='disk full'))
+
+    started = time.monotonic()
+    try:
+        results = publisher.publish(scan(), ['slow', 'slower', 'fast', 'broken'])
+        elapsed = time.monotonic() - started
+    finally:
+        release.set()
+
+    # Timeouts run from the start of the fan-out, not one after another
+    assert elapsed < 0.5
+    assert results['slow'].error == 'Timed out after 0.2s'
+    assert results['slower'].error == 'Timed out after 0.3s'
+    assert 0.2 <= results['slow'].duration < 0.3 <= results['slower'].duration
+    assert results['fast'].success and results['fast'].duration < 0.2
+    assert not results['broken'].success and results['broken'].error == 'disk full'
+    assert results['broken'].duration is not None
+
+
+def test_single_destination_records_its_duration(make_publisher):
+    publisher = make_publisher()
+    publisher.register_destination(FakeDestination('only', wait=lambda: time.sleep(0.05)))
+
+    result = publisher.publish(scan(), ['only'])['only']
+
+    assert result.success and result.duration >= 0.05
@@ -0,0 +1,165 @@
+"""
+Report retrieval from Walrus across the stored layouts.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pgdn_publisher.reports import IndexCache, ReportError, decode_report_blob
+
+from conftest import scan
+
+
+def test_bundled_pointer_fetches_only_the_report_range(make_publisher, walrus):
+    publisher = make_publisher()
+    scans = [scan(host_uid=f'host-{n}', scan_id=n, trust_score=50 + n) for n in range(5)]
+    results = publisher.publish_bundle(scans, ['walrus'])
+    pointer = results[3]['walrus'].identifier
+    blob_id = pointer.split('#')[0]
+
+    walrus.requests.clear()
+    assessment = publisher.retrieve_section(pointer, 'security_assessment')
+
+    assert assessment['trust_score'] == 53
+    assert walrus.requests and all(blob == blob_id and byte_range for blob, byte_range in walrus.requests)
+
+
+def test_bundled_range_pointer(make_publisher):
+    publisher = make_publisher(bundle_pointer_style='range')
+    results = publisher.publish_bundle([scan(scan_id=n) for n in range(3)], ['walrus'])
+
+    report = publisher.retrieve_from_walrus(results[1]['walrus'].identifier)
+
+    assert report['scan_metadata']['scan_id'] == 1
+    assert publisher.retrieve_section(results[2]['walrus'].identifier, 'scan_metadata')['scan_id'] == 2
+
+
+def test_bundle_keeps_reports_sharing_a_uid(make_publisher):
+    publisher = make_publisher()
+    scans = [{'host_uid': f'host-{n}', 'trust_score': n} for n in range(4)]
+    results = publisher.publish_bundle(scans, ['walrus'])
+
+    assert all(result['walrus'].success for result in results)
+    pointers = [result['walrus'].identifier for result in results]
+    assert len(set(pointers)) == 4
+    assert [publisher.retrieve_from_walrus(pointer)['scan_metadata']['host_uid'] for pointer in pointers] == \
+        [f'host-{n}' for n in range(4)]
+
+
+def test_missing_section(make_publisher):
+    publisher = make_publisher()
+    results = publisher.publish_bundle([scan()], ['walrus'])
+
+    with pytest.raises(ReportError, match='not found'):
+        publisher.retrieve_section(results[0]['walrus'].identifier, 'no_such_section')
+
+
+def test_section_of_a_delta_record_comes_from_the_rebuilt_report(make_publisher, walrus):
+    publisher = make_publisher(report_delta_mode='diff')
+    first = publisher.publish(scan(trust_score=40))
+    second = publisher.publish(scan(trust_score=90, open_ports=[22]))
+    assert decode_report_blob(walrus.blobs[second['walrus'].identifier])['report_type'] == 'depin_validator_scan_delta'
+
+    assert publisher.retrieve_from_walrus(second['walrus'].identifier)['security_assessment']['trust_score'] == 90
+    assessment = publisher.retrieve_section(second['walrus'].identifier, 'security_assessment')
+    assert assessment['trust_score'] == 90
+    assert assessment['open_ports'] == [22]
+    assert publisher.retrieve_section(first['walrus'].identifier, 'security_assessment')['trust_score'] == 40
+
+
+def test_sectioned_delta_record_is_rebuilt(make_publisher, walrus):
+    publisher = make_publisher(report_delta_mode='unchanged', report_layout='sectioned')
+    publisher.publish(scan(scan_id=1))
+    second = publisher.publish(scan(scan_id=2))
+    assert decode_report_blob(walrus.blobs[second['walrus'].identifier])['report_type'] == 'depin_validator_scan_unchanged'
+
+    assert publisher.retrieve_section(second['walrus'].identifier, 'scan_metadata')['scan_id'] == 2
+    assert publisher.retrieve_section(second['walrus'].identifier, 'recommendations')
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'walrus_streaming': True},
+    {'walrus_compression': 'gzip'},
+    {'report_layout': 'sectioned'},
+])
+def test_retrieve_section_per_layout(make_publisher, walrus, overrides):
+    publisher = make_publisher(**overrides)
+    blob_id = publisher.publish(scan(trust_score=65), ['walrus'])['walrus'].identifier
+    if overrides.get('walrus_compression'):
+        assert walrus.blobs[blob_id][:2] == b'\x1f\x8b'
+
+    assert publisher.retrieve_section(blob_id, 'security_assessment')['trust_score'] == 65
+    assert publisher.retrieve_from_walrus(blob_id)['scan_metadata']['host_uid'] == 'host-1'
+
+
+def test_sectioned_report_fetches_only_table_and_section(make_publisher, walrus):
+    publisher = make_publisher(report_layout='sectioned')
+    blob_id = publisher.publish(scan(), ['walrus'])['walrus'].identifier
+
+    walrus.requests.clear()
+    publisher.retrieve_section(blob_id, 'recommendations')
+    publisher.retrieve_section(blob_id, 'security_assessment')
+
+    # One probe for the section table, then one range per section
+    assert len(walrus.requests) == 3
+    assert all(byte_range for _, byte_range in walrus.requests)
+
+
+def test_retrieve_section_without_range_support(make_publisher, walrus):
+    walrus.ranges = False
+    publisher = make_publisher(walrus_compression='gzip')
+    blob_id = publisher.publish(scan(trust_score=12), ['walrus'])['walrus'].identifier
+
+    assert publisher.retrieve_section(blob_id, 'security_assessment')['trust_score'] == 12
+
+
+def test_index_cache_under_concurrent_use():
+    cache = IndexCache(size=8)
+
+    def hammer(worker):
+        for n in range(2000):
+            key = f'blob-{(worker * 7 + n) % 20}'
+            if cache.get(key) is None:
+                cache.put(key, {'uid': (n, 1)})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(hammer, range(8)))
+
+    assert len(cache._entries) == 8
+
+
+def test_retrieve_as_completed_over_many_bundles(make_publisher):
+    publisher = make_publisher(bundle_max_reports=3)
+    results = publisher.publish_bundle([scan(host_uid=f'host-{n}', scan_id=n) for n in range(30)], ['walrus'])
+    pointers = [result['walrus'].identifier for result in results]
+    publisher._bundle_indexes = IndexCache(size=2)
+
+    retrieved = {pointer: (report, error) for pointer, report, error in publisher.retrieve_as_completed(pointers, 16)}
+
+    assert all(error is None for _, error in retrieved.values())
+    assert sorted(report['scan_metadata']['scan_id'] for report, _ in retrieved.values()) == list(range(30))
+
+
+@pytest.mark.parametrize('overrides', [
+    {},
+    {'walrus_compression': 'gzip'},
+    {'report_layout': 'sectioned'},
+    {'report_delta_mode': 'diff'},
+    {'report_delta_mode': 'unchanged', 'walrus_compression': 'gzip'},
+])
+def test_retrieve_section_from_bundles_per_layout(make_publisher, overrides):
+    publisher = make_publisher(**overrides)
+    unchanged = overrides.get('report_delta_mode') == 'unchanged'
+    publisher.publish_bundle([scan(host_uid=f'host-{n}', scan_id=n, trust_score=n) for n in range(3)], ['walrus'])
+    results = publisher.publish_bundle(
+        [scan(host_uid=f'host-{n}', scan_id=10 + n, trust_score=n if unchanged else 50 + n) for n in range(3)],
+        ['walrus']
+    )
+
+    for n, result in enumerate(results):
+        pointer = result['walrus'].identifier
+        assert publisher.retrieve_section(pointer, 'scan_metadata')['scan_id'] == 10 + n
+        assert publisher.retrieve_section(pointer, 'security_assessment')['trust_score'] == (n if unchanged else 50 + n)
+        assert publisher.retrieve_from_walrus(pointer)['scan_metadata']['host_uid'] == f'host-{n}'
@@ -0,0 +1,75 @@
+"""
+Routing, hedging and circuit breaking across pooled RPC endpoints.
+"""
+
+import pytest
+from web3 import Web3
+from web3.exceptions import ProviderConnectionError
+
+from pgdn_publisher.rpc_pool import RpcEndpointPool, RpcPoolError
+
+
+class FakeEndpointProvider:
+    """Stands in for one endpoint's HTTPProvider."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.methods = []
+
+    def make_request(self, method, params):
+        self.methods.append(method)
+        if self.fail:
+            raise ConnectionError('connection refused')
+        return {'jsonrpc': '2.0', 'id': 1, 'result': '0x1'}
+
+
+def make_pool(count, fail=False, **options):
+    pool = RpcEndpointPool([f'http://node-{n}.invalid' for n in range(count)], **options)
+    for endpoint in pool.endpoints:
+        endpoint.provider = FakeEndpointProvider(fail)
+    return pool
+
+
+def test_unreachable_pool_is_not_connected():
+    pool = make_pool(2, fail=True)
+
+    assert Web3(pool).is_connected() is False
+    with pytest.raises(ProviderConnectionError):
+        pool.is_connected(show_traceback=True)
+    with pytest.raises(RpcPoolError, match='All RPC endpoints failed'):
+        pool.make_request('eth_chainId', [])
+
+
+def test_pool_with_one_live_endpoint_is_connected():
+    pool = make_pool(3, fail=True)
+    pool.endpoints[2].provider.fail = False
+
+    assert Web3(pool).is_connected() is True
+
+
+def test_only_submitted_probes_are_marked_probing():
+    pool = make_pool(4, fail=True, broadcast_fanout=1, breaker_failures=1, breaker_reset=0)
+    for endpoint in pool.endpoints:
+        with pytest.raises(ConnectionError):
+            pool._call(endpoint, 'eth_chainId', [])
+    assert all(endpoint.consecutive_failures == 1 for endpoint in pool.endpoints)
+
+    # Every breaker has reset, but the broadcast goes to one endpoint only
+    for endpoint in pool.endpoints:
+        endpoint.provider.fail = False
+    pool.make_request('eth_sendRawTransaction', ['0x00'])
+
+    assert [len(endpoint.provider.methods) for endpoint in pool.endpoints].count(2) == 1
+    assert not any(endpoint.probing for endpoint in pool.endpoints)
+    # The endpoints that were not probed are still candidates for the next request
+    assert len(pool._ranked()) == 4
+
+
+def test_endpoint_being_probed_is_not_probed_twice():
+    pool = make_pool(2, fail=True, breaker_failures=1, breaker_reset=0)
+    probed = pool.endpoints[0]
+    probed.consecutive_failures = 1
+    probed.probing = True
+
+    assert pool._submit(probed, 'eth_chainId', []) is None
+    assert pool._submit(pool.endpoints[1], 'eth_chainId', []) is not None
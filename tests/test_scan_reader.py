@@ -0,0 +1,100 @@
+"""
+Parallel NDJSON scan reader: newline-aligned chunks and reading in worker processes.
+"""
+
+import json
+
+import pytest
+
+from pgdn_publisher.scan_reader import InvalidScan, chunk_ranges, is_columnar_path, parse_chunk, read_scan_file
+
+
+def write_scans(path, scans, trailing_newline=True, newline='\n'):
+    text = newline.join(json.dumps(data, ensure_ascii=False) for data in scans)
+    path.write_bytes((text + (newline if trailing_newline else '')).encode())
+    return str(path)
+
+
+def sample_scans(count):
+    # Varying lengths and multi-byte characters so chunk sizes land mid-line and mid-character
+    return [{'scan_id': n, 'host_uid': f'hôst-{n}', 'banner': 'é' * (n % 7)} for n in range(count)]
+
+
+@pytest.mark.parametrize('trailing_newline', [True, False])
+def test_chunk_ranges_cover_the_file_and_end_on_newlines(tmp_path, trailing_newline):
+    path = write_scans(tmp_path / 'scans.ndjson', sample_scans(20), trailing_newline)
+    data = open(path, 'rb').read()
+
+    for chunk_bytes in (1, 7, 64, 200, len(data), 10 * len(data)):
+        ranges = chunk_ranges(path, chunk_bytes)
+
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+        assert all(data[end - 1:end] == b'\n' for _, end in ranges[:-1])
+
+
+def test_empty_file_has_no_chunks(tmp_path):
+    path = tmp_path / 'scans.ndjson'
+    path.write_bytes(b'')
+
+    assert chunk_ranges(str(path)) == []
+    assert list(read_scan_file(str(path), workers=2)) == []
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_lines_split_across_chunk_boundaries_are_parsed_whole(tmp_path, newline):
+    scans = sample_scans(15)
+    path = write_scans(tmp_path / 'scans.ndjson', scans, trailing_newline=False, newline=newline)
+    size = len(open(path, 'rb').read())
+
+    for chunk_bytes in range(1, size + 2):
+        parsed = [data for start, end in chunk_ranges(path, chunk_bytes) for data in parse_chunk(path, start, end)]
+        assert parsed == scans, f"chunk_bytes={chunk_bytes}"
+
+
+def test_blank_lines_are_skipped_and_offsets_stay_exact(tmp_path):
+    path = tmp_path / 'scans.ndjson'
+    path.write_bytes(b'\n{"scan_id": 1}\n   \n\n{"scan_id": \n{"scan_id": 2}')
+
+    scans = [data for start, end in chunk_ranges(str(path), 4) for data in parse_chunk(str(path), start, end)]
+
+    assert scans[0] == {'scan_id': 1} and scans[2] == {'scan_id': 2}
+    assert isinstance(scans[1], InvalidScan) and scans[1].error.startswith('Invalid JSON at byte 21:')
+
+
+def test_parallel_read_keeps_file_order(tmp_path):
+    scans = sample_scans(300)
+    path = write_scans(tmp_path / 'scans.ndjson', scans)
+
+    assert list(read_scan_file(path, workers=3, chunk_bytes=100)) == scans
+
+
+def test_unordered_parallel_read_yields_every_scan_once(tmp_path):
+    scans = sample_scans(300)
+    path = write_scans(tmp_path / 'scans.ndjson', scans)
+
+    read = list(read_scan_file(path, workers=3, ordered=False, chunk_bytes=100))
+
+    assert sorted(data['scan_id'] for data in read) == list(range(300))
+
+
+def test_single_worker_reads_in_process(tmp_path):
+    scans = sample_scans(50)
+    path = write_scans(tmp_path / 'scans.ndjson', scans)
+
+    assert list(read_scan_file(path, workers=1, chunk_bytes=10)) == scans
+
+
+def test_consumer_can_stop_reading_early(tmp_path):
+    path = write_scans(tmp_path / 'scans.ndjson', sample_scans(500))
+    reader = read_scan_file(path, workers=2, chunk_bytes=50)
+
+    first = [next(reader) for _ in range(5)]
+    reader.close()
+
+    assert [data['scan_id'] for data in first] == [0, 1, 2, 3, 4]
+
+
+def test_columnar_paths_are_recognized_by_suffix():
+    assert is_columnar_path('scans.parquet') and is_columnar_path('SCANS.ARROW') and is_columnar_path('s.feather')
+    assert not is_columnar_path('scans.ndjson') and not is_columnar_path('scans.json')
@@ -0,0 +1,133 @@
+"""
+Routing scans to publisher accounts by host.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from pgdn_publisher.records import ScanRecord
+from pgdn_publisher.sharded_ledger import HashRing, ShardedZkSyncPublisher
+from pgdn_publisher.zksync_ledger import ZkSyncLedgerError
+
+from conftest import scan
+
+
+class FakeAccount:
+    """One publisher account; remembers what it was asked to publish or sign."""
+
+    def __init__(self, position):
+        self.account = SimpleNamespace(address=f'0x{position:040x}')
+        self.calls = []
+
+    def publish(self, scan_result, wait_for_confirmation=True):
+        self.calls.append(('publish', [scan_result]))
+        return {'success': True, 'transaction_hash': '0xabc', 'network': 'zksync'}
+
+    def publish_batch(self, records, wait_for_confirmation=True):
+        self.calls.append(('publish_batch', list(records)))
+        result = {
+            'success': True,
+            'transaction_hash': '0xabc',
+            'summary_hashes': [record.summary_hash_hex for record in records],
+            'count': len(records),
+            'network': 'zksync'
+        }
+        if any(record.score == 0 for record in records):
+            result.update(confirmed=False, confirmation_error='Transaction reverted: 0xabc', reverted=True)
+        return result
+
+    def sign_publish(self, scan_results):
+        self.calls.append(('sign', list(scan_results)))
+        return {'transaction_hash': f'0x{len(self.calls):064x}', 'nonce': 0, 'raw_transaction': '0x00'}
+
+
+@pytest.fixture
+def sharded():
+    publisher = ShardedZkSyncPublisher.__new__(ShardedZkSyncPublisher)
+    publisher.accounts = [FakeAccount(position) for position in range(4)]
+    publisher._ring = HashRing([account.account.address for account in publisher.accounts])
+    publisher._lock = threading.Lock()
+    publisher._signers = {}
+    publisher._health = [{'published': 0, 'failed': 0, 'last_error': None} for _ in publisher.accounts]
+    publisher._executor = ThreadPoolExecutor(max_workers=4)
+    yield publisher
+    publisher._executor.shutdown()
+
+
+def hosts(count):
+    return [f'validator-{n}' for n in range(count)]
+
+
+def test_routing_falls_back_like_validation(sharded):
+    # Hosts whose hash lands on different accounts than 'unknown_host' and ''
+    host = next(name for name in hosts(100)
+                if sharded.account_for(name) not in (sharded.account_for('unknown_host'), sharded.account_for('')))
+    scans = [
+        {'host_uid': host},
+        {'validator_id': host},
+        {'host_uid': None, 'validator_id': host},
+        {'host_uid': '', 'validator_id': host},
+    ]
+
+    assert sharded.partition(scans) == [[0, 1, 2, 3]]
+    assert sharded.partition(scans + [{'host_uid': ''}]) == [[0, 1, 2, 3], [4]]
+
+
+def test_missing_host_uid_routes_as_unknown_host(sharded):
+    other = next(name for name in hosts(100) if sharded.account_for(name) != sharded.account_for('unknown_host'))
+
+    groups = sharded.partition([{'host_uid': None}, {'host_uid': other}, {}, {'host_uid': 'unknown_host'}])
+
+    assert groups == [[0, 2, 3], [1]]
+
+
+def test_publish_routes_the_validated_record(sharded):
+    raw = scan(validator_id='validator-7')
+    del raw['host_uid']
+
+    sharded.publish(raw)
+
+    account = sharded.accounts[sharded.account_for('validator-7')]
+    (call, [record]), = account.calls
+    assert call == 'publish'
+    assert isinstance(record, ScanRecord) and record.host_uid == 'validator-7'
+    assert record.scan_time == 1700000000
+
+
+def test_sign_publish_accepts_hosts_named_either_way(sharded):
+    by_host, by_validator = scan(host_uid='validator-3'), scan(scan_id=2)
+    del by_validator['host_uid']
+    by_validator['validator_id'] = 'validator-3'
+
+    signed = sharded.sign_publish([by_host, by_validator])
+
+    account = sharded.accounts[sharded.account_for('validator-3')]
+    assert signed['account'] == account.account.address
+    assert [record.host_uid for record in account.calls[0][1]] == ['validator-3', 'validator-3']
+
+
+def test_invalid_scan_is_a_ledger_error(sharded):
+    with pytest.raises(ZkSyncLedgerError, match='summary_hash'):
+        sharded.publish({'host_uid': 'validator-1'})
+
+
+def test_reverted_transactions_count_as_failures(sharded):
+    host = 'validator-1'
+    account = sharded.account_for(host)
+
+    sharded.publish_batch([scan(host_uid=host, trust_score=50), scan(host_uid=host, scan_id=2, trust_score=60)])
+    sharded.publish_batch([scan(host_uid=host, trust_score=0), scan(host_uid=host, scan_id=2, trust_score=60)])
+
+    health = sharded._health[account]
+    assert health['published'] == 2 and health['failed'] == 2
+    assert health['last_error'] == 'Transaction reverted: 0xabc'
+
+
+def test_close_stops_the_account_threads(sharded):
+    sharded.close()
+
+    with pytest.raises(RuntimeError):
+        sharded._executor.submit(print)
@@ -0,0 +1,137 @@
+"""
+Batch validation of scans before they are published to a ledger.
+"""
+
+import numpy as np
+import pytest
+
+from pgdn_publisher.validation import (
+    MAX_HOST_UID_LENGTH, ValidationError, normalize_scan_times, scan_records, validate_scans
+)
+
+from conftest import scan
+
+
+NOW = 1700000000
+
+BAD_ROWS = [
+    ({'summary_hash': None}, 'summary_hash is required'),
+    ({'summary_hash': '0x1234'}, 'summary_hash must be exactly 32 bytes'),
+    ({'summary_hash': 'zz' * 32}, 'summary_hash is not valid hex'),
+    ({'trust_score': 'high'}, 'trust_score is not a number'),
+    ({'trust_score': float('inf')}, 'trust_score is not a number'),
+    ({'trust_score': float('nan')}, 'trust_score is not a number'),
+    ({'scan_time': -1}, 'scan_time is not a valid timestamp'),
+    ({'scan_time': float('nan')}, 'scan_time is not a valid timestamp'),
+    ({'scan_time': float('inf')}, 'scan_time is not a valid timestamp'),
+    ({'scan_time': 2 ** 63}, 'scan_time is not a valid timestamp'),
+    ({'scan_time': 1e30}, 'scan_time is not a valid timestamp'),
+    ({'host_uid': 'h' * (MAX_HOST_UID_LENGTH + 1)}, 'host_uid must be a string'),
+    ({'report_pointer': 'p' * 257}, 'report_pointer must be a string'),
+]
+
+
+@pytest.mark.parametrize('fields, reason', BAD_ROWS)
+def test_rejected_rows_keep_their_position_and_reason(fields, reason):
+    scans = [scan(scan_id=0), scan(scan_id=1, **fields), scan(scan_id=2)]
+
+    validated = validate_scans(scans, 'zksync', now=NOW)
+
+    assert validated.index.tolist() == [0, 2]
+    assert [rejected.index for rejected in validated.rejected] == [1]
+    assert validated.rejected[0].reason.startswith(reason)
+
+
+@pytest.mark.parametrize('scan_time, zksync, sui', [
+    (1700000000, 1700000000, 1700000000000),
+    (1700000000123, 1700000000, 1700000000123),
+    (1700000000123456, 1700000000, 1700000000123),
+    (1700000000123456789, 1700000000, 1700000000123),
+    (1700000000123000000, 1700000000, 1700000000123),
+    (1700000000.9, 1700000000, 1700000000900),
+    (1700000000123.0, 1700000000, 1700000000123),
+])
+def test_scan_time_units_are_normalized(scan_time, zksync, sui):
+    assert validate_scans([scan(scan_time=scan_time)], 'zksync', now=NOW).scan_time.tolist() == [zksync]
+    assert validate_scans([scan(scan_time=scan_time)], 'sui', now=NOW).scan_time.tolist() == [sui]
+
+
+def test_normalize_scan_times_per_row():
+    values = np.array([1700000000, 1700000000000, 1700000000000000, 1700000000000000000])
+
+    assert normalize_scan_times(values, 'zksync').tolist() == [1700000000] * 4
+    assert normalize_scan_times(values + 5, 'sui').tolist() == [1700000005000, 1700000000005, 1700000000000, 1700000000000]
+
+
+@pytest.mark.parametrize('scan_time', [0, 0.0])
+def test_zero_scan_time_is_now_on_zksync_only(scan_time):
+    assert validate_scans([scan(scan_time=scan_time)], 'zksync', now=NOW + 0.5).scan_time.tolist() == [NOW]
+    assert validate_scans([scan(scan_time=scan_time)], 'sui', now=NOW + 0.5).scan_time.tolist() == [0]
+
+
+def test_missing_scan_time_keeps_milliseconds_on_sui():
+    raw = scan()
+    del raw['scan_time']
+
+    assert validate_scans([raw], 'sui', now=NOW + 0.25).scan_time.tolist() == [NOW * 1000 + 250]
+    assert validate_scans([raw], 'zksync', now=NOW + 0.25).scan_time.tolist() == [NOW]
+
+
+def test_defaults_and_score_clamping():
+    raw = {'validator_id': 'validator-7', 'summary_hash': 'AB' * 32, 'trust_score': 70000, 'scan_id': 3}
+
+    record = scan_records([raw, scan(trust_score=-5)], 'zksync', now=NOW)
+
+    assert record[0].host_uid == 'validator-7'
+    assert record[0].scan_time == NOW
+    assert record[0].summary_hash == bytes([0xab] * 32)
+    assert record[0].score == 65535
+    assert record[0].report_pointer == f'scan_3_{NOW}'
+    assert record[1].score == 0
+
+
+def test_scan_records_names_the_first_rejected_position():
+    with pytest.raises(ValidationError, match='position 1: scan_time'):
+        scan_records([scan(), scan(scan_time=float('inf'))])
+
+
+def test_arrow_input_rejects_the_same_rows():
+    pa = pytest.importorskip('pyarrow')
+    from pgdn_publisher.arrow_input import to_ledger_batch
+
+    batch = pa.record_batch({
+        'host_uid': ['a', 'b', 'c', 'd', 'e'],
+        'scan_time': [1.7e9, float('nan'), 1e19, float('inf'), 1.7e12],
+        'summary_hash': ['0x' + 'ab' * 32] * 5,
+        'trust_score': [1.0, 2.0, 3.0, 4.0, float('-inf')],
+    })
+
+    ledger_batch, rejected = to_ledger_batch(batch, 10, 'zksync', now=NOW)
+
+    assert ledger_batch.column(1).to_pylist() == [1700000000]
+    assert [row.index for row in rejected] == [11, 12, 13, 14]
+    assert rejected[-1].reason == 'trust_score is not a number'
+
+
+def test_arrow_input_keeps_milliseconds_on_sui():
+    pa = pytest.importorskip('pyarrow')
+    from pgdn_publisher.arrow_input import to_ledger_batch
+
+    batch = pa.record_batch({
+        'host_uid': ['a', 'b', 'c', 'd', 'e'],
+        'scan_time': pa.array([1700000000123, 1700000000123456789, 0, None, 1700000000], pa.int64()),
+        'summary_hash': ['0x' + 'ab' * 32] * 5,
+    })
+
+    sui, _ = to_ledger_batch(batch, network='sui', now=NOW + 0.5)
+    zksync, _ = to_ledger_batch(batch, network='zksync', now=NOW + 0.5)
+
+    assert sui.column(1).to_pylist() == [1700000000123, 1700000000123, 0, NOW * 1000 + 500, 1700000000000]
+    assert zksync.column(1).to_pylist() == [NOW] * 5
+
+    stamps = pa.record_batch({
+        'host_uid': ['a'],
+        'scan_time': pa.array([1700000000123], pa.timestamp('ms')),
+        'summary_hash': ['ab' * 32],
+    })
+    assert to_ledger_batch(stamps, network='sui', now=NOW)[0].column(1).to_pylist() == [1700000000123]